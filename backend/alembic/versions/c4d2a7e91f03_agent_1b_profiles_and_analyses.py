@@ -0,0 +1,69 @@
+"""agent_1b_profiles_and_analyses
+
+Colonnes lues par l'Agent 1B multi-profils (workflow des documents, profils
+de veille) et table des analyses validées dans l'UI.
+
+Revision ID: c4d2a7e91f03
+Revises: b98fe5251b59
+Create Date: 2026-10-19 10:12:44.518203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d2a7e91f03'
+down_revision = 'b98fe5251b59'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('documents') as batch_op:
+        batch_op.add_column(sa.Column('regulation_type', sa.String(length=50), nullable=True))
+        batch_op.add_column(sa.Column('workflow_status', sa.String(length=20), nullable=False, server_default='raw'))
+        batch_op.add_column(sa.Column('analyzed_at', sa.DateTime(), nullable=True))
+
+    with op.batch_alter_table('company_profile') as batch_op:
+        batch_op.add_column(sa.Column('nc_codes', sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column('keywords', sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column('regulations', sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column('contact_emails', sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column('config', sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column('active', sa.Boolean(), nullable=False, server_default=sa.true()))
+
+    op.create_table('analyses',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('document_id', sa.String(), nullable=False),
+    sa.Column('is_relevant', sa.Boolean(), nullable=False),
+    sa.Column('confidence', sa.Float(), nullable=False),
+    sa.Column('matched_keywords', sa.JSON(), nullable=True),
+    sa.Column('matched_nc_codes', sa.JSON(), nullable=True),
+    sa.Column('llm_reasoning', sa.Text(), nullable=True),
+    sa.Column('validation_status', sa.String(length=20), nullable=False),
+    sa.Column('validation_comment', sa.Text(), nullable=True),
+    sa.Column('validated_by', sa.String(length=200), nullable=True),
+    sa.Column('validated_at', sa.DateTime(), nullable=True),
+    sa.Column('regulation_type', sa.String(length=50), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('analyses')
+
+    with op.batch_alter_table('company_profile') as batch_op:
+        batch_op.drop_column('active')
+        batch_op.drop_column('config')
+        batch_op.drop_column('contact_emails')
+        batch_op.drop_column('regulations')
+        batch_op.drop_column('keywords')
+        batch_op.drop_column('nc_codes')
+
+    with op.batch_alter_table('documents') as batch_op:
+        batch_op.drop_column('analyzed_at')
+        batch_op.drop_column('workflow_status')
+        batch_op.drop_column('regulation_type')
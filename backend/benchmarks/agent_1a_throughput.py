@@ -0,0 +1,268 @@
+"""
+Benchmark de débit de l'Agent 1A sur un site réglementaire synthétique local
+
+Démarre benchmarks/synthetic_site.py, pointe EUR-Lex et CBAM vers ce serveur
+(EURLEX_BASE_URL / CBAM_SOURCE_URL) et exécute run_agent_1a_combined de bout
+en bout dans un dossier de travail temporaire, avec une base SQLite jetable.
+
+Mesures :
+- latences par étape (scraping, vérification BDD, téléchargement, extraction,
+  sauvegarde) : p50 / p90 / p95 / p99 / max
+- débit global (documents/s, Mo/s)
+- délai avant la sauvegarde du premier acte EUR-Lex
+- pic de mémoire résidente (processus + spiders Scrapy)
+- octets transférés (côté serveur et côté fetcher)
+
+Usage:
+    python benchmarks/agent_1a_throughput.py --eurlex-docs 20 --cbam-docs 30 --output bench.json
+
+    # Comparer à un run précédent (autre commit)
+    python benchmarks/agent_1a_throughput.py --baseline bench_main.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Ajouter le dossier parent au PYTHONPATH
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_site import SyntheticRegulatorySite
+
+STAGES = ["scraping", "check_existing", "download", "extraction", "save"]
+
+# Métriques comparées avec --baseline : (chemin, plus grand = meilleur)
+COMPARED_METRICS = [
+    ("throughput.docs_per_second", True),
+    ("throughput.mb_per_second", True),
+    ("wall_time_seconds", False),
+    ("time_to_first_regulation_seconds", False),
+    ("peak_rss_mb.total", False),
+]
+
+
+def percentiles(values: list) -> dict:
+    """Percentiles (rang le plus proche) d'une série de durées, en millisecondes"""
+    if not values:
+        return {"count": 0}
+
+    ordered = sorted(values)
+
+    def rank(q: float) -> float:
+        index = min(len(ordered) - 1, max(0, round(q * len(ordered) + 0.5) - 1))
+        return round(ordered[index] * 1000, 2)
+
+    return {
+        "count": len(ordered),
+        "total_ms": round(sum(ordered) * 1000, 2),
+        "p50_ms": rank(0.50),
+        "p90_ms": rank(0.90),
+        "p95_ms": rank(0.95),
+        "p99_ms": rank(0.99),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+def peak_rss_mb() -> dict:
+    """Pic de mémoire résidente (ru_maxrss est en Ko sous Linux, en octets sous macOS)"""
+    unit = 1 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit / 1e6
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit / 1e6
+    return {"process": round(own, 1), "children": round(children, 1), "total": round(own + children, 1)}
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def run_benchmark(args) -> dict:
+    """
+    Exécute l'Agent 1A contre le site synthétique et construit le rapport
+
+    Raises:
+        RuntimeError: Agent 1A en erreur ou aucun document sauvegardé (mesures
+            sans valeur)
+    """
+    site = SyntheticRegulatorySite(
+        eurlex_docs=args.eurlex_docs,
+        cited_docs=args.cited_docs,
+        cbam_docs=args.cbam_docs,
+        pdf_pages=args.pdf_pages,
+        file_size_kb=args.file_size_kb,
+        latency_ms=args.latency_ms,
+        html_renditions=not args.no_html,
+    )
+
+    workdir = Path(tempfile.mkdtemp(prefix="agent_1a_bench_"))
+
+    with site:
+        # La configuration doit être en place avant le premier import de src.config
+        os.environ.update({
+            "EURLEX_BASE_URL": site.eurlex_base_url,
+            "CBAM_SOURCE_URL": site.cbam_source_url,
+            "DATABASE_URL": f"sqlite:///{workdir / 'bench.db'}",
+            "HTTP_CASSETTE_MODE": "off",
+        })
+        os.chdir(workdir)
+
+        from src.agent_1a.agent import run_agent_1a_combined
+        from src.storage.database import init_db
+
+        init_db()
+
+        start = time.perf_counter()
+        result = asyncio.run(run_agent_1a_combined(
+            keyword=args.keyword,
+            max_eurlex_documents=args.eurlex_docs,
+            max_cbam_documents=args.cbam_docs,
+        ))
+        wall_time = time.perf_counter() - start
+
+    if result.get("status") != "success":
+        raise RuntimeError(f"Agent 1A en erreur: {result.get('error')}")
+    if not result.get("documents_processed"):
+        raise RuntimeError(
+            f"Aucun document sauvegardé ({result.get('save_errors', 0)} erreurs de sauvegarde, "
+            f"{result.get('extraction_errors', 0)} d'extraction, {result.get('download_errors', 0)} de téléchargement)"
+        )
+
+    durations = result.pop("stage_durations", {})
+    downloaded = len(durations.get("download", []))
+    bytes_downloaded = result.get("bytes_downloaded", 0)
+
+    return {
+        "revision": git_revision(),
+        "label": args.label,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "parameters": {
+            "eurlex_docs": args.eurlex_docs,
+            "cited_docs": args.cited_docs,
+            "cbam_docs": args.cbam_docs,
+            "pdf_pages": args.pdf_pages,
+            "file_size_kb": args.file_size_kb,
+            "latency_ms": args.latency_ms,
+            "html_renditions": not args.no_html,
+        },
+        "wall_time_seconds": round(wall_time, 3),
+        "time_to_first_regulation_seconds": result.get("first_regulation_saved_seconds"),
+        "stages": {stage: percentiles(durations.get(stage, [])) for stage in STAGES},
+        "throughput": {
+            "documents_downloaded": downloaded,
+            "documents_saved": result.get("documents_processed", 0),
+            "docs_per_second": round(downloaded / wall_time, 2) if wall_time else None,
+            "mb_per_second": round(bytes_downloaded / 1e6 / wall_time, 2) if wall_time else None,
+        },
+        "bytes": {
+            "published": site.total_bytes,
+            "served": site.bytes_sent,
+            "downloaded": bytes_downloaded,
+            "requests": site.requests_served,
+        },
+        "peak_rss_mb": peak_rss_mb(),
+        "agent_result": result,
+    }
+
+
+def _metric(report: dict, path: str):
+    value = report
+    for key in path.split("."):
+        value = value.get(key) if isinstance(value, dict) else None
+    return value
+
+
+def print_report(report: dict, baseline: dict = None) -> None:
+    """Affiche le tableau des latences et, si fourni, l'écart avec un run de référence"""
+    params = report["parameters"]
+    print("=" * 80)
+    print(
+        f"AGENT 1A - {params['eurlex_docs']} actes EUR-Lex, {params['cbam_docs']} fichiers CBAM "
+        f"(rev {report['revision']})"
+    )
+    print("=" * 80)
+
+    print(f"{'Étape':<16}{'N':>6}{'p50 ms':>10}{'p90 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for stage, stats in report["stages"].items():
+        if not stats["count"]:
+            print(f"{stage:<16}{0:>6}")
+            continue
+        print(
+            f"{stage:<16}{stats['count']:>6}{stats['p50_ms']:>10.1f}{stats['p90_ms']:>10.1f}"
+            f"{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}{stats['max_ms']:>10.1f}"
+        )
+
+    throughput = report["throughput"]
+    print(f"\nDurée totale : {report['wall_time_seconds']:.2f} s")
+    if report["time_to_first_regulation_seconds"] is not None:
+        print(f"1er acte     : sauvegardé après {report['time_to_first_regulation_seconds']:.2f} s")
+    print(
+        f"Débit        : {throughput['docs_per_second'] or 0:.2f} docs/s, "
+        f"{throughput['mb_per_second'] or 0:.2f} Mo/s "
+        f"({throughput['documents_saved']} sauvegardés)"
+    )
+    print(
+        f"Transfert    : {report['bytes']['served'] / 1e6:.2f} Mo servis "
+        f"en {report['bytes']['requests']} requêtes"
+    )
+    print(f"Pic RSS      : {report['peak_rss_mb']['total']:.1f} Mo (dont spiders {report['peak_rss_mb']['children']:.1f} Mo)")
+
+    if baseline:
+        print(f"\nComparaison avec rev {baseline.get('revision')}:")
+        for path, higher_is_better in COMPARED_METRICS:
+            before, after = _metric(baseline, path), _metric(report, path)
+            if not before or after is None:
+                continue
+            change = (after - before) / before * 100
+            better = (change > 0) == higher_is_better
+            print(f"  {path:<30}{before:>10}{after:>10}  {change:+.1f}% {'✅' if better else '⚠️'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Débit de l'Agent 1A sur un site synthétique local")
+    parser.add_argument("--eurlex-docs", type=int, default=10, help="Actes EUR-Lex publiés")
+    parser.add_argument("--cited-docs", type=int, default=0, help="Actes atteignables uniquement par citation")
+    parser.add_argument("--cbam-docs", type=int, default=20, help="Fichiers CBAM publiés (PDF/XLSX/ZIP)")
+    parser.add_argument("--pdf-pages", type=int, default=5, help="Pages par PDF généré")
+    parser.add_argument("--file-size-kb", type=int, default=256, help="Taille des fichiers XLSX/ZIP")
+    parser.add_argument("--latency-ms", type=int, default=0, help="Latence serveur par réponse")
+    parser.add_argument("--no-html", action="store_true", help="Pas de rendu HTML EUR-Lex (repli PDF)")
+    parser.add_argument("--keyword", default="CBAM")
+    parser.add_argument("--label", default="", help="Libellé libre du run")
+    parser.add_argument("--baseline", type=Path, help="Rapport JSON de référence à comparer")
+    parser.add_argument("--output", type=Path, help="Fichier JSON de résultats")
+    args = parser.parse_args()
+
+    if args.output:
+        args.output = args.output.resolve()
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline else None
+
+    try:
+        report = run_benchmark(args)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print_report(report, baseline)
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False, default=str), encoding="utf-8")
+        print(f"\n💾 Résultats sauvegardés: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Accélération de l'analyse Agent 1B en fonction du nombre d'appels LLM simultanés
+
+L'appel à Claude est remplacé par une attente simulant sa latence (et,
+optionnellement, des réponses 429 avec retry-after) ; les niveaux 1 et 2 et
+l'agrégation tournent réellement. Pour chaque niveau de concurrence, le lot
+complet est analysé et le débit comparé à l'exécution séquentielle.
+
+Usage:
+    python benchmarks/agent_1b_batch_concurrency.py --documents 200 --latency-ms 300
+    python benchmarks/agent_1b_batch_concurrency.py --concurrency 1 4 8 16 --rate-limit-every 25
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+# Ajouter le dossier parent au PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import structlog
+from anthropic import RateLimitError
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+
+from src.agent_1b.agent import Agent1B
+from src.agent_1b.batch import BatchAnalyzer
+from src.agent_1b.models import SemanticAnalysisResult
+from src.agent_1b.tools.semantic_analyzer import SemanticAnalyzer
+
+PROFILE = {
+    "company_id": "bench",
+    "company_name": "Bench Industries",
+    "keywords": ["cbam", "rubber", "embedded emissions", "declarant", "steel"],
+    "nc_codes": ["4016.93", "4009.11", "7208"],
+}
+
+RESULT = SemanticAnalysisResult(
+    score=0.7,
+    is_applicable=True,
+    explanation="Le règlement impose une déclaration CBAM pour les importations concernées.",
+    regulation_summary="Déclaration trimestrielle des émissions intégrées.",
+    impact_explanation="Les joints en caoutchouc importés relèvent du code NC 4016.93 déclaré.",
+    confidence_level=0.9
+)
+
+# Réponse brute du LLM (JSON du résultat + consommation de tokens)
+RESPONSE = AIMessage(
+    content=RESULT.model_dump_json(),
+    usage_metadata={"input_tokens": 9000, "output_tokens": 400, "total_tokens": 9400}
+)
+
+
+def make_agent(latency: float, rate_limit_every: int) -> Agent1B:
+    calls = 0
+
+    async def fake_llm(inputs):
+        nonlocal calls
+        calls += 1
+        if rate_limit_every and calls % rate_limit_every == 0:
+            request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+            response = httpx.Response(429, headers={"retry-after": str(latency)}, request=request)
+            raise RateLimitError("rate limited", response=response, body=None)
+        await asyncio.sleep(latency)
+        return RESPONSE
+
+    analyzer = SemanticAnalyzer()
+    analyzer.chain = RunnableLambda(lambda inputs: RESPONSE, afunc=fake_llm)
+    return Agent1B(PROFILE, semantic_analyzer=analyzer)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Accélération de l'Agent 1B selon la concurrence LLM")
+    parser.add_argument("--documents", type=int, default=100)
+    parser.add_argument("--latency-ms", type=int, default=200, help="Latence simulée d'un appel LLM")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="Un 429 tous les N appels (0: jamais)")
+    parser.add_argument("--output", type=Path, help="Fichier JSON de résultats")
+    args = parser.parse_args()
+
+    os.environ.setdefault("ANTHROPIC_API_KEY", "sk-ant-benchmark")
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(40))
+
+    content = "The declarant shall report embedded emissions of CBAM goods, e.g. rubber under CN 4016.93.\n" * 300
+    documents = [
+        {"document_id": f"doc-{i:05d}", "document_content": content, "document_title": f"Document {i}"}
+        for i in range(args.documents)
+    ]
+
+    results = []
+    for concurrency in args.concurrency:
+        agent = make_agent(args.latency_ms / 1000, args.rate_limit_every)
+        stats = asyncio.run(BatchAnalyzer(agent, concurrency=concurrency).run(
+            documents, on_analysis=lambda document, analysis: None
+        ))
+        results.append(stats)
+
+    baseline = results[0]["wall_time_seconds"]
+
+    print("=" * 80)
+    print(f"AGENT 1B - {args.documents} documents, latence LLM simulée {args.latency_ms} ms")
+    print("=" * 80)
+    print(f"{'Concurrence':>12}{'Durée s':>10}{'Docs/min':>10}{'Accélération':>14}{'Pauses 429':>12}{'Erreurs':>9}")
+    for stats in results:
+        print(
+            f"{stats['concurrency']:>12}{stats['wall_time_seconds']:>10.2f}{stats['docs_per_minute']:>10.1f}"
+            f"{baseline / stats['wall_time_seconds']:>13.1f}x{stats['rate_limit_pauses']:>12}{len(stats['errors']):>9}"
+        )
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\n💾 Résultats sauvegardés: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
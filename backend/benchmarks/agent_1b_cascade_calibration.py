@@ -0,0 +1,97 @@
+"""
+Calibration de la cascade de pertinence de l'Agent 1B sur des analyses historiques
+
+Rejoue SemanticCascade sur des analyses déjà produites (avec appel LLM) et
+mesure, pour chaque mode et plancher de score local :
+- la part des appels LLM économisés (sautés ou différés)
+- les décisions qui auraient changé (criticité différente sans le LLM)
+
+Sources :
+- --input : fichier JSONL de DocumentAnalysis sérialisées (model_dump_json)
+- sinon : table "analyses" de la base (scores relus dans le reasoning)
+
+Usage:
+    python benchmarks/agent_1b_cascade_calibration.py --mode gate --local-floor 0 0.05 0.1
+    python benchmarks/agent_1b_cascade_calibration.py --input analyses.jsonl --output calibration.json
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+# Ajouter le dossier parent au PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.agent_1b.tools.relevance_scorer import RelevanceScorer
+from src.agent_1b.tools.semantic_cascade import (
+    SemanticCascade,
+    calibrate_cascade,
+    scores_from_document_analysis,
+    scores_from_reasoning
+)
+
+
+def load_records(input_path: Path = None) -> list:
+    """Scores par niveau des analyses historiques"""
+    if input_path:
+        with open(input_path, encoding="utf-8") as f:
+            return [scores_from_document_analysis(json.loads(line)) for line in f if line.strip()]
+
+    from src.storage.database import get_session
+    from src.storage.models import Analysis
+
+    session = get_session()
+    try:
+        records = [
+            scores_from_reasoning(analysis.document_id, analysis.llm_reasoning)
+            for analysis in session.query(Analysis).all()
+        ]
+    finally:
+        session.close()
+
+    return [record for record in records if record is not None]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibration de la cascade LLM de l'Agent 1B")
+    parser.add_argument("--input", type=Path, help="JSONL de DocumentAnalysis (défaut: table analyses)")
+    parser.add_argument("--mode", choices=["exact", "gate"], default="gate")
+    parser.add_argument("--local-floor", type=float, nargs="+", default=[0.0], help="Planchers du mode gate")
+    parser.add_argument("--output", type=Path, help="Fichier JSON des rapports")
+    args = parser.parse_args()
+
+    records = load_records(args.input)
+    scorer = RelevanceScorer()
+    floors = args.local_floor if args.mode == "gate" else [0.0]
+
+    reports = [calibrate_cascade(records, SemanticCascade(scorer, args.mode, floor)) for floor in floors]
+
+    print("=" * 80)
+    print(f"CASCADE {args.mode.upper()} - {len(records)} analyses historiques")
+    print("=" * 80)
+    print(f"{'Plancher':>10}{'Appelés':>10}{'Sautés':>10}{'Différés':>10}{'Économie':>11}{'Inversées':>11}")
+    for report in reports:
+        decisions = report["decisions"]
+        print(
+            f"{report['local_floor']:>10.3f}{decisions['called']:>10}{decisions['skipped']:>10}"
+            f"{decisions['deferred']:>10}{(report['llm_calls_saved_share'] or 0) * 100:>10.1f}%"
+            f"{report['flipped']:>11}"
+        )
+
+    for report in reports:
+        for flip in report["flips"][:10]:
+            print(
+                f"  plancher {report['local_floor']:.3f} : {flip['document_id']} "
+                f"{flip['criticality']} -> {flip['cascade_criticality']} "
+                f"(local {flip['local_score']:.3f}, sémantique {flip['semantic_score']:.2f})"
+            )
+
+    if args.output:
+        args.output.write_text(json.dumps(reports, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"\n💾 Rapports sauvegardés: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Benchmark de la sélection de contenu envoyée au LLM (Agent 1B, niveau 3)
+
+Corpus fixe (généré avec une graine) de règlements longs : considérants
+génériques, articles, annexe finale. L'article qui liste les codes NC et
+produits du profil est placé au milieu du document, là où la troncature
+début/fin le coupe.
+
+Pour chaque budget et chaque stratégie (head_tail, ranked) :
+- tokens de l'extrait (estimation 4 caractères/token)
+- pertinence : part des faits du profil (codes NC, produits) conservés
+- temps de préparation par document
+
+Usage:
+    python benchmarks/agent_1b_content_selection.py --budgets 2000 4000 8000 --documents 20
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+# Ajouter le dossier parent au PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.agent_1b.tools.content_selector import CHARS_PER_TOKEN
+from src.agent_1b.tools.semantic_analyzer import SemanticAnalyzer
+from src.config import settings
+
+PROFILE = {
+    "company_name": "AeroRubber Industries",
+    "keywords": ["caoutchouc", "rubber", "gaskets", "étanchéité"],
+    "products": ["joints d'étanchéité", "durites"],
+    "nc_codes": ["4016.93", "4009.11", "4016.99"],
+}
+
+# Faits du profil insérés dans l'article central : doivent survivre à la sélection
+FACTS = [
+    "CN code 4016 93 00 (gaskets, washers and other seals of vulcanised rubber)",
+    "CN code 4009 11 00 (tubes, pipes and hoses of vulcanised rubber)",
+    "CN code 4016 99 97 (other articles of vulcanised rubber)",
+]
+
+BOILERPLATE = [
+    "Whereas the objectives of this Regulation cannot be sufficiently achieved by the Member States",
+    "In order to ensure uniform conditions for the implementation of this Regulation",
+    "The Commission should be empowered to adopt delegated acts in accordance with the Treaty",
+    "This Regulation respects the fundamental rights and observes the principles recognised by the Charter",
+    "The processing of personal data should comply with the applicable data protection rules",
+    "The European Parliament and the Council have been consulted on the draft measures",
+    "Member States should lay down rules on cooperation between the competent authorities",
+    "Transparency and legal certainty require that the measures be published without delay",
+]
+
+
+def build_document(rng: random.Random, index: int) -> str:
+    """Règlement synthétique d'environ 120 000 caractères"""
+    parts = [f"REGULATION (EU) 2026/{1000 + index} OF THE EUROPEAN PARLIAMENT AND OF THE COUNCIL\n"
+             "laying down rules on carbon border adjustment for imported goods\n"]
+
+    for recital in range(1, 161):
+        sentences = " ".join(rng.choice(BOILERPLATE) + "." for _ in range(4))
+        parts.append(f"({recital}) {sentences}\n")
+
+    articles = 60
+    facts_article = rng.randint(articles * 2 // 5, articles * 3 // 5)
+    for article in range(1, articles + 1):
+        body = " ".join(rng.choice(BOILERPLATE) + "." for _ in range(6))
+        if article == facts_article:
+            body = (
+                "Goods concerned. The obligations of authorised declarants apply to imports of the "
+                "following goods: " + "; ".join(FACTS) + ". Importers shall report embedded emissions "
+                "for these goods in each quarterly declaration. " + body
+            )
+        parts.append(f"Article {article}\n{body}\n")
+
+    parts.append("ANNEX I\nList of goods: CN 7208 10 00, CN 7601 10 00, CN 2523 29 00, CN 3102 10 10.\n")
+    return "\n".join(parts)
+
+
+def run(budgets: list, documents: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    corpus = [build_document(rng, index) for index in range(documents)]
+    analyzer = SemanticAnalyzer()
+    query = analyzer.content_query(PROFILE, "CBAM")
+    results = []
+
+    for budget in budgets:
+        for strategy in ("head_tail", "ranked"):
+            settings.semantic_content_selection = strategy
+            tokens = recall = elapsed = 0.0
+
+            for text in corpus:
+                start = time.perf_counter()
+                excerpt = analyzer._prepare_content(text, max_chars=budget * CHARS_PER_TOKEN, query=query)
+                elapsed += time.perf_counter() - start
+                tokens += len(excerpt) / CHARS_PER_TOKEN
+                recall += sum(fact in excerpt for fact in FACTS) / len(FACTS)
+
+            results.append({
+                "budget_tokens": budget,
+                "strategy": strategy,
+                "excerpt_tokens": round(tokens / documents),
+                "fact_recall": round(recall / documents, 3),
+                "prepare_ms": round(elapsed / documents * 1000, 2),
+            })
+
+    return {
+        "documents": documents,
+        "document_tokens": round(sum(len(text) for text in corpus) / documents / CHARS_PER_TOKEN),
+        "seed": seed,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sélection de contenu : head/tail vs sections classées")
+    parser.add_argument("--budgets", type=int, nargs="+", default=[2000, 4000, 8000], help="Budgets en tokens")
+    parser.add_argument("--documents", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", type=Path, help="Fichier JSON de résultats")
+    args = parser.parse_args()
+
+    report = run(args.budgets, args.documents, args.seed)
+
+    print("=" * 80)
+    print(f"SÉLECTION DE CONTENU - {report['documents']} documents de ~{report['document_tokens']} tokens")
+    print("=" * 80)
+    print(f"{'Budget':>8}{'Stratégie':>12}{'Tokens':>10}{'Faits':>10}{'ms/doc':>10}")
+    for row in report["results"]:
+        print(
+            f"{row['budget_tokens']:>8}{row['strategy']:>12}{row['excerpt_tokens']:>10}"
+            f"{row['fact_recall'] * 100:>9.0f}%{row['prepare_ms']:>10.2f}"
+        )
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"\n💾 Résultats sauvegardés: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Benchmark du filtre codes NC (Niveau 2) de l'Agent 1B
+
+Compare, pour des profils de 10, 100 et 1000 codes, la correspondance par trie
+(NCCodeFilter) au parcours linéaire des codes du profil (implémentation
+d'origine, reproduite ici comme référence), et vérifie que les deux donnent
+exactement les mêmes correspondances exactes, partielles et critiques.
+
+Usage:
+    python benchmarks/agent_1b_nc_codes.py
+    python benchmarks/agent_1b_nc_codes.py --profile-sizes 10 100 1000 5000 --document-codes 2000
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+# Ajouter le dossier parent au PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import structlog
+
+from src.agent_1b.tools.nc_code_filter import NCCodeFilter
+
+
+def random_code(rng: random.Random) -> str:
+    """Code NC au format 4, 6 ou 8 chiffres (ex: 4016, 4016.93, 4016.93.00)"""
+    digits = f"{rng.randint(100, 9999):04d}{rng.randint(0, 99):02d}{rng.randint(0, 99):02d}"
+    length = rng.choice([4, 6, 8, 8])
+    return ".".join(digits[i:i + 2] if i else digits[:4] for i in range(0, length, 2) if i != 2)
+
+
+def build_document(profile: list, count: int, rng: random.Random) -> str:
+    """Texte contenant des codes exacts, des préfixes/extensions du profil et des codes sans rapport"""
+    codes = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.2:
+            codes.append(rng.choice(profile))
+        elif kind < 0.4:
+            codes.append(rng.choice(profile)[:4])
+        else:
+            codes.append(random_code(rng))
+    return "\n".join(f"CN code {code} - goods subject to the regulation" for code in codes)
+
+
+def linear_matches(nc_filter: NCCodeFilter, document_codes: list) -> tuple:
+    """Référence : parcours de tous les codes du profil pour chaque code du document"""
+    exact, partial, critical = [], [], []
+    for doc_code in document_codes:
+        if doc_code in nc_filter.company_nc_codes:
+            exact.append(doc_code)
+        else:
+            for company_code in nc_filter.company_nc_codes:
+                if nc_filter._is_partial_match(doc_code, company_code):
+                    partial.append(doc_code)
+                    break
+        if doc_code in nc_filter.critical_codes or any(
+            nc_filter._is_partial_match(doc_code, crit) for crit in nc_filter.critical_codes
+        ):
+            critical.append(doc_code)
+    return exact, partial, critical
+
+
+def best_of(repeat: int, func, *args) -> float:
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def run_benchmark(args) -> list:
+    rng = random.Random(args.seed)
+    results = []
+
+    for size in args.profile_sizes:
+        profile = list(dict.fromkeys(random_code(rng) for _ in range(size)))
+        critical = rng.sample(profile, max(1, len(profile) // 10))
+        text = build_document(profile, args.document_codes, rng)
+
+        start = time.perf_counter()
+        nc_filter = NCCodeFilter(profile, critical_codes=critical)
+        compile_time = time.perf_counter() - start
+
+        result = nc_filter.analyze(text)
+        document_codes = nc_filter._extract_nc_codes(text)
+        expected = linear_matches(nc_filter, document_codes)
+        actual = (result.exact_matches, result.partial_matches, result.critical_codes)
+
+        # Même ordre d'itération (set des codes extraits) pour les deux chemins
+        same = [sorted(a) for a in actual] == [sorted(e) for e in expected]
+
+        trie_time = best_of(args.repeat, nc_filter.analyze, text)
+        linear_time = best_of(args.repeat, linear_matches, nc_filter, document_codes)
+
+        results.append({
+            "profile_codes": len(profile),
+            "critical_codes": len(critical),
+            "document_codes": len(document_codes),
+            "compile_ms": round(compile_time * 1000, 3),
+            "trie_analyze_ms": round(trie_time * 1000, 3),
+            "linear_matching_ms": round(linear_time * 1000, 3),
+            "exact": len(result.exact_matches),
+            "partial": len(result.partial_matches),
+            "critical": len(result.critical_codes),
+            "identical": same,
+        })
+
+    return results
+
+
+def print_report(results: list) -> None:
+    print("=" * 80)
+    print("AGENT 1B - CODES NC : TRIE vs PARCOURS LINÉAIRE")
+    print("=" * 80)
+    print(
+        f"{'Profil':>8}{'Doc':>8}{'Compil. ms':>12}{'Trie ms':>10}{'Linéaire ms':>13}"
+        f"{'Exact':>7}{'Part.':>7}{'Crit.':>7}  Identique"
+    )
+    for r in results:
+        print(
+            f"{r['profile_codes']:>8}{r['document_codes']:>8}{r['compile_ms']:>12.2f}"
+            f"{r['trie_analyze_ms']:>10.2f}{r['linear_matching_ms']:>13.2f}"
+            f"{r['exact']:>7}{r['partial']:>7}{r['critical']:>7}  {'✅' if r['identical'] else '❌'}"
+        )
+    print("\nTrie ms : analyse complète (extraction, correspondances, contextes)")
+    print("Linéaire ms : correspondances seules avec l'implémentation d'origine")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du filtre codes NC de l'Agent 1B")
+    parser.add_argument("--profile-sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--document-codes", type=int, default=500, help="Codes NC cités dans le document")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, help="Fichier JSON de résultats")
+    args = parser.parse_args()
+
+    # Les logs par document fausseraient les mesures
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(40))
+
+    results = run_benchmark(args)
+    print_report(results)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\n💾 Résultats sauvegardés: {args.output}")
+
+    if not all(r["identical"] for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Calibration des poids et seuils du scorer de l'Agent 1B sur les analyses validées
+
+Charge une fois les scores par niveau des analyses d'un profil
+(document_profile_analyses) et les étiquettes humaines (GroundTruthCase,
+analyses.validation_status), évalue en NumPy une grille de poids et de seuils,
+puis affiche précision et rappel par criticité et un bloc Settings candidat.
+
+Usage:
+    python benchmarks/agent_1b_scoring_calibration.py
+    python benchmarks/agent_1b_scoring_calibration.py --company-name HUTCHINSON --weight-step 0.05 --threshold-step 0.05
+    python benchmarks/agent_1b_scoring_calibration.py --objective relevance_f1 --output calibration.json
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+# Ajouter le dossier parent au PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.agent_1b.calibration import (
+    OBJECTIVES,
+    calibrate,
+    load_calibration_data,
+    settings_block,
+    threshold_grid,
+    weight_grid
+)
+
+
+def load_data(profile_id: str = None, company_name: str = "HUTCHINSON"):
+    """Scores et étiquettes du profil demandé (par ID, sinon par nom)"""
+    from src.storage.database import get_session
+    from src.storage.models import CompanyProfile
+
+    session = get_session()
+    try:
+        if profile_id is None:
+            profile = session.query(CompanyProfile).filter(CompanyProfile.company_name == company_name).first()
+            if profile is None:
+                sys.exit(f"Profil introuvable: {company_name}")
+            profile_id = profile.id
+        return profile_id, load_calibration_data(session, profile_id)
+    finally:
+        session.close()
+
+
+def print_metrics(title: str, configuration: dict) -> None:
+    metrics = configuration["metrics"]
+    print(f"\n{title} : poids {configuration['weights']}, seuils {configuration['thresholds']} "
+          f"(objectif {configuration['objective']:.4f})")
+    print(f"{'':>14}{'Précision':>11}{'Rappel':>9}{'Support':>9}")
+
+    def row(name: str, values: dict) -> None:
+        precision = "-" if values["precision"] is None else f"{values['precision']:.3f}"
+        recall = "-" if values["recall"] is None else f"{values['recall']:.3f}"
+        print(f"{name:>14}{precision:>11}{recall:>9}{values['support']:>9}")
+
+    row("pertinence", metrics["relevance"])
+    for level, values in metrics["criticality"].items():
+        row(level, values)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibration des poids et seuils du scorer de l'Agent 1B")
+    parser.add_argument("--profile-id", help="Profil calibré (défaut: profil nommé --company-name)")
+    parser.add_argument("--company-name", default="HUTCHINSON")
+    parser.add_argument("--weight-step", type=float, default=0.05, help="Pas de la grille des poids")
+    parser.add_argument("--threshold-step", type=float, default=0.05, help="Pas de la grille des seuils")
+    parser.add_argument("--objective", choices=OBJECTIVES, default="balanced")
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--output", type=Path, help="Fichier JSON du rapport")
+    args = parser.parse_args()
+
+    profile_id, data = load_data(args.profile_id, args.company_name)
+    report = calibrate(
+        data,
+        weights=weight_grid(args.weight_step),
+        thresholds=threshold_grid(args.threshold_step),
+        objective=args.objective,
+        top=args.top
+    )
+
+    print("=" * 80)
+    print(f"CALIBRATION DU SCORER - profil {profile_id}, {report['analyses']} analyses "
+          f"({report['relevance_labels']} étiquetées, {report['criticality_labels']} avec criticité)")
+    print("=" * 80)
+    print(f"{report['configurations']} configurations en {report['elapsed_seconds']:.2f} s "
+          f"({report['configurations_per_second']} configurations/s)")
+
+    print_metrics("Configuration actuelle", report["baseline"])
+    print_metrics("Meilleure configuration", report["best"])
+
+    print(f"\nMeilleures configurations ({args.objective}) :")
+    for candidate in report["top"]:
+        print(f"  {candidate['objective']:.4f}  poids {candidate['weights']}  seuils {candidate['thresholds']}")
+
+    print("\nBloc Settings candidat (.env) :\n")
+    print(settings_block(report["best"]["weights"], report["best"]["thresholds"]))
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"\n💾 Rapport sauvegardé: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
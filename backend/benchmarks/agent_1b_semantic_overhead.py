@@ -0,0 +1,94 @@
+"""
+Coût fixe par document de l'analyse sémantique (Agent 1B, Niveau 3)
+
+Mesure tout ce qui précède l'appel réseau à Claude, sans clé API ni réseau :
+- "par document" : un SemanticAnalyzer neuf par document (ancien comportement
+  de analyze_semantically) : client ChatAnthropic, parser, chaîne, instructions
+  de format, puis préparation du prompt
+- "partagé" : analyseur du processus (get_semantic_analyzer), seule la
+  préparation du prompt reste par document
+
+Usage:
+    python benchmarks/agent_1b_semantic_overhead.py --documents 50 --content-kb 40
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Ajouter le dossier parent au PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import structlog
+
+from src.agent_1b.tools.semantic_analyzer import (
+    SemanticAnalyzer,
+    build_semantic_messages,
+    get_semantic_analyzer,
+)
+
+PROFILE = {
+    "company_name": "Bench Industries",
+    "industry": "Caoutchouc et polymères",
+    "products": ["joints", "durites", "amortisseurs"],
+    "nc_codes": ["4016.93", "4009.11", "7208"],
+    "countries": "France, Pologne",
+    "regulations": ["CBAM", "EUDR"],
+}
+
+
+def prepare(analyzer: SemanticAnalyzer, content: str) -> list:
+    inputs = analyzer.build_inputs(content, "Implementing Regulation (EU) 2023/1773", "CBAM", PROFILE)
+    return build_semantic_messages(inputs)
+
+
+def per_document(documents: int, content: str) -> float:
+    start = time.perf_counter()
+    for _ in range(documents):
+        analyzer = SemanticAnalyzer()
+        analyzer.warm_up()
+        prepare(analyzer, content)
+    return (time.perf_counter() - start) / documents
+
+
+def shared(documents: int, content: str) -> float:
+    analyzer = get_semantic_analyzer()
+    analyzer.warm_up()
+    start = time.perf_counter()
+    for _ in range(documents):
+        prepare(analyzer, content)
+    return (time.perf_counter() - start) / documents
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Coût fixe par document de l'analyse sémantique")
+    parser.add_argument("--documents", type=int, default=50)
+    parser.add_argument("--content-kb", type=int, default=40, help="Taille du texte de chaque document")
+    args = parser.parse_args()
+
+    # Pas d'appel réseau : une clé factice suffit à construire le client
+    os.environ.setdefault("ANTHROPIC_API_KEY", "sk-ant-benchmark")
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(40))
+
+    sentence = "The declarant shall report embedded emissions of CBAM goods.\n"
+    content = (sentence * (args.content_kb * 1024 // len(sentence) + 1))[:args.content_kb * 1024]
+
+    # Premier import/instanciation hors mesure
+    SemanticAnalyzer().warm_up()
+
+    new_each = per_document(args.documents, content)
+    reused = shared(args.documents, content)
+
+    print("=" * 80)
+    print(f"AGENT 1B - COÛT FIXE PAR DOCUMENT (hors appel LLM), {args.documents} documents de {args.content_kb} Ko")
+    print("=" * 80)
+    print(f"Analyseur par document : {new_each * 1000:8.2f} ms/document")
+    print(f"Analyseur partagé      : {reused * 1000:8.2f} ms/document")
+    print(f"Gain                   : {(new_each - reused) * 1000:8.2f} ms/document")
+    print("\nHors connexion TLS : selon la version de langchain-anthropic, un client neuf peut")
+    print("ouvrir sa propre connexion ; l'analyseur partagé garantit la réutilisation du pool.")
+
+
+if __name__ == "__main__":
+    main()
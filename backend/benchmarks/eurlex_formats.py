@@ -0,0 +1,172 @@
+"""
+Comparaison de débit HTML vs PDF sur les mêmes actes EUR-Lex
+
+Pour chaque acte, mesure le temps d'extraction (texte, tableaux, codes NC) du
+rendu HTML et du rendu PDF, puis affiche documents/s, Mo/s et la parité des
+codes NC détectés.
+
+Usage:
+    # Actes téléchargés en direct depuis EUR-Lex
+    python benchmarks/eurlex_formats.py --celex 32023R0956 32023R1773
+
+    # Paires déjà présentes sur disque: <CELEX>.html + <CELEX>.pdf
+    python benchmarks/eurlex_formats.py --local-dir data/eurlex_pairs --output results.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Ajouter le dossier parent au PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.agent_1a.tools.document_fetcher import fetch_document
+from src.agent_1a.tools.html_extractor import extract_html_content
+from src.agent_1a.tools.pdf_extractor import extract_pdf_content
+
+EURLEX_RENDITION_URL = "https://eur-lex.europa.eu/legal-content/EN/TXT/{fmt}/?uri=CELEX:{celex}"
+
+EXTRACTORS = {
+    "html": extract_html_content,
+    "pdf": extract_pdf_content,
+}
+
+
+async def download_pairs(celex_numbers, output_dir: Path) -> dict:
+    """Télécharge les rendus HTML et PDF de chaque acte."""
+    pairs = {}
+
+    for celex in celex_numbers:
+        pairs[celex] = {}
+        for fmt in EXTRACTORS:
+            result = await fetch_document(
+                EURLEX_RENDITION_URL.format(fmt=fmt.upper(), celex=celex),
+                output_dir=str(output_dir),
+                filename=f"{celex}.{fmt}"
+            )
+            if result.success:
+                pairs[celex][fmt] = result.document.file_path
+            else:
+                print(f"⚠️  {celex} [{fmt}] indisponible: {result.error}")
+
+    return pairs
+
+
+def load_local_pairs(local_dir: Path) -> dict:
+    """Recherche les paires <CELEX>.html / <CELEX>.pdf dans un dossier."""
+    pairs = {}
+
+    for path in sorted(local_dir.iterdir()):
+        if path.suffix.lower().lstrip(".") in EXTRACTORS:
+            pairs.setdefault(path.stem, {})[path.suffix.lower().lstrip(".")] = str(path)
+
+    return pairs
+
+
+async def benchmark(pairs: dict, repeat: int = 1) -> dict:
+    """Extrait chaque rendu et agrège les mesures par format."""
+    # Ne comparer que les actes disponibles dans les deux formats
+    complete = {celex: files for celex, files in pairs.items() if len(files) == len(EXTRACTORS)}
+
+    report = {"acts": sorted(complete), "repeat": repeat, "formats": {}, "per_act": {}}
+
+    for fmt, extractor in EXTRACTORS.items():
+        total_seconds = 0.0
+        total_bytes = 0
+        total_chars = 0
+        total_nc_codes = 0
+
+        for celex, files in complete.items():
+            file_path = files[fmt]
+            size = Path(file_path).stat().st_size
+
+            start = time.perf_counter()
+            for _ in range(repeat):
+                content = await extractor(file_path)
+            elapsed = (time.perf_counter() - start) / repeat
+
+            total_seconds += elapsed
+            total_bytes += size
+            total_chars += len(content.text)
+            total_nc_codes += len(content.nc_codes)
+
+            report["per_act"].setdefault(celex, {})[fmt] = {
+                "seconds": round(elapsed, 4),
+                "bytes": size,
+                "characters": len(content.text),
+                "nc_codes": sorted({nc.code for nc in content.nc_codes}),
+                "tables": len(content.tables),
+                "status": content.status,
+            }
+
+        report["formats"][fmt] = {
+            "documents": len(complete),
+            "seconds": round(total_seconds, 4),
+            "bytes": total_bytes,
+            "characters": total_chars,
+            "nc_codes": total_nc_codes,
+            "docs_per_second": round(len(complete) / total_seconds, 2) if total_seconds else None,
+            "mb_per_second": round(total_bytes / 1e6 / total_seconds, 2) if total_seconds else None,
+        }
+
+    # Parité des codes NC entre les deux rendus
+    report["nc_code_parity"] = {
+        celex: {
+            "only_html": sorted(set(acts["html"]["nc_codes"]) - set(acts["pdf"]["nc_codes"])),
+            "only_pdf": sorted(set(acts["pdf"]["nc_codes"]) - set(acts["html"]["nc_codes"])),
+        }
+        for celex, acts in report["per_act"].items()
+    }
+
+    return report
+
+
+def print_report(report: dict) -> None:
+    """Affiche le tableau de comparaison."""
+    print("=" * 80)
+    print(f"COMPARAISON HTML vs PDF - {len(report['acts'])} actes (x{report['repeat']})")
+    print("=" * 80)
+    print(f"{'Format':<8}{'Docs':>6}{'Temps (s)':>12}{'Docs/s':>10}{'Mo':>10}{'Mo/s':>10}{'Codes NC':>10}")
+
+    for fmt, stats in report["formats"].items():
+        print(
+            f"{fmt.upper():<8}{stats['documents']:>6}{stats['seconds']:>12.3f}"
+            f"{stats['docs_per_second'] or 0:>10.2f}{stats['bytes'] / 1e6:>10.2f}"
+            f"{stats['mb_per_second'] or 0:>10.2f}{stats['nc_codes']:>10}"
+        )
+
+    html_time = report["formats"].get("html", {}).get("seconds")
+    pdf_time = report["formats"].get("pdf", {}).get("seconds")
+    if html_time and pdf_time:
+        print(f"\nAccélération HTML vs PDF: x{pdf_time / html_time:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Débit d'extraction HTML vs PDF (EUR-Lex)")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--celex", nargs="+", help="Numéros CELEX à télécharger")
+    source.add_argument("--local-dir", type=Path, help="Dossier de paires <CELEX>.html/.pdf")
+    parser.add_argument("--repeat", type=int, default=1, help="Répétitions par document")
+    parser.add_argument("--output", type=Path, help="Fichier JSON de résultats")
+    args = parser.parse_args()
+
+    if args.local_dir:
+        pairs = load_local_pairs(args.local_dir)
+    else:
+        pairs = asyncio.run(download_pairs(args.celex, Path(tempfile.mkdtemp(prefix="eurlex_"))))
+
+    report = asyncio.run(benchmark(pairs, repeat=args.repeat))
+    print_report(report)
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"\n💾 Résultats sauvegardés: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,435 @@
+"""
+Site réglementaire synthétique local pour les benchmarks de l'Agent 1A
+
+Serveur HTTP (thread d'arrière-plan) qui reproduit le balisage consommé par
+les spiders et le fetcher :
+
+- EUR-Lex : page de résultats /search.html (liens a[id^="cellar_"]), rendus
+  /legal-content/EN/TXT/HTML/ et /legal-content/EN/TXT/PDF/ de chaque acte
+- CBAM : page "legislation and guidance" (blocs div.ecl-file) et fichiers
+  PDF / XLSX / ZIP téléchargeables sous /document/download/
+
+Le nombre et la taille des documents sont paramétrables ; tous les fichiers
+sont générés une fois au démarrage et servis depuis la mémoire.
+
+Usage:
+    python benchmarks/synthetic_site.py --eurlex-docs 20 --cbam-docs 30 --port 8765
+"""
+
+import argparse
+import io
+import random
+import threading
+import time
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import pymupdf
+
+CBAM_PAGE_PATH = "/carbon-border-adjustment-mechanism/cbam-legislation-and-guidance_en"
+
+# Codes NC représentatifs de l'annexe I du règlement CBAM
+NC_CODES = ["7601.10", "7601.20", "7604.10", "7208.51", "7318.15", "2523.10", "3102.10", "2804.10"]
+
+# (titre, catégorie attendue côté spider) - cf. _determine_category
+CBAM_TITLES = [
+    "Guidance document on CBAM implementation for importers",
+    "Questions and Answers on the CBAM transitional period",
+    "Communication template for installation operators",
+    "Default values for the transitional period",
+    "CBAM self-assessment tool",
+]
+
+CBAM_FORMATS = [("pdf", "PDF"), ("xlsx", "XLSX"), ("zip", "ZIP")]
+
+CONTENT_TYPES = {
+    "pdf": "application/pdf",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "zip": "application/zip",
+    "html": "text/html; charset=utf-8",
+}
+
+LOREM = (
+    "Importers of goods listed in Annex I shall submit a CBAM declaration covering "
+    "embedded emissions, the country of origin and the installation of production. "
+)
+
+
+# ========================================
+# GÉNÉRATION DES DOCUMENTS
+# ========================================
+
+def _act_paragraphs(celex: str, articles: int, cites: Optional[str] = None) -> list:
+    """Contenu commun aux rendus HTML et PDF d'un acte : (classe, texte)"""
+    rng = random.Random(celex)
+    paragraphs = [("oj-doc-ti", f"REGULATION (EU) {celex[1:5]}/{int(celex[-4:])}")]
+
+    if cites:
+        paragraphs.append((
+            "oj-normal",
+            f"Having regard to Implementing Regulation (EU) {cites[1:5]}/{int(cites[-4:])}, "
+            f"and to Regulation (EU) 2023/956 of the European Parliament and of the Council,"
+        ))
+
+    for number in range(1, articles + 1):
+        paragraphs.append(("oj-ti-art", f"Article {number}"))
+        codes = ", ".join(rng.sample(NC_CODES, 2))
+        paragraphs.append(("oj-normal", f"{LOREM}This Article applies to CN codes {codes}. " * 3))
+
+    paragraphs.append(("oj-doc-ti", "ANNEX I"))
+    return paragraphs
+
+
+def build_act_html(celex: str, articles: int, cites: Optional[str] = None) -> bytes:
+    """Rendu TXT/HTML EUR-Lex d'un acte (marqueurs attendus par html_extractor)"""
+    body = "\n".join(
+        f'<p class="{css}">{text}</p>' for css, text in _act_paragraphs(celex, articles, cites)
+    )
+    rows = "\n".join(
+        f"<tr><td><p>{code}</p></td><td><p>Goods of CN code {code}</p></td></tr>"
+        for code in NC_CODES
+    )
+    html = (
+        f'<html><head><title>{celex}</title></head><body><div id="document1">\n'
+        f'{body}\n<table>\n<tr><td><p>CN code</p></td><td><p>Description</p></td></tr>\n{rows}\n'
+        f"</table>\n</div></body></html>"
+    )
+    return html.encode("utf-8")
+
+
+def build_pdf(title: str, pages: int, seed: str) -> bytes:
+    """PDF texte de `pages` pages mentionnant des codes NC"""
+    rng = random.Random(seed)
+    pdf = pymupdf.open()
+
+    for page_number in range(1, pages + 1):
+        page = pdf.new_page()
+        codes = ", ".join(rng.sample(NC_CODES, 3))
+        text = f"{title} - page {page_number}\n\n" + (LOREM + f"CN codes: {codes}.\n") * 12
+        page.insert_textbox(pymupdf.Rect(50, 50, 545, 790), text, fontsize=9)
+
+    data = pdf.tobytes()
+    pdf.close()
+    return data
+
+
+def build_xlsx(size_kb: int, seed: str) -> bytes:
+    """Classeur XLSX minimal (une feuille de valeurs par défaut) d'environ `size_kb` Ko"""
+    rng = random.Random(seed)
+    rows = []
+    row_number = 1
+    xml_size = 0
+
+    # Le contenu XML se compresse bien : viser la taille après compression
+    while xml_size < size_kb * 1024 * 6:
+        row = (
+            f'<row r="{row_number}"><c r="A{row_number}" t="inlineStr"><is><t>'
+            f'{rng.choice(NC_CODES)}</t></is></c><c r="B{row_number}"><v>{rng.random():.6f}</v></c></row>'
+        )
+        rows.append(row)
+        xml_size += len(row)
+        row_number += 1
+
+    parts = {
+        "[Content_Types].xml": (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            '</Types>'
+        ),
+        "_rels/.rels": (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+            '</Relationships>'
+        ),
+        "xl/workbook.xml": (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            '<sheets><sheet name="Default values" sheetId="1" r:id="rId1"/></sheets></workbook>'
+        ),
+        "xl/_rels/workbook.xml.rels": (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+            '</Relationships>'
+        ),
+        "xl/worksheets/sheet1.xml": (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            + "".join(rows) + "</sheetData></worksheet>"
+        ),
+    }
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, xml in parts.items():
+            archive.writestr(name, xml)
+    return buffer.getvalue()
+
+
+def build_zip(size_kb: int, seed: str) -> bytes:
+    """Archive ZIP d'environ `size_kb` Ko (contenu non compressible)"""
+    rng = random.Random(seed)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+        archive.writestr("communication_template.bin", rng.randbytes(size_kb * 1024))
+    return buffer.getvalue()
+
+
+def _human_size(size: int) -> str:
+    """Taille au format affiché par le site CBAM (ex: "1 MB", "250 KB")"""
+    if size >= 1024 * 1024:
+        return f"{size / (1024 * 1024):.0f} MB"
+    return f"{max(size // 1024, 1)} KB"
+
+
+# ========================================
+# SERVEUR
+# ========================================
+
+class SyntheticRegulatorySite:
+    """Site EUR-Lex + CBAM synthétique servi sur 127.0.0.1"""
+
+    def __init__(
+        self,
+        eurlex_docs: int = 10,
+        cited_docs: int = 0,
+        cbam_docs: int = 20,
+        pdf_pages: int = 5,
+        file_size_kb: int = 256,
+        latency_ms: int = 0,
+        html_renditions: bool = True,
+        port: int = 0
+    ):
+        """
+        Args:
+            eurlex_docs: Nombre d'actes listés dans la recherche EUR-Lex
+            cited_docs: Actes supplémentaires absents de la recherche, atteignables
+                        uniquement par citation (chaque acte cite le suivant)
+            cbam_docs: Nombre de fichiers listés sur la page CBAM (PDF/XLSX/ZIP en alternance)
+            pdf_pages: Nombre de pages des PDF générés
+            file_size_kb: Taille cible des fichiers XLSX et ZIP
+            latency_ms: Latence ajoutée à chaque réponse
+            html_renditions: Servir le rendu HTML des actes (sinon 404 -> repli PDF)
+            port: Port d'écoute (0 = port libre)
+        """
+        self.latency_ms = latency_ms
+        self.html_renditions = html_renditions
+        self.port = port
+
+        self.bytes_sent = 0
+        self.requests_served = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+        self.acts: Dict[str, Dict] = {}
+        self.files: Dict[str, Tuple[str, bytes]] = {}
+        self.cbam_entries = []
+
+        self.listed_acts = eurlex_docs
+        self._generate(eurlex_docs + cited_docs, cbam_docs, pdf_pages, file_size_kb)
+
+    def _generate(self, eurlex_docs: int, cbam_docs: int, pdf_pages: int, file_size_kb: int) -> None:
+        for index in range(eurlex_docs):
+            celex = f"32024R{1000 + index:04d}"
+            cites = f"32024R{1001 + index:04d}" if index + 1 < eurlex_docs else None
+            title = (
+                f"Commission Implementing Regulation (EU) 2024/{1000 + index} laying down rules "
+                f"for the application of the carbon border adjustment mechanism"
+            )
+            self.acts[celex] = {
+                "title": title,
+                "html": build_act_html(celex, articles=pdf_pages * 4, cites=cites),
+                "pdf": build_pdf(title, pdf_pages, celex),
+            }
+
+        for index in range(cbam_docs):
+            title = f"{CBAM_TITLES[index % len(CBAM_TITLES)]} ({index + 1})"
+            extension, label = CBAM_FORMATS[index % len(CBAM_FORMATS)]
+            name = f"cbam_{index + 1:03d}.{extension}"
+            seed = f"cbam-{index}"
+
+            if extension == "pdf":
+                data = build_pdf(title, pdf_pages, seed)
+            elif extension == "xlsx":
+                data = build_xlsx(file_size_kb, seed)
+            else:
+                data = build_zip(file_size_kb, seed)
+
+            self.files[name] = (CONTENT_TYPES[extension], data)
+            self.cbam_entries.append({
+                "title": title,
+                "path": f"/document/download/{name}",
+                "meta": f"English ({label} - {_human_size(len(data))})",
+            })
+
+    # ---------------------------------------- pages
+
+    def search_page(self) -> bytes:
+        links = "\n".join(
+            f'<div class="SearchResult"><h2><a id="cellar_{index}" class="title" '
+            f'href="./legal-content/EN/AUTO/?uri=CELEX:{celex}">{act["title"]}</a></h2></div>'
+            for index, (celex, act) in enumerate(list(self.acts.items())[:self.listed_acts])
+        )
+        return f"<html><body><div id=\"results\">\n{links}\n</div></body></html>".encode("utf-8")
+
+    def cbam_page(self) -> bytes:
+        blocks = []
+        for index, entry in enumerate(self.cbam_entries):
+            blocks.append(
+                f'<div class="ecl-file"><div class="ecl-file__container">'
+                f'<div class="ecl-file__title">{entry["title"]}</div>'
+                f'<div class="ecl-file__info"><div class="ecl-file__meta">{entry["meta"]}</div></div>'
+                f'<a id="ecl-file-{index}" href="{entry["path"]}" class="ecl-file__download">Download</a>'
+                f'</div></div>'
+            )
+        return ("<html><body><main>\n" + "\n".join(blocks) + "\n</main></body></html>").encode("utf-8")
+
+    def resolve(self, path: str) -> Optional[Tuple[str, bytes]]:
+        """Retourne (content-type, corps) pour un chemin, ou None (404)"""
+        parsed = urlparse(path)
+        uri = parse_qs(parsed.query).get("uri", [""])[0]
+        celex = uri.split("CELEX:", 1)[-1] if "CELEX:" in uri else None
+
+        if parsed.path == "/search.html":
+            return CONTENT_TYPES["html"], self.search_page()
+
+        if parsed.path == CBAM_PAGE_PATH:
+            return CONTENT_TYPES["html"], self.cbam_page()
+
+        if parsed.path.startswith("/document/download/"):
+            return self.files.get(parsed.path.rsplit("/", 1)[-1])
+
+        if celex in self.acts:
+            act = self.acts[celex]
+            if parsed.path.startswith("/legal-content/EN/TXT/PDF"):
+                return CONTENT_TYPES["pdf"], act["pdf"]
+            if parsed.path.startswith("/legal-content/EN/TXT/HTML") and self.html_renditions:
+                return CONTENT_TYPES["html"], act["html"]
+            if parsed.path.startswith("/legal-content/EN/AUTO"):
+                return CONTENT_TYPES["html"], f"<html><body><h1>{act['title']}</h1></body></html>".encode()
+
+        return None
+
+    # ---------------------------------------- cycle de vie
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    @property
+    def eurlex_base_url(self) -> str:
+        return self.base_url
+
+    @property
+    def cbam_source_url(self) -> str:
+        return self.base_url + CBAM_PAGE_PATH
+
+    @property
+    def total_bytes(self) -> int:
+        """Volume total des documents publiés"""
+        acts = sum(len(act["html"]) + len(act["pdf"]) for act in self.acts.values())
+        return acts + sum(len(data) for _, data in self.files.values())
+
+    def _record(self, size: int) -> None:
+        with self._lock:
+            self.bytes_sent += size
+            self.requests_served += 1
+
+    def start(self) -> "SyntheticRegulatorySite":
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _respond(self, include_body: bool) -> None:
+                if site.latency_ms:
+                    time.sleep(site.latency_ms / 1000)
+
+                resolved = site.resolve(self.path)
+                content_type, body = resolved if resolved else ("text/plain", b"Not found")
+
+                self.send_response(200 if resolved else 404)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+
+                if include_body:
+                    self.wfile.write(body)
+                    site._record(len(body))
+                else:
+                    site._record(0)
+
+            def do_GET(self):
+                self._respond(include_body=True)
+
+            def do_HEAD(self):
+                self._respond(include_body=False)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "SyntheticRegulatorySite":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Site réglementaire synthétique (EUR-Lex + CBAM)")
+    parser.add_argument("--eurlex-docs", type=int, default=10)
+    parser.add_argument("--cited-docs", type=int, default=0, help="Actes atteignables uniquement par citation")
+    parser.add_argument("--cbam-docs", type=int, default=20)
+    parser.add_argument("--pdf-pages", type=int, default=5)
+    parser.add_argument("--file-size-kb", type=int, default=256)
+    parser.add_argument("--latency-ms", type=int, default=0)
+    parser.add_argument("--no-html", action="store_true", help="Ne pas servir les rendus HTML EUR-Lex")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    site = SyntheticRegulatorySite(
+        eurlex_docs=args.eurlex_docs,
+        cited_docs=args.cited_docs,
+        cbam_docs=args.cbam_docs,
+        pdf_pages=args.pdf_pages,
+        file_size_kb=args.file_size_kb,
+        latency_ms=args.latency_ms,
+        html_renditions=not args.no_html,
+        port=args.port,
+    ).start()
+
+    print(f"EUR-Lex : EURLEX_BASE_URL={site.eurlex_base_url}")
+    print(f"CBAM    : CBAM_SOURCE_URL={site.cbam_source_url}")
+    print(f"{len(site.acts)} actes, {len(site.files)} fichiers CBAM, {site.total_bytes / 1e6:.1f} Mo publiés")
+
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        site.stop()
+
+
+if __name__ == "__main__":
+    main()
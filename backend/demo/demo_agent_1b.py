@@ -2,7 +2,6 @@
 Démonstration de l'Agent 1B - Analyse + Affichage Rich + Sauvegarde BDD
 """
 
-import json
 from pathlib import Path
 from datetime import datetime
 
@@ -11,7 +10,8 @@ from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.panel import Panel
 from rich.table import Table
 
-from src.agent_1b.agent import Agent1B, _extract_keywords_from_profile, _extract_regulations_from_profile, _extract_countries_from_profile
+from src.agent_1b.agent import Agent1B
+from src.agent_1b.profile_index import load_profile_index
 from src.agent_1b.display import process_and_display_analysis
 from src.storage.database import get_session
 from src.storage.models import Document
@@ -74,25 +74,9 @@ def main():
             console.print(f"[bold red]✗ Fichier profil non trouvé: {profile_path}[/bold red]")
             return
         
-        with open(profile_path, 'r', encoding='utf-8') as f:
-            company_profile_data = json.load(f)
-        
-        company_name = (
-            company_profile_data.get("company", {}).get("company_name") or
-            company_profile_data.get("company_name") or
-            "HUTCHINSON"
-        )
-        
-        profile = {
-            "company_id": company_profile_data.get("company", {}).get("company_id", "HUT-001"),
-            "company_name": company_name,
-            "industry": company_profile_data.get("company", {}).get("industry", {}).get("sector", ""),
-            "products": company_profile_data.get("products", []),
-            "nc_codes": company_profile_data.get("nc_codes", {}),
-            "keywords": _extract_keywords_from_profile(company_profile_data),
-            "regulations": _extract_regulations_from_profile(company_profile_data),
-            "countries": _extract_countries_from_profile(company_profile_data)
-        }
+        profile_index = load_profile_index(str(profile_path))
+        profile = profile_index.profile
+        company_name = profile_index.company_name
         
         console.print(f"[bold green]✓ Profil chargé: {company_name}[/bold green]")
         console.print(f"  • {len(profile['keywords'])} mots-clés")
@@ -104,7 +88,7 @@ def main():
         console.print(f"[bold cyan]🔍 Analyse de {len(docs_to_analyze)} document(s)...[/bold cyan]")
         console.print("=" * 90)
         
-        agent = Agent1B(profile)
+        agent = Agent1B(profile_index)
         analyses_created = []
         relevant_count = 0
         critical_count = 0
@@ -7,15 +7,19 @@ Collecte les documents depuis deux sources :
 """
 
 import asyncio
+import time
 import structlog
 from typing import Dict, List
 from datetime import datetime
 import hashlib
 
-from .tools.scraper import search_eurlex
+from .tools.scraper import search_eurlex, EurlexDocument
 from .tools.cbam_guidance_scraper import search_cbam_guidance
 from .tools.document_fetcher import fetch_document
 from .tools.pdf_extractor import extract_pdf_content
+from .tools.html_extractor import extract_html_content, is_eurlex_html_rendition
+from .tools.fetch_scheduler import FetchScheduler
+from .tools.celex_citations import ACT_TYPE_LETTERS, celex_rendition_urls, extract_celex_references
 
 logger = structlog.get_logger()
 
@@ -55,18 +59,38 @@ async def run_agent_1a_combined(
     
     try:
         from src.storage.database import get_session
-        from src.storage.repositories import DocumentRepository
+        from src.storage.document_repository import DocumentRepository
+        
+        # Durées par étape (secondes) : une entrée par document pour les
+        # étapes 3 à 5, une entrée globale pour les étapes 1 et 2
+        stage_durations = {
+            "scraping": [],
+            "check_existing": [],
+            "download": [],
+            "extraction": [],
+            "save": []
+        }
+        bytes_downloaded = 0
+        run_start = time.perf_counter()
         
         # ====================================================================
         # ÉTAPE 1 : SCRAPING PARALLÈLE (EUR-Lex + CBAM)
         # ====================================================================
         logger.info("step_1_parallel_scraping")
         
+        # Une part du budget EUR-Lex est réservée aux actes cités par les
+        # documents déjà collectés (frontière de crawl) ; le reste va à la
+        # recherche par mot-clé
+        frontier_documents = _load_frontier_documents(get_session, max_eurlex_documents, keyword)
+        keyword_budget = max_eurlex_documents - len(frontier_documents)
+        
         # Lancer les deux scrapers en parallèle
-        eurlex_task = search_eurlex(keyword, max_results=max_eurlex_documents)
+        stage_start = time.perf_counter()
+        eurlex_task = search_eurlex(keyword, max_results=keyword_budget)
         cbam_task = search_cbam_guidance(categories=cbam_categories, max_results=max_cbam_documents)
         
         eurlex_results, cbam_results = await asyncio.gather(eurlex_task, cbam_task)
+        stage_durations["scraping"].append(time.perf_counter() - stage_start)
         
         # Vérifier les résultats
         if eurlex_results.status != "success":
@@ -80,6 +104,7 @@ async def run_agent_1a_combined(
         logger.info(
             "step_1_completed",
             eurlex_count=len(eurlex_results.documents),
+            frontier_count=len(frontier_documents),
             cbam_count=len(cbam_results.documents),
             total=total_found
         )
@@ -89,6 +114,7 @@ async def run_agent_1a_combined(
         # ====================================================================
         logger.info("step_2_checking_existing_documents")
         
+        stage_start = time.perf_counter()
         session = get_session()
         repo = DocumentRepository(session)
         
@@ -96,11 +122,18 @@ async def run_agent_1a_combined(
         documents_unchanged = []
         
         try:
-            # Vérifier EUR-Lex documents
-            for doc in eurlex_results.documents:
-                # Utiliser pdf_url pour télécharger le PDF au lieu du HTML
-                url = str(doc.pdf_url) if doc.pdf_url else str(doc.url)
-                existing_doc = repo.find_by_url(url)
+            # Vérifier EUR-Lex documents (recherche + actes cités de la frontière)
+            keyword_celex = {doc.celex_number for doc in eurlex_results.documents}
+            frontier_documents = [doc for doc in frontier_documents if doc.celex_number not in keyword_celex]
+            
+            for doc in eurlex_results.documents + frontier_documents:
+                # Rendus candidats par ordre de préférence (HTML puis PDF par défaut)
+                candidate_urls = _eurlex_candidate_urls(doc)
+                url = candidate_urls[0]
+                existing_doc = next(
+                    (found for found in map(repo.find_by_url, candidate_urls) if found),
+                    None
+                )
                 
                 if existing_doc:
                     if existing_doc.hash_sha256 == doc.metadata.get("remote_hash"):
@@ -111,7 +144,8 @@ async def run_agent_1a_combined(
                 documents_to_process.append({
                     'source': 'eurlex',
                     'doc': doc,
-                    'url': url
+                    'url': url,
+                    'fallback_urls': candidate_urls[1:]
                 })
             
             # Vérifier CBAM documents
@@ -139,62 +173,52 @@ async def run_agent_1a_combined(
             
         finally:
             session.close()
+            stage_durations["check_existing"].append(time.perf_counter() - stage_start)
         
         # ====================================================================
-        # ÉTAPE 3 : TÉLÉCHARGEMENT DES DOCUMENTS
+        # ÉTAPES 3 À 5 : TÉLÉCHARGEMENT, EXTRACTION ET SAUVEGARDE (ORDONNANCÉS)
         # ====================================================================
-        logger.info("step_3_downloading", count=len(documents_to_process))
+        # Chaque document enchaîne téléchargement, extraction et sauvegarde dès
+        # qu'un worker le prend en charge. L'ordre suit la priorité calculée par
+        # le FetchScheduler (type d'acte, catégorie, taille estimée) : un petit
+        # règlement n'attend plus derrière un outil ZIP de plusieurs dizaines de Mo.
+        logger.info("step_3_scheduled_processing", count=len(documents_to_process))
         
         downloaded_files = []
         download_errors = []
+        extracted_documents = []
+        extraction_errors = []
+        saved_count = 0
+        save_errors = []
+        first_regulation_saved_seconds = None
+        new_citations = 0
         
-        for item in documents_to_process:
+        # Profils actifs : leurs mots-clés sont cherchés à la sauvegarde
+        # (caractéristiques lues par l'Agent 1B sans relire le texte)
+        profile_indexes = _load_profile_indexes(get_session)
+        
+        async def process_item(item: Dict) -> None:
+            nonlocal bytes_downloaded, saved_count, first_regulation_saved_seconds, new_citations
+            
+            doc = item['doc']
+            source = item['source']
+            doc_id = _document_id(item)
+            
+            # --- Téléchargement ------------------------------------------------
+            stage_start = time.perf_counter()
             try:
-                doc = item['doc']
-                url = item['url']
-                source = item['source']
-                
-                # Identifier le document
-                if source == 'eurlex':
-                    doc_id = doc.celex_number
-                else:
-                    doc_id = doc.title[:50]
-                
-                logger.info("downloading_document", source=source, id=doc_id)
-                
-                # Vérifier si le document existe déjà en BDD pour éviter téléchargement inutile
-                session_check = get_session()
-                repo_check = DocumentRepository(session_check)
-                existing_doc_check = repo_check.find_by_url(url)
-                session_check.close()
+                logger.info("downloading_document", source=source, id=doc_id, priority=item.get('priority'))
                 
-                # Utiliser skip_if_exists et existing_hash pour optimiser
-                fetch_result = await fetch_document(
-                    url, 
-                    output_dir="data/documents",
-                    skip_if_exists=True,
-                    existing_hash=existing_doc_check.hash_sha256 if existing_doc_check else None
+                # Télécharger le rendu préféré, repli sur les suivants s'il est absent
+                fetch_result, url = await _fetch_preferred_rendition(
+                    [item['url']] + item.get('fallback_urls', []),
+                    get_session,
+                    DocumentRepository
                 )
                 
                 if not fetch_result.success:
                     raise Exception(fetch_result.error or "Download failed")
                 
-                # Si le document est inchangé, on skip le téléchargement
-                if fetch_result.document.status == "skipped":
-                    logger.info("document_skipped", source=source, id=doc_id, reason="unchanged")
-                    continue
-                
-                file_path = fetch_result.document.file_path
-                
-                downloaded_files.append({
-                    'source': source,
-                    'doc': doc,
-                    'file_path': file_path,
-                    'url': url
-                })
-                
-                logger.info("document_downloaded", source=source, id=doc_id, path=file_path)
-                
             except Exception as e:
                 logger.error("download_failed", source=source, id=doc_id, error=str(e))
                 download_errors.append({
@@ -202,158 +226,127 @@ async def run_agent_1a_combined(
                     'doc': doc,
                     'error': str(e)
                 })
-        
-        logger.info(
-            "step_3_completed",
-            downloaded=len(downloaded_files),
-            errors=len(download_errors)
-        )
-        
-        # ====================================================================
-        # ÉTAPE 4 : EXTRACTION DU CONTENU (PDFs uniquement)
-        # ====================================================================
-        logger.info("step_4_extracting", count=len(downloaded_files))
-        
-        extracted_documents = []
-        extraction_errors = []
-        
-        for item in downloaded_files:
+                if source == 'eurlex' and doc.metadata.get('frontier'):
+                    _record_frontier_failure(get_session, doc.celex_number, str(e))
+                return
+            finally:
+                stage_durations["download"].append(time.perf_counter() - stage_start)
+            
+            # Si le document est inchangé, on skip le téléchargement
+            if fetch_result.document.status == "skipped":
+                logger.info("document_skipped", source=source, id=doc_id, reason="unchanged")
+                return
+            
+            bytes_downloaded += fetch_result.document.file_size
+            file_path = fetch_result.document.file_path
+            
+            downloaded_files.append({
+                'source': source,
+                'doc': doc,
+                'file_path': file_path,
+                'url': url
+            })
+            
+            logger.info("document_downloaded", source=source, id=doc_id, path=file_path)
+            
+            # --- Extraction (PDFs et rendus HTML EUR-Lex uniquement) ------------
+            if file_path.endswith('.html'):
+                extractor = extract_html_content
+            elif file_path.endswith('.pdf'):
+                extractor = extract_pdf_content
+            else:
+                doc_format = doc.format if hasattr(doc, 'format') else 'UNKNOWN'
+                logger.info("skipping_non_pdf", source=source, id=doc_id, format=doc_format)
+                return
+            
             try:
-                doc = item['doc']
-                file_path = item['file_path']
-                source = item['source']
-                
-                # Identifier le document
-                if source == 'eurlex':
-                    doc_id = doc.celex_number
-                else:
-                    doc_id = doc.title[:50]
-                
-                # Extraire seulement les PDFs
-                if not file_path.endswith('.pdf'):
-                    doc_format = doc.format if hasattr(doc, 'format') else 'UNKNOWN'
-                    logger.info("skipping_non_pdf", source=source, id=doc_id, format=doc_format)
-                    continue
-                
                 logger.info("extracting_content", source=source, id=doc_id)
                 
-                content = await extract_pdf_content(file_path)
+                stage_start = time.perf_counter()
+                content = await extractor(file_path)
+                stage_durations["extraction"].append(time.perf_counter() - stage_start)
                 
-                extracted_documents.append({
+            except Exception as e:
+                logger.error("extraction_failed", source=source, id=doc_id, error=str(e))
+                extraction_errors.append({
                     'source': source,
                     'doc': doc,
-                    'file_path': file_path,
-                    'content': content,
-                    'url': item['url']
+                    'error': str(e)
                 })
+                if source == 'eurlex' and doc.metadata.get('frontier'):
+                    _record_frontier_failure(get_session, doc.celex_number, str(e))
+                return
+            
+            # Actes de la frontière : titre réel lu dans le rendu HTML (sinon "CELEX ...")
+            if source == 'eurlex' and doc.metadata.get('frontier') and content.metadata.get('document_title'):
+                doc.title = content.metadata['document_title']
+            
+            extracted = {
+                'source': source,
+                'doc': doc,
+                'file_path': file_path,
+                'content': content,
+                'url': url
+            }
+            extracted_documents.append(extracted)
+            
+            logger.info(
+                "content_extracted",
+                source=source,
+                id=doc_id,
+                pages=content.page_count,
+                nc_codes=len(content.nc_codes)
+            )
+            
+            # --- Sauvegarde (une transaction par document) ---------------------
+            stage_start = time.perf_counter()
+            saved_doc_id = None
+            session = get_session()
+            try:
+                saved_doc, status = _save_extracted_document(DocumentRepository(session), extracted)
+                if status != "unchanged":
+                    _save_document_features(session, saved_doc, extracted, profile_indexes)
+                session.commit()
+                saved_doc_id = saved_doc.id
                 
-                logger.info(
-                    "content_extracted",
-                    source=source,
-                    id=doc_id,
-                    pages=content.page_count,
-                    nc_codes=len(content.nc_codes)
-                )
+                # Seuls les documents nouveaux ou modifiés comptent comme sauvegardés
+                if status != "unchanged":
+                    saved_count += 1
+                    if source == 'eurlex' and first_regulation_saved_seconds is None:
+                        first_regulation_saved_seconds = time.perf_counter() - run_start
+                
+                logger.info("document_saved", source=source, title=doc.title[:50], status=status, doc_id=saved_doc.id)
                 
             except Exception as e:
-                logger.error("extraction_failed", source=source, id=doc_id, error=str(e))
-                extraction_errors.append({
+                session.rollback()
+                logger.error("save_failed", source=source, title=doc.title[:50], error=str(e))
+                save_errors.append({
                     'source': source,
                     'doc': doc,
                     'error': str(e)
                 })
+                if source == 'eurlex' and doc.metadata.get('frontier'):
+                    _record_frontier_failure(get_session, doc.celex_number, str(e))
+            finally:
+                session.close()
+                stage_durations["save"].append(time.perf_counter() - stage_start)
+            
+            # --- Citations CELEX (graphe + frontière de crawl) -----------------
+            # Document non sauvegardé : l'acte reste dans la frontière, repris au run suivant
+            if saved_doc_id is not None:
+                new_citations += _record_citations(get_session, extracted, saved_doc_id)
+        
+        await FetchScheduler.from_settings().run(documents_to_process, process_item)
         
+        logger.info("step_3_completed", downloaded=len(downloaded_files), errors=len(download_errors))
+        logger.info("step_4_completed", extracted=len(extracted_documents), errors=len(extraction_errors))
         logger.info(
-            "step_4_completed",
-            extracted=len(extracted_documents),
-            errors=len(extraction_errors)
+            "step_5_completed",
+            saved=saved_count,
+            errors=len(save_errors),
+            first_regulation_saved_seconds=first_regulation_saved_seconds
         )
         
-        # ====================================================================
-        # ÉTAPE 5 : SAUVEGARDE EN BASE DE DONNÉES
-        # ====================================================================
-        logger.info("step_5_saving_to_database", count=len(extracted_documents))
-        
-        session = get_session()
-        repo = DocumentRepository(session)
-        
-        saved_count = 0
-        save_errors = []
-        
-        try:
-            for item in extracted_documents:
-                try:
-                    doc = item['doc']
-                    content = item['content']
-                    file_path = item['file_path']
-                    url = item['url']
-                    source = item['source']
-                    
-                    # Calculer le hash du fichier
-                    with open(file_path, 'rb') as f:
-                        file_hash = hashlib.sha256(f.read()).hexdigest()
-                    
-                    # Préparer les métadonnées selon la source
-                    # Note: content est un objet ExtractedContent (Pydantic), pas un dict
-                    if source == 'eurlex':
-                        metadata = {
-                            'source': 'eurlex',
-                            'celex_number': doc.celex_number,
-                            'document_type': doc.document_type,
-                            'pages': content.page_count,
-                            'tables': len(content.tables),
-                            'file_path': file_path
-                        }
-                        regulation_type = 'CBAM'  # EUR-Lex documents are CBAM-related
-                        nc_codes = [nc.code for nc in content.nc_codes]  # Extraire les codes NC
-                        pub_date = doc.publication_date  # EurlexDocument utilise publication_date, pas date
-                    else:  # cbam
-                        metadata = {
-                            'source': 'cbam_guidance',
-                            'format': doc.format,
-                            'size': doc.size,
-                            'category': doc.category,
-                            'pages': content.page_count,
-                            'file_path': file_path
-                        }
-                        regulation_type = 'CBAM'
-                        nc_codes = [nc.code for nc in content.nc_codes]  # Extraire les codes NC
-                        pub_date = getattr(doc, 'date', None)
-                    
-                    # Sauvegarder avec upsert_document
-                    saved_doc, status = repo.upsert_document(
-                        source_url=url,
-                        hash_sha256=file_hash,
-                        title=doc.title,
-                        content=content.text,  # Attribut text, pas .get('text')
-                        nc_codes=nc_codes,
-                        regulation_type=regulation_type,
-                        publication_date=pub_date,
-                        document_metadata=metadata
-                    )
-                    saved_count += 1
-                    
-                    logger.info("document_saved", source=source, title=doc.title[:50], status=status, doc_id=saved_doc.id)
-                    
-                except Exception as e:
-                    logger.error("save_failed", source=source, title=doc.title[:50], error=str(e))
-                    save_errors.append({
-                        'source': source,
-                        'doc': doc,
-                        'error': str(e)
-                    })
-            
-            session.commit()
-            
-        except Exception as e:
-            session.rollback()
-            logger.error("database_transaction_failed", error=str(e))
-            raise
-        finally:
-            session.close()
-        
-        logger.info("step_5_completed", saved=saved_count, errors=len(save_errors))
-        
         # ====================================================================
         # RÉSULTAT FINAL
         # ====================================================================
@@ -365,6 +358,7 @@ async def run_agent_1a_combined(
             "sources": {
                 "eurlex": {
                     "found": len(eurlex_results.documents),
+                    "frontier": len(frontier_documents),
                     "processed": len([x for x in extracted_documents if x['source'] == 'eurlex'])
                 },
                 "cbam_guidance": {
@@ -377,11 +371,19 @@ async def run_agent_1a_combined(
             "documents_unchanged": len(documents_unchanged),
             "download_errors": len(download_errors),
             "extraction_errors": len(extraction_errors),
-            "save_errors": len(save_errors)
+            "save_errors": len(save_errors),
+            "bytes_downloaded": bytes_downloaded,
+            "new_citations": new_citations,
+            "first_regulation_saved_seconds": (
+                round(first_regulation_saved_seconds, 3) if first_regulation_saved_seconds is not None else None
+            )
         }
         
         logger.info("agent_1a_combined_completed", result=result)
         
+        # Ajoutées après le log pour ne pas le surcharger (benchmarks/agent_1a_throughput.py)
+        result["stage_durations"] = stage_durations
+        
         return result
         
     except Exception as e:
@@ -391,3 +393,268 @@ async def run_agent_1a_combined(
             "keyword": keyword,
             "error": str(e)
         }
+
+
+# ========================================
+# TRAITEMENT D'UN DOCUMENT
+# ========================================
+
+def _document_id(item: Dict) -> str:
+    """Identifiant lisible d'un document (CELEX pour EUR-Lex, début du titre pour CBAM)"""
+    if item['source'] == 'eurlex':
+        return item['doc'].celex_number
+    return item['doc'].title[:50]
+
+
+def _save_extracted_document(repo, item: Dict):
+    """
+    Sauvegarde un document extrait via upsert_document
+    
+    Returns:
+        Tuple (document, status) retourné par le repository
+    """
+    doc = item['doc']
+    content = item['content']
+    file_path = item['file_path']
+    
+    # Calculer le hash du fichier
+    with open(file_path, 'rb') as f:
+        file_hash = hashlib.sha256(f.read()).hexdigest()
+    
+    # Préparer les métadonnées selon la source
+    # Note: content est un objet ExtractedContent (Pydantic), pas un dict
+    if item['source'] == 'eurlex':
+        metadata = {
+            'source': 'eurlex',
+            'celex_number': doc.celex_number,
+            'document_type': doc.document_type,
+            'format': 'HTML' if file_path.endswith('.html') else 'PDF',
+            'pages': content.page_count,
+            'tables': len(content.tables),
+            'file_path': file_path
+        }
+        pub_date = doc.publication_date  # EurlexDocument utilise publication_date, pas date
+    else:  # cbam
+        metadata = {
+            'source': 'cbam_guidance',
+            'format': doc.format,
+            'size': doc.size,
+            'category': doc.category,
+            'pages': content.page_count,
+            'file_path': file_path
+        }
+        pub_date = getattr(doc, 'date', None)
+    
+    return repo.upsert_document(
+        source_url=item['url'],
+        hash_sha256=file_hash,
+        title=doc.title,
+        content=content.text,  # Attribut text, pas .get('text')
+        nc_codes=[nc.code for nc in content.nc_codes],  # Extraire les codes NC
+        regulation_type='CBAM',  # EUR-Lex et CBAM Guidance sont liés au CBAM
+        publication_date=pub_date,
+        document_metadata=metadata
+    )
+
+
+def _load_profile_indexes(get_session) -> List:
+    """
+    Profils actifs compilés (ProfileIndex), pour les caractéristiques des documents
+    
+    Sans profil lisible, les caractéristiques sont calculées sans mots-clés ;
+    l'Agent 1B les complète à l'analyse.
+    """
+    from src.agent_1b.profile_index import profile_index_for_row
+    from src.storage.models import CompanyProfile
+    
+    session = get_session()
+    try:
+        profiles = session.query(CompanyProfile).filter(CompanyProfile.active.is_(True)).all()
+        return [profile_index_for_row(row) for row in profiles]
+    except Exception as e:
+        logger.warning("profile_indexes_unavailable", error=str(e))
+        return []
+    finally:
+        session.close()
+
+
+def _save_document_features(session, document, item: Dict, profile_indexes: List) -> None:
+    """
+    Calcule et enregistre les caractéristiques d'un document nouveau ou modifié
+    (codes NC, statistiques du texte, occurrences des mots-clés des profils)
+    """
+    from src.agent_1b.features import featurize
+    from src.storage.document_feature_repository import DocumentFeatureRepository
+    
+    content = item['content']
+    features = featurize(
+        content.text,
+        profile_indexes,
+        nc_occurrences=[nc.model_dump() for nc in content.nc_codes],
+        content_hash=document.hash_sha256
+    )
+    DocumentFeatureRepository(session).save(document.id, features)
+
+
+# ========================================
+# FRONTIÈRE DE CRAWL (CITATIONS CELEX)
+# ========================================
+
+_ACT_TYPES_BY_LETTER = {letter: act_type.upper() for act_type, letter in ACT_TYPE_LETTERS.items()}
+
+
+def _load_frontier_documents(get_session, max_eurlex_documents: int, keyword: str) -> List[EurlexDocument]:
+    """
+    Actes cités les plus prioritaires, dans la limite de la part du budget
+    EUR-Lex réservée à la frontière (settings.citation_frontier_share)
+    """
+    from src.config import settings
+    from src.storage.citation_repository import CitationRepository
+    
+    budget = int(max_eurlex_documents * settings.citation_frontier_share)
+    if budget <= 0:
+        return []
+    
+    session = get_session()
+    try:
+        entries = CitationRepository(session).next_batch(budget)
+    except Exception as e:
+        logger.error("frontier_loading_failed", error=str(e))
+        return []
+    finally:
+        session.close()
+    
+    documents = []
+    for entry in entries:
+        url, pdf_url, html_url = celex_rendition_urls(entry.celex, settings.eurlex_base_url)
+        documents.append(EurlexDocument(
+            celex_number=entry.celex,
+            title=f"CELEX {entry.celex}",
+            url=url,
+            pdf_url=pdf_url,
+            html_url=html_url,
+            document_type=_ACT_TYPES_BY_LETTER.get(entry.celex[5:6], 'OTHER'),
+            keyword=keyword,
+            metadata={'frontier': True, 'citation_count': entry.citation_count}
+        ))
+    
+    logger.info("frontier_loaded", budget=budget, count=len(documents))
+    return documents
+
+
+def _record_citations(get_session, item: Dict, document_id=None) -> int:
+    """
+    Enregistre les actes cités par un document extrait
+    
+    Returns:
+        Nombre de nouvelles arêtes du graphe de citations
+    """
+    from src.storage.citation_repository import CitationRepository
+    
+    citing_celex = item['doc'].celex_number if item['source'] == 'eurlex' else None
+    references = extract_celex_references(item['content'].text, exclude=citing_celex)
+    
+    session = get_session()
+    try:
+        new_edges = CitationRepository(session).record_citations(
+            citing_url=item['url'],
+            references=references,
+            citing_celex=citing_celex,
+            citing_document_id=document_id
+        )
+        session.commit()
+        return new_edges
+    except Exception as e:
+        session.rollback()
+        logger.error("citations_recording_failed", url=item['url'], error=str(e))
+        return 0
+    finally:
+        session.close()
+
+
+def _record_frontier_failure(get_session, celex: str, error: str) -> None:
+    """Comptabilise un échec de collecte d'un acte de la frontière"""
+    from src.config import settings
+    from src.storage.citation_repository import CitationRepository
+    
+    session = get_session()
+    try:
+        CitationRepository(session).mark_failed(celex, error, settings.citation_frontier_max_attempts)
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        logger.error("frontier_update_failed", celex=celex, error=str(e))
+    finally:
+        session.close()
+
+
+# ========================================
+# SÉLECTION DU FORMAT EUR-LEX
+# ========================================
+
+def _eurlex_candidate_urls(doc) -> List[str]:
+    """
+    Retourne les URLs des rendus d'un acte EUR-Lex par ordre de préférence.
+    
+    L'ordre suit settings.eurlex_format_preference (défaut: "html,pdf") ;
+    la page de notice (doc.url) sert de dernier recours.
+    """
+    from src.config import settings
+    
+    renditions = {
+        'html': getattr(doc, 'html_url', None),
+        'pdf': doc.pdf_url,
+    }
+    
+    urls = []
+    for fmt in settings.eurlex_format_preference.split(','):
+        candidate = renditions.get(fmt.strip().lower())
+        if candidate and str(candidate) not in urls:
+            urls.append(str(candidate))
+    
+    return urls or [str(doc.url)]
+
+
+async def _fetch_preferred_rendition(urls: List[str], get_session, repository_cls):
+    """
+    Télécharge le premier rendu disponible parmi les URLs candidates.
+    
+    Un rendu HTML sans texte d'acte (page d'erreur EUR-Lex) est ignoré au
+    profit du rendu suivant (PDF).
+    
+    Returns:
+        Tuple (FetchResult, url retenue)
+    """
+    fetch_result = None
+    
+    for candidate in urls:
+        # Vérifier si le document existe déjà en BDD pour éviter téléchargement inutile
+        session_check = get_session()
+        try:
+            existing_doc_check = repository_cls(session_check).find_by_url(candidate)
+        finally:
+            session_check.close()
+        
+        # Utiliser skip_if_exists et existing_hash pour optimiser
+        fetch_result = await fetch_document(
+            candidate,
+            output_dir="data/documents",
+            skip_if_exists=True,
+            existing_hash=existing_doc_check.hash_sha256 if existing_doc_check else None
+        )
+        
+        if not fetch_result.success:
+            logger.info("rendition_unavailable", url=candidate, error=fetch_result.error)
+            continue
+        
+        file_path = fetch_result.document.file_path
+        if file_path.endswith('.html') and not is_eurlex_html_rendition(file_path):
+            logger.info("rendition_unavailable", url=candidate, reason="no_act_text")
+            fetch_result = fetch_result.model_copy(
+                update={'success': False, 'error': 'HTML rendition without act text'}
+            )
+            continue
+        
+        return fetch_result, candidate
+    
+    return fetch_result, urls[-1]
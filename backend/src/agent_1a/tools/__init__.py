@@ -9,6 +9,7 @@ from .scraper import search_eurlex
 from .cbam_guidance_scraper import search_cbam_guidance, search_cbam_guidance_sync
 from .document_fetcher import fetch_document
 from .pdf_extractor import extract_pdf_content
+from .html_extractor import extract_html_content
 
 # Créer les LangChain Tools pour l'agent ReAct
 search_eurlex_tool = Tool(
@@ -55,6 +56,7 @@ __all__ = [
     "search_cbam_guidance",
     "fetch_document",
     "extract_pdf_content",
+    "extract_html_content",
     # Tools (pour agent ReAct)
     "search_eurlex_tool",
     "search_cbam_guidance_tool",
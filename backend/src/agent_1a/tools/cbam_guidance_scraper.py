@@ -16,6 +16,8 @@ from datetime import datetime
 from pydantic import BaseModel
 import structlog
 
+from src.utils.http_cassette import cassette_subprocess_env
+
 logger = structlog.get_logger()
 
 # ========================================
@@ -44,10 +46,21 @@ class CbamSearchResult(BaseModel):
 # ========================================
 
 CBAM_SPIDER_CODE = '''
+import os
 import scrapy
 import json
 import re
 
+# Cassettes HTTP (record/replay) - voir src/utils/http_cassette.py
+CASSETTE_MODE = os.environ.get('HTTP_CASSETTE_MODE', 'off')
+CASSETTE_SETTINGS = {}
+if CASSETTE_MODE in ('record', 'replay'):
+    CASSETTE_SETTINGS['DOWNLOADER_MIDDLEWARES'] = {
+        'src.utils.http_cassette.CassetteDownloaderMiddleware': 950,
+    }
+if CASSETTE_MODE == 'replay':
+    CASSETTE_SETTINGS.update({'DOWNLOAD_DELAY': 0, 'AUTOTHROTTLE_ENABLED': False})
+
 class CbamGuidanceSpider(scrapy.Spider):
     name = 'cbam_guidance'
     
@@ -60,13 +73,14 @@ class CbamGuidanceSpider(scrapy.Spider):
         'AUTOTHROTTLE_START_DELAY': 2,
         'AUTOTHROTTLE_MAX_DELAY': 5,
         'LOG_LEVEL': 'INFO',
+        **CASSETTE_SETTINGS,
     }
     
-    def __init__(self, categories='all', *args, **kwargs):
+    def __init__(self, categories='all', start_url=None, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.categories = categories.split(',') if categories != 'all' else ['all']
         self.start_urls = [
-            'https://taxation-customs.ec.europa.eu/carbon-border-adjustment-mechanism/cbam-legislation-and-guidance_en'
+            start_url or 'https://taxation-customs.ec.europa.eu/carbon-border-adjustment-mechanism/cbam-legislation-and-guidance_en'
         ]
         self.documents = []
     
@@ -216,6 +230,8 @@ async def _run_scrapy_spider(categories: str, max_results: int) -> List[Dict]:
     Returns:
         Liste de dictionnaires contenant les documents
     """
+    from src.config import settings
+
     # Créer un fichier temporaire pour le spider
     with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False, encoding='utf-8') as spider_file:
         spider_file.write(CBAM_SPIDER_CODE)
@@ -231,6 +247,7 @@ async def _run_scrapy_spider(categories: str, max_results: int) -> List[Dict]:
             'scrapy', 'runspider', spider_path,
             '-o', output_path,
             '-a', f'categories={categories}',
+            '-a', f'start_url={settings.cbam_source_url}',
             '--loglevel=INFO'
         ]
         
@@ -238,7 +255,8 @@ async def _run_scrapy_spider(categories: str, max_results: int) -> List[Dict]:
         process = await asyncio.create_subprocess_exec(
             *cmd,
             stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
+            stderr=asyncio.subprocess.PIPE,
+            env=cassette_subprocess_env()
         )
         
         stdout, stderr = await process.communicate()
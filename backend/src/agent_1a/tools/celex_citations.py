@@ -0,0 +1,104 @@
+"""
+Extraction des références CELEX citées dans le texte d'un acte
+
+Les règlements citent en permanence d'autres actes (actes délégués, actes
+d'exécution, règlements modifiés). Les formes reconnues :
+
+    Regulation (EU) 2023/956                  -> 32023R0956
+    Implementing Regulation (EU) 2023/1773    -> 32023R1773
+    Regulation (EC) No 1907/2006              -> 32006R1907
+    Council Regulation (EEC) No 2658/87       -> 31987R2658
+    Directive 2003/87/EC                      -> 32003L0087
+    Decision (EU) 2015/1814                   -> 32015D1814
+    Decision No 406/2009/EC                   -> 32009D0406
+    CELEX:32023R0956 / CELEX 32023R0956       -> 32023R0956
+"""
+
+import re
+from typing import Dict, List, Optional
+
+# Lettre de type d'acte dans le numéro CELEX (secteur 3 : législation)
+ACT_TYPE_LETTERS = {
+    "regulation": "R",
+    "directive": "L",
+    "decision": "D",
+}
+
+_ACT_REFERENCE = re.compile(
+    r"\b(?:(?:Commission|Council)\s+)?(?:(?:Implementing|Delegated)\s+)?"
+    r"(Regulation|Directive|Decision)\s+"
+    r"(?:\((?:EU|EC|EEC|Euratom|EU,\s*Euratom)\)\s+)?"
+    r"(No\.?\s+)?(\d{1,4})\s*/\s*(\d{1,4})\b",
+    re.IGNORECASE,
+)
+
+_EXPLICIT_CELEX = re.compile(r"\bCELEX\s*[:\s]\s*([1-9]\d{4}[A-Z]{1,2}\d{4})\b")
+
+
+def _full_year(year: int) -> Optional[int]:
+    """Années sur deux chiffres (ex: 87 -> 1987, 03 -> 2003)"""
+    if year < 100:
+        year += 1900 if year >= 50 else 2000
+    return year if 1950 <= year <= 2100 else None
+
+
+def reference_to_celex(act_type: str, first: str, second: str, numbered: bool) -> Optional[str]:
+    """
+    Convertit une référence d'acte en numéro CELEX
+
+    Args:
+        act_type: "Regulation", "Directive" ou "Decision"
+        first: Premier nombre de la référence
+        second: Second nombre de la référence
+        numbered: True pour la forme "No <numéro>/<année>", sinon "<année>/<numéro>"
+
+    Returns:
+        Numéro CELEX, ou None si la référence n'est pas plausible
+    """
+    number, year = (first, second) if numbered else (second, first)
+    full_year = _full_year(int(year))
+
+    if full_year is None or int(number) == 0:
+        return None
+
+    return f"3{full_year}{ACT_TYPE_LETTERS[act_type.lower()]}{int(number):04d}"
+
+
+def extract_celex_references(text: str, exclude: Optional[str] = None) -> Dict[str, str]:
+    """
+    Extrait les actes cités dans un texte
+
+    Args:
+        text: Texte extrait du document
+        exclude: CELEX du document lui-même (auto-citation ignorée)
+
+    Returns:
+        Dict {celex: première référence textuelle}, dans l'ordre d'apparition
+    """
+    references: Dict[str, str] = {}
+
+    if not text:
+        return references
+
+    for match in _ACT_REFERENCE.finditer(text):
+        act_type, numbered, first, second = match.groups()
+        celex = reference_to_celex(act_type, first, second, numbered=bool(numbered))
+        if celex and celex != exclude:
+            references.setdefault(celex, " ".join(match.group(0).split()))
+
+    for match in _EXPLICIT_CELEX.finditer(text):
+        celex = match.group(1)
+        if celex != exclude:
+            references.setdefault(celex, match.group(0))
+
+    return references
+
+
+def celex_rendition_urls(celex: str, base_url: str) -> List[str]:
+    """URLs de notice, PDF et HTML d'un acte (même format que le spider EUR-Lex)"""
+    base_url = base_url.rstrip("/")
+    return [
+        f"{base_url}/legal-content/EN/AUTO/?uri=CELEX:{celex}",
+        f"{base_url}/legal-content/EN/TXT/PDF/?uri=CELEX:{celex}",
+        f"{base_url}/legal-content/EN/TXT/HTML/?uri=CELEX:{celex}",
+    ]
@@ -15,6 +15,8 @@ import httpx
 import structlog
 from pydantic import BaseModel, HttpUrl
 
+from src.utils.http_cassette import get_http_transport
+
 logger = structlog.get_logger()
 
 
@@ -63,7 +65,11 @@ async def get_remote_file_hash(
     logger.info("get_remote_hash_started", url=url)
     
     try:
-        async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
+        async with httpx.AsyncClient(
+            timeout=timeout,
+            follow_redirects=True,
+            transport=get_http_transport()
+        ) as client:
             # Essayer d'abord avec HEAD (plus rapide, juste les métadonnées)
             response = await client.head(url)
             response.raise_for_status()
@@ -179,7 +185,8 @@ async def fetch_document(
         async with httpx.AsyncClient(
             timeout=timeout,
             follow_redirects=True,
-            limits=httpx.Limits(max_connections=5)
+            limits=httpx.Limits(max_connections=5),
+            transport=get_http_transport()
         ) as client:
             response = await client.get(url)
             response.raise_for_status()
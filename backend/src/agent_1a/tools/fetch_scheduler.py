@@ -0,0 +1,219 @@
+"""
+Ordonnancement des téléchargements de l'Agent 1A
+
+Les documents ne sont plus traités dans l'ordre du scraping : chaque élément
+reçoit une priorité (type d'acte EUR-Lex, catégorie CBAM, réglementation citée
+dans le titre) et une taille estimée, puis un pool de workers les traite par
+ordre de priorité.
+
+Les gros fichiers (outils ZIP, classeurs de valeurs par défaut...) passent par
+un nombre limité de "créneaux lourds" : ils ne peuvent jamais occuper tous les
+workers, un petit règlement d'exécution prioritaire n'attend donc pas la fin
+d'un téléchargement de 40 Mo.
+
+Configuration (variables d'environnement / .env) :
+    FETCH_CONCURRENCY=4
+    FETCH_LARGE_FILE_MB=10
+    FETCH_LARGE_SLOTS=1
+    FETCH_PRIORITY_DOCUMENT_TYPES=REGULATION:0,DIRECTIVE:1,DECISION:2,OTHER:3
+    FETCH_PRIORITY_CATEGORIES=guidance:1,faq:2,default_values:2,template:3,tool:4,other:4
+    FETCH_PRIORITY_REGULATIONS=CBAM
+"""
+
+import asyncio
+import heapq
+import itertools
+import re
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import structlog
+
+logger = structlog.get_logger()
+
+# Taille supposée quand la source n'annonce rien (actes EUR-Lex : quelques centaines de Ko)
+DEFAULT_SIZE_ESTIMATES = {
+    "eurlex": 500 * 1024,
+    "cbam": 1024 * 1024,
+}
+
+# Rang attribué aux types / catégories absents de la configuration
+DEFAULT_RANK = 5
+
+_SIZE_UNITS = {"B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+_SIZE_PATTERN = re.compile(r"(\d+(?:[.,]\d+)?)\s*(GB|MB|KB|B)\b", re.IGNORECASE)
+
+
+def parse_size(size: Optional[str]) -> Optional[int]:
+    """
+    Convertit une taille annoncée par le site CBAM en octets
+
+    Args:
+        size: Texte de taille, ex: "PDF - 1 MB", "XLSX - 250 KB"
+
+    Returns:
+        Taille en octets, ou None si absente / illisible
+    """
+    if not size:
+        return None
+
+    match = _SIZE_PATTERN.search(size)
+    if not match:
+        return None
+
+    value = float(match.group(1).replace(",", "."))
+    return int(value * _SIZE_UNITS[match.group(2).upper()])
+
+
+def parse_ranks(spec: str) -> Dict[str, int]:
+    """Parse une configuration "CLE:rang,CLE:rang" (clés insensibles à la casse)"""
+    ranks = {}
+
+    for entry in spec.split(","):
+        if ":" not in entry:
+            continue
+        key, rank = entry.split(":", 1)
+        try:
+            ranks[key.strip().lower()] = int(rank)
+        except ValueError:
+            logger.warning("fetch_priority_invalid_rank", entry=entry)
+
+    return ranks
+
+
+def estimate_size(item: Dict) -> int:
+    """Taille estimée d'un élément à télécharger (octets)"""
+    announced = parse_size(getattr(item["doc"], "size", None))
+    return announced if announced is not None else DEFAULT_SIZE_ESTIMATES.get(item["source"], 0)
+
+
+def fetch_priority(item: Dict) -> int:
+    """
+    Rang de priorité d'un élément (plus petit = plus urgent)
+
+    - EUR-Lex : rang du type d'acte (REGULATION, DIRECTIVE...)
+    - CBAM : rang de la catégorie (guidance, faq, template...)
+    - un titre citant une réglementation prioritaire gagne un rang
+    """
+    from src.config import settings
+
+    doc = item["doc"]
+
+    if item["source"] == "eurlex":
+        ranks = parse_ranks(settings.fetch_priority_document_types)
+        rank = ranks.get(str(doc.document_type).lower(), DEFAULT_RANK)
+    else:
+        ranks = parse_ranks(settings.fetch_priority_categories)
+        rank = ranks.get(str(getattr(doc, "category", "other")).lower(), DEFAULT_RANK)
+
+    regulations = [name.strip().lower() for name in settings.fetch_priority_regulations.split(",") if name.strip()]
+    title = (doc.title or "").lower()
+    if any(name in title for name in regulations):
+        rank -= 1
+
+    return rank
+
+
+def prioritize(items: List[Dict]) -> List[Dict]:
+    """
+    Annote chaque élément ('priority', 'size_bytes') et les trie par urgence
+
+    À priorité égale, le plus petit document passe en premier.
+    """
+    for item in items:
+        item["priority"] = fetch_priority(item)
+        item["size_bytes"] = estimate_size(item)
+
+    return sorted(items, key=lambda item: (item["priority"], item["size_bytes"]))
+
+
+class FetchScheduler:
+    """
+    Pool de workers qui traite les éléments par priorité
+
+    Les éléments dont la taille estimée dépasse `large_file_bytes` ne peuvent
+    occuper plus de `large_slots` workers simultanément.
+    """
+
+    def __init__(self, concurrency: int = 4, large_file_bytes: int = 10 * 1024 * 1024, large_slots: int = 1):
+        """
+        Args:
+            concurrency: Nombre de workers
+            large_file_bytes: Seuil à partir duquel un fichier est "lourd"
+            large_slots: Nombre maximum de fichiers lourds traités en parallèle
+        """
+        self.concurrency = max(1, concurrency)
+        self.large_file_bytes = large_file_bytes
+        self.large_slots = max(1, large_slots)
+
+    @classmethod
+    def from_settings(cls) -> "FetchScheduler":
+        from src.config import settings
+
+        return cls(
+            concurrency=settings.fetch_concurrency,
+            large_file_bytes=int(settings.fetch_large_file_mb * 1024 * 1024),
+            large_slots=settings.fetch_large_slots,
+        )
+
+    async def run(self, items: List[Dict], worker: Callable[[Dict], Awaitable[None]]) -> None:
+        """
+        Traite tous les éléments avec `worker` (les exceptions sont journalisées)
+
+        Args:
+            items: Éléments à traiter (dicts source/doc/url)
+            worker: Coroutine appelée pour chaque élément
+        """
+        counter = itertools.count()
+        small, large = [], []
+
+        for item in prioritize(items):
+            queue = large if item["size_bytes"] >= self.large_file_bytes else small
+            heapq.heappush(queue, (item["priority"], item["size_bytes"], next(counter), item))
+
+        condition = asyncio.Condition()
+        large_in_flight = 0
+
+        def take() -> Optional[tuple]:
+            """Élément suivant éligible : (item, is_large) ou None si rien n'est éligible"""
+            large_allowed = large and large_in_flight < self.large_slots
+            if large_allowed and (not small or large[0] < small[0]):
+                return heapq.heappop(large)[-1], True
+            if small:
+                return heapq.heappop(small)[-1], False
+            return None
+
+        async def run_worker() -> None:
+            nonlocal large_in_flight
+
+            while True:
+                async with condition:
+                    taken = take()
+                    while taken is None and large:
+                        # Seuls des fichiers lourds restent et tous les créneaux sont pris
+                        await condition.wait()
+                        taken = take()
+                    if taken is None:
+                        return
+                    item, is_large = taken
+                    if is_large:
+                        large_in_flight += 1
+
+                try:
+                    await worker(item)
+                except Exception as e:
+                    logger.error("scheduled_fetch_failed", url=item.get("url"), error=str(e))
+                finally:
+                    if is_large:
+                        async with condition:
+                            large_in_flight -= 1
+                            condition.notify_all()
+
+        logger.info(
+            "fetch_schedule_started",
+            small=len(small),
+            large=len(large),
+            concurrency=self.concurrency,
+            large_slots=self.large_slots
+        )
+
+        await asyncio.gather(*(run_worker() for _ in range(self.concurrency)))
@@ -0,0 +1,252 @@
+"""
+HTML Extractor - Extraction de contenu et codes NC depuis le rendu HTML EUR-Lex
+
+EUR-Lex publie chaque acte en HTML structuré (TXT/HTML), plus léger et beaucoup
+plus rapide à analyser que le PDF. Le découpage en articles et annexes est
+conservé : chaque section joue le rôle d'une "page" pour les codes NC.
+
+Responsable: Dev 1
+"""
+import asyncio
+import re
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+import structlog
+from bs4 import BeautifulSoup
+
+from .pdf_extractor import ExtractedContent, NCCode, _extract_nc_codes
+
+logger = structlog.get_logger()
+
+
+# Classes CSS EUR-Lex (format OJ récent "oj-*" et ancien format sans préfixe)
+ARTICLE_TITLE_CLASSES = {"ti-art", "oj-ti-art"}
+ANNEX_TITLE_CLASSES = {"doc-ti", "oj-doc-ti"}
+
+# Marqueurs indiquant une page EUR-Lex contenant réellement le texte de l'acte
+# (EUR-Lex répond 200 avec une page d'erreur quand le HTML n'existe pas)
+EURLEX_TEXT_MARKERS = re.compile(
+    rb'id="document1"|id="TexteOnly"|class="(?:oj-)?ti-art"|class="(?:oj-)?doc-ti"|class="eli-container"'
+)
+
+
+def is_eurlex_html_rendition(file_path: str, min_size: int = 2048) -> bool:
+    """
+    Vérifie (sans parser le DOM) qu'un fichier HTML contient bien le texte d'un acte.
+
+    Args:
+        file_path: Chemin vers le fichier HTML téléchargé
+        min_size: Taille minimale en octets
+
+    Returns:
+        bool: True si le rendu HTML est exploitable, False sinon (repli sur PDF)
+    """
+    path = Path(file_path)
+    if not path.exists() or path.stat().st_size < min_size:
+        return False
+
+    with open(path, "rb") as f:
+        raw = f.read()
+
+    return EURLEX_TEXT_MARKERS.search(raw) is not None
+
+
+async def extract_html_content(
+    file_path: str,
+    extract_tables: bool = True,
+    extract_nc_codes: bool = True
+) -> ExtractedContent:
+    """
+    Extrait le contenu d'un rendu HTML EUR-Lex.
+
+    Le parsing est exécuté dans un thread pour ne pas bloquer la boucle asyncio.
+
+    Args:
+        file_path: Chemin vers le fichier HTML
+        extract_tables: Extraire les tableaux
+        extract_nc_codes: Détecter les codes NC
+
+    Returns:
+        ExtractedContent: Même modèle que pour les PDFs (page_count = nombre de sections)
+    """
+    logger.info("html_extraction_started", file_path=file_path)
+
+    path = Path(file_path)
+
+    if not path.exists():
+        return ExtractedContent(
+            file_path=file_path,
+            text="",
+            nc_codes=[],
+            tables=[],
+            metadata={},
+            page_count=0,
+            status="error",
+            error=f"File not found: {file_path}"
+        )
+
+    try:
+        return await asyncio.to_thread(
+            _extract_html_content_sync, path, extract_tables, extract_nc_codes
+        )
+
+    except Exception as e:
+        logger.error("html_extraction_error", file_path=file_path, error=str(e), exc_info=True)
+        return ExtractedContent(
+            file_path=file_path,
+            text="",
+            nc_codes=[],
+            tables=[],
+            metadata={},
+            page_count=0,
+            status="error",
+            error=f"Extraction error: {str(e)}"
+        )
+
+
+def _extract_html_content_sync(
+    path: Path,
+    extract_tables: bool,
+    extract_nc_codes: bool
+) -> ExtractedContent:
+    """Parsing DOM synchrone (appelé via asyncio.to_thread)."""
+    with open(path, "rb") as f:
+        soup = BeautifulSoup(f.read(), "lxml")
+
+    root = soup.find(id="document1") or soup.find(id="TexteOnly") or soup.body or soup
+
+    for tag in root(["script", "style", "noscript"]):
+        tag.decompose()
+
+    sections = _split_sections(root)
+
+    text_content = []
+    nc_codes: List[NCCode] = []
+
+    for section_num, (section_title, paragraphs) in enumerate(sections, start=1):
+        section_text = "\n".join(paragraphs)
+
+        text_content.append(f"\n--- {section_title} ---\n")
+        text_content.append(section_text)
+
+        if extract_nc_codes and section_text:
+            nc_codes.extend(_extract_nc_codes(section_text, section_num))
+
+    tables = _extract_tables(root) if extract_tables else []
+
+    full_text = "".join(text_content)
+
+    metadata = {
+        "filename": path.name,
+        "file_size": path.stat().st_size,
+        "extension": path.suffix,
+        "format": "HTML",
+        "sections": [title for title, _ in sections],
+        "document_title": _document_title(root),
+        "page_count": len(sections),
+        "tables_found": len(tables),
+        "nc_codes_found": len(nc_codes)
+    }
+
+    logger.info(
+        "html_extraction_completed",
+        file_path=str(path),
+        sections=len(sections),
+        text_length=len(full_text),
+        nc_codes=len(nc_codes),
+        tables=len(tables)
+    )
+
+    return ExtractedContent(
+        file_path=str(path),
+        text=full_text,
+        nc_codes=nc_codes,
+        tables=tables,
+        metadata=metadata,
+        page_count=len(sections),
+        status="success"
+    )
+
+
+def _document_title(root) -> Optional[str]:
+    """
+    Titre de l'acte : premiers paragraphes "doc-ti" consécutifs.
+
+    L'en-tête du Journal officiel (paragraphes "oj-hd-*", section "Preamble")
+    précède le titre ; les annexes, plus loin, sont aussi des "doc-ti".
+
+    Returns:
+        Titre (ex: "COMMISSION IMPLEMENTING REGULATION (EU) 2023/1773 of 17
+        August 2023 ...") ou None si l'acte n'a pas de titre balisé
+    """
+    parts: List[str] = []
+
+    for p in root.find_all("p"):
+        text = p.get_text(" ", strip=True)
+        if not text:
+            continue
+        if set(p.get("class") or []) & ANNEX_TITLE_CLASSES:
+            parts.append(text)
+        elif parts:
+            break
+
+    return " ".join(parts)[:500] if parts else None
+
+
+def _split_sections(root) -> List[Tuple[str, List[str]]]:
+    """
+    Découpe le document en sections (préambule, articles, annexes).
+
+    Returns:
+        Liste de tuples (titre de section, paragraphes)
+    """
+    sections: List[Tuple[str, List[str]]] = [("Preamble", [])]
+
+    paragraphs = root.find_all("p")
+
+    # Pages sans <p> (anciens actes en texte brut) : une seule section
+    if not paragraphs:
+        text = root.get_text("\n", strip=True)
+        return [("Document", [text])] if text else []
+
+    for p in paragraphs:
+        text = p.get_text(" ", strip=True)
+        if not text:
+            continue
+
+        classes = set(p.get("class") or [])
+
+        if classes & ARTICLE_TITLE_CLASSES or classes & ANNEX_TITLE_CLASSES:
+            sections.append((text, []))
+            continue
+
+        sections[-1][1].append(text)
+
+    # Retirer le préambule s'il est vide
+    return [(title, paras) for title, paras in sections if paras or title != "Preamble"]
+
+
+def _extract_tables(root) -> List[Dict[str, Any]]:
+    """Extrait les tableaux HTML au même format que pdf_extractor."""
+    tables = []
+
+    for table_idx, table in enumerate(root.find_all("table")):
+        rows = []
+        for tr in table.find_all("tr"):
+            cells = [cell.get_text(" ", strip=True) for cell in tr.find_all(["td", "th"])]
+            if any(cells):
+                rows.append(cells)
+
+        if not rows:
+            continue
+
+        tables.append({
+            "page": None,
+            "table_index": table_idx,
+            "rows": len(rows),
+            "columns": max(len(row) for row in rows),
+            "data": rows
+        })
+
+    return tables
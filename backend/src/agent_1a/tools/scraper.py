@@ -15,6 +15,8 @@ import sys
 
 import structlog
 
+from src.utils.http_cassette import cassette_subprocess_env
+
 logger = structlog.get_logger()
 
 # ========================================
@@ -27,6 +29,7 @@ class EurlexDocument(BaseModel):
     title: str
     url: str
     pdf_url: Optional[str]
+    html_url: Optional[str] = None
     document_type: str
     source: str = "eurlex"
     keyword: str
@@ -49,17 +52,24 @@ class EurlexSpider(scrapy.Spider):
     """Spider Scrapy pour EUR-Lex"""
     name = 'eurlex'
     
-    def __init__(self, keyword: str, max_results: int = 10, output_file: str = None, *args, **kwargs):
+    def __init__(self, keyword: str, max_results: int = 10, output_file: str = None,
+                 base_url: str = "https://eur-lex.europa.eu", *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.keyword = keyword
+        self.base_url = base_url.rstrip('/')
         self.max_results = max_results
         self.output_file = output_file
         self.results = []
         
     def start_requests(self):
-        url = f"https://eur-lex.europa.eu/search.html?text={quote(self.keyword)}&type=quick&lang=en"
+        url = f"{self.base_url}/search.html?text={quote(self.keyword)}&type=quick&lang=en"
         yield scrapy.Request(url, callback=self.parse)
     
+    async def start(self):
+        # Scrapy >= 2.13 : start() remplace start_requests()
+        for request in self.start_requests():
+            yield request
+    
     def parse(self, response):
         # Extraire les résultats
         result_links = response.css('a[id^="cellar_"]')
@@ -82,7 +92,8 @@ class EurlexSpider(scrapy.Spider):
                 'celex_number': celex,
                 'title': title.strip(),
                 'url': response.urljoin(url),
-                'pdf_url': f"https://eur-lex.europa.eu/legal-content/EN/TXT/PDF/?uri=CELEX:{celex}" if celex else None,
+                'pdf_url': f"{self.base_url}/legal-content/EN/TXT/PDF/?uri=CELEX:{celex}" if celex else None,
+                'html_url': f"{self.base_url}/legal-content/EN/TXT/HTML/?uri=CELEX:{celex}" if celex else None,
                 'document_type': self._extract_type(title),
                 'source': 'eurlex',
                 'keyword': self.keyword,
@@ -166,6 +177,8 @@ async def _run_scrapy_spider(keyword: str, max_results: int) -> List[Dict]:
     """
     Exécuter le spider Scrapy dans un subprocess séparé
     """
+    from src.config import settings
+
     # Créer un fichier temporaire pour les résultats
     with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
         output_file = f.name
@@ -173,6 +186,7 @@ async def _run_scrapy_spider(keyword: str, max_results: int) -> List[Dict]:
     # Créer un script Python temporaire pour exécuter le spider
     spider_script = f"""
 import sys
+import os
 import scrapy
 from scrapy.crawler import CrawlerProcess
 from urllib.parse import quote
@@ -180,20 +194,29 @@ import json
 import re
 from datetime import datetime
 
+# Cassettes HTTP (record/replay) - voir src/utils/http_cassette.py
+CASSETTE_MODE = os.environ.get('HTTP_CASSETTE_MODE', 'off')
+
 class EurlexSpider(scrapy.Spider):
     name = 'eurlex'
     
-    def __init__(self, keyword, max_results, output_file, *args, **kwargs):
+    def __init__(self, keyword, max_results, output_file, base_url, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.keyword = keyword
+        self.base_url = base_url.rstrip('/')
         self.max_results = int(max_results)
         self.output_file = output_file
         self.results = []
         
     def start_requests(self):
-        url = f"https://eur-lex.europa.eu/search.html?text={{quote(self.keyword)}}&type=quick&lang=en"
+        url = f"{{self.base_url}}/search.html?text={{quote(self.keyword)}}&type=quick&lang=en"
         yield scrapy.Request(url, callback=self.parse)
     
+    async def start(self):
+        # Scrapy >= 2.13 : start() remplace start_requests()
+        for request in self.start_requests():
+            yield request
+    
     def parse(self, response):
         result_links = response.css('a[id^="cellar_"]')
         
@@ -213,7 +236,8 @@ class EurlexSpider(scrapy.Spider):
                 'celex_number': celex,
                 'title': title.strip(),
                 'url': response.urljoin(url),
-                'pdf_url': f"https://eur-lex.europa.eu/legal-content/EN/TXT/PDF/?uri=CELEX:{{celex}}" if celex else None,
+                'pdf_url': f"{{self.base_url}}/legal-content/EN/TXT/PDF/?uri=CELEX:{{celex}}" if celex else None,
+                'html_url': f"{{self.base_url}}/legal-content/EN/TXT/HTML/?uri=CELEX:{{celex}}" if celex else None,
                 'document_type': self._extract_type(title),
                 'source': 'eurlex',
                 'keyword': self.keyword,
@@ -251,8 +275,9 @@ if __name__ == '__main__':
     keyword = sys.argv[1]
     max_results = int(sys.argv[2])
     output_file = sys.argv[3]
+    base_url = sys.argv[4]
     
-    process = CrawlerProcess(settings={{
+    settings = {{
         'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
         'DOWNLOAD_DELAY': 3,
         'RANDOMIZE_DOWNLOAD_DELAY': True,
@@ -268,9 +293,24 @@ if __name__ == '__main__':
             'scrapy.downloadermiddlewares.useragent.UserAgentMiddleware': None,
             'scrapy_user_agents.middlewares.RandomUserAgentMiddleware': 400,
         }}
-    }})
+    }}
+    
+    # scrapy_user_agents est optionnel (absent des dépendances du projet)
+    try:
+        import scrapy_user_agents
+    except ImportError:
+        del settings['DOWNLOADER_MIDDLEWARES']['scrapy_user_agents.middlewares.RandomUserAgentMiddleware']
+        settings['DOWNLOADER_MIDDLEWARES']['scrapy.downloadermiddlewares.useragent.UserAgentMiddleware'] = 500
+    
+    if CASSETTE_MODE in ('record', 'replay'):
+        settings['DOWNLOADER_MIDDLEWARES']['src.utils.http_cassette.CassetteDownloaderMiddleware'] = 950
+    if CASSETTE_MODE == 'replay':
+        # Rejeu local : pas de politesse réseau, la latence est injectée par la cassette
+        settings.update({{'DOWNLOAD_DELAY': 0, 'AUTOTHROTTLE_ENABLED': False, 'RANDOMIZE_DOWNLOAD_DELAY': False}})
+    
+    process = CrawlerProcess(settings=settings)
     
-    process.crawl(EurlexSpider, keyword=keyword, max_results=max_results, output_file=output_file)
+    process.crawl(EurlexSpider, keyword=keyword, max_results=max_results, output_file=output_file, base_url=base_url)
     process.start()
 """
     
@@ -282,9 +322,10 @@ if __name__ == '__main__':
     try:
         # Exécuter le script dans un subprocess
         process = await asyncio.create_subprocess_exec(
-            sys.executable, script_file, keyword, str(max_results), output_file,
+            sys.executable, script_file, keyword, str(max_results), output_file, settings.eurlex_base_url,
             stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
+            stderr=asyncio.subprocess.PIPE,
+            env=cassette_subprocess_env()
         )
         
         stdout, stderr = await process.communicate()
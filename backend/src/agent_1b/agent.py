@@ -11,8 +11,8 @@ Sauvegarde les résultats en BDD + affichage Rich.
 """
 
 import structlog
-import json
-from typing import Dict, List, Optional
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple, Union
 from datetime import datetime
 
 from rich.console import Console
@@ -24,24 +24,35 @@ from rich.syntax import Syntax
 from src.agent_1b.models import (
     DocumentAnalysis,
     AnalysisAlert,
-    Criticality
+    KeywordAnalysisResult,
+    NCCodeAnalysisResult,
+    SemanticAnalysisResult
 )
-from src.agent_1b.tools.keyword_filter import analyze_keywords
-from src.agent_1b.tools.nc_code_filter import analyze_nc_codes
-from src.agent_1b.tools.semantic_analyzer import analyze_semantically
+from src.agent_1b.pre_classifier import PreClassifierGate, load_pre_classifier_gate
+from src.agent_1b.profile_index import ProfileIndex, get_profile_index, load_profile_index
+from src.agent_1b.tools.semantic_analyzer import SemanticAnalyzer, get_semantic_analyzer
+from src.agent_1b.tools.semantic_cascade import CascadeDecision, SemanticCascade
 from src.agent_1b.tools.relevance_scorer import (
     RelevanceScorer,
     create_document_analysis,
     create_alert
 )
 from src.storage.database import get_session
-from src.storage.analysis_repository import AnalysisRepository
-from src.storage.models import Document, CompanyProfile
-from src.storage.repositories import DocumentRepository
+from src.storage.models import Document
+from src.utils.llm_usage import llm_context
 
 logger = structlog.get_logger()
 
 
+@dataclass
+class AnalysisPlan:
+    """Niveaux 1-2 d'un document et décision pour le niveau 3 (avant l'appel LLM)"""
+    keyword_result: KeywordAnalysisResult
+    nc_code_result: NCCodeAnalysisResult
+    decision: CascadeDecision
+    pre_classifier_probability: Optional[float]
+
+
 class Agent1B:
     """
     Agent 1B - Analyseur de pertinence réglementaire
@@ -52,14 +63,44 @@ class Agent1B:
     3. Quels départements sont impactés ?
     """
     
-    def __init__(self, company_profile: Dict):
+    def __init__(
+        self,
+        company_profile: Union[Dict, ProfileIndex],
+        semantic_analyzer: Optional[SemanticAnalyzer] = None,
+        cascade: Optional[SemanticCascade] = None,
+        pre_classifier: Optional[PreClassifierGate] = None
+    ):
         """
         Args:
-            company_profile: Profil entreprise (dict depuis JSON)
+            company_profile: Profil entreprise (dict au format Agent 1B, ou
+                index déjà compilé)
+            semantic_analyzer: Analyseur LLM (défaut: analyseur partagé du processus)
+            cascade: Décision d'appel LLM (défaut: SEMANTIC_CASCADE_MODE)
+            pre_classifier: Pré-classifieur local (défaut: dernier modèle du
+                profil selon PRE_CLASSIFIER_MODE)
         """
-        self.company_profile = company_profile
-        self.company_name = company_profile.get("company_name", "Unknown")
-        self.scorer = RelevanceScorer()
+        # Profil compilé une fois (automate de mots-clés, trie des codes NC),
+        # partagé par les agents d'un même profil
+        if isinstance(company_profile, ProfileIndex):
+            self.profile_index = company_profile
+        else:
+            self.profile_index = get_profile_index(company_profile)
+        
+        self.company_profile = self.profile_index.profile
+        self.company_name = self.profile_index.company_name
+        self.scorer = RelevanceScorer.from_settings()
+        
+        # Appel LLM sauté/différé quand les niveaux 1-2 suffisent
+        self.cascade = cascade or SemanticCascade(self.scorer)
+        
+        # Applicabilité prédite localement (shadow : comparée au LLM, gate : négatifs sûrs écartés)
+        self.pre_classifier = pre_classifier or load_pre_classifier_gate(self.profile_index.profile_id)
+        
+        self.keyword_filter = self.profile_index.keyword_filter
+        self.nc_code_filter = self.profile_index.nc_code_filter
+        
+        # Client LLM et chaîne LangChain partagés entre documents
+        self.semantic_analyzer = semantic_analyzer or get_semantic_analyzer()
         
         logger.info("agent_1b_initialized", company=self.company_name)
     
@@ -68,7 +109,8 @@ class Agent1B:
         document_id: str,
         document_content: str,
         document_title: str,
-        regulation_type: str = "CBAM"
+        regulation_type: str = "CBAM",
+        local_levels: Optional[Tuple[KeywordAnalysisResult, NCCodeAnalysisResult]] = None
     ) -> DocumentAnalysis:
         """
         Analyse complète d'un document
@@ -78,10 +120,122 @@ class Agent1B:
             document_content: Contenu textuel du document
             document_title: Titre du document
             regulation_type: Type de réglementation (CBAM, EUDR, etc.)
+            local_levels: Niveaux 1 et 2 déjà calculés (balayage partagé entre
+                profils, voir src/agent_1b/fan_out.py)
+            
+        Returns:
+            DocumentAnalysis avec scores, criticité et recommandations
+        """
+        plan = self._plan_analysis(document_id, document_content, document_title, regulation_type, local_levels)
+        
+        semantic_result = None
+        if plan.decision.call_llm:
+            with self._llm_context(document_id):
+                semantic_result = self.semantic_analyzer.analyze(
+                    document_content,
+                    document_title,
+                    regulation_type,
+                    self.company_profile
+                )
+        
+        return self._complete_analysis(plan, document_id, document_title, regulation_type, semantic_result)
+    
+    async def aanalyze_document(
+        self,
+        document_id: str,
+        document_content: str,
+        document_title: str,
+        regulation_type: str = "CBAM",
+        local_levels: Optional[Tuple[KeywordAnalysisResult, NCCodeAnalysisResult]] = None
+    ) -> DocumentAnalysis:
+        """
+        Analyse complète d'un document, appel LLM asynchrone
+        
+        Les niveaux 1 et 2 restent locaux et synchrones ; seul l'appel LLM
+        est attendu, ce qui permet d'analyser plusieurs documents en parallèle
+        (voir src/agent_1b/batch.py).
+        
+        Args:
+            document_id: ID du document à analyser
+            document_content: Contenu textuel du document
+            document_title: Titre du document
+            regulation_type: Type de réglementation (CBAM, EUDR, etc.)
+            local_levels: Niveaux 1 et 2 déjà calculés (balayage partagé entre
+                profils, voir src/agent_1b/fan_out.py)
+            
+        Returns:
+            DocumentAnalysis avec scores, criticité et recommandations
+        """
+        plan = self._plan_analysis(document_id, document_content, document_title, regulation_type, local_levels)
+        
+        semantic_result = None
+        if plan.decision.call_llm:
+            with self._llm_context(document_id):
+                semantic_result = await self.semantic_analyzer.aanalyze(
+                    document_content,
+                    document_title,
+                    regulation_type,
+                    self.company_profile
+                )
+        
+        return self._complete_analysis(plan, document_id, document_title, regulation_type, semantic_result)
+    
+    def analyze_document_with_semantic(
+        self,
+        document_id: str,
+        document_content: str,
+        document_title: str,
+        regulation_type: str,
+        semantic_result: SemanticAnalysisResult,
+        local_levels: Optional[Tuple[KeywordAnalysisResult, NCCodeAnalysisResult]] = None
+    ) -> DocumentAnalysis:
+        """
+        Analyse complète d'un document dont le niveau 3 est déjà connu
+        
+        Utilisé quand les réponses du LLM sont obtenues en lot (voir
+        src/agent_1b/message_batch.py) : seuls les niveaux 1 et 2 sont
+        calculés, puis agrégés avec le résultat sémantique fourni.
+        
+        Args:
+            document_id: ID du document à analyser
+            document_content: Contenu textuel du document
+            document_title: Titre du document
+            regulation_type: Type de réglementation (CBAM, EUDR, etc.)
+            semantic_result: Résultat de l'analyse sémantique LLM
+            local_levels: Niveaux 1 et 2 déjà calculés (lus dans DocumentFeatures)
             
         Returns:
             DocumentAnalysis avec scores, criticité et recommandations
         """
+        keyword_result, nc_code_result = local_levels or self._analyze_local_levels(document_content)
+        
+        return self._aggregate(
+            document_id, document_title, regulation_type,
+            keyword_result, nc_code_result, semantic_result
+        )
+    
+    def needs_llm(self, keyword_result: KeywordAnalysisResult, nc_code_result: NCCodeAnalysisResult) -> bool:
+        """
+        Le niveau 3 sera-t-il appelé pour ces niveaux 1 et 2 ?
+        
+        Permet de ne charger le texte complet d'un document que si le LLM
+        doit le lire (niveaux 1-2 lus dans DocumentFeatures, voir src/agent_1b/features.py).
+        """
+        return self.cascade.decide(
+            keyword_result.score,
+            nc_code_result.score,
+            has_critical_codes=len(nc_code_result.critical_codes) > 0
+        ).call_llm
+    
+    def _plan_analysis(
+        self,
+        document_id: str,
+        document_content: str,
+        document_title: str,
+        regulation_type: str,
+        local_levels: Optional[Tuple[KeywordAnalysisResult, NCCodeAnalysisResult]]
+    ) -> AnalysisPlan:
+        """Niveaux 1 et 2, puis décision de la cascade et du pré-classifieur pour le niveau 3"""
         logger.info(
             "agent_1b_analysis_started",
             document_id=document_id[:8],
@@ -89,13 +243,121 @@ class Agent1B:
             regulation_type=regulation_type
         )
         
+        keyword_result, nc_code_result = local_levels or self._analyze_local_levels(document_content)
+        
+        # ====================================================================
+        # NIVEAU 3 : ANALYSE SÉMANTIQUE LLM (40%)
+        # ====================================================================
+        decision = self._cascade_decision(keyword_result, nc_code_result)
+        decision, pre_classifier_probability = self._pre_classify(document_content, decision)
+        
+        if decision.call_llm:
+            logger.info("level_3_semantic_analysis")
+        
+        return AnalysisPlan(keyword_result, nc_code_result, decision, pre_classifier_probability)
+    
+    def _complete_analysis(
+        self,
+        plan: AnalysisPlan,
+        document_id: str,
+        document_title: str,
+        regulation_type: str,
+        semantic_result: Optional[SemanticAnalysisResult]
+    ) -> DocumentAnalysis:
+        """Agrégation des trois niveaux (résultat de remplacement si le LLM n'est pas appelé)"""
+        if semantic_result is None:
+            semantic_result = self.cascade.placeholder_result(plan.decision)
+        
+        logger.info(
+            "level_3_completed",
+            score=semantic_result.score,
+            is_applicable=semantic_result.is_applicable,
+            confidence=semantic_result.confidence_level,
+            decision=plan.decision.decision
+        )
+        
+        analysis = self._aggregate(
+            document_id, document_title, regulation_type,
+            plan.keyword_result, plan.nc_code_result, semantic_result
+        )
+        analysis.semantic_decision = plan.decision.decision
+        self._record_pre_classifier(analysis, plan.pre_classifier_probability)
+        return analysis
+    
+    def _llm_context(self, document_id: str):
+        """Étiquettes des appels LLM du niveau 3 (consommation par document et profil)"""
+        return llm_context(agent="agent_1b", document_id=document_id, profile_id=self.profile_index.profile_id)
+    
+    def _cascade_decision(
+        self,
+        keyword_result: KeywordAnalysisResult,
+        nc_code_result: NCCodeAnalysisResult
+    ) -> CascadeDecision:
+        """Le résultat LLM peut-il encore changer la criticité ?"""
+        decision = self.cascade.decide(
+            keyword_result.score,
+            nc_code_result.score,
+            has_critical_codes=len(nc_code_result.critical_codes) > 0
+        )
+        
+        if not decision.call_llm:
+            logger.info(
+                "level_3_llm_not_called",
+                decision=decision.decision,
+                reason=decision.reason,
+                local_score=decision.local_score
+            )
+        
+        return decision
+    
+    def _pre_classify(
+        self,
+        document_content: str,
+        decision: CascadeDecision
+    ) -> Tuple[CascadeDecision, Optional[float]]:
+        """Probabilité du pré-classifieur avant un appel LLM, et décision éventuellement remplacée"""
+        if not decision.call_llm or self.pre_classifier is None:
+            return decision, None
+        
+        probability = self.pre_classifier.predict(document_content)
+        if self.pre_classifier.gates(probability):
+            decision = self.pre_classifier.decision(probability, decision)
+            logger.info(
+                "level_3_llm_not_called",
+                decision=decision.decision,
+                reason=decision.reason,
+                local_score=decision.local_score
+            )
+        return decision, probability
+    
+    def _record_pre_classifier(self, analysis: DocumentAnalysis, probability: Optional[float]):
+        """Prédiction enregistrée avec l'analyse (accord shadow, voir pre_classifier.shadow_agreement)"""
+        if probability is None:
+            return
+        
+        analysis.pre_classifier_probability = probability
+        analysis.pre_classifier_version = self.pre_classifier.version
+        if analysis.semantic_decision == "called":
+            logger.info(
+                "pre_classifier_shadow",
+                document_id=analysis.document_id[:8],
+                version=self.pre_classifier.version,
+                probability=probability,
+                llm_applicable=analysis.semantic_analysis.is_applicable,
+                agrees=(probability >= 0.5) == analysis.semantic_analysis.is_applicable
+            )
+    
+    def _analyze_local_levels(
+        self,
+        document_content: str
+    ) -> Tuple[KeywordAnalysisResult, NCCodeAnalysisResult]:
+        """Niveaux 1 et 2 (déterministes, sans appel réseau)"""
         # ====================================================================
         # NIVEAU 1 : ANALYSE MOTS-CLÉS (30%)
         # ====================================================================
         logger.info("level_1_keyword_analysis")
         
-        company_keywords = self.company_profile.get("keywords", [])
-        keyword_result = analyze_keywords(document_content, company_keywords)
+        keyword_result = self.keyword_filter.analyze(document_content)
         
         logger.info(
             "level_1_completed",
@@ -108,12 +370,7 @@ class Agent1B:
         # ====================================================================
         logger.info("level_2_nc_code_analysis")
         
-        company_nc_codes = self._extract_nc_codes_from_profile()
-        nc_code_result = analyze_nc_codes(
-            document_content,
-            company_nc_codes,
-            critical_codes=self._get_critical_nc_codes()
-        )
+        nc_code_result = self.nc_code_filter.analyze(document_content)
         
         logger.info(
             "level_2_completed",
@@ -122,25 +379,18 @@ class Agent1B:
             critical_codes=len(nc_code_result.critical_codes)
         )
         
-        # ====================================================================
-        # NIVEAU 3 : ANALYSE SÉMANTIQUE LLM (40%)
-        # ====================================================================
-        logger.info("level_3_semantic_analysis")
-        
-        semantic_result = analyze_semantically(
-            document_content,
-            document_title,
-            regulation_type,
-            self.company_profile
-        )
-        
-        logger.info(
-            "level_3_completed",
-            score=semantic_result.score,
-            is_applicable=semantic_result.is_applicable,
-            confidence=semantic_result.confidence_level
-        )
-        
+        return keyword_result, nc_code_result
+    
+    def _aggregate(
+        self,
+        document_id: str,
+        document_title: str,
+        regulation_type: str,
+        keyword_result: KeywordAnalysisResult,
+        nc_code_result: NCCodeAnalysisResult,
+        semantic_result: SemanticAnalysisResult
+    ) -> DocumentAnalysis:
+        """Agrège les trois niveaux en DocumentAnalysis"""
         # ====================================================================
         # AGRÉGATION ET SCORING FINAL
         # ====================================================================
@@ -156,6 +406,8 @@ class Agent1B:
             semantic_result=semantic_result,
             scorer=self.scorer
         )
+        # Version du profil : diff et re-scoring incrémental après modification
+        analysis.profile_hash = self.profile_index.content_hash
         
         logger.info(
             "agent_1b_analysis_completed",
@@ -166,41 +418,6 @@ class Agent1B:
         )
         
         return analysis
-    
-    def _extract_nc_codes_from_profile(self) -> List[str]:
-        """Extrait tous les codes NC du profil entreprise"""
-        nc_codes = []
-        
-        # Format simple : liste directe
-        if isinstance(self.company_profile.get("nc_codes"), list):
-            nc_codes = self.company_profile["nc_codes"]
-        
-        # Format structuré : imports + exports
-        elif isinstance(self.company_profile.get("nc_codes"), dict):
-            nc_dict = self.company_profile["nc_codes"]
-            
-            for imp in nc_dict.get("imports", []):
-                if isinstance(imp, dict):
-                    nc_codes.append(imp.get("code", ""))
-                else:
-                    nc_codes.append(str(imp))
-            
-            for exp in nc_dict.get("exports", []):
-                if isinstance(exp, dict):
-                    nc_codes.append(exp.get("code", ""))
-                else:
-                    nc_codes.append(str(exp))
-        
-        # Nettoyer et dédupliquer
-        nc_codes = list(set(filter(None, nc_codes)))
-        
-        return nc_codes
-    
-    def _get_critical_nc_codes(self) -> List[str]:
-        """Identifie les codes NC critiques pour l'entreprise"""
-        # Pour l'instant, retourne une liste vide
-        # À améliorer avec une logique métier
-        return []
 
 
 def run_agent_1b_on_document(
@@ -217,43 +434,20 @@ def run_agent_1b_on_document(
     Returns:
         DocumentAnalysis
     """
-    logger.info("loading_company_profile", path=company_profile_path)
-    
-    # Charger le profil entreprise
-    with open(company_profile_path, 'r', encoding='utf-8') as f:
-        company_profile_data = json.load(f)
-    
-    # Extraire le nom de l'entreprise
-    company_name = (
-        company_profile_data.get("company", {}).get("company_name") or
-        company_profile_data.get("company_name") or
-        "HUTCHINSON"
-    )
-    
-    # Préparer le profil pour l'agent
-    profile = {
-        "company_id": company_profile_data.get("company", {}).get("company_id", "HUT-001"),
-        "company_name": company_name,
-        "industry": company_profile_data.get("company", {}).get("industry", {}).get("sector", ""),
-        "products": company_profile_data.get("products", []),
-        "nc_codes": company_profile_data.get("nc_codes", {}),
-        "keywords": _extract_keywords_from_profile(company_profile_data),
-        "regulations": _extract_regulations_from_profile(company_profile_data),
-        "countries": _extract_countries_from_profile(company_profile_data)
-    }
+    # Profil compilé une fois par processus (relu seulement si le fichier change)
+    profile_index = load_profile_index(company_profile_path)
     
     # Récupérer le document depuis la base
     session = get_session()
-    repo = DocumentRepository(session)
     
     try:
-        document = repo.find_by_id(document_id)
+        document = session.get(Document, document_id)
         
         if not document:
             raise ValueError(f"Document {document_id} not found")
         
         # Créer l'agent
-        agent = Agent1B(profile)
+        agent = Agent1B(profile_index)
         
         # Analyser le document
         analysis = agent.analyze_document(
@@ -267,72 +461,3 @@ def run_agent_1b_on_document(
         
     finally:
         session.close()
-
-
-def _extract_keywords_from_profile(profile_data: Dict) -> List[str]:
-    """Extrait ou génère les mots-clés depuis le profil"""
-    keywords = profile_data.get("keywords", [])
-    
-    if keywords and isinstance(keywords, list):
-        return keywords
-    
-    # Générer depuis les produits et l'industrie
-    keywords_set = set()
-    
-    # Depuis produits
-    for product in profile_data.get("products", []):
-        if "caoutchouc" in product.lower() or "rubber" in product.lower():
-            keywords_set.add("caoutchouc")
-        if "aluminium" in product.lower():
-            keywords_set.add("aluminium")
-        if "joint" in product.lower() or "seal" in product.lower():
-            keywords_set.add("étanchéité")
-    
-    # Depuis industry
-    industry = profile_data.get("company", {}).get("industry", {})
-    for segment in industry.get("segments", []):
-        if isinstance(segment, str):
-            words = segment.lower().split()
-            keywords_set.update([w for w in words if len(w) > 4])
-    
-    return list(keywords_set)[:15]
-
-
-def _extract_regulations_from_profile(profile_data: Dict) -> List[str]:
-    """Extrait la liste des réglementations suivies"""
-    regulations = []
-    
-    regs_data = profile_data.get("regulations", {})
-    
-    if isinstance(regs_data, dict):
-        for level in ["critical", "high", "medium"]:
-            for reg in regs_data.get(level, []):
-                if isinstance(reg, dict):
-                    name = reg.get("name") or reg.get("full_name", "")
-                    if name:
-                        regulations.append(name)
-                elif reg:
-                    regulations.append(reg)
-    elif isinstance(regs_data, list):
-        regulations = regs_data
-    
-    return regulations or ["CBAM", "EUDR", "CSRD"]
-
-
-def _extract_countries_from_profile(profile_data: Dict) -> str:
-    """Extrait les pays d'opération"""
-    countries = set()
-    
-    # Depuis sites
-    for site in profile_data.get("sites", []):
-        country = site.get("country")
-        if country:
-            countries.add(country)
-    
-    # Depuis locations
-    for location in profile_data.get("locations", {}).get("production_sites", []):
-        country = location.get("country")
-        if country:
-            countries.add(country)
-    
-    return ", ".join(sorted(countries)) if countries else "EU, US, IN"
@@ -0,0 +1,115 @@
+"""
+Analyse concurrente d'un lot de documents par l'Agent 1B
+
+Les niveaux 1 et 2 (mots-clés, codes NC) tournent localement ; les appels LLM
+du niveau 3 sont lancés en parallèle, limités à `concurrency` appels
+simultanés. Sur un 429/529, l'analyseur sémantique met en pause tous les
+appels en cours (voir SemanticAnalyzer.aanalyze).
+
+Chaque analyse est remise à `on_analysis` dès qu'elle est terminée (pour être
+sauvegardée et commitée), et l'échec d'un document n'interrompt pas les autres.
+"""
+
+import asyncio
+import time
+import structlog
+from typing import Callable, Dict, List, Optional
+
+from src.agent_1b.agent import Agent1B
+from src.agent_1b.models import DocumentAnalysis
+from src.config import settings
+
+logger = structlog.get_logger()
+
+
+class BatchAnalyzer:
+    """Analyse un lot de documents avec un nombre borné d'appels LLM simultanés"""
+    
+    def __init__(self, agent: Agent1B, concurrency: Optional[int] = None):
+        """
+        Args:
+            agent: Agent 1B (profil entreprise déjà chargé)
+            concurrency: Appels LLM simultanés (défaut: settings.analysis_concurrency)
+        """
+        self.agent = agent
+        self.concurrency = max(1, concurrency or settings.analysis_concurrency)
+    
+    async def run(
+        self,
+        documents: List[Dict],
+        on_analysis: Callable[[Dict, DocumentAnalysis], None],
+        on_error: Optional[Callable[[Dict, Exception], None]] = None
+    ) -> Dict:
+        """
+        Analyse tous les documents
+        
+        Args:
+            documents: Dicts avec document_id, document_content, document_title
+                et regulation_type (clés supplémentaires ignorées)
+            on_analysis: Appelé avec (document, analyse) à chaque analyse terminée
+            on_error: Appelé avec (document, exception) en cas d'échec
+        
+        Returns:
+            Statistiques du lot (analysés, erreurs, durée, pauses de débit)
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        backoff = self.agent.semantic_analyzer.backoff
+        pauses_before = backoff.pauses
+        cache = self.agent.semantic_analyzer.cache
+        cache_before = cache.stats() if cache else None
+        analyzed = 0
+        errors = []
+        
+        logger.info("batch_analysis_started", documents=len(documents), concurrency=self.concurrency)
+        start = time.perf_counter()
+        
+        async def analyze_one(document: Dict) -> None:
+            nonlocal analyzed
+            
+            async with semaphore:
+                try:
+                    analysis = await self.agent.aanalyze_document(
+                        document_id=document["document_id"],
+                        document_content=document.get("document_content") or "",
+                        document_title=document.get("document_title") or "",
+                        regulation_type=document.get("regulation_type") or "CBAM"
+                    )
+                    on_analysis(document, analysis)
+                    analyzed += 1
+                
+                except Exception as e:
+                    logger.error(
+                        "batch_document_failed",
+                        document_id=document["document_id"],
+                        error=str(e),
+                        exc_info=True
+                    )
+                    errors.append({"document_id": document["document_id"], "error": str(e)})
+                    if on_error:
+                        on_error(document, e)
+        
+        await asyncio.gather(*(analyze_one(document) for document in documents))
+        
+        wall_time = time.perf_counter() - start
+        
+        stats = {
+            "documents": len(documents),
+            "analyzed": analyzed,
+            "errors": errors,
+            "concurrency": self.concurrency,
+            "rate_limit_pauses": backoff.pauses - pauses_before,
+            "semantic_cache": cache.stats(since=cache_before) if cache else None,
+            "wall_time_seconds": round(wall_time, 3),
+            "docs_per_minute": round(analyzed / wall_time * 60, 1) if wall_time else None
+        }
+        
+        logger.info(
+            "batch_analysis_completed",
+            analyzed=analyzed,
+            errors=len(errors),
+            rate_limit_pauses=stats["rate_limit_pauses"],
+            cache_hit_rate=stats["semantic_cache"]["hit_rate"] if cache else None,
+            wall_time_seconds=stats["wall_time_seconds"]
+        )
+        
+        return stats
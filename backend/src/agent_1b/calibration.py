@@ -0,0 +1,419 @@
+"""
+Calibration des poids et seuils du RelevanceScorer sur des analyses validées
+
+Les scores par niveau des analyses (document_profile_analyses) sont chargés
+une fois en matrice, avec les étiquettes humaines :
+- GroundTruthCase : décision de pertinence (OUI, PARTIELLEMENT, NON) et
+  niveau de risque expert (Faible, Moyen, Fort, Critique) -> criticité
+- analyses.validation_status : approved (pertinent) ou rejected (non pertinent)
+
+Une grille de poids (somme 1) et de seuils croissants est évaluée en NumPy :
+pour chaque jeu de poids, les scores finaux sont calculés une fois, puis les
+criticités et métriques de tous les jeux de seuils en un seul passage
+vectorisé (comptes cumulés sur les scores triés). Le rapport donne précision
+et rappel par criticité et un bloc Settings (.env) candidat.
+"""
+
+import time
+from dataclasses import dataclass, field
+from itertools import combinations
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import structlog
+
+from src.agent_1b.models import Criticality
+from src.agent_1b.rescoring import CRITICALITY_LEVELS, round_scores
+from src.agent_1b.tools.relevance_scorer import RelevanceScorer
+
+logger = structlog.get_logger()
+
+# Niveau de risque expert (GroundTruthCase.expert_risk_level) -> rang de criticité
+EXPERT_RISK_LEVELS = {
+    "faible": CRITICALITY_LEVELS.index(Criticality.LOW),
+    "moyen": CRITICALITY_LEVELS.index(Criticality.MEDIUM),
+    "fort": CRITICALITY_LEVELS.index(Criticality.HIGH),
+    "critique": CRITICALITY_LEVELS.index(Criticality.CRITICAL),
+}
+
+OBJECTIVES = ["balanced", "relevance_f1", "criticality_f1"]
+
+
+@dataclass
+class CalibrationData:
+    """Matrice des scores par niveau et étiquettes humaines (-1 : inconnue)"""
+    
+    scores: np.ndarray  # (N, 3) mots-clés, codes NC, sémantique
+    has_critical_codes: np.ndarray  # (N,) booléens
+    semantic_applicable: np.ndarray  # (N,) booléens
+    relevant: np.ndarray  # (N,) 1 pertinent, 0 non pertinent, -1 inconnu
+    criticality: np.ndarray  # (N,) rang dans CRITICALITY_LEVELS, -1 inconnu
+    document_ids: List[str] = field(default_factory=list)
+    
+    def __len__(self) -> int:
+        return len(self.scores)
+
+
+def labels_from_ground_truth(decision: Optional[str], risk_level: Optional[str]) -> Tuple[int, int]:
+    """
+    Étiquettes (pertinence, criticité) d'un cas de référence expert
+    
+    Returns:
+        (1/0/-1, rang de criticité ou -1)
+    """
+    decision = (decision or "").strip().upper()
+    if decision == "NON":
+        return 0, CRITICALITY_LEVELS.index(Criticality.NOT_RELEVANT)
+    if decision in ("OUI", "PARTIELLEMENT"):
+        return 1, EXPERT_RISK_LEVELS.get((risk_level or "").strip().lower(), -1)
+    return -1, -1
+
+
+def weight_grid(step: float = 0.1) -> np.ndarray:
+    """Poids (mots-clés, codes NC, sémantique) de somme 1, par pas de step"""
+    units = int(round(1 / step))
+    return np.array([
+        (k / units, n / units, (units - k - n) / units)
+        for k in range(units + 1)
+        for n in range(units + 1 - k)
+    ])
+
+
+def threshold_grid(step: float = 0.1, minimum: float = 0.05, maximum: float = 0.95) -> np.ndarray:
+    """Seuils strictement croissants (low, medium, high, critical) pris sur une grille"""
+    values = np.round(np.arange(minimum, maximum + step / 2, step), 3)
+    return np.array(list(combinations(values, 4)))
+
+
+def _f1(tp: np.ndarray, fp: np.ndarray, fn: np.ndarray) -> np.ndarray:
+    denominator = 2 * tp + fp + fn
+    return np.divide(2 * tp, denominator, out=np.zeros(tp.shape, dtype=float), where=denominator > 0)
+
+
+def _criticality_matrix(data: CalibrationData, final_scores: np.ndarray, thresholds: np.ndarray) -> np.ndarray:
+    """Criticités (N, T) pour un vecteur de scores finaux et T jeux de seuils croissants"""
+    # Nombre de seuils atteints = criticité de base (seuils croissants)
+    criticality = np.zeros((len(final_scores), len(thresholds)), dtype=np.int8)
+    for column in range(4):
+        criticality += final_scores[:, None] >= thresholds[None, :, column]
+    
+    # Boosts de RelevanceScorer.criticality_for_score
+    high_applicability = data.semantic_applicable & (data.scores[:, 2] > 0.7)
+    criticality[data.has_critical_codes[:, None] & (criticality == 3)] = 4
+    criticality[high_applicability[:, None] & (criticality == 2)] = 3
+    return criticality
+
+
+def final_scores_for(data: CalibrationData, weights: np.ndarray) -> np.ndarray:
+    """Scores finaux arrondis, même ordre d'opérations et même arrondi que RelevanceScorer.calculate_score"""
+    return round_scores(
+        data.scores[:, 0] * weights[0] + data.scores[:, 1] * weights[1] + data.scores[:, 2] * weights[2]
+    )
+
+
+def _counts_at_least(sorted_scores: np.ndarray, thresholds: np.ndarray) -> np.ndarray:
+    """Nombre de scores >= chaque seuil (T, 4), scores triés"""
+    return len(sorted_scores) - np.searchsorted(sorted_scores, thresholds, side="left")
+
+
+def _level_counts(sorted_scores: np.ndarray, thresholds: np.ndarray) -> np.ndarray:
+    """Nombre d'analyses par criticité de base (T, 5) : différences des comptes cumulés"""
+    at_least = _counts_at_least(sorted_scores, thresholds)
+    total = np.full((len(thresholds), 1), len(sorted_scores))
+    return -np.diff(np.hstack([total, at_least, np.zeros_like(total)]), axis=1)
+
+
+# Criticité finale selon la criticité de base, par classe de boost
+# (0 aucun, 1 codes critiques, 2 applicabilité LLM, 3 les deux)
+_BOOSTED_LEVELS = np.array([
+    [0, 1, 2, 3, 4],
+    [0, 1, 2, 4, 4],
+    [0, 1, 3, 3, 4],
+    [0, 1, 3, 4, 4],
+])
+
+
+def evaluate_thresholds(
+    data: CalibrationData,
+    weights: np.ndarray,
+    thresholds: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """
+    Métriques d'un jeu de poids pour T jeux de seuils
+    
+    Les scores finaux de chaque groupe d'analyses (étiquette, classe de boost)
+    sont triés une fois : le nombre d'analyses par criticité prédite, pour
+    chaque jeu de seuils, se lit dans les comptes cumulés (searchsorted). Le
+    coût par configuration ne dépend plus du nombre d'analyses.
+    
+    Args:
+        data: Scores et étiquettes
+        weights: (3,) poids mots-clés, codes NC, sémantique
+        thresholds: (T, 4) seuils low, medium, high, critical croissants
+    
+    Returns:
+        relevance_f1 (T,), criticality_f1 (T,) macro sur les criticités étiquetées,
+        criticality_accuracy (T,)
+    """
+    final_scores = final_scores_for(data, weights)
+    
+    # Pertinence : score final >= seuil low
+    positives = np.sort(final_scores[data.relevant == 1])
+    negatives = np.sort(final_scores[data.relevant == 0])
+    tp = _counts_at_least(positives, thresholds[:, :1])[:, 0]
+    fp = _counts_at_least(negatives, thresholds[:, :1])[:, 0]
+    relevance_f1 = _f1(tp, fp, len(positives) - tp)
+    
+    # Criticité : matrice de confusion (T, réelle, prédite), F1 macro sur les niveaux étiquetés
+    levels = np.unique(data.criticality[data.criticality >= 0])
+    if not len(levels):
+        nan = np.full(len(thresholds), np.nan)
+        return {"relevance_f1": relevance_f1, "criticality_f1": nan, "criticality_accuracy": nan}
+    
+    high_applicability = data.semantic_applicable & (data.scores[:, 2] > 0.7)
+    boost_class = data.has_critical_codes.astype(int) + 2 * high_applicability.astype(int)
+    confusion = np.zeros((len(thresholds), 5, 5))
+    for level in levels:
+        for boost in range(4):
+            group = np.sort(final_scores[(data.criticality == level) & (boost_class == boost)])
+            if len(group):
+                base_counts = _level_counts(group, thresholds)
+                for base, predicted in enumerate(_BOOSTED_LEVELS[boost]):
+                    confusion[:, level, predicted] += base_counts[:, base]
+    
+    tp = confusion[:, levels, levels]
+    fp = confusion[:, :, levels].sum(axis=1) - tp
+    fn = confusion[:, levels, :].sum(axis=2) - tp
+    
+    return {
+        "relevance_f1": relevance_f1,
+        "criticality_f1": _f1(tp, fp, fn).mean(axis=1),
+        "criticality_accuracy": np.trace(confusion, axis1=1, axis2=2) / confusion.sum(axis=(1, 2)),
+    }
+
+
+def _objective(metrics: Dict[str, np.ndarray], objective: str) -> np.ndarray:
+    if objective == "balanced":
+        # Moyenne des deux F1 (F1 de pertinence seul si aucune criticité étiquetée)
+        return np.where(
+            np.isnan(metrics["criticality_f1"]),
+            metrics["relevance_f1"],
+            (metrics["relevance_f1"] + np.nan_to_num(metrics["criticality_f1"])) / 2
+        )
+    return np.nan_to_num(metrics[objective])
+
+
+def metrics_report(data: CalibrationData, weights: np.ndarray, thresholds: np.ndarray) -> Dict:
+    """
+    Précision et rappel par criticité (et pour la pertinence) d'une configuration
+    
+    Args:
+        weights: (3,) poids
+        thresholds: (4,) seuils low, medium, high, critical
+    """
+    final_scores = final_scores_for(data, weights)
+    predicted = _criticality_matrix(data, final_scores, thresholds[None, :])[:, 0]
+    
+    def precision_recall(pred: np.ndarray, actual: np.ndarray) -> Dict:
+        tp = int((pred & actual).sum())
+        return {
+            "precision": round(tp / pred.sum(), 3) if pred.sum() else None,
+            "recall": round(tp / actual.sum(), 3) if actual.sum() else None,
+            "support": int(actual.sum()),
+        }
+    
+    labeled = data.relevant >= 0
+    report = {
+        "relevance": precision_recall(
+            final_scores[labeled] >= thresholds[0], data.relevant[labeled] == 1
+        ),
+        "criticality": {},
+    }
+    
+    labeled = data.criticality >= 0
+    for rank, level in enumerate(CRITICALITY_LEVELS):
+        report["criticality"][level.value] = precision_recall(
+            predicted[labeled] == rank, data.criticality[labeled] == rank
+        )
+    return report
+
+
+def calibrate(
+    data: CalibrationData,
+    weights: Optional[np.ndarray] = None,
+    thresholds: Optional[np.ndarray] = None,
+    objective: str = "balanced",
+    baseline: Optional[RelevanceScorer] = None,
+    top: int = 5
+) -> Dict:
+    """
+    Recherche sur grille des poids et seuils maximisant l'objectif
+    
+    Args:
+        data: Scores et étiquettes (voir load_calibration_data)
+        weights: (W, 3) poids candidats (défaut: weight_grid())
+        thresholds: (T, 4) seuils candidats (défaut: threshold_grid())
+        objective: "balanced" (moyenne des F1), "relevance_f1" ou "criticality_f1"
+        baseline: Configuration de référence (défaut: Settings)
+        top: Nombre de meilleures configurations rapportées
+    
+    Returns:
+        Rapport : meilleure configuration et ses métriques, référence,
+        meilleures configurations, débit (configurations par seconde)
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Objectif inconnu: {objective} (attendu: {', '.join(OBJECTIVES)})")
+    if not (data.relevant >= 0).any():
+        raise ValueError("Aucune analyse étiquetée (GroundTruthCase ou validation_status)")
+    
+    weights = weight_grid() if weights is None else np.asarray(weights, dtype=float)
+    thresholds = threshold_grid() if thresholds is None else np.asarray(thresholds, dtype=float)
+    baseline = baseline or RelevanceScorer.from_settings()
+    
+    start = time.perf_counter()
+    scores = np.empty((len(weights), len(thresholds)))
+    for index, weight in enumerate(weights):
+        scores[index] = _objective(evaluate_thresholds(data, weight, thresholds), objective)
+    elapsed = time.perf_counter() - start
+    
+    # Meilleures configurations (ordre de la grille à score égal)
+    order = np.argsort(-scores, axis=None, kind="stable")[:top]
+    candidates = [
+        {
+            "weights": [round(float(w), 3) for w in weights[i // len(thresholds)]],
+            "thresholds": [round(float(t), 3) for t in thresholds[i % len(thresholds)]],
+            "objective": round(float(scores.flat[i]), 4),
+        }
+        for i in order
+    ]
+    
+    best_weights = weights[order[0] // len(thresholds)]
+    best_thresholds = thresholds[order[0] % len(thresholds)]
+    baseline_weights = np.array([baseline.keyword_weight, baseline.nc_code_weight, baseline.semantic_weight])
+    baseline_thresholds = np.array([baseline.thresholds[name] for name in ("low", "medium", "high", "critical")])
+    baseline_objective = _objective(
+        evaluate_thresholds(data, baseline_weights, baseline_thresholds[None, :]), objective
+    )[0]
+    
+    configurations = len(weights) * len(thresholds)
+    report = {
+        "analyses": len(data),
+        "relevance_labels": int((data.relevant >= 0).sum()),
+        "criticality_labels": int((data.criticality >= 0).sum()),
+        "objective": objective,
+        "configurations": configurations,
+        "elapsed_seconds": round(elapsed, 3),
+        "configurations_per_second": round(configurations / elapsed) if elapsed else None,
+        "best": {**candidates[0], "metrics": metrics_report(data, best_weights, best_thresholds)},
+        "baseline": {
+            "weights": [round(float(w), 3) for w in baseline_weights],
+            "thresholds": [round(float(t), 3) for t in baseline_thresholds],
+            "objective": round(float(baseline_objective), 4),
+            "metrics": metrics_report(data, baseline_weights, baseline_thresholds),
+        },
+        "top": candidates,
+    }
+    
+    logger.info(
+        "scoring_calibration_completed",
+        analyses=report["analyses"],
+        configurations=configurations,
+        configurations_per_second=report["configurations_per_second"],
+        best_objective=candidates[0]["objective"],
+        baseline_objective=report["baseline"]["objective"]
+    )
+    return report
+
+
+def settings_block(weights: List[float], thresholds: List[float]) -> str:
+    """Bloc .env (Settings) d'une configuration : poids puis seuils low..critical"""
+    keyword, nc_code, semantic = weights
+    low, medium, high, critical = thresholds
+    return "\n".join([
+        "# Agent 1B - Scoring weights",
+        f"KEYWORD_WEIGHT={keyword:g}",
+        f"NC_CODE_WEIGHT={nc_code:g}",
+        f"LLM_SEMANTIC_WEIGHT={semantic:g}",
+        "# Criticality thresholds",
+        f"CRITICAL_THRESHOLD={critical:g}",
+        f"HIGH_THRESHOLD={high:g}",
+        f"MEDIUM_THRESHOLD={medium:g}",
+        f"LOW_THRESHOLD={low:g}",
+    ])
+
+
+def human_labels(session) -> Dict[str, Tuple[int, int]]:
+    """
+    Étiquettes humaines par document : (pertinent, rang de criticité)
+    
+    Validations des analyses (table analyses) puis cas de référence, qui
+    priment sur validation_status.
+    """
+    from src.storage.models import Analysis, GroundTruthCase
+    
+    labels: Dict[str, Tuple[int, int]] = {}
+    
+    # Validation humaine des analyses
+    for document_id, status in session.query(Analysis.document_id, Analysis.validation_status)\
+            .filter(Analysis.validation_status.in_(["approved", "rejected"])):
+        labels[document_id] = (1 if status == "approved" else 0, -1)
+    
+    for document_id, decision, risk_level in session.query(
+        GroundTruthCase.document_id,
+        GroundTruthCase.expert_pertinence_decision,
+        GroundTruthCase.expert_risk_level
+    ):
+        labels[document_id] = labels_from_ground_truth(decision, risk_level)
+    
+    return labels
+
+
+def load_calibration_data(session, profile_id: str) -> CalibrationData:
+    """
+    Scores par niveau des analyses d'un profil et étiquettes humaines
+    
+    Les cas de référence et validations portent sur un document : ils sont
+    rapprochés des analyses de ce document pour le profil donné (voir
+    human_labels). Seules les analyses dont le LLM a été appelé sont
+    retenues : sans appel (cascade, pré-classifieur), le score sémantique
+    enregistré est un 0 de remplacement.
+    
+    Args:
+        session: Session SQLAlchemy
+        profile_id: Profil dont les analyses sont calibrées
+    """
+    from sqlalchemy import or_
+    
+    from src.storage.models import DocumentProfileAnalysis
+    
+    rows = session.query(
+        DocumentProfileAnalysis.document_id,
+        DocumentProfileAnalysis.keyword_score,
+        DocumentProfileAnalysis.nc_code_score,
+        DocumentProfileAnalysis.semantic_score,
+        DocumentProfileAnalysis.has_critical_codes,
+        DocumentProfileAnalysis.semantic_applicable
+    )\
+        .filter(DocumentProfileAnalysis.company_profile_id == profile_id)\
+        .filter(DocumentProfileAnalysis.status == "analyzed")\
+        .filter(DocumentProfileAnalysis.keyword_score.isnot(None))\
+        .filter(DocumentProfileAnalysis.nc_code_score.isnot(None))\
+        .filter(DocumentProfileAnalysis.semantic_score.isnot(None))\
+        .filter(or_(
+            DocumentProfileAnalysis.semantic_decision == "called",
+            DocumentProfileAnalysis.semantic_decision.is_(None)  # Antérieures à la cascade
+        ))\
+        .order_by(DocumentProfileAnalysis.document_id)\
+        .all()
+    
+    labels = human_labels(session)
+    
+    document_ids = [row[0] for row in rows]
+    return CalibrationData(
+        scores=np.array([row[1:4] for row in rows], dtype=float).reshape(-1, 3),
+        has_critical_codes=np.array([bool(row[4]) for row in rows], dtype=bool),
+        semantic_applicable=np.array([bool(row[5]) for row in rows], dtype=bool),
+        relevant=np.array([labels.get(document_id, (-1, -1))[0] for document_id in document_ids], dtype=np.int8),
+        criticality=np.array([labels.get(document_id, (-1, -1))[1] for document_id in document_ids], dtype=np.int8),
+        document_ids=document_ids
+    )
@@ -15,7 +15,6 @@ from rich import box
 
 from src.agent_1b.models import DocumentAnalysis, Criticality
 from src.storage.database import get_session
-from src.storage.analysis_repository import AnalysisRepository
 
 logger = structlog.get_logger()
 console = Console()
@@ -176,6 +175,8 @@ def save_analysis_to_database(analysis: DocumentAnalysis) -> str:
     Returns:
         ID de l'analyse sauvegardée
     """
+    from src.storage.analysis_repository import AnalysisRepository
+    
     session = get_session()
     
     try:
@@ -238,6 +239,8 @@ def display_analysis_summary(analysis_id: str) -> None:
     Args:
         analysis_id: ID de l'analyse
     """
+    from src.storage.analysis_repository import AnalysisRepository
+    
     session = get_session()
     
     try:
@@ -0,0 +1,314 @@
+"""
+Analyse multi-profils : un document collecté, une analyse par profil entreprise
+
+Les documents sont collectés et extraits une seule fois par l'Agent 1A ; l'Agent
+1B les analyse ensuite pour chaque CompanyProfile actif (état par couple
+document/profil, voir DocumentProfileRepository).
+
+Les niveaux 1 et 2 ne dépendent du profil que pour le score : le document est
+balayé une seule fois par un automate regroupant les mots-clés de tous les
+profils, et ses codes NC sont extraits une seule fois, puis chaque profil score
+ses propres correspondances. Seul l'appel LLM du niveau 3 est fait par profil,
+avec un nombre borné d'appels simultanés (comme BatchAnalyzer).
+
+Quand le document a un enregistrement de caractéristiques couvrant le profil
+(DocumentFeatures, calculé à la collecte), les niveaux 1 et 2 sont lus dans
+l'enregistrement : le texte n'est chargé (load_content) que si le LLM est appelé.
+
+Les couples (document, profil) forment une file de priorité (voir
+src/agent_1b/priority.py) : chaque worker prend le couple le plus prioritaire
+restant, et le délai jusqu'à la première analyse critique est mesuré.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+import structlog
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.agent_1b.agent import Agent1B
+from src.agent_1b.features import covers
+from src.agent_1b.models import (
+    Criticality,
+    DocumentAnalysis,
+    DocumentFeatures,
+    KeywordAnalysisResult,
+    NCCodeAnalysisResult
+)
+from src.agent_1b.priority import AnalysisPriority
+from src.agent_1b.tools.keyword_filter import KeywordAutomaton
+from src.agent_1b.tools.nc_code_filter import NCCodeFilter
+from src.config import settings
+
+logger = structlog.get_logger()
+
+
+class ProfileMatchers:
+    """Matchers déterministes de plusieurs profils, balayés en un seul passage"""
+    
+    def __init__(self, agents: Dict[str, Agent1B]):
+        """
+        Args:
+            agents: Agent 1B par ID de profil
+        """
+        self.agents = agents
+        
+        # Un automate par jeu d'options (un seul en pratique : options globales)
+        keywords_by_options: Dict[Tuple[bool, bool], List[str]] = {}
+        for agent in agents.values():
+            automaton = agent.keyword_filter.automaton
+            options = (automaton.word_boundary, automaton.accent_folding)
+            keywords_by_options.setdefault(options, []).extend(agent.keyword_filter.keywords)
+        
+        self.automata = {
+            options: KeywordAutomaton(keywords, word_boundary=options[0], accent_folding=options[1])
+            for options, keywords in keywords_by_options.items()
+        }
+    
+    def scan(
+        self,
+        document_content: str,
+        profile_ids: Optional[List[str]] = None
+    ) -> Dict[str, Tuple[KeywordAnalysisResult, NCCodeAnalysisResult]]:
+        """
+        Niveaux 1 et 2 de chaque profil pour un document
+        
+        Args:
+            document_content: Texte complet du document
+            profile_ids: Profils à scorer (défaut: tous)
+        
+        Returns:
+            {ID de profil: (résultat mots-clés, résultat codes NC)}
+        """
+        occurrences = {options: automaton.find_all(document_content) for options, automaton in self.automata.items()}
+        document_codes = NCCodeFilter.extract_codes(document_content)
+        
+        results = {}
+        for profile_id in list(self.agents) if profile_ids is None else profile_ids:
+            agent = self.agents[profile_id]
+            automaton = agent.keyword_filter.automaton
+            results[profile_id] = (
+                agent.keyword_filter.score_occurrences(
+                    document_content, occurrences[(automaton.word_boundary, automaton.accent_folding)]
+                ),
+                agent.nc_code_filter.score_codes(document_content, document_codes)
+            )
+        
+        logger.info(
+            "profile_matchers_scanned",
+            profiles=len(results),
+            keywords_found=sum(len(found) for found in occurrences.values()),
+            nc_codes=len(document_codes)
+        )
+        return results
+    
+    def scan_features(
+        self,
+        features: DocumentFeatures,
+        profile_ids: Optional[List[str]] = None
+    ) -> Dict[str, Tuple[KeywordAnalysisResult, NCCodeAnalysisResult]]:
+        """
+        Niveaux 1 et 2 de chaque profil à partir des caractéristiques du document
+        
+        Les profils doivent être couverts par l'enregistrement (voir features.covers).
+        
+        Args:
+            features: Caractéristiques calculées à la collecte
+            profile_ids: Profils à scorer (défaut: tous)
+        
+        Returns:
+            {ID de profil: (résultat mots-clés, résultat codes NC)}
+        """
+        hits = {keyword: (hit.count, hit.context) for keyword, hit in features.keyword_hits.items()}
+        document_codes = list(features.nc_codes)
+        
+        return {
+            profile_id: (
+                self.agents[profile_id].keyword_filter.score_hits(hits),
+                self.agents[profile_id].nc_code_filter.score_codes(None, document_codes, features.nc_codes)
+            )
+            for profile_id in (list(self.agents) if profile_ids is None else profile_ids)
+        }
+    
+    def scan_document(
+        self,
+        document: Dict,
+        profile_ids: List[str]
+    ) -> Dict[str, Tuple[KeywordAnalysisResult, NCCodeAnalysisResult]]:
+        """
+        Niveaux 1 et 2 d'un document du lot : caractéristiques pour les profils
+        couverts, balayage du texte (chargé si besoin) pour les autres
+        """
+        features = document.get("features")
+        covered = [
+            profile_id for profile_id in profile_ids
+            if features is not None and covers(features, self.agents[profile_id].profile_index)
+        ]
+        results = self.scan_features(features, covered) if covered else {}
+        
+        missing = [profile_id for profile_id in profile_ids if profile_id not in results]
+        if missing:
+            results.update(self.scan(document_text(document), missing))
+        
+        return results
+
+
+def document_text(document: Dict) -> str:
+    """Texte d'un document du lot, chargé une seule fois via load_content si absent"""
+    if document.get("document_content") is None and document.get("load_content"):
+        document["document_content"] = document["load_content"]()
+    return document.get("document_content") or ""
+
+
+class FanOutAnalyzer:
+    """Analyse un lot de documents pour plusieurs profils entreprise"""
+    
+    def __init__(
+        self,
+        agents: Dict[str, Agent1B],
+        concurrency: Optional[int] = None,
+        priority: Optional[AnalysisPriority] = None
+    ):
+        """
+        Args:
+            agents: Agent 1B par ID de profil (analyseur sémantique partagé)
+            concurrency: Appels LLM simultanés, tous profils confondus
+                (défaut: settings.analysis_concurrency)
+            priority: Priorité des couples (document, profil) (défaut: Settings)
+        """
+        if not agents:
+            raise ValueError("Aucun profil entreprise à analyser")
+        
+        self.agents = agents
+        self.matchers = ProfileMatchers(agents)
+        self.concurrency = max(1, concurrency or settings.analysis_concurrency)
+        self.priority = priority or AnalysisPriority.from_settings()
+    
+    async def run(
+        self,
+        documents: List[Dict],
+        on_analysis: Callable[[Dict, str, DocumentAnalysis], None],
+        on_error: Optional[Callable[[Dict, str, Exception], None]] = None
+    ) -> Dict:
+        """
+        Analyse chaque document pour ses profils en attente
+        
+        Args:
+            documents: Dicts avec document_id, document_content, document_title,
+                regulation_type et profile_ids (profils à analyser, défaut: tous) ;
+                optionnellement features (DocumentFeatures), load_content
+                (appelé pour obtenir le texte si document_content est absent) et
+                les attributs de priorité (voir priority.priority_attributes)
+            on_analysis: Appelé avec (document, ID de profil, analyse) à chaque
+                analyse terminée
+            on_error: Appelé avec (document, ID de profil, exception) en cas d'échec
+        
+        Returns:
+            Statistiques du lot (analyses, erreurs, durée, pauses de débit,
+            délai et rang de la première analyse critique)
+        """
+        semantic_analyzer = next(iter(self.agents.values())).semantic_analyzer
+        backoff = semantic_analyzer.backoff
+        pauses_before = backoff.pauses
+        cache = semantic_analyzer.cache
+        cache_before = cache.stats() if cache else None
+        analyzed = 0
+        pairs = 0
+        errors = []
+        first_critical = None
+        
+        logger.info(
+            "fan_out_analysis_started",
+            documents=len(documents),
+            profiles=len(self.agents),
+            concurrency=self.concurrency
+        )
+        start = time.perf_counter()
+        
+        async def analyze_pair(document: Dict, profile_id: str, local_levels: Tuple) -> None:
+            nonlocal analyzed, first_critical
+            
+            try:
+                agent = self.agents[profile_id]
+                # Texte complet seulement si le LLM doit le lire
+                content = document_text(document) if agent.needs_llm(*local_levels) else ""
+                analysis = await agent.aanalyze_document(
+                    document_id=document["document_id"],
+                    document_content=content,
+                    document_title=document.get("document_title") or "",
+                    regulation_type=document.get("regulation_type") or "CBAM",
+                    local_levels=local_levels
+                )
+                on_analysis(document, profile_id, analysis)
+                analyzed += 1
+                
+                if first_critical is None and analysis.relevance_score.criticality == Criticality.CRITICAL:
+                    first_critical = {
+                        "seconds": round(time.perf_counter() - start, 3),
+                        "position": analyzed,
+                        "document_id": document["document_id"],
+                        "profile_id": profile_id,
+                    }
+                    logger.info("first_critical_analysis", **first_critical)
+            
+            except Exception as e:
+                logger.error(
+                    "fan_out_analysis_failed",
+                    document_id=document["document_id"],
+                    profile_id=profile_id,
+                    error=str(e),
+                    exc_info=True
+                )
+                errors.append({"document_id": document["document_id"], "profile_id": profile_id, "error": str(e)})
+                if on_error:
+                    on_error(document, profile_id, e)
+        
+        # File de priorité : (-priorité, ordre d'arrivée, ...) ; ordre du lot à priorité égale
+        queue = []
+        counter = itertools.count()
+        for document in documents:
+            profile_ids = [pid for pid in document.get("profile_ids") or self.agents if pid in self.agents]
+            
+            # Niveaux 1-2 : un balayage par document (ou ses caractéristiques), pour tous ses profils
+            scans = self.matchers.scan_document(document, profile_ids)
+            pairs += len(profile_ids)
+            for profile_id in profile_ids:
+                priority = self.priority.score(document, *scans[profile_id], self.agents[profile_id].scorer)
+                heapq.heappush(queue, (-priority, next(counter), document, profile_id, scans[profile_id]))
+        
+        async def worker() -> None:
+            # Aucune attente entre le test et le retrait : pas de concurrence sur la file
+            while queue:
+                _, _, document, profile_id, local_levels = heapq.heappop(queue)
+                await analyze_pair(document, profile_id, local_levels)
+        
+        await asyncio.gather(*(worker() for _ in range(min(self.concurrency, len(queue)))))
+        
+        wall_time = time.perf_counter() - start
+        
+        stats = {
+            "documents": len(documents),
+            "profiles": len(self.agents),
+            "pairs": pairs,
+            "analyzed": analyzed,
+            "errors": errors,
+            "concurrency": self.concurrency,
+            "rate_limit_pauses": backoff.pauses - pauses_before,
+            "semantic_cache": cache.stats(since=cache_before) if cache else None,
+            "wall_time_seconds": round(wall_time, 3),
+            "first_critical_seconds": first_critical["seconds"] if first_critical else None,
+            "first_critical_position": first_critical["position"] if first_critical else None
+        }
+        
+        logger.info(
+            "fan_out_analysis_completed",
+            pairs=pairs,
+            analyzed=analyzed,
+            errors=len(errors),
+            rate_limit_pauses=stats["rate_limit_pauses"],
+            wall_time_seconds=stats["wall_time_seconds"],
+            first_critical_seconds=stats["first_critical_seconds"]
+        )
+        
+        return stats
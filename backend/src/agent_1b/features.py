@@ -0,0 +1,131 @@
+"""
+Caractéristiques d'un document, calculées une fois à la collecte
+
+L'Agent 1A extrait le texte et le sauvegarde ; il calcule au même moment ce
+dont les niveaux déterministes de l'Agent 1B ont besoin (DocumentFeatures) :
+- codes NC du document (extraction du niveau 2) et leur contexte
+- codes NC vus par l'extracteur PDF (page, confiance), conservés tels quels
+- statistiques du texte (caractères, mots, lignes, tokens estimés)
+- occurrences des mots-clés de tous les profils actifs (un seul passage)
+
+L'enregistrement couvre les profils dont le hash (ProfileIndex.content_hash)
+figure dans profile_hashes : pour eux, l'Agent 1B score les niveaux 1 et 2
+sans relire le texte. Un profil nouveau ou modifié est ajouté par
+extend_features, et un document modifié (hash différent) est recalculé.
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+import structlog
+
+from src.agent_1b.models import DocumentFeatures, KeywordHit
+from src.agent_1b.profile_index import ProfileIndex
+from src.agent_1b.tools.content_selector import CHARS_PER_TOKEN
+from src.agent_1b.tools.keyword_filter import KeywordAutomaton, KeywordFilter
+from src.agent_1b.tools.nc_code_filter import NCCodeFilter
+
+logger = structlog.get_logger()
+
+# À incrémenter quand le calcul change (les enregistrements existants sont recalculés)
+FEATURES_VERSION = 1
+
+
+def featurize(
+    content: str,
+    profile_indexes: Iterable[ProfileIndex] = (),
+    nc_occurrences: Optional[List[Dict]] = None,
+    content_hash: str = ""
+) -> DocumentFeatures:
+    """
+    Calcule les caractéristiques d'un document
+    
+    Args:
+        content: Texte complet du document
+        profile_indexes: Profils dont les mots-clés sont cherchés
+        nc_occurrences: Codes NC de l'extracteur PDF (dicts code, page, context, confidence)
+        content_hash: Hash du document (Document.hash_sha256)
+    
+    Returns:
+        DocumentFeatures
+    """
+    document_codes = NCCodeFilter.extract_codes(content)
+    
+    features = DocumentFeatures(
+        version=FEATURES_VERSION,
+        content_hash=content_hash,
+        token_stats={
+            "chars": len(content),
+            "words": len(content.split()),
+            "lines": content.count("\n") + 1 if content else 0,
+            "tokens": len(content) // CHARS_PER_TOKEN,
+        },
+        nc_codes=NCCodeFilter.extract_contexts(content, document_codes),
+        nc_occurrences=list(nc_occurrences or [])
+    )
+    return extend_features(features, content, profile_indexes)
+
+
+def extend_features(
+    features: DocumentFeatures,
+    content: str,
+    profile_indexes: Iterable[ProfileIndex]
+) -> DocumentFeatures:
+    """
+    Ajoute à un enregistrement les mots-clés de profils non encore couverts
+    
+    Args:
+        features: Caractéristiques existantes (modifiées sur place)
+        content: Texte complet du document
+        profile_indexes: Profils à couvrir
+    
+    Returns:
+        Les mêmes caractéristiques
+    """
+    missing = [index for index in profile_indexes if not covers(features, index)]
+    if not missing:
+        return features
+    
+    # Un automate par jeu d'options (un seul en pratique : options globales)
+    keywords_by_options: Dict[tuple, List[str]] = {}
+    for index in missing:
+        automaton = index.keyword_filter.automaton
+        options = (automaton.word_boundary, automaton.accent_folding)
+        keywords_by_options.setdefault(options, []).extend(
+            keyword for keyword in index.keyword_filter.keywords if keyword not in features.keyword_hits
+        )
+    
+    for (word_boundary, accent_folding), keywords in keywords_by_options.items():
+        if not keywords:
+            continue
+        automaton = KeywordAutomaton(keywords, word_boundary=word_boundary, accent_folding=accent_folding)
+        for keyword, spans in automaton.find_all(content).items():
+            start, end = spans[0]
+            features.keyword_hits[keyword] = KeywordHit(
+                count=len(spans),
+                start=start,
+                end=end,
+                context=KeywordFilter._extract_context(content, start, end)
+            )
+    
+    features.profile_hashes.extend(index.content_hash for index in missing)
+    
+    logger.debug(
+        "document_features_extended",
+        profiles=len(missing),
+        keyword_hits=len(features.keyword_hits)
+    )
+    return features
+
+
+def covers(features: DocumentFeatures, profile_index: ProfileIndex) -> bool:
+    """Les mots-clés du profil ont-ils été cherchés pour ce document ?"""
+    return profile_index.content_hash in features.profile_hashes
+
+
+def is_current(features: Optional[DocumentFeatures], content_hash: str) -> bool:
+    """Caractéristiques calculées sur la version actuelle du document et du calcul"""
+    return (
+        features is not None
+        and features.version == FEATURES_VERSION
+        and features.content_hash == content_hash
+    )
@@ -0,0 +1,341 @@
+"""
+Analyse en masse du backlog par l'API Message Batches d'Anthropic
+
+Pour un premier chargement ou le re-scoring d'un corpus entier, la latence
+interactive importe peu : les requêtes d'analyse sémantique de tous les
+documents sont soumises dans un seul lot (moitié prix, hors quotas de débit
+interactifs), le lot est consulté jusqu'à sa fin, puis les réponses sont
+parsées en SemanticAnalysisResult et les analyses remises en une fois à
+`on_analyses` pour une sauvegarde groupée.
+
+Reprise : chaque requête porte l'ID de son document (custom_id). Un lot
+soumis peut donc être repris par son identifiant (batch_id), par exemple
+après l'arrêt du processus pendant l'attente, avec la liste des documents
+encore bruts.
+
+Les documents dont l'analyse sémantique est déjà en cache ne sont pas
+soumis ; les résultats du lot alimentent le cache. Ceux dont la criticité ne
+dépend pas du LLM (cascade de pertinence, voir Agent1B.needs_llm) sont
+analysés localement, sans requête.
+"""
+
+import hashlib
+import re
+import time
+import structlog
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.agent_1b.agent import Agent1B
+from src.agent_1b.fan_out import ProfileMatchers, document_text
+from src.agent_1b.models import DocumentAnalysis, SemanticAnalysisResult
+from src.agent_1b.tools.semantic_analyzer import PROMPT_VERSION
+from src.config import settings
+from src.utils.llm_usage import api_token_usage, tracker
+
+logger = structlog.get_logger()
+
+# Format imposé par l'API pour custom_id
+_CUSTOM_ID = re.compile(r"^[a-zA-Z0-9_-]{1,64}$")
+
+
+def custom_id_for(document_id: str) -> str:
+    """custom_id d'un document (son ID, ou une empreinte si le format ne convient pas)"""
+    if _CUSTOM_ID.match(document_id):
+        return document_id
+    return "doc-" + hashlib.sha256(document_id.encode("utf-8")).hexdigest()[:32]
+
+
+def message_text(message) -> str:
+    """Texte d'un message de l'API (concaténation des blocs texte)"""
+    return "".join(block.text for block in message.content if block.type == "text")
+
+
+class MessageBatchAnalyzer:
+    """Analyse un backlog de documents via un lot de la Message Batches API"""
+    
+    def __init__(self, agent: Agent1B, client=None, poll_seconds: Optional[float] = None):
+        """
+        Args:
+            agent: Agent 1B (profil entreprise déjà chargé)
+            client: Client anthropic.Anthropic (défaut: créé depuis les settings)
+            poll_seconds: Intervalle de consultation du lot (défaut: settings.message_batch_poll_seconds)
+        """
+        if client is None:
+            import anthropic
+            client = anthropic.Anthropic(
+                api_key=settings.anthropic_api_key,
+                base_url=settings.anthropic_base_url or None
+            )
+        
+        self.agent = agent
+        self.client = client
+        self.poll_seconds = settings.message_batch_poll_seconds if poll_seconds is None else poll_seconds
+    
+    def submit(self, documents: List[Dict]) -> Optional[str]:
+        """
+        Soumet les documents dans un lot
+        
+        Args:
+            documents: Dicts avec document_id, document_content, document_title
+                et regulation_type
+        
+        Returns:
+            ID du lot (None si aucun document)
+        """
+        if not documents:
+            return None
+        
+        analyzer = self.agent.semantic_analyzer
+        requests = [
+            {
+                "custom_id": custom_id_for(document["document_id"]),
+                "params": analyzer.request_params(
+                    document.get("document_content") or "",
+                    document.get("document_title") or "",
+                    document.get("regulation_type") or "CBAM",
+                    self.agent.company_profile
+                )
+            }
+            for document in documents
+        ]
+        
+        batch = self.client.messages.batches.create(requests=requests)
+        
+        logger.info("message_batch_submitted", batch_id=batch.id, requests=len(requests))
+        return batch.id
+    
+    def wait(self, batch_id: str, max_wait_seconds: Optional[float] = None):
+        """
+        Consulte le lot jusqu'à la fin de son traitement
+        
+        Args:
+            batch_id: ID du lot
+            max_wait_seconds: Abandon de l'attente au-delà (le lot reste repris-able)
+        
+        Returns:
+            Lot terminé (MessageBatch)
+        
+        Raises:
+            TimeoutError: Lot toujours en cours après max_wait_seconds
+        """
+        start = time.monotonic()
+        
+        while True:
+            batch = self.client.messages.batches.retrieve(batch_id)
+            
+            if batch.processing_status == "ended":
+                logger.info("message_batch_ended", batch_id=batch_id, **batch.request_counts.model_dump())
+                return batch
+            
+            logger.info(
+                "message_batch_in_progress",
+                batch_id=batch_id,
+                processing=batch.request_counts.processing
+            )
+            
+            if max_wait_seconds is not None and time.monotonic() - start + self.poll_seconds > max_wait_seconds:
+                raise TimeoutError(f"Lot {batch_id} toujours en cours ({batch.processing_status})")
+            
+            time.sleep(self.poll_seconds)
+    
+    def collect(self, batch_id: str) -> Tuple[Dict[str, Tuple[SemanticAnalysisResult, Dict]], Dict[str, str]]:
+        """
+        Résultats d'un lot terminé
+        
+        Returns:
+            (Dict {custom_id: (SemanticAnalysisResult, usage)},
+             Dict {custom_id: erreur} pour les requêtes en échec ou illisibles)
+        """
+        analyzer = self.agent.semantic_analyzer
+        results = {}
+        failures = {}
+        
+        for item in self.client.messages.batches.results(batch_id):
+            outcome = item.result
+            
+            if outcome.type != "succeeded":
+                error = getattr(getattr(outcome, "error", None), "error", None)
+                failures[item.custom_id] = getattr(error, "message", None) or outcome.type
+                continue
+            
+            try:
+                semantic_result = analyzer.parse_response(message_text(outcome.message))
+            except Exception as e:
+                failures[item.custom_id] = f"Réponse illisible: {e}"
+                continue
+            
+            results[item.custom_id] = (semantic_result, api_token_usage(outcome.message.usage))
+        
+        return results, failures
+    
+    def run(
+        self,
+        documents: List[Dict],
+        on_analyses: Callable[[List[Tuple[Dict, DocumentAnalysis]]], None],
+        batch_id: Optional[str] = None,
+        max_wait_seconds: Optional[float] = None
+    ) -> Dict:
+        """
+        Analyse tous les documents (soumission, attente, sauvegarde groupée)
+        
+        Args:
+            documents: Dicts avec document_id, document_content (ou
+                load_content, appelé seulement si le LLM doit lire le texte),
+                document_title, regulation_type et optionnellement features
+                (DocumentFeatures)
+            on_analyses: Appelé une fois avec la liste des (document, analyse)
+            batch_id: Lot déjà soumis à reprendre (pas de nouvelle soumission)
+            max_wait_seconds: Durée maximale d'attente du lot
+        
+        Returns:
+            Statistiques (lot, analysés, locaux, en cache, erreurs, tokens, durée)
+        """
+        analyzer = self.agent.semantic_analyzer
+        start = time.perf_counter()
+        
+        # Niveaux 1-2 (caractéristiques, sinon texte) : sans effet possible du
+        # LLM sur la criticité, analyse locale et pas de requête
+        profile_id = self.agent.profile_index.profile_id
+        matchers = ProfileMatchers({profile_id: self.agent})
+        local_levels: Dict[str, Tuple] = {}
+        analyses = []
+        llm_documents = []
+        
+        for document in documents:
+            levels = matchers.scan_document(document, [profile_id])[profile_id]
+            if self.agent.needs_llm(*levels):
+                document["document_content"] = document_text(document)
+                local_levels[document["document_id"]] = levels
+                llm_documents.append(document)
+            else:
+                analyses.append((document, self.agent.analyze_document(
+                    document_id=document["document_id"],
+                    document_content="",
+                    document_title=document.get("document_title") or "",
+                    regulation_type=document.get("regulation_type") or "CBAM",
+                    local_levels=levels
+                )))
+        
+        local_count = len(analyses)
+        
+        # Analyses sémantiques déjà en cache : pas de requête
+        semantic_results: Dict[str, SemanticAnalysisResult] = {}
+        cache_keys: Dict[str, Optional[str]] = {}
+        pending = []
+        
+        for document in llm_documents:
+            cache_key, cached = analyzer.lookup(
+                document.get("document_content") or "",
+                document.get("document_title") or "",
+                document.get("regulation_type") or "CBAM",
+                self.agent.company_profile,
+                # Une requête de lot est toujours un appel unique (pas de map-reduce)
+                prompt_version=PROMPT_VERSION
+            )
+            custom_id = custom_id_for(document["document_id"])
+            cache_keys[custom_id] = cache_key
+            if cached is not None:
+                semantic_results[custom_id] = cached
+            else:
+                pending.append(document)
+        
+        cached_count = len(semantic_results)
+        
+        if batch_id is None:
+            batch_id = self.submit(pending)
+        else:
+            logger.info("message_batch_resumed", batch_id=batch_id, documents=len(pending))
+        
+        errors = []
+        failures: Dict[str, str] = {}
+        usage_total = {
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "cache_read_input_tokens": 0,
+            "cache_creation_input_tokens": 0
+        }
+        request_counts = None
+        
+        if batch_id is not None:
+            batch = self.wait(batch_id, max_wait_seconds)
+            request_counts = batch.request_counts.model_dump()
+            results, failures = self.collect(batch_id)
+            
+            document_ids = {custom_id_for(document["document_id"]): document["document_id"] for document in pending}
+            for custom_id, (semantic_result, usage) in results.items():
+                semantic_results[custom_id] = semantic_result
+                analyzer.store(cache_keys.get(custom_id), semantic_result, usage)
+                # Pas de latence par requête dans un lot : seule la durée du run compte
+                tracker.record(
+                    analyzer.model_name,
+                    usage,
+                    batch=True,
+                    agent="agent_1b",
+                    stage="semantic_batch",
+                    document_id=document_ids.get(custom_id),
+                    profile_id=profile_id
+                )
+                for name in usage_total:
+                    usage_total[name] += usage.get(name, 0)
+            for custom_id, error in failures.items():
+                tracker.record(
+                    analyzer.model_name,
+                    error=error[:200],
+                    batch=True,
+                    agent="agent_1b",
+                    stage="semantic_batch",
+                    document_id=document_ids.get(custom_id),
+                    profile_id=profile_id
+                )
+        
+        # Agrégation avec les niveaux 1-2, pour chaque document résolu
+        for document in llm_documents:
+            custom_id = custom_id_for(document["document_id"])
+            semantic_result = semantic_results.get(custom_id)
+            
+            if semantic_result is None:
+                # En échec ou absent du lot : le document reste à analyser
+                errors.append({
+                    "document_id": document["document_id"],
+                    "error": failures.get(custom_id, "Absent du lot")
+                })
+                continue
+            
+            analyses.append((document, self.agent.analyze_document_with_semantic(
+                document_id=document["document_id"],
+                document_content=document.get("document_content") or "",
+                document_title=document.get("document_title") or "",
+                regulation_type=document.get("regulation_type") or "CBAM",
+                semantic_result=semantic_result,
+                local_levels=local_levels[document["document_id"]]
+            )))
+        
+        if analyses:
+            on_analyses(analyses)
+        
+        wall_time = time.perf_counter() - start
+        
+        stats = {
+            "batch_id": batch_id,
+            "documents": len(documents),
+            "local": local_count,
+            "submitted": len(pending),
+            "cached": cached_count,
+            "analyzed": len(analyses),
+            "errors": errors,
+            "request_counts": request_counts,
+            "usage": usage_total,
+            "wall_time_seconds": round(wall_time, 3)
+        }
+        
+        logger.info(
+            "message_batch_analysis_completed",
+            batch_id=batch_id,
+            analyzed=len(analyses),
+            local=local_count,
+            cached=cached_count,
+            errors=len(errors),
+            wall_time_seconds=stats["wall_time_seconds"]
+        )
+        
+        return stats
@@ -66,6 +66,11 @@ class KeywordAnalysisResult(BaseModel):
         default_factory=dict,
         description="Contexte autour de chaque mot-clé trouvé"
     )
+    
+    occurrences: Dict[str, int] = Field(
+        default_factory=dict,
+        description="Nombre d'occurrences de chaque mot-clé trouvé"
+    )
 
 
 class NCCodeAnalysisResult(BaseModel):
@@ -159,6 +164,90 @@ class SemanticAnalysisResult(BaseModel):
     )
 
 
+class ChunkExtraction(BaseModel):
+    """Informations extraites d'un passage d'un document long (phase map)"""
+    
+    is_relevant: bool = Field(
+        default=False,
+        description="Le passage concerne-t-il l'entreprise ?"
+    )
+    
+    summary: str = Field(
+        default="",
+        description="Ce que dit le passage, en une ou deux phrases"
+    )
+    
+    obligations: List[str] = Field(
+        default_factory=list,
+        description="Obligations ou actions requises dans le passage"
+    )
+    
+    products: List[str] = Field(
+        default_factory=list,
+        description="Produits/matériaux mentionnés"
+    )
+    
+    nc_codes: List[str] = Field(
+        default_factory=list,
+        description="Codes NC/SH cités"
+    )
+    
+    geographical_scope: List[str] = Field(
+        default_factory=list,
+        description="Pays/régions concernés"
+    )
+
+
+class KeywordHit(BaseModel):
+    """Occurrences d'un mot-clé dans un document"""
+    
+    count: int = Field(..., ge=1, description="Nombre d'occurrences")
+    start: int = Field(..., ge=0, description="Position de la première occurrence")
+    end: int = Field(..., ge=0, description="Fin de la première occurrence")
+    context: str = Field(default="", description="Contexte autour de la première occurrence")
+
+
+class DocumentFeatures(BaseModel):
+    """
+    Caractéristiques déterministes d'un document, calculées à la collecte
+    
+    Suffisent aux niveaux 1 et 2 de l'Agent 1B pour les profils dont le hash
+    figure dans profile_hashes : le texte complet n'est relu que pour l'appel LLM.
+    """
+    
+    version: int = Field(default=1, description="Version du format (voir FEATURES_VERSION)")
+    
+    content_hash: str = Field(
+        default="",
+        description="Hash du document au moment du calcul (Document.hash_sha256)"
+    )
+    
+    token_stats: Dict[str, int] = Field(
+        default_factory=dict,
+        description="Statistiques du texte : chars, words, lines, tokens (estimation)"
+    )
+    
+    nc_codes: Dict[str, str] = Field(
+        default_factory=dict,
+        description="Codes NC normalisés du document (niveau 2) et contexte de la première occurrence"
+    )
+    
+    nc_occurrences: List[Dict] = Field(
+        default_factory=list,
+        description="Codes NC vus par l'Agent 1A à l'extraction (code, page, context, confidence)"
+    )
+    
+    keyword_hits: Dict[str, KeywordHit] = Field(
+        default_factory=dict,
+        description="Occurrences des mots-clés des profils couverts"
+    )
+    
+    profile_hashes: List[str] = Field(
+        default_factory=list,
+        description="Hash des ProfileIndex dont les mots-clés ont été cherchés"
+    )
+
+
 class RelevanceScore(BaseModel):
     """Score de pertinence final agrégé"""
     
@@ -256,6 +345,26 @@ class DocumentAnalysis(BaseModel):
         description="Statut dans le workflow"
     )
     
+    semantic_decision: str = Field(
+        default="called",
+        description="Appel LLM du niveau 3 : called, skipped (criticité déjà déterminée), deferred (cascade) ou preclassified (pré-classifieur)"
+    )
+    
+    pre_classifier_probability: Optional[float] = Field(
+        default=None,
+        description="P(applicable) selon le pré-classifieur local (None s'il n'a pas été consulté)"
+    )
+    
+    pre_classifier_version: Optional[int] = Field(
+        default=None,
+        description="Version du modèle de pré-classification utilisé"
+    )
+    
+    profile_hash: Optional[str] = Field(
+        default=None,
+        description="Hash du profil compilé utilisé (ProfileIndex.content_hash)"
+    )
+    
     @field_validator('is_relevant', mode='before')
     @classmethod
     def determine_relevance(cls, v, info):
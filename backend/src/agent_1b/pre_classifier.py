@@ -0,0 +1,660 @@
+"""
+Pré-classifieur local - Applicabilité prédite avant l'appel LLM
+
+Modèle linéaire (régression logistique en NumPy) sur des n-grammes de mots
+hachés (1 et 2 mots, 2^18 dimensions), entraîné hors ligne par profil
+entreprise à partir des analyses stockées :
+
+- étiquette : verdict is_applicable du LLM (analyses dont le niveau 3 a
+  réellement été appelé), remplacé par l'étiquette humaine quand elle existe
+  (cas de référence, validation des analyses)
+- calibration : échelle de Platt ajustée sur un échantillon de validation
+  (documents tirés par hachage de leur id, stable d'un entraînement à l'autre)
+- fichiers versionnés : <PRE_CLASSIFIER_DIR>/<profil>/v<N>.npz
+
+Modes (PRE_CLASSIFIER_MODE) :
+
+- "off"    : modèle ignoré
+- "shadow" : probabilité calculée et enregistrée avec l'analyse, le LLM est
+  toujours appelé ; l'accord avec son verdict est mesuré par shadow_agreement
+- "gate"   : le LLM est sauté (décision "preclassified") quand
+  P(applicable) < PRE_CLASSIFIER_NEGATIVE_THRESHOLD, seulement si le mode
+  shadow a confirmé ces négatifs pour cette version du modèle ; sinon le
+  modèle reste en shadow
+"""
+
+import json
+import re
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import structlog
+
+from src.agent_1b.tools.semantic_cascade import CascadeDecision
+
+logger = structlog.get_logger()
+
+PRE_CLASSIFIER_MODES = ("off", "shadow", "gate")
+
+# Espace des n-grammes hachés (puissance de 2)
+HASH_BITS = 18
+# Début du document pris en compte (les documents longs ne sont pas lus en entier)
+MAX_TEXT_CHARS = 50000
+# Part des documents réservée à la calibration et aux métriques
+HOLDOUT_MODULO = 5
+MIN_HOLDOUT_SAMPLES = 10
+
+_TOKEN = re.compile(r"\w\w+")
+
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -35, 35)))
+
+
+def hashed_features(text: str, n_features: int = 1 << HASH_BITS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    N-grammes (1 et 2 mots) hachés d'un texte
+    
+    Returns:
+        (indices, valeurs) : log(1 + occurrences), vecteur de norme 1
+    """
+    tokens = _TOKEN.findall((text or "")[:MAX_TEXT_CHARS].lower())
+    grams = tokens + [f"{first} {second}" for first, second in zip(tokens[:-1], tokens[1:], strict=True)]
+    if not grams:
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+    
+    # crc32 : même hachage d'un processus à l'autre (contrairement à hash())
+    hashes = np.fromiter((zlib.crc32(gram.encode("utf-8")) for gram in grams), dtype=np.int64, count=len(grams))
+    indices, counts = np.unique(hashes % n_features, return_counts=True)
+    values = np.log1p(counts)
+    return indices, values / np.linalg.norm(values)
+
+
+@dataclass
+class HashedMatrix:
+    """Matrice creuse (format CSR) des n-grammes hachés de N documents"""
+    indptr: np.ndarray
+    indices: np.ndarray
+    values: np.ndarray
+    n_features: int
+    _rows: Optional[np.ndarray] = field(default=None, repr=False)
+    
+    @classmethod
+    def from_texts(cls, texts: Sequence[str], n_features: int = 1 << HASH_BITS) -> "HashedMatrix":
+        rows = [hashed_features(text, n_features) for text in texts]
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(indices) for indices, _ in rows])
+        return cls(
+            indptr=indptr,
+            indices=np.concatenate([indices for indices, _ in rows]) if rows else np.zeros(0, dtype=np.int64),
+            values=np.concatenate([values for _, values in rows]) if rows else np.zeros(0),
+            n_features=n_features
+        )
+    
+    @property
+    def rows(self) -> int:
+        return len(self.indptr) - 1
+    
+    def _row_ids(self) -> np.ndarray:
+        # Ligne de chaque valeur non nulle (calculée une fois, réutilisée à chaque itération)
+        if self._rows is None:
+            self._rows = np.repeat(np.arange(self.rows), np.diff(self.indptr))
+        return self._rows
+    
+    def dot(self, weights: np.ndarray) -> np.ndarray:
+        """X @ weights"""
+        return np.bincount(self._row_ids(), weights=weights[self.indices] * self.values, minlength=self.rows)
+    
+    def transpose_dot(self, vector: np.ndarray) -> np.ndarray:
+        """X.T @ vector"""
+        return np.bincount(
+            self.indices, weights=self.values * vector[self._row_ids()], minlength=self.n_features
+        )
+    
+    def take(self, rows: np.ndarray) -> "HashedMatrix":
+        """Sous-matrice des lignes données"""
+        parts = [np.arange(self.indptr[row], self.indptr[row + 1]) for row in rows]
+        positions = np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(part) for part in parts])
+        return HashedMatrix(indptr, self.indices[positions], self.values[positions], self.n_features)
+
+
+def fit_logistic(
+    matrix: HashedMatrix,
+    labels: np.ndarray,
+    l2: float = 1e-4,
+    epochs: int = 300,
+    learning_rate: float = 0.1
+) -> Tuple[np.ndarray, float]:
+    """
+    Régression logistique (descente de gradient Adam, classes équilibrées)
+    
+    Returns:
+        (poids, biais)
+    """
+    labels = labels.astype(float)
+    positives = labels.sum()
+    negatives = len(labels) - positives
+    sample_weights = np.where(labels == 1, len(labels) / (2 * max(positives, 1)), len(labels) / (2 * max(negatives, 1)))
+    sample_weights /= len(labels)
+    
+    parameters = np.zeros(matrix.n_features + 1)
+    first_moment = np.zeros_like(parameters)
+    second_moment = np.zeros_like(parameters)
+    beta1, beta2 = 0.9, 0.999
+    
+    for epoch in range(1, epochs + 1):
+        logits = matrix.dot(parameters[:-1]) + parameters[-1]
+        residual = (_sigmoid(logits) - labels) * sample_weights
+        gradient = np.empty_like(parameters)
+        gradient[:-1] = matrix.transpose_dot(residual) + l2 * parameters[:-1]
+        gradient[-1] = residual.sum()
+        
+        first_moment = beta1 * first_moment + (1 - beta1) * gradient
+        second_moment = beta2 * second_moment + (1 - beta2) * gradient ** 2
+        corrected = first_moment / (1 - beta1 ** epoch)
+        parameters -= learning_rate * corrected / (np.sqrt(second_moment / (1 - beta2 ** epoch)) + 1e-8)
+    
+    return parameters[:-1], float(parameters[-1])
+
+
+def fit_platt(logits: np.ndarray, labels: np.ndarray, iterations: int = 50) -> Tuple[float, float]:
+    """
+    Échelle de Platt : P = sigmoid(a * logit + b), ajustée par Newton
+    
+    Cibles lissées (Platt, 1999) pour ne pas sur-confier les petits échantillons.
+    """
+    positives = labels.sum()
+    negatives = len(labels) - positives
+    targets = np.where(labels == 1, (positives + 1) / (positives + 2), 1 / (negatives + 2))
+    
+    a, b = 1.0, 0.0
+    for _ in range(iterations):
+        probabilities = _sigmoid(a * logits + b)
+        error = probabilities - targets
+        weights = probabilities * (1 - probabilities)
+        gradient = np.array([(error * logits).sum(), error.sum()])
+        hessian = np.array([
+            [(weights * logits ** 2).sum(), (weights * logits).sum()],
+            [(weights * logits).sum(), weights.sum()],
+        ]) + 1e-9 * np.eye(2)
+        step = np.linalg.solve(hessian, gradient)
+        a, b = a - step[0], b - step[1]
+        if np.abs(step).max() < 1e-8:
+            break
+    
+    return float(a), float(b)
+
+
+def holdout_mask(document_ids: Sequence[str]) -> np.ndarray:
+    """Documents de validation (tirage stable par hachage de l'id)"""
+    return np.array([zlib.crc32(document_id.encode("utf-8")) % HOLDOUT_MODULO == 0 for document_id in document_ids],
+                    dtype=bool)
+
+
+def holdout_metrics(probabilities: np.ndarray, labels: np.ndarray, negative_threshold: float) -> Dict:
+    """Exactitude, log loss et négatifs écartés au seuil du mode gate"""
+    if len(labels) == 0:
+        return {"samples": 0}
+    
+    clipped = np.clip(probabilities, 1e-7, 1 - 1e-7)
+    gated = probabilities < negative_threshold
+    return {
+        "samples": int(len(labels)),
+        "accuracy": round(float(((probabilities >= 0.5) == (labels == 1)).mean()), 4),
+        "log_loss": round(float(-(labels * np.log(clipped) + (1 - labels) * np.log(1 - clipped)).mean()), 4),
+        "gated": int(gated.sum()),
+        "gated_share": round(float(gated.mean()), 4),
+        "missed_applicable": int((labels[gated] == 1).sum()),
+    }
+
+
+@dataclass
+class PreClassifier:
+    """Modèle entraîné pour un profil (poids hachés, biais, échelle de Platt)"""
+    profile_id: str
+    version: int
+    weights: np.ndarray
+    bias: float
+    platt: Tuple[float, float] = (1.0, 0.0)
+    metadata: Dict = field(default_factory=dict)
+    
+    @property
+    def n_features(self) -> int:
+        return len(self.weights)
+    
+    def logits(self, texts: Sequence[str]) -> np.ndarray:
+        return HashedMatrix.from_texts(texts, self.n_features).dot(self.weights) + self.bias
+    
+    def predict_many(self, texts: Sequence[str]) -> np.ndarray:
+        """P(applicable) calibrée de chaque texte"""
+        a, b = self.platt
+        return _sigmoid(a * self.logits(texts) + b)
+    
+    def predict(self, text: str) -> float:
+        return float(self.predict_many([text])[0])
+    
+    def save(self, directory: Path) -> Path:
+        """Écrit <directory>/<profil>/v<version>.npz"""
+        path = Path(directory) / self.profile_id / f"v{self.version}.npz"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            path,
+            weights=self.weights.astype(np.float32),
+            bias=np.float64(self.bias),
+            platt=np.array(self.platt, dtype=np.float64),
+            metadata=np.array(json.dumps(self.metadata, ensure_ascii=False))
+        )
+        return path
+    
+    @classmethod
+    def load(cls, path: Path) -> "PreClassifier":
+        with np.load(path, allow_pickle=False) as archive:
+            metadata = json.loads(str(archive["metadata"]))
+            return cls(
+                profile_id=metadata["profile_id"],
+                version=int(metadata["version"]),
+                weights=archive["weights"].astype(np.float64),
+                bias=float(archive["bias"]),
+                platt=tuple(float(value) for value in archive["platt"]),
+                metadata=metadata
+            )
+
+
+def fit_pre_classifier(
+    profile_id: str,
+    document_ids: Sequence[str],
+    texts: Sequence[str],
+    labels: np.ndarray,
+    version: int = 1,
+    negative_threshold: Optional[float] = None
+) -> PreClassifier:
+    """
+    Entraîne et calibre un modèle (sans accès à la base)
+    
+    Le modèle est appris sur les documents d'entraînement ; l'échelle de Platt
+    et les métriques sont calculées sur les documents de validation. Sans
+    validation exploitable (trop peu de documents ou une seule classe), les
+    probabilités ne sont pas recalibrées.
+    """
+    from src.config import settings
+    
+    threshold = settings.pre_classifier_negative_threshold if negative_threshold is None else negative_threshold
+    labels = np.asarray(labels, dtype=float)
+    matrix = HashedMatrix.from_texts(texts)
+    
+    holdout = holdout_mask(document_ids)
+    held_labels = labels[holdout]
+    calibrated = holdout.sum() >= MIN_HOLDOUT_SAMPLES and 0 < held_labels.sum() < len(held_labels)
+    if not calibrated:
+        holdout = np.zeros(len(labels), dtype=bool)
+    
+    train_rows = np.flatnonzero(~holdout)
+    weights, bias = fit_logistic(matrix.take(train_rows), labels[train_rows])
+    
+    platt = (1.0, 0.0)
+    metrics = {"samples": 0}
+    if calibrated:
+        held = matrix.take(np.flatnonzero(holdout))
+        logits = held.dot(weights) + bias
+        platt = fit_platt(logits, held_labels)
+        metrics = holdout_metrics(_sigmoid(platt[0] * logits + platt[1]), held_labels, threshold)
+    
+    return PreClassifier(
+        profile_id=profile_id,
+        version=version,
+        weights=weights,
+        bias=bias,
+        platt=platt,
+        metadata={
+            "profile_id": profile_id,
+            "version": version,
+            "trained_at": datetime.now(timezone.utc).isoformat(),
+            "hash_bits": int(np.log2(matrix.n_features)),
+            "samples": int(len(labels)),
+            "positives": int(labels.sum()),
+            "train_samples": int(len(train_rows)),
+            "calibrated": bool(calibrated),
+            "negative_threshold": threshold,
+            "holdout": metrics,
+        }
+    )
+
+
+# ============================================================================
+# FICHIERS VERSIONNÉS
+# ============================================================================
+
+def model_versions(profile_id: str, directory: Optional[Path] = None) -> List[int]:
+    """Versions enregistrées pour un profil, par ordre croissant"""
+    from src.config import settings
+    
+    folder = Path(directory or settings.pre_classifier_dir) / profile_id
+    if not folder.is_dir():
+        return []
+    return sorted(int(path.stem[1:]) for path in folder.glob("v*.npz") if path.stem[1:].isdigit())
+
+
+def load_pre_classifier(
+    profile_id: str,
+    version: Optional[int] = None,
+    directory: Optional[Path] = None
+) -> Optional[PreClassifier]:
+    """Modèle d'un profil (défaut: dernière version), None s'il n'y en a pas"""
+    from src.config import settings
+    
+    versions = model_versions(profile_id, directory)
+    if version is None:
+        version = versions[-1] if versions else None
+    if version not in versions:
+        return None
+    return PreClassifier.load(Path(directory or settings.pre_classifier_dir) / profile_id / f"v{version}.npz")
+
+
+# ============================================================================
+# ENTRAÎNEMENT À PARTIR DES ANALYSES STOCKÉES
+# ============================================================================
+
+@dataclass
+class TrainingData:
+    """Documents étiquetés d'un profil"""
+    document_ids: List[str]
+    texts: List[str]
+    labels: np.ndarray
+    human_labels: int = 0
+
+
+def load_training_data(session, profile_id: str) -> TrainingData:
+    """
+    Analyses d'un profil utilisables pour l'entraînement
+    
+    Étiquette humaine si elle existe (voir calibration.human_labels), sinon
+    verdict LLM des analyses dont le niveau 3 a été appelé ; les résultats
+    par défaut de la cascade (niveau 3 sauté ou différé) ne sont pas des
+    verdicts et sont ignorés.
+    """
+    from src.agent_1b.calibration import human_labels
+    from src.storage.models import Document, DocumentProfileAnalysis
+    
+    labels = human_labels(session)
+    rows = session.query(
+        DocumentProfileAnalysis.document_id,
+        DocumentProfileAnalysis.semantic_decision,
+        DocumentProfileAnalysis.semantic_applicable,
+        Document.content
+    )\
+        .join(Document, Document.id == DocumentProfileAnalysis.document_id)\
+        .filter(DocumentProfileAnalysis.company_profile_id == profile_id)\
+        .filter(DocumentProfileAnalysis.status == "analyzed")\
+        .order_by(DocumentProfileAnalysis.document_id)\
+        .all()
+    
+    data = TrainingData(document_ids=[], texts=[], labels=np.zeros(0))
+    values = []
+    for document_id, decision, applicable, content in rows:
+        human = labels.get(document_id, (-1, -1))[0]
+        if not content:
+            continue
+        if human != -1:
+            values.append(human)
+            data.human_labels += 1
+        elif decision == "called" and applicable is not None:
+            values.append(int(applicable))
+        else:
+            continue
+        data.document_ids.append(document_id)
+        data.texts.append(content)
+    
+    data.labels = np.array(values, dtype=float)
+    return data
+
+
+def train_pre_classifier(
+    session,
+    profile_id: str,
+    directory: Optional[Path] = None,
+    min_samples: Optional[int] = None
+) -> Dict:
+    """
+    Entraîne une nouvelle version du modèle d'un profil et l'enregistre
+    
+    Returns:
+        Rapport : status (trained ou skipped), reason, samples, positives,
+        human_labels, version, path, holdout (métriques de validation)
+    """
+    from src.config import settings
+    
+    directory = Path(directory or settings.pre_classifier_dir)
+    min_samples = settings.pre_classifier_min_training_samples if min_samples is None else min_samples
+    data = load_training_data(session, profile_id)
+    
+    report = {
+        "profile_id": profile_id,
+        "samples": len(data.labels),
+        "positives": int(data.labels.sum()),
+        "human_labels": data.human_labels,
+    }
+    if len(data.labels) < min_samples:
+        report.update(status="skipped", reason=f"{len(data.labels)} analyses étiquetées (minimum {min_samples})")
+    elif report["positives"] in (0, len(data.labels)):
+        report.update(status="skipped", reason="Une seule classe dans les analyses étiquetées")
+    
+    if "status" in report:
+        logger.info("pre_classifier_training_skipped", profile_id=profile_id, reason=report["reason"])
+        return report
+    
+    versions = model_versions(profile_id, directory)
+    model = fit_pre_classifier(
+        profile_id, data.document_ids, data.texts, data.labels,
+        version=(versions[-1] + 1) if versions else 1
+    )
+    path = model.save(directory)
+    
+    report.update(status="trained", version=model.version, path=str(path), holdout=model.metadata["holdout"])
+    logger.info(
+        "pre_classifier_trained",
+        profile_id=profile_id,
+        version=model.version,
+        samples=report["samples"],
+        positives=report["positives"],
+        holdout=model.metadata["holdout"]
+    )
+    return report
+
+
+# ============================================================================
+# MODE SHADOW ET GATE
+# ============================================================================
+
+def shadow_agreement(
+    session,
+    profile_id: str,
+    version: int,
+    negative_threshold: Optional[float] = None
+) -> Dict:
+    """
+    Accord entre le modèle et le LLM sur les analyses où les deux ont répondu
+    
+    Returns:
+        comparisons, agreement (même verdict au seuil 0.5), predicted_negatives
+        (P < seuil du gate), negative_precision (part confirmée non
+        applicable par le LLM), missed_applicable
+    """
+    from src.config import settings
+    from src.storage.models import DocumentProfileAnalysis
+    
+    threshold = settings.pre_classifier_negative_threshold if negative_threshold is None else negative_threshold
+    rows = session.query(
+        DocumentProfileAnalysis.pre_classifier_probability,
+        DocumentProfileAnalysis.semantic_applicable
+    )\
+        .filter(DocumentProfileAnalysis.company_profile_id == profile_id)\
+        .filter(DocumentProfileAnalysis.pre_classifier_version == version)\
+        .filter(DocumentProfileAnalysis.semantic_decision == "called")\
+        .filter(DocumentProfileAnalysis.pre_classifier_probability.isnot(None))\
+        .filter(DocumentProfileAnalysis.semantic_applicable.isnot(None))\
+        .all()
+    
+    probabilities = np.array([row[0] for row in rows], dtype=float)
+    applicable = np.array([bool(row[1]) for row in rows], dtype=bool)
+    predicted_negative = probabilities < threshold
+    
+    return {
+        "profile_id": profile_id,
+        "version": version,
+        "comparisons": len(rows),
+        "agreement": round(float(((probabilities >= 0.5) == applicable).mean()), 4) if rows else None,
+        "predicted_negatives": int(predicted_negative.sum()),
+        "negative_precision": (
+            round(float((~applicable[predicted_negative]).mean()), 4) if predicted_negative.any() else None
+        ),
+        "missed_applicable": int(applicable[predicted_negative].sum()),
+    }
+
+
+def gate_allowed(agreement: Dict) -> bool:
+    """Le mode shadow a-t-il assez confirmé les négatifs de ce modèle ?"""
+    from src.config import settings
+    
+    return (
+        agreement["comparisons"] >= settings.pre_classifier_min_shadow_samples
+        and agreement["negative_precision"] is not None
+        and agreement["negative_precision"] >= settings.pre_classifier_min_shadow_precision
+    )
+
+
+class PreClassifierGate:
+    """Pré-classifieur consulté par l'Agent 1B avant l'appel LLM"""
+    
+    def __init__(
+        self,
+        model: PreClassifier,
+        mode: str = "shadow",
+        negative_threshold: Optional[float] = None,
+        approved: bool = False
+    ):
+        """
+        Args:
+            model: Modèle du profil
+            mode: "shadow" ou "gate"
+            negative_threshold: P(applicable) sous laquelle le LLM est sauté
+                (défaut: settings.pre_classifier_negative_threshold)
+            approved: Accord shadow suffisant pour ce modèle (gate_allowed)
+        """
+        from src.config import settings
+        
+        if mode not in PRE_CLASSIFIER_MODES[1:]:
+            raise ValueError(f"Mode de pré-classifieur inconnu: {mode} (attendu: shadow, gate)")
+        
+        self.model = model
+        self.mode = mode
+        self.negative_threshold = (
+            settings.pre_classifier_negative_threshold if negative_threshold is None else negative_threshold
+        )
+        self.approved = approved
+    
+    @property
+    def version(self) -> int:
+        return self.model.version
+    
+    def predict(self, text: str) -> float:
+        return round(self.model.predict(text), 4)
+    
+    def gates(self, probability: float) -> bool:
+        """Le LLM est-il sauté pour cette probabilité ?"""
+        return self.mode == "gate" and self.approved and probability < self.negative_threshold
+    
+    def decision(self, probability: float, decision: CascadeDecision) -> CascadeDecision:
+        """Décision "preclassified" remplaçant un appel LLM"""
+        return CascadeDecision(
+            "preclassified",
+            f"P(applicable) {probability:.3f} < {self.negative_threshold:.3f} (modèle v{self.version})",
+            decision.local_score,
+            decision.min_criticality,
+            decision.max_criticality
+        )
+
+
+def load_pre_classifier_gate(profile_id: str, mode: Optional[str] = None) -> Optional[PreClassifierGate]:
+    """
+    Pré-classifieur d'un profil selon PRE_CLASSIFIER_MODE
+    
+    Returns:
+        None en mode "off" ou sans modèle entraîné pour ce profil. En mode
+        "gate", le modèle n'écarte des documents qu'une fois son accord shadow
+        suffisant (sinon il reste en shadow).
+    """
+    from src.config import settings
+    
+    mode = settings.pre_classifier_mode if mode is None else mode
+    if mode not in PRE_CLASSIFIER_MODES:
+        raise ValueError(f"Mode de pré-classifieur inconnu: {mode} (attendu: {', '.join(PRE_CLASSIFIER_MODES)})")
+    if mode == "off":
+        return None
+    
+    model = load_pre_classifier(profile_id)
+    if model is None:
+        logger.info("pre_classifier_missing", profile_id=profile_id)
+        return None
+    
+    approved = False
+    if mode == "gate":
+        from src.storage.database import get_session
+        
+        session = get_session()
+        try:
+            agreement = shadow_agreement(session, profile_id, model.version)
+            approved = gate_allowed(agreement)
+            logger.info("pre_classifier_gate", approved=approved, **agreement)
+        except Exception as e:
+            logger.warning("pre_classifier_agreement_unavailable", profile_id=profile_id, error=str(e))
+        finally:
+            session.close()
+    
+    return PreClassifierGate(model, mode, approved=approved)
+
+
+def format_training_report(reports: List[Dict]) -> str:
+    """Rapport lisible (terminal) d'un entraînement"""
+    lines = []
+    for report in reports:
+        if report["status"] == "skipped":
+            lines.append(f"{report['profile_id']:<24} ignoré : {report['reason']}")
+            continue
+        holdout = report["holdout"]
+        lines.append(
+            f"{report['profile_id']:<24} v{report['version']}  {report['samples']} analyses "
+            f"({report['positives']} applicables, {report['human_labels']} étiquettes humaines)"
+        )
+        if holdout["samples"]:
+            lines.append(
+                f"  validation : {holdout['samples']} documents, exactitude {holdout['accuracy']:.1%}, "
+                f"log loss {holdout['log_loss']:.3f}, écartés {holdout['gated']} "
+                f"dont {holdout['missed_applicable']} applicables"
+            )
+        else:
+            lines.append("  validation : échantillon insuffisant, probabilités non calibrées")
+    return "\n".join(lines)
+
+
+def format_shadow_report(agreements: List[Dict]) -> str:
+    """Rapport lisible (terminal) de l'accord shadow"""
+    lines = []
+    for agreement in agreements:
+        if not agreement["comparisons"]:
+            lines.append(f"{agreement['profile_id']:<24} v{agreement['version']}  aucune comparaison shadow")
+            continue
+        precision = agreement["negative_precision"]
+        lines.append(
+            f"{agreement['profile_id']:<24} v{agreement['version']}  {agreement['comparisons']} comparaisons, "
+            f"accord {agreement['agreement']:.1%}, négatifs prédits {agreement['predicted_negatives']} "
+            f"(confirmés {'-' if precision is None else f'{precision:.1%}'}, "
+            f"{agreement['missed_applicable']} applicables manqués)  "
+            f"gate {'autorisé' if gate_allowed(agreement) else 'non autorisé'}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,151 @@
+"""
+Priorité d'analyse de l'Agent 1B
+
+Les couples (document, profil) en attente ne sont plus analysés dans l'ordre
+de la requête : chacun reçoit une priorité a priori, calculée sans appel LLM,
+et les workers de FanOutAnalyzer prennent toujours le couple le plus
+prioritaire. Un acte d'exécution CBAM critique n'attend plus derrière
+cinquante FAQ sans rapport.
+
+Composantes (entre 0 et 1, pondérées par PRIORITY_WEIGHTS) :
+
+- score local : niveaux 1-2 pondérés comme dans le score final
+- codes NC critiques trouvés
+- type de document : rangs de l'Agent 1A (FETCH_PRIORITY_DOCUMENT_TYPES pour
+  EUR-Lex, FETCH_PRIORITY_CATEGORIES pour les documents CBAM)
+- source : rangs ANALYSIS_PRIORITY_SOURCES
+- fraîcheur : demi-vie de ANALYSIS_PRIORITY_FRESHNESS_DAYS depuis la
+  publication (à défaut, la collecte)
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+import structlog
+
+from src.agent_1a.tools.fetch_scheduler import DEFAULT_RANK, parse_ranks
+from src.agent_1b.models import KeywordAnalysisResult, NCCodeAnalysisResult
+from src.agent_1b.tools.relevance_scorer import RelevanceScorer
+
+logger = structlog.get_logger()
+
+PRIORITY_WEIGHTS = {
+    "local": 0.5,
+    "critical_codes": 0.15,
+    "document_type": 0.15,
+    "source": 0.05,
+    "freshness": 0.15,
+}
+
+
+def priority_attributes(document) -> Dict:
+    """
+    Attributs d'un Document utiles à la priorité (sans lire son contenu)
+    
+    Returns:
+        Dict document_type, category, source (métadonnées de l'Agent 1A) et
+        published_at
+    """
+    metadata = getattr(document, "extra_metadata", None) or {}
+    return {
+        "document_type": metadata.get("document_type"),
+        "category": metadata.get("category"),
+        "source": metadata.get("source"),
+        "published_at": document.publication_date or document.collection_date,
+    }
+
+
+def _rank_score(rank: int) -> float:
+    """Rang (0 = plus urgent) ramené entre 0 et 1"""
+    return max(0.0, 1 - rank / DEFAULT_RANK)
+
+
+class AnalysisPriority:
+    """Priorité a priori d'un couple (document, profil), plus grand = plus urgent"""
+    
+    def __init__(
+        self,
+        document_type_ranks: Dict[str, int],
+        category_ranks: Dict[str, int],
+        source_ranks: Dict[str, int],
+        freshness_days: float,
+        now: Optional[datetime] = None
+    ):
+        """
+        Args:
+            document_type_ranks: Rang par type d'acte EUR-Lex (clés en minuscules)
+            category_ranks: Rang par catégorie de document CBAM
+            source_ranks: Rang par source (eurlex, cbam_guidance...)
+            freshness_days: Demi-vie de la fraîcheur, en jours
+            now: Date de référence (défaut: maintenant, UTC)
+        """
+        self.document_type_ranks = document_type_ranks
+        self.category_ranks = category_ranks
+        self.source_ranks = source_ranks
+        self.freshness_days = freshness_days
+        # Dates naïves en UTC, comme les colonnes DateTime de la base
+        self.now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+    
+    @classmethod
+    def from_settings(cls) -> "AnalysisPriority":
+        from src.config import settings
+        
+        return cls(
+            document_type_ranks=parse_ranks(settings.fetch_priority_document_types),
+            category_ranks=parse_ranks(settings.fetch_priority_categories),
+            source_ranks=parse_ranks(settings.analysis_priority_sources),
+            freshness_days=settings.analysis_priority_freshness_days
+        )
+    
+    def components(
+        self,
+        document: Dict,
+        keyword_result: KeywordAnalysisResult,
+        nc_code_result: NCCodeAnalysisResult,
+        scorer: RelevanceScorer
+    ) -> Dict[str, float]:
+        """Composantes de la priorité, chacune entre 0 et 1"""
+        local_weight = scorer.keyword_weight + scorer.nc_code_weight
+        local = scorer.local_score(keyword_result.score, nc_code_result.score) / local_weight if local_weight else 0.0
+        
+        if document.get("document_type"):
+            rank = self.document_type_ranks.get(str(document["document_type"]).lower(), DEFAULT_RANK)
+        else:
+            rank = self.category_ranks.get(str(document.get("category") or "other").lower(), DEFAULT_RANK)
+        
+        published_at = document.get("published_at")
+        if published_at is not None and self.freshness_days > 0:
+            age_days = max(0.0, (self.now - published_at).total_seconds() / 86400)
+            freshness = 0.5 ** (age_days / self.freshness_days)
+        else:
+            freshness = 0.0
+        
+        return {
+            "local": min(1.0, local),
+            "critical_codes": 1.0 if nc_code_result.critical_codes else 0.0,
+            "document_type": _rank_score(rank),
+            "source": _rank_score(self.source_ranks.get(str(document.get("source") or "other").lower(), DEFAULT_RANK)),
+            "freshness": freshness,
+        }
+    
+    def score(
+        self,
+        document: Dict,
+        keyword_result: KeywordAnalysisResult,
+        nc_code_result: NCCodeAnalysisResult,
+        scorer: RelevanceScorer
+    ) -> float:
+        """
+        Priorité d'un couple (document, profil)
+        
+        Args:
+            document: Dict du lot (document_type, category, source,
+                published_at, voir priority_attributes ; clés absentes tolérées)
+            keyword_result, nc_code_result: Niveaux 1-2 du profil
+            scorer: Poids du score final du profil
+        
+        Returns:
+            Priorité entre 0 et 1
+        """
+        components = self.components(document, keyword_result, nc_code_result, scorer)
+        return round(sum(PRIORITY_WEIGHTS[name] * value for name, value in components.items()), 6)
@@ -0,0 +1,416 @@
+"""
+Index compilé d'un profil entreprise
+
+Tout ce que l'Agent 1B dérive d'un profil est calculé une seule fois :
+- profil normalisé (format attendu par l'Agent 1B, codes NC à plat)
+- automate des mots-clés normalisés (KeywordFilter)
+- trie des codes NC (NCCodeFilter)
+- ensemble des pays d'opération
+- contexte entreprise du prompt sémantique, prêt à l'emploi
+
+Un index est identifié par le hash du contenu du profil normalisé (et des
+options du filtre mots-clés). Il est gardé en mémoire et sur disque
+(PROFILE_INDEX_DIR) : un autre processus réutilise l'automate déjà compilé.
+Pour une source identifiée (ligne company_profile, fichier JSON), l'index est
+réutilisé sans relire le profil tant que CompanyProfile.updated_at (ou la date
+de modification du fichier) ne change pas.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+import structlog
+
+from src.agent_1b.tools.keyword_filter import KeywordFilter
+from src.agent_1b.tools.nc_code_filter import NCCodeFilter
+from src.agent_1b.tools.semantic_analyzer import SEMANTIC_COMPANY_PROMPT, profile_prompt_inputs
+from src.config import settings
+
+logger = structlog.get_logger()
+
+# À incrémenter quand la compilation change (les index sur disque sont ignorés)
+INDEX_VERSION = "1"
+
+
+@dataclass
+class ProfileIndex:
+    """Profil entreprise compilé pour l'Agent 1B"""
+    
+    content_hash: str
+    profile: Dict
+    keyword_filter: KeywordFilter
+    nc_code_filter: NCCodeFilter
+    countries: FrozenSet[str]
+    prompt_inputs: Dict[str, str]
+    context: str
+    compiled_at_version: str = field(default=INDEX_VERSION)
+    
+    @property
+    def profile_id(self) -> str:
+        return self.profile["company_id"]
+    
+    @property
+    def company_name(self) -> str:
+        return self.profile["company_name"]
+    
+    @classmethod
+    def compile(cls, profile: Dict) -> "ProfileIndex":
+        """
+        Compile un profil (format Agent 1B, voir profile_from_json / profile_from_row)
+        
+        Args:
+            profile: Profil entreprise
+        
+        Returns:
+            ProfileIndex
+        """
+        normalized = normalize_profile(profile)
+        return cls._compile(normalized, profile_hash(normalized))
+    
+    @classmethod
+    def _compile(cls, normalized: Dict, content_hash: str) -> "ProfileIndex":
+        prompt_inputs = profile_prompt_inputs(normalized)
+        return cls(
+            content_hash=content_hash,
+            profile=normalized,
+            keyword_filter=KeywordFilter(normalized.get("keywords", [])),
+            # Codes critiques : pas encore définis dans les profils
+            nc_code_filter=NCCodeFilter(normalized["nc_codes"], critical_codes=[]),
+            countries=frozenset(
+                country.strip() for country in normalized.get("countries", "").split(",") if country.strip()
+            ),
+            prompt_inputs=prompt_inputs,
+            context=SEMANTIC_COMPANY_PROMPT.format(**prompt_inputs)
+        )
+
+
+def flatten_nc_codes(nc_codes: Any) -> List[str]:
+    """
+    Codes NC d'un profil, à plat et sans doublon (ordre du profil)
+    
+    Formats acceptés : liste de codes, {"imports": [...], "exports": [...]}
+    (codes ou dicts avec "code"), ou dict {code: description}.
+    """
+    if isinstance(nc_codes, dict):
+        if "imports" in nc_codes or "exports" in nc_codes:
+            entries = list(nc_codes.get("imports", [])) + list(nc_codes.get("exports", []))
+        else:
+            entries = list(nc_codes.keys())
+    else:
+        entries = list(nc_codes or [])
+    
+    codes = [entry.get("code", "") if isinstance(entry, dict) else str(entry) for entry in entries]
+    return list(dict.fromkeys(code.strip() for code in codes if code and code.strip()))
+
+
+def normalize_profile(profile: Dict) -> Dict:
+    """Profil au format Agent 1B : identifiants renseignés, codes NC à plat, pays en texte"""
+    normalized = dict(profile)
+    normalized["company_id"] = profile.get("company_id") or "unknown"
+    normalized["company_name"] = profile.get("company_name") or "Unknown"
+    normalized["nc_codes"] = flatten_nc_codes(profile.get("nc_codes"))
+    
+    countries = profile.get("countries", "")
+    if isinstance(countries, (list, tuple, set, frozenset)):
+        countries = ", ".join(sorted(countries))
+    normalized["countries"] = countries
+    
+    return normalized
+
+
+def profile_hash(normalized: Dict) -> str:
+    """Hash du contenu du profil normalisé et des options de compilation"""
+    payload = json.dumps(
+        {
+            "version": INDEX_VERSION,
+            "keyword_options": [settings.keyword_word_boundary, settings.keyword_accent_folding],
+            "profile": normalized,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ============================================================================
+# SOURCES DE PROFIL
+# ============================================================================
+
+def profile_from_json(data: Dict) -> Dict:
+    """
+    Profil Agent 1B depuis un profil JSON complet (ex: Hutchinson_SA.json)
+    
+    Args:
+        data: Contenu du fichier JSON
+    
+    Returns:
+        Profil au format Agent 1B
+    """
+    company = data.get("company", {})
+    
+    return {
+        "company_id": company.get("company_id", "HUT-001"),
+        "company_name": company.get("company_name") or data.get("company_name") or "HUTCHINSON",
+        "industry": company.get("industry", {}).get("sector", ""),
+        "products": data.get("products", []),
+        "nc_codes": data.get("nc_codes", {}),
+        "keywords": _keywords_from_json(data),
+        "regulations": _regulations_from_json(data),
+        "countries": _countries_from_json(data)
+    }
+
+
+def profile_from_row(profile) -> Dict:
+    """Profil Agent 1B depuis une ligne company_profile"""
+    return {
+        "company_id": profile.id,
+        "company_name": profile.company_name,
+        "nc_codes": profile.nc_codes or [],
+        "keywords": profile.keywords or [],
+        "regulations": profile.regulations or ["CBAM"],
+        "contact_emails": profile.contact_emails or [],
+        "config": profile.config or {}
+    }
+
+
+def _keywords_from_json(data: Dict) -> List[str]:
+    """Mots-clés du profil, ou générés depuis les produits et l'industrie"""
+    keywords = data.get("keywords", [])
+    
+    if keywords and isinstance(keywords, list):
+        return keywords
+    
+    keywords_set = set()
+    
+    # Depuis produits
+    for product in data.get("products", []):
+        if "caoutchouc" in product.lower() or "rubber" in product.lower():
+            keywords_set.add("caoutchouc")
+        if "aluminium" in product.lower():
+            keywords_set.add("aluminium")
+        if "joint" in product.lower() or "seal" in product.lower():
+            keywords_set.add("étanchéité")
+    
+    # Depuis industry
+    industry = data.get("company", {}).get("industry", {})
+    for segment in industry.get("segments", []):
+        if isinstance(segment, str):
+            words = segment.lower().split()
+            keywords_set.update([w for w in words if len(w) > 4])
+    
+    # Trié : même profil, même index (et même hash)
+    return sorted(keywords_set)[:15]
+
+
+def _regulations_from_json(data: Dict) -> List[str]:
+    """Réglementations suivies"""
+    regulations = []
+    
+    regs_data = data.get("regulations", {})
+    
+    if isinstance(regs_data, dict):
+        for level in ["critical", "high", "medium"]:
+            for reg in regs_data.get(level, []):
+                if isinstance(reg, dict):
+                    name = reg.get("name") or reg.get("full_name", "")
+                    if name:
+                        regulations.append(name)
+                elif reg:
+                    regulations.append(reg)
+    elif isinstance(regs_data, list):
+        regulations = regs_data
+    
+    return regulations or ["CBAM", "EUDR", "CSRD"]
+
+
+def _countries_from_json(data: Dict) -> str:
+    """Pays d'opération (sites et sites de production)"""
+    countries = set()
+    
+    for site in data.get("sites", []):
+        country = site.get("country")
+        if country:
+            countries.add(country)
+    
+    for location in data.get("locations", {}).get("production_sites", []):
+        country = location.get("country")
+        if country:
+            countries.add(country)
+    
+    return ", ".join(sorted(countries)) if countries else "EU, US, IN"
+
+
+# ============================================================================
+# CACHE (MÉMOIRE + DISQUE)
+# ============================================================================
+
+class ProfileIndexCache:
+    """Index compilés, par hash de contenu (mémoire, puis disque)"""
+    
+    def __init__(self, directory: Optional[Path] = None):
+        """
+        Args:
+            directory: Dossier des index sur disque (None: mémoire seulement)
+        """
+        self.directory = Path(directory) if directory else None
+        self._indexes: Dict[str, ProfileIndex] = {}
+        # Source (ex: "company_profile:<id>") -> (updated_at, hash de l'index)
+        self._sources: Dict[str, Tuple[Any, str]] = {}
+        self._lock = threading.Lock()
+        self.compiled = 0
+        self.disk_hits = 0
+    
+    def get(self, profile: Dict) -> ProfileIndex:
+        """Index d'un profil (compilé seulement si son contenu est inconnu)"""
+        normalized = normalize_profile(profile)
+        content_hash = profile_hash(normalized)
+        
+        with self._lock:
+            index = self._indexes.get(content_hash)
+            if index is None:
+                index = self._load(content_hash)
+                if index is None:
+                    index = ProfileIndex._compile(normalized, content_hash)
+                    self.compiled += 1
+                    self._save(index)
+                    logger.info(
+                        "profile_index_compiled",
+                        company=index.company_name,
+                        content_hash=content_hash[:12],
+                        keywords=index.keyword_filter.total_keywords,
+                        nc_codes=len(index.nc_code_filter.company_nc_codes)
+                    )
+                self._indexes[content_hash] = index
+        
+        return index
+    
+    def get_hash(self, content_hash: str) -> Optional[ProfileIndex]:
+        """Index déjà compilé d'un hash (mémoire, puis disque), sans recompilation"""
+        with self._lock:
+            index = self._indexes.get(content_hash) or self._load(content_hash)
+            if index is not None:
+                self._indexes[content_hash] = index
+        return index
+    
+    def get_source(self, source: str, updated_at: Any, loader: Callable[[], Dict]) -> ProfileIndex:
+        """
+        Index d'une source de profil, relue seulement quand updated_at change
+        
+        Args:
+            source: Identifiant stable de la source
+            updated_at: Date de dernière modification de la source
+            loader: Lecture du profil (format Agent 1B)
+        """
+        with self._lock:
+            known = self._sources.get(source)
+            if known is not None and known[0] == updated_at and known[1] in self._indexes:
+                return self._indexes[known[1]]
+        
+        index = self.get(loader())
+        
+        with self._lock:
+            self._sources[source] = (updated_at, index.content_hash)
+        return index
+    
+    def _path(self, content_hash: str) -> Optional[Path]:
+        return self.directory / f"{content_hash}.pkl" if self.directory else None
+    
+    def _load(self, content_hash: str) -> Optional[ProfileIndex]:
+        path = self._path(content_hash)
+        if path is None or not path.exists():
+            return None
+        
+        try:
+            with open(path, "rb") as f:
+                index = pickle.load(f)
+        except Exception as e:
+            logger.warning("profile_index_unreadable", path=str(path), error=str(e))
+            return None
+        
+        if not isinstance(index, ProfileIndex) or index.compiled_at_version != INDEX_VERSION:
+            return None
+        
+        self.disk_hits += 1
+        return index
+    
+    def _save(self, index: ProfileIndex) -> None:
+        path = self._path(index.content_hash)
+        if path is None:
+            return
+        
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, "wb") as f:
+                pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("profile_index_not_saved", path=str(path), error=str(e))
+
+
+_cache: Optional[ProfileIndexCache] = None
+_cache_lock = threading.Lock()
+
+
+def profile_index_cache() -> ProfileIndexCache:
+    """Cache d'index partagé par le processus (disque selon PROFILE_INDEX_DISK_CACHE)"""
+    global _cache
+    
+    with _cache_lock:
+        if _cache is None:
+            _cache = ProfileIndexCache(settings.profile_index_dir if settings.profile_index_disk_cache else None)
+        return _cache
+
+
+def reset_profile_indexes() -> None:
+    """Oublie les index en mémoire (ex: entre deux tests, après un changement de réglages)"""
+    global _cache
+    
+    with _cache_lock:
+        _cache = None
+
+
+def get_profile_index(profile: Dict) -> ProfileIndex:
+    """Index d'un profil au format Agent 1B"""
+    return profile_index_cache().get(profile)
+
+
+def previous_profile_index(content_hash: str) -> Optional[ProfileIndex]:
+    """
+    Index d'une version antérieure d'un profil (diff après modification)
+    
+    Returns:
+        ProfileIndex, ou None s'il n'est plus en mémoire ni sur disque
+    """
+    return profile_index_cache().get_hash(content_hash)
+
+
+def load_profile_index(path: str) -> ProfileIndex:
+    """
+    Index d'un profil JSON complet (relu seulement si le fichier a changé)
+    
+    Args:
+        path: Chemin du fichier (ex: data/company_profiles/Hutchinson_SA.json)
+    """
+    def read() -> Dict:
+        logger.info("loading_company_profile", path=path)
+        with open(path, "r", encoding="utf-8") as f:
+            return profile_from_json(json.load(f))
+    
+    return profile_index_cache().get_source(f"file:{os.path.abspath(path)}", os.stat(path).st_mtime_ns, read)
+
+
+def profile_index_for_row(profile) -> ProfileIndex:
+    """Index d'une ligne company_profile (recompilé quand updated_at change)"""
+    return profile_index_cache().get_source(
+        f"company_profile:{profile.id}",
+        profile.updated_at,
+        lambda: profile_from_row(profile)
+    )
@@ -0,0 +1,416 @@
+"""
+Re-scoring incrémental après modification d'un profil entreprise
+
+Chaque analyse enregistre le hash du profil compilé qui l'a produite
+(document_profile_analyses.profile_hash). Quand un profil change (mots-clés,
+codes NC...), ses analyses faites avec une version antérieure sont reprises
+sans tout ré-analyser :
+
+1. diff entre l'index précédent (cache des ProfileIndex, mémoire puis disque)
+   et l'index actuel : mots-clés et codes NC ajoutés ou retirés
+2. documents candidats d'après leurs caractéristiques (document_features) :
+   un mot-clé ancien ou nouveau trouvé (le score mots-clés dépend du nombre
+   total de mots-clés du profil), un code NC trouvé si les codes ont changé
+3. niveaux 1-2 des candidats recalculés depuis les caractéristiques, puis
+   score final et criticité avec le score sémantique enregistré (même
+   arithmétique que le re-scoring, voir src/agent_1b/rescoring.py)
+4. ré-analyse LLM des seuls documents dont les niveaux 1-2 ont changé et dont
+   la criticité dépend encore du LLM (bornes différentes pour un score
+   sémantique de 0 ou 1, comme la cascade) : statut "stale", le couple est
+   repris au prochain run comme un couple en attente
+
+Le texte n'est relu que pour chercher les mots-clés ajoutés (une fois par
+document, l'enregistrement complété est sauvegardé). Sans index précédent
+(cache désactivé ou purgé), les niveaux 1-2 de toutes les analyses du profil
+sont recalculés. Les analyses antérieures au suivi des versions (profile_hash
+vide) sont rattachées à la version actuelle sans changement.
+"""
+
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+import structlog
+
+from src.agent_1b.features import covers, extend_features, featurize, is_current
+from src.agent_1b.models import DocumentFeatures
+from src.agent_1b.profile_index import ProfileIndex, previous_profile_index
+from src.agent_1b.rescoring import CRITICALITY_LEVELS, MAX_REPORTED_CHANGES, llm_dependent, score_arrays
+from src.agent_1b.tools.relevance_scorer import RelevanceScorer
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class ProfileDiff:
+    """Différences entre la version d'un profil qui a produit des analyses et la version actuelle"""
+    
+    profile_id: str
+    old_hash: str
+    new_hash: str
+    previous_known: bool
+    added_keywords: List[str] = field(default_factory=list)
+    removed_keywords: List[str] = field(default_factory=list)
+    added_nc_codes: List[str] = field(default_factory=list)
+    removed_nc_codes: List[str] = field(default_factory=list)
+    context_changed: bool = False
+    
+    @property
+    def keywords_changed(self) -> bool:
+        """Niveau 1 à recalculer (toujours sans index précédent)"""
+        return not self.previous_known or bool(self.added_keywords or self.removed_keywords)
+    
+    @property
+    def nc_codes_changed(self) -> bool:
+        """Niveau 2 à recalculer (toujours sans index précédent)"""
+        return not self.previous_known or bool(self.added_nc_codes or self.removed_nc_codes)
+    
+    def as_dict(self) -> Dict:
+        return {
+            "old_hash": self.old_hash[:12],
+            "previous_known": self.previous_known,
+            "added_keywords": self.added_keywords,
+            "removed_keywords": self.removed_keywords,
+            "added_nc_codes": self.added_nc_codes,
+            "removed_nc_codes": self.removed_nc_codes,
+            "context_changed": self.context_changed,
+        }
+
+
+def diff_profiles(old: Optional[ProfileIndex], new: ProfileIndex, old_hash: str) -> ProfileDiff:
+    """
+    Diff de deux versions compilées d'un profil
+    
+    Args:
+        old: Index de la version précédente (None s'il n'est plus disponible)
+        new: Index actuel
+        old_hash: Hash de la version précédente
+    
+    Returns:
+        ProfileDiff (mots-clés normalisés, codes NC normalisés)
+    """
+    if old is None:
+        return ProfileDiff(new.profile_id, old_hash, new.content_hash, previous_known=False)
+    
+    old_keywords, new_keywords = old.keyword_filter.keywords, new.keyword_filter.keywords
+    old_codes, new_codes = old.nc_code_filter.company_nc_codes, new.nc_code_filter.company_nc_codes
+    
+    return ProfileDiff(
+        profile_id=new.profile_id,
+        old_hash=old_hash,
+        new_hash=new.content_hash,
+        previous_known=True,
+        added_keywords=[keyword for keyword in new_keywords if keyword not in set(old_keywords)],
+        removed_keywords=[keyword for keyword in old_keywords if keyword not in set(new_keywords)],
+        added_nc_codes=[code for code in new_codes if code not in set(old_codes)],
+        removed_nc_codes=[code for code in old_codes if code not in set(new_codes)],
+        context_changed=old.context != new.context
+    )
+
+
+def cover_edit(
+    features: DocumentFeatures,
+    diff: ProfileDiff,
+    new_index: ProfileIndex,
+    load_content
+) -> bool:
+    """
+    Étend à la version actuelle du profil des caractéristiques qui ne la couvrent pas
+    
+    Sans mot-clé ajouté, les mots-clés du profil ont tous été cherchés pour
+    l'ancienne version : la couverture est reportée sans relire le texte.
+    
+    Args:
+        features: Caractéristiques à jour du document (modifiées sur place)
+        diff: Diff du profil
+        new_index: Index actuel
+        load_content: Lecture du texte complet du document
+    
+    Returns:
+        True si le texte a été relu
+    """
+    if diff.previous_known and diff.old_hash in features.profile_hashes and not diff.added_keywords:
+        features.profile_hashes.append(new_index.content_hash)
+        return False
+    
+    extend_features(features, load_content(), [new_index])
+    return True
+
+
+def is_candidate(features: DocumentFeatures, diff: ProfileDiff, old: Optional[ProfileIndex], new: ProfileIndex) -> bool:
+    """Les niveaux 1-2 du document peuvent-ils avoir changé avec le profil ?"""
+    if not diff.previous_known:
+        return True
+    
+    if diff.keywords_changed:
+        watched = set(old.keyword_filter.keywords) | set(new.keyword_filter.keywords)
+        if any(keyword in features.keyword_hits for keyword in watched):
+            return True
+    
+    return diff.nc_codes_changed and bool(features.nc_codes)
+
+
+def rescore_edit(
+    rows: List,
+    features: Dict[str, DocumentFeatures],
+    diff: ProfileDiff,
+    old: Optional[ProfileIndex],
+    new: ProfileIndex,
+    scorer: RelevanceScorer
+) -> Dict:
+    """
+    Re-score des analyses faites avec une même version antérieure du profil
+    
+    Args:
+        rows: Tuples de DocumentProfileRepository.outdated() (même profile_hash)
+        features: Caractéristiques des documents, couvrant la version actuelle
+        diff: Diff du profil
+        old, new: Index précédent (ou None) et actuel
+        scorer: Poids et seuils
+    
+    Returns:
+        Rapport : analyses, candidats, modifiées (niveaux 1-2), ré-analyses,
+        transitions de criticité, lignes à mettre à jour (updates), détail
+        des changements
+    """
+    report = {
+        "analyses": len(rows), "candidates": 0, "touched": 0, "reanalysis": 0, "unscored": 0,
+        "transitions": Counter(), "updates": [], "changes": [],
+    }
+    touched = []
+    
+    for row in rows:
+        (row_id, document_id, _, keyword_score, nc_code_score, semantic_score,
+         applicable, critical, old_score, old_criticality, old_relevant) = row
+        document_features = features.get(document_id)
+        
+        if None in (keyword_score, nc_code_score, semantic_score) or document_features is None:
+            report["unscored"] += 1
+        elif is_candidate(document_features, diff, old, new):
+            report["candidates"] += 1
+            hits = {keyword: (hit.count, hit.context) for keyword, hit in document_features.keyword_hits.items()}
+            keyword_result = new.keyword_filter.score_hits(hits)
+            nc_code_result = new.nc_code_filter.score_codes(
+                None, list(document_features.nc_codes), document_features.nc_codes
+            )
+            has_critical_codes = bool(nc_code_result.critical_codes)
+            
+            if not (
+                np.isclose(keyword_result.score, keyword_score)
+                and np.isclose(nc_code_result.score, nc_code_score)
+                and has_critical_codes == bool(critical)
+            ):
+                touched.append((row, keyword_result.score, nc_code_result.score, has_critical_codes))
+                continue
+        
+        report["updates"].append({"id": row_id, "profile_hash": new.content_hash})
+    
+    if not touched:
+        return report
+    
+    keyword_scores = np.asarray([entry[1] for entry in touched], dtype=float)
+    nc_code_scores = np.asarray([entry[2] for entry in touched], dtype=float)
+    has_critical_codes = np.asarray([entry[3] for entry in touched])
+    semantic_scores = np.asarray([entry[0][5] for entry in touched], dtype=float)
+    applicable = np.asarray([bool(entry[0][6]) for entry in touched])
+    
+    result = score_arrays(keyword_scores, nc_code_scores, semantic_scores, has_critical_codes, applicable, scorer)
+    
+    reanalysis = llm_dependent(keyword_scores, nc_code_scores, has_critical_codes, scorer)
+    
+    report["touched"] = len(touched)
+    report["reanalysis"] = int(reanalysis.sum())
+    
+    for i, (row, keyword_score, nc_code_score, critical) in enumerate(touched):
+        new_criticality = CRITICALITY_LEVELS[result["criticality"][i]].value
+        report["updates"].append({
+            "id": row[0],
+            "profile_hash": new.content_hash,
+            "status": "stale" if reanalysis[i] else "analyzed",
+            "keyword_score": float(keyword_score),
+            "nc_code_score": float(nc_code_score),
+            "has_critical_codes": bool(critical),
+            "relevance_score": float(result["final_score"][i]),
+            "criticality": new_criticality,
+            "is_relevant": bool(result["is_relevant"][i]),
+        })
+        if new_criticality != row[9]:
+            report["transitions"][f"{row[9]} -> {new_criticality}"] += 1
+        if len(report["changes"]) < MAX_REPORTED_CHANGES:
+            report["changes"].append({
+                "document_id": row[1],
+                "old_score": row[8],
+                "new_score": float(result["final_score"][i]),
+                "old_criticality": row[9],
+                "new_criticality": new_criticality,
+                "reanalysis": bool(reanalysis[i]),
+            })
+    
+    return report
+
+
+def rescore_profile_edits(
+    session,
+    profile_index: ProfileIndex,
+    scorer: Optional[RelevanceScorer] = None,
+    apply: bool = False
+) -> Dict:
+    """
+    Reprend les analyses d'un profil faites avec une version antérieure
+    
+    Args:
+        session: Session SQLAlchemy
+        profile_index: Version actuelle du profil
+        scorer: Poids et seuils (défaut: Settings)
+        apply: Écrire scores, versions et statuts "stale" (défaut: essai à blanc)
+    
+    Returns:
+        Rapport : corpus (analyses du profil), outdated, baselined (sans
+        version), candidats, modifiées, ré-analyses, documents relus, diffs,
+        transitions, détail des changements, applied
+    """
+    from sqlalchemy.orm import defer
+    
+    from src.storage.document_feature_repository import DocumentFeatureRepository
+    from src.storage.document_profile_repository import DocumentProfileRepository
+    from src.storage.models import Document
+    
+    scorer = scorer or RelevanceScorer.from_settings()
+    states = DocumentProfileRepository(session)
+    rows = states.outdated(profile_index.profile_id, profile_index.content_hash)
+    
+    report = {
+        "profile_id": profile_index.profile_id,
+        "company_name": profile_index.company_name,
+        "corpus": states.count_analyzed(profile_index.profile_id),
+        "outdated": len(rows),
+        "baselined": 0, "candidates": 0, "touched": 0, "reanalysis": 0, "unscored": 0,
+        "documents_scanned": 0, "diffs": [], "transitions": Counter(), "changes": [], "applied": apply,
+    }
+    updates = []
+    
+    by_hash: Dict[Optional[str], List] = {}
+    for row in rows:
+        by_hash.setdefault(row[2], []).append(row)
+    
+    # Analyses antérieures au suivi des versions : rattachées à la version actuelle
+    for row in by_hash.pop(None, []):
+        updates.append({"id": row[0], "profile_hash": profile_index.content_hash})
+        report["baselined"] += 1
+    
+    feature_repository = DocumentFeatureRepository(session)
+    for old_hash, hash_rows in by_hash.items():
+        old = previous_profile_index(old_hash)
+        diff = diff_profiles(old, profile_index, old_hash)
+        report["diffs"].append(diff.as_dict())
+        
+        # Caractéristiques à jour et couvrant la version actuelle (texte relu si
+        # besoin), pour les seules analyses dont les scores par niveau sont connus
+        document_ids = [row[1] for row in hash_rows if None not in row[3:6]]
+        stored = feature_repository.get_many(document_ids)
+        documents = session.query(Document)\
+            .options(defer(Document.content))\
+            .filter(Document.id.in_(document_ids))\
+            .all()
+        features = {}
+        for doc in documents:
+            current = stored.get(doc.id)
+            if not is_current(current, doc.hash_sha256):
+                current = featurize(doc.content or "", [profile_index], content_hash=doc.hash_sha256)
+                report["documents_scanned"] += 1
+            elif covers(current, profile_index):
+                features[doc.id] = current
+                continue
+            elif cover_edit(current, diff, profile_index, lambda doc=doc: doc.content or ""):
+                report["documents_scanned"] += 1
+            
+            if apply:
+                feature_repository.save(doc.id, current)
+            features[doc.id] = current
+        
+        edit = rescore_edit(hash_rows, features, diff, old, profile_index, scorer)
+        updates.extend(edit["updates"])
+        for key in ("candidates", "touched", "reanalysis", "unscored"):
+            report[key] += edit[key]
+        report["transitions"].update(edit["transitions"])
+        report["changes"].extend(edit["changes"][:MAX_REPORTED_CHANGES - len(report["changes"])])
+    
+    report["transitions"] = dict(sorted(report["transitions"].items()))
+    
+    if apply:
+        # Une requête groupée par jeu de colonnes
+        columns = {}
+        for update_row in updates:
+            columns.setdefault(tuple(sorted(update_row)), []).append(update_row)
+        for grouped in columns.values():
+            states.update_scores(grouped)
+        session.commit()
+    
+    logger.info(
+        "profile_edits_rescored",
+        profile_id=profile_index.profile_id,
+        corpus=report["corpus"],
+        outdated=report["outdated"],
+        touched=report["touched"],
+        reanalysis=report["reanalysis"],
+        documents_scanned=report["documents_scanned"],
+        applied=apply
+    )
+    return report
+
+
+def format_profile_edit_report(reports: List[Dict], max_rows: int = 20) -> str:
+    """Rapport lisible (terminal) du re-scoring incrémental des profils"""
+    lines = []
+    
+    for report in reports:
+        lines.append(f"{report['company_name']} ({report['profile_id']})")
+        if not report["outdated"]:
+            lines.append("  Analyses à jour : profil inchangé.")
+            continue
+        
+        for diff in report["diffs"]:
+            if not diff["previous_known"]:
+                lines.append(f"  Version {diff['old_hash']} inconnue du cache : niveaux 1-2 recalculés pour toutes ses analyses")
+                continue
+            for label, key in (
+                ("Mots-clés ajoutés", "added_keywords"),
+                ("Mots-clés retirés", "removed_keywords"),
+                ("Codes NC ajoutés", "added_nc_codes"),
+                ("Codes NC retirés", "removed_nc_codes"),
+            ):
+                if diff[key]:
+                    lines.append(f"  {label} : {', '.join(diff[key])}")
+            if diff["context_changed"]:
+                lines.append("  Contexte du prompt modifié (sans effet sur les niveaux 1-2)")
+        
+        lines.append(
+            f"  Documents touchés : {report['touched']} sur {report['corpus']} analyses du profil "
+            f"({report['candidates']} candidats, {report['documents_scanned']} textes relus)"
+        )
+        lines.append(f"  Ré-analyses LLM : {report['reanalysis']} (criticité encore dépendante du LLM)")
+        if report["baselined"] or report["unscored"]:
+            lines.append(
+                f"  Sans re-scoring : {report['baselined']} analyses sans version (rattachées), "
+                f"{report['unscored']} sans scores par niveau"
+            )
+        
+        if report["transitions"]:
+            lines.append("  Changements de criticité :")
+            lines.extend(f"    {transition:<30} {count:>6}" for transition, count in report["transitions"].items())
+        for change in report["changes"][:max_rows]:
+            old_score = "-" if change["old_score"] is None else f"{change['old_score']:.3f}"
+            lines.append(
+                f"    {change['document_id'][:8]} {old_score} -> {change['new_score']:.3f}  "
+                f"{change['old_criticality']} -> {change['new_criticality']}"
+                + ("  (ré-analyse)" if change["reanalysis"] else "")
+            )
+        if len(report["changes"]) > max_rows:
+            lines.append(f"    ... {len(report['changes']) - max_rows} autres")
+    
+    if reports and all(report["applied"] for report in reports):
+        lines.append("Modifications écrites en base.")
+    elif reports:
+        lines.append("Essai à blanc : rien n'a été écrit (--apply pour appliquer).")
+    return "\n".join(lines)
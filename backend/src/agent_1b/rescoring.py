@@ -0,0 +1,292 @@
+"""
+Re-scoring des analyses stockées, sans appel LLM
+
+Le score final et la criticité ne dépendent que des trois scores par niveau
+(enregistrés dans document_profile_analyses), des facteurs de boost (codes NC
+critiques, applicabilité LLM) et des poids et seuils du RelevanceScorer.
+Après un changement de KEYWORD_WEIGHT, CRITICAL_THRESHOLD, etc., toutes les
+analyses sont recalculées en un seul passage vectorisé (NumPy), avec la même
+arithmétique que RelevanceScorer.calculate_score et criticality_for_score,
+puis les lignes modifiées sont mises à jour en une requête groupée. Une
+analyse faite sans appel LLM dont la criticité dépend désormais du LLM est
+marquée "stale" pour être ré-analysée.
+
+Par défaut le re-scoring est un essai à blanc : le rapport liste les analyses
+qui changent de criticité ou de pertinence, sans rien écrire.
+"""
+
+from collections import Counter
+from typing import Dict, List, Optional
+
+import numpy as np
+import structlog
+
+from src.agent_1b.models import Criticality
+from src.agent_1b.tools.relevance_scorer import RelevanceScorer
+
+logger = structlog.get_logger()
+
+# Criticités par rang croissant (indices du tableau renvoyé par score_arrays)
+CRITICALITY_LEVELS = [
+    Criticality.NOT_RELEVANT,
+    Criticality.LOW,
+    Criticality.MEDIUM,
+    Criticality.HIGH,
+    Criticality.CRITICAL,
+]
+
+# Au-delà, le rapport ne détaille pas chaque analyse modifiée (compteurs seulement)
+MAX_REPORTED_CHANGES = 1000
+
+
+def round_scores(values: np.ndarray) -> np.ndarray:
+    """
+    Arrondi à 3 décimales de round() (celui de calculate_score), élément par élément
+    
+    np.round multiplie par 1000 avant d'arrondir : sur les valeurs proches
+    d'une demi-unité (ex: 0.0005), il ne donne pas toujours le même résultat.
+    """
+    return np.fromiter((round(value, 3) for value in values.tolist()), dtype=float, count=values.size)
+
+
+def score_arrays(
+    keyword_scores: np.ndarray,
+    nc_code_scores: np.ndarray,
+    semantic_scores: np.ndarray,
+    has_critical_codes: np.ndarray,
+    semantic_applicable: np.ndarray,
+    scorer: RelevanceScorer
+) -> Dict[str, np.ndarray]:
+    """
+    Score final, criticité et pertinence de N analyses en un passage
+    
+    Args:
+        keyword_scores, nc_code_scores, semantic_scores: Scores par niveau (N,)
+        has_critical_codes: Codes NC critiques trouvés (N,) booléens
+        semantic_applicable: Applicable selon le LLM (N,) booléens
+        scorer: Poids et seuils à appliquer
+    
+    Returns:
+        Dict final_score (N,), criticality (N,) indices de CRITICALITY_LEVELS,
+        is_relevant (N,)
+    """
+    # Même ordre d'opérations et même arrondi que calculate_score (résultats identiques au bit près)
+    final_scores = round_scores(
+        keyword_scores * scorer.keyword_weight
+        + nc_code_scores * scorer.nc_code_weight
+        + semantic_scores * scorer.semantic_weight
+    )
+    
+    thresholds = scorer.thresholds
+    criticality = np.select(
+        [
+            final_scores >= thresholds["critical"],
+            final_scores >= thresholds["high"],
+            final_scores >= thresholds["medium"],
+            final_scores >= thresholds["low"],
+        ],
+        [4, 3, 2, 1],
+        default=0
+    )
+    
+    # Boosts de criticality_for_score
+    high_applicability = semantic_applicable & (semantic_scores > 0.7)
+    criticality = np.where(has_critical_codes & (criticality == 3), 4, criticality)
+    criticality = np.where(high_applicability & (criticality == 2), 3, criticality)
+    
+    return {
+        "final_score": final_scores,
+        "criticality": criticality,
+        "is_relevant": final_scores >= thresholds["low"],
+    }
+
+
+def llm_dependent(
+    keyword_scores: np.ndarray,
+    nc_code_scores: np.ndarray,
+    has_critical_codes: np.ndarray,
+    scorer: RelevanceScorer
+) -> np.ndarray:
+    """
+    Analyses dont la criticité dépend encore du LLM : bornes score sémantique
+    0 (non applicable) et 1 (applicable) différentes, comme criticality_bounds
+    
+    Returns:
+        (N,) booléens
+    """
+    zeros, ones = np.zeros(len(keyword_scores)), np.ones(len(keyword_scores))
+    low = score_arrays(keyword_scores, nc_code_scores, zeros, has_critical_codes, zeros.astype(bool), scorer)
+    high = score_arrays(keyword_scores, nc_code_scores, ones, has_critical_codes, ones.astype(bool), scorer)
+    return low["criticality"] != high["criticality"]
+
+
+def rescore_rows(rows: List, scorer: RelevanceScorer) -> Dict:
+    """
+    Recalcule des analyses stockées et compare au résultat enregistré
+    
+    Sans appel LLM (cascade, pré-classifieur), le score sémantique enregistré
+    est un 0 de remplacement : l'analyse n'est recalculée que si sa criticité
+    ne dépend toujours pas du LLM, sinon elle est marquée "stale" (ré-analyse
+    au prochain run).
+    
+    Args:
+        rows: Tuples de DocumentProfileRepository.scored()
+        scorer: Poids et seuils à appliquer
+    
+    Returns:
+        Rapport : analyses, changements (lignes à mettre à jour), ré-analyses,
+        transitions de criticité ("HIGH -> CRITICAL": n), bascules de pertinence
+    """
+    if not rows:
+        return {
+            "analyses": 0, "changed": 0, "reanalysis": 0, "updates": [], "transitions": {},
+            "relevance_flips": 0, "changes": [],
+        }
+    
+    (ids, document_ids, profile_ids, keyword, nc_code, semantic, applicable,
+     critical, old_scores, old_criticality, old_relevant, decisions) = zip(*rows, strict=True)
+    
+    keyword = np.asarray(keyword, dtype=float)
+    nc_code = np.asarray(nc_code, dtype=float)
+    critical = np.asarray([bool(value) for value in critical])
+    result = score_arrays(
+        keyword,
+        nc_code,
+        np.asarray(semantic, dtype=float),
+        critical,
+        np.asarray([bool(value) for value in applicable]),
+        scorer
+    )
+    
+    # Analyses antérieures à la cascade (decision None) : LLM toujours appelé
+    placeholder = np.asarray([decision not in (None, "called") for decision in decisions])
+    reanalysis = placeholder & llm_dependent(keyword, nc_code, critical, scorer)
+    
+    rank = {level.value: index for index, level in enumerate(CRITICALITY_LEVELS)}
+    old_rank = np.asarray([rank.get(value, -1) for value in old_criticality])
+    old_scores = np.asarray([np.nan if value is None else value for value in old_scores], dtype=float)
+    old_relevant = np.asarray([bool(value) for value in old_relevant])
+    
+    changed = (
+        (result["criticality"] != old_rank)
+        | (result["is_relevant"] != old_relevant)
+        | ~np.isclose(result["final_score"], old_scores)
+        | reanalysis
+    )
+    bucket_changed = result["criticality"] != old_rank
+    
+    updates = []
+    changes = []
+    transitions = Counter()
+    for i in np.flatnonzero(changed):
+        new_criticality = CRITICALITY_LEVELS[result["criticality"][i]].value
+        updates.append({
+            "id": ids[i],
+            "status": "stale" if reanalysis[i] else "analyzed",
+            "relevance_score": float(result["final_score"][i]),
+            "criticality": new_criticality,
+            "is_relevant": bool(result["is_relevant"][i]),
+        })
+        if bucket_changed[i]:
+            transitions[f"{old_criticality[i]} -> {new_criticality}"] += 1
+        # Détail des changements de criticité ou de pertinence (pas des seuls écarts de score)
+        if (
+            bucket_changed[i] or result["is_relevant"][i] != old_relevant[i] or reanalysis[i]
+        ) and len(changes) < MAX_REPORTED_CHANGES:
+            changes.append({
+                "document_id": document_ids[i],
+                "company_profile_id": profile_ids[i],
+                "old_score": None if np.isnan(old_scores[i]) else float(old_scores[i]),
+                "new_score": float(result["final_score"][i]),
+                "old_criticality": old_criticality[i],
+                "new_criticality": new_criticality,
+                "old_is_relevant": bool(old_relevant[i]),
+                "new_is_relevant": bool(result["is_relevant"][i]),
+                "reanalysis": bool(reanalysis[i]),
+            })
+    
+    return {
+        "analyses": len(rows),
+        "changed": len(updates),
+        "reanalysis": int(reanalysis.sum()),
+        "updates": updates,
+        "transitions": dict(sorted(transitions.items())),
+        "relevance_flips": int((result["is_relevant"] != old_relevant).sum()),
+        "changes": changes,
+    }
+
+
+def rescore_stored_analyses(
+    session,
+    scorer: Optional[RelevanceScorer] = None,
+    apply: bool = False
+) -> Dict:
+    """
+    Re-score toutes les analyses stockées avec les poids et seuils actuels
+    
+    Args:
+        session: Session SQLAlchemy
+        scorer: Poids et seuils (défaut: Settings)
+        apply: Écrire les nouveaux scores (défaut: essai à blanc)
+    
+    Returns:
+        Rapport de rescore_rows, plus unscored (analyses sans scores par
+        niveau, non recalculables) et applied
+    """
+    from src.storage.document_profile_repository import DocumentProfileRepository
+    
+    scorer = scorer or RelevanceScorer.from_settings()
+    repository = DocumentProfileRepository(session)
+    
+    report = rescore_rows(repository.scored(), scorer)
+    report["unscored"] = repository.count_unscored()
+    report["applied"] = apply
+    
+    if apply:
+        repository.update_scores(report["updates"])
+        session.commit()
+    
+    logger.info(
+        "analyses_rescored",
+        analyses=report["analyses"],
+        changed=report["changed"],
+        bucket_changes=sum(report["transitions"].values()),
+        relevance_flips=report["relevance_flips"],
+        reanalysis=report["reanalysis"],
+        unscored=report["unscored"],
+        applied=report["applied"]
+    )
+    return report
+
+
+def format_rescore_report(report: Dict, max_rows: int = 20) -> str:
+    """Rapport lisible (terminal) d'un re-scoring"""
+    lines = [
+        f"Analyses re-scorées : {report['analyses']} ({report['unscored']} sans scores par niveau, ignorées)",
+        f"Analyses modifiées : {report['changed']} (pertinence inversée : {report['relevance_flips']})",
+    ]
+    if report["reanalysis"]:
+        lines.append(
+            f"Ré-analyses LLM : {report['reanalysis']} (LLM non appelé, la criticité dépend désormais du LLM)"
+        )
+    
+    if report["transitions"]:
+        lines.append("Changements de criticité :")
+        lines.extend(f"  {transition:<30} {count:>6}" for transition, count in report["transitions"].items())
+    
+    for change in report["changes"][:max_rows]:
+        old_score = "-" if change["old_score"] is None else f"{change['old_score']:.3f}"
+        lines.append(
+            f"  {change['document_id'][:8]} / {change['company_profile_id'][:12]:<12} "
+            f"{old_score} -> {change['new_score']:.3f}  "
+            f"{change['old_criticality']} -> {change['new_criticality']}"
+            + ("  (ré-analyse)" if change["reanalysis"] else "")
+        )
+    if len(report["changes"]) > max_rows:
+        lines.append(f"  ... {len(report['changes']) - max_rows} autres")
+    
+    if report["applied"]:
+        lines.append("Modifications écrites en base.")
+    else:
+        lines.append("Essai à blanc : rien n'a été écrit (--apply pour appliquer).")
+    return "\n".join(lines)
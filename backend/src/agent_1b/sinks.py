@@ -0,0 +1,225 @@
+"""
+Destinations des analyses d'un run Agent 1B
+
+FanOutAnalyzer remet chaque analyse terminée à une liste de destinations :
+
+- DatabaseSink : unité de travail sur une seule session (analyse, état du
+  couple document/profil, statut du document), commits groupés toutes les
+  `commit_every` analyses ; prévient les autres destinations à chaque commit
+  ou rollback
+- JsonlSink : une ligne JSON par analyse (ou échec), écrite une fois son
+  enregistrement en base commité
+- RichSink : affichage Rich de chaque analyse (optionnel, coûteux en lot)
+"""
+
+import json
+import structlog
+from pathlib import Path
+from typing import Dict, List, Optional, TextIO
+
+from src.agent_1b.models import DocumentAnalysis
+
+logger = structlog.get_logger()
+
+
+class AnalysisSink:
+    """Destination des analyses d'un run"""
+    
+    def write(self, document: Dict, profile_id: str, analysis: DocumentAnalysis) -> None:
+        raise NotImplementedError
+    
+    def error(self, document: Dict, profile_id: str, error: Exception) -> None:
+        """Échec de l'analyse d'un couple (ignoré par défaut)"""
+    
+    def close(self) -> None:
+        """Fin du run (écritures en attente)"""
+    
+    def committed(self) -> None:
+        """Écritures précédentes commitées en base"""
+    
+    def rolled_back(self) -> None:
+        """Écritures non commitées annulées en base (couples repris au run suivant)"""
+
+
+class DatabaseSink(AnalysisSink):
+    """
+    Enregistrement des analyses en base sur une seule session
+    
+    Les écritures non commitées au moment d'un échec d'écriture sont perdues
+    (rollback) : leurs couples restent en attente pour le run suivant.
+    """
+    
+    def __init__(
+        self,
+        session,
+        documents: Dict,
+        pending: Dict[str, List[str]],
+        commit_every: int = 1,
+        listeners: Optional[List[AnalysisSink]] = None
+    ):
+        """
+        Args:
+            session: Session SQLAlchemy du run
+            documents: Document (ORM) par ID
+            pending: Profils en attente par ID de document
+            commit_every: Écritures par commit (1: commit à chaque analyse)
+            listeners: Destinations prévenues des commits et rollbacks
+        """
+        from src.storage.analysis_repository import AnalysisRepository
+        from src.storage.document_profile_repository import DocumentProfileRepository
+        
+        self.session = session
+        self.documents = documents
+        self.remaining = {document_id: len(profile_ids) for document_id, profile_ids in pending.items()}
+        self.commit_every = max(1, commit_every)
+        self.listeners = list(listeners or [])
+        self.analyses = AnalysisRepository(session)
+        self.states = DocumentProfileRepository(session)
+        self.saved = 0
+        self.lost = 0
+        self.commits = 0
+        # Écritures de la transaction en cours (ID de document des analyses, None pour un échec)
+        self._uncommitted: List[Optional[str]] = []
+    
+    def write(self, document: Dict, profile_id: str, analysis: DocumentAnalysis) -> None:
+        document_id = document["document_id"]
+        
+        try:
+            self.analyses.save_from_document_analysis(analysis, document_id, commit=False, update_document=False)
+            
+            # Le document est analysé quand tous ses profils en attente le sont
+            self.states.mark_analyzed(document_id, profile_id, analysis)
+            if self.remaining[document_id] == 1:
+                doc = self.documents[document_id]
+                doc.workflow_status = "analyzed"
+                doc.analyzed_at = analysis.analysis_timestamp
+            self.session.flush()
+        except Exception:
+            self._rollback()
+            raise
+        
+        self.remaining[document_id] -= 1
+        self._uncommitted.append(document_id)
+        self._commit_if_due()
+    
+    def error(self, document: Dict, profile_id: str, error: Exception) -> None:
+        """Échec conservé : le couple sera repris au prochain run"""
+        try:
+            self.states.mark_error(document["document_id"], profile_id, str(error))
+            self.session.flush()
+        except Exception:
+            self._rollback()
+            raise
+        
+        self._uncommitted.append(None)
+        self._commit_if_due()
+    
+    def commit(self) -> None:
+        if not self._uncommitted:
+            return
+        try:
+            self.session.commit()
+        except Exception:
+            self._rollback()
+            raise
+        
+        self.commits += 1
+        self.saved += sum(1 for document_id in self._uncommitted if document_id is not None)
+        self._uncommitted = []
+        for listener in self.listeners:
+            listener.committed()
+    
+    def close(self) -> None:
+        self.commit()
+    
+    def _commit_if_due(self) -> None:
+        if len(self._uncommitted) >= self.commit_every:
+            self.commit()
+    
+    def _rollback(self) -> None:
+        """Écriture échouée : les écritures non commitées sont perdues"""
+        self.session.rollback()
+        lost = [document_id for document_id in self._uncommitted if document_id is not None]
+        for document_id in lost:
+            self.remaining[document_id] += 1
+        self.lost += len(lost)
+        self._uncommitted = []
+        logger.warning("analysis_sink_rolled_back", lost=len(lost))
+        for listener in self.listeners:
+            listener.rolled_back()
+
+
+class JsonlSink(AnalysisSink):
+    """
+    Une ligne JSON par couple analysé (status analyzed ou error)
+    
+    Les lignes sont écrites au commit de leurs écritures en base (ou à la fin
+    du run) : une analyse annulée par un rollback n'apparaît pas dans le
+    fichier, son couple sera repris au run suivant.
+    """
+    
+    def __init__(self, stream: TextIO, owns_stream: bool = False):
+        """
+        Args:
+            stream: Flux texte de destination
+            owns_stream: Fermer le flux à la fin du run
+        """
+        self.stream = stream
+        self.owns_stream = owns_stream
+        self.lines = 0
+        self.discarded = 0
+        # Lignes dont l'enregistrement en base n'est pas encore commité
+        self._pending: List[Dict] = []
+    
+    @classmethod
+    def open(cls, path: Path) -> "JsonlSink":
+        """Fichier JSONL, ajout en fin de fichier (la sortie standard reçoit les logs)"""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        return cls(open(path, "a", encoding="utf-8"), owns_stream=True)
+    
+    def write(self, document: Dict, profile_id: str, analysis: DocumentAnalysis) -> None:
+        self._write_line({
+            "status": "analyzed",
+            "document_id": document["document_id"],
+            "company_profile_id": profile_id,
+            "analysis": analysis.model_dump(mode="json"),
+        })
+    
+    def error(self, document: Dict, profile_id: str, error: Exception) -> None:
+        self._write_line({
+            "status": "error",
+            "document_id": document["document_id"],
+            "company_profile_id": profile_id,
+            "error": str(error),
+        })
+    
+    def committed(self) -> None:
+        for record in self._pending:
+            self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.stream.flush()
+        self.lines += len(self._pending)
+        self._pending = []
+    
+    def rolled_back(self) -> None:
+        self.discarded += len(self._pending)
+        self._pending = []
+    
+    def close(self) -> None:
+        self.committed()
+        if self.owns_stream:
+            self.stream.close()
+    
+    def _write_line(self, record: Dict) -> None:
+        self._pending.append(record)
+
+
+class RichSink(AnalysisSink):
+    """Affichage Rich de chaque analyse (panneaux et tableaux)"""
+    
+    def __init__(self):
+        from src.agent_1b.display import display_document_analysis
+        
+        self._display = display_document_analysis
+    
+    def write(self, document: Dict, profile_id: str, analysis: DocumentAnalysis) -> None:
+        self._display(analysis)
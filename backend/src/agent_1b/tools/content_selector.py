@@ -0,0 +1,237 @@
+"""
+Sélection des passages pertinents d'un document long (avant l'appel LLM)
+
+Au lieu de garder le début et la fin d'un règlement (70% / 30% du budget),
+le document est découpé en sections (articles, annexes, considérants), puis
+chaque section est classée localement par BM25 contre les termes du profil
+entreprise : mots-clés, codes NC (toutes graphies : "4016.93", "4016 93",
+"401693") et vocabulaire réglementaire. Les sections les mieux classées sont
+retenues jusqu'au budget, puis remises dans l'ordre du document ; les
+passages omis sont signalés avec leur taille.
+
+La première section (titre, références de l'acte) est toujours conservée.
+"""
+
+import math
+import re
+import structlog
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+from src.agent_1b.tools.keyword_filter import normalize_text
+
+logger = structlog.get_logger()
+
+# Estimation tokens <-> caractères utilisée pour les budgets
+CHARS_PER_TOKEN = 4
+
+# Taille cible d'une section
+DEFAULT_CHUNK_CHARS = 2000
+
+# Début de section : article, annexe, chapitre, titre, section, considérant "(12)"
+_SECTION_START = re.compile(
+    r"^[ \t]*(?:(?:article|annex|annexe|chapter|chapitre|title|titre|section)\b|\(\d+\)[ \t])",
+    re.IGNORECASE | re.MULTILINE
+)
+
+_WORD = re.compile(r"[^\W\d_]{3,}")
+_CODE = re.compile(r"(?<!\d)\d{4}(?:[ .]?\d{2}){0,3}(?!\d)")
+
+# Vocabulaire des obligations réglementaires (poids faible)
+REGULATION_TERMS = [
+    "obligation", "obligations", "declaration", "declarant", "importer", "importers",
+    "import", "export", "goods", "scope", "apply", "applies", "annex", "penalty",
+    "penalties", "reporting", "report", "deadline", "emissions", "authorised",
+    "déclaration", "déclarant", "importateur", "marchandises", "annexe", "sanction",
+    "champ", "application", "échéance",
+]
+
+# Poids des termes de requête par origine
+TERM_WEIGHTS = {"nc_code": 2.0, "keyword": 1.0, "regulation": 0.5}
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Termes d'un texte : mots (minuscules, sans accents) et codes NC
+    
+    Un code NC produit sa forme compacte et ses préfixes à 4 et 6 chiffres,
+    pour que "4016.93.00", "4016 93" et "4016" se rejoignent.
+    """
+    normalized = normalize_text(text)[0]
+    tokens = _WORD.findall(normalized)
+    
+    for match in _CODE.finditer(normalized):
+        digits = re.sub(r"\D", "", match.group())
+        tokens.append(digits)
+        if len(digits) > 4:
+            tokens.append(digits[:4])
+        if len(digits) > 6:
+            tokens.append(digits[:6])
+    
+    return tokens
+
+
+def split_sections(text: str, max_chars: int = DEFAULT_CHUNK_CHARS) -> List[Tuple[int, int]]:
+    """
+    Découpe un texte en sections contiguës
+    
+    Args:
+        text: Texte complet
+        max_chars: Taille maximale d'une section
+    
+    Returns:
+        Positions (début, fin) couvrant tout le texte, dans l'ordre
+    """
+    boundaries = sorted({0, len(text), *(match.start() for match in _SECTION_START.finditer(text))})
+    
+    # Sections trop longues : coupure au dernier saut de ligne avant la limite
+    pieces = []
+    for start, end in zip(boundaries[:-1], boundaries[1:], strict=True):
+        while end - start > max_chars:
+            cut = text.rfind("\n", start + max_chars // 2, start + max_chars)
+            cut = cut + 1 if cut != -1 else start + max_chars
+            pieces.append((start, cut))
+            start = cut
+        pieces.append((start, end))
+    
+    # Sections courtes consécutives (considérants, alinéas) regroupées
+    spans: List[Tuple[int, int]] = []
+    for start, end in pieces:
+        if spans and end - spans[-1][0] <= max_chars:
+            spans[-1] = (spans[-1][0], end)
+        else:
+            spans.append((start, end))
+    
+    return spans
+
+
+def bm25_scores(
+    documents: List[List[str]],
+    query: Dict[str, float],
+    k1: float = 1.5,
+    b: float = 0.75
+) -> List[float]:
+    """
+    Scores BM25 de chaque section pour une requête pondérée
+    
+    Args:
+        documents: Termes de chaque section
+        query: {terme: poids}
+        k1: Saturation de la fréquence des termes
+        b: Normalisation par la longueur de la section
+    
+    Returns:
+        Score de chaque section (même ordre)
+    """
+    count = len(documents)
+    if count == 0:
+        return []
+    
+    average_length = sum(len(terms) for terms in documents) / count or 1.0
+    frequencies = [Counter(terms) for terms in documents]
+    document_frequency = Counter(term for terms in frequencies for term in terms if term in query)
+    
+    scores = []
+    for terms, frequency in zip(documents, frequencies, strict=True):
+        norm = k1 * (1 - b + b * len(terms) / average_length)
+        score = 0.0
+        for term, weight in query.items():
+            tf = frequency.get(term)
+            if not tf:
+                continue
+            df = document_frequency[term]
+            idf = math.log(1 + (count - df + 0.5) / (df + 0.5))
+            score += weight * idf * tf * (k1 + 1) / (tf + norm)
+        scores.append(score)
+    
+    return scores
+
+
+def build_query(
+    keywords: Iterable[str] = (),
+    nc_codes: Iterable[str] = (),
+    extra_terms: Iterable[str] = ()
+) -> Dict[str, float]:
+    """
+    Requête pondérée à partir du profil entreprise
+    
+    Args:
+        keywords: Mots-clés (et produits) du profil
+        nc_codes: Codes NC du profil
+        extra_terms: Termes supplémentaires (ex: type de réglementation)
+    
+    Returns:
+        {terme: poids}
+    """
+    query: Dict[str, float] = {}
+    
+    def add(texts: Iterable[str], weight: float) -> None:
+        for text in texts:
+            for term in tokenize(str(text)):
+                query[term] = max(query.get(term, 0.0), weight)
+    
+    add(REGULATION_TERMS, TERM_WEIGHTS["regulation"])
+    add(extra_terms, TERM_WEIGHTS["keyword"])
+    add(keywords, TERM_WEIGHTS["keyword"])
+    add(nc_codes, TERM_WEIGHTS["nc_code"])
+    
+    return query
+
+
+def select_passages(
+    text: str,
+    query: Dict[str, float],
+    max_chars: int,
+    chunk_chars: int = DEFAULT_CHUNK_CHARS
+) -> str:
+    """
+    Extrait les sections les plus pertinentes dans un budget de caractères
+    
+    Args:
+        text: Texte complet
+        query: Requête pondérée (voir build_query)
+        max_chars: Budget de l'extrait
+        chunk_chars: Taille cible des sections
+    
+    Returns:
+        Sections retenues dans l'ordre du document, passages omis signalés
+    """
+    if len(text) <= max_chars:
+        return text
+    
+    spans = split_sections(text, min(chunk_chars, max_chars))
+    scores = bm25_scores([tokenize(text[start:end]) for start, end in spans], query)
+    
+    # Première section toujours gardée, puis par score décroissant (à score
+    # égal, dans l'ordre du document)
+    ranking = [0] + sorted(range(1, len(spans)), key=lambda index: (-scores[index], index))
+    
+    selected = []
+    used = 0
+    for index in ranking:
+        start, end = spans[index]
+        length = end - start + 40  # Marqueur de passage omis
+        if used + length > max_chars:
+            continue
+        selected.append(index)
+        used += length
+    
+    parts = []
+    position = 0
+    for index in sorted(selected):
+        start, end = spans[index]
+        if start > position:
+            parts.append(f"[... {start - position} caractères omis ...]")
+        parts.append(text[start:end].strip())
+        position = end
+    if position < len(text):
+        parts.append(f"[... {len(text) - position} caractères omis ...]")
+    
+    logger.info(
+        "content_passages_selected",
+        sections=len(spans),
+        selected=len(selected),
+        top_score=round(max(scores), 2) if scores else 0.0
+    )
+    
+    return "\n\n".join(parts)
@@ -2,26 +2,188 @@
 Filtre Niveau 1 - Analyse par mots-clés
 
 Scanne le document pour trouver les mots-clés du profil entreprise.
+
+Les mots-clés sont compilés une seule fois (par profil) en un automate :
+un trie des mots-clés normalisés, traduit en une unique expression régulière
+que le moteur `re` parcourt en C à chaque position du texte. Un seul passage
+sur le document suffit pour obtenir toutes les occurrences (y compris les
+mots-clés imbriqués, ex: "carbon" dans "carbon border"), leur nombre et le
+contexte de la première occurrence.
+
+Options :
+- word_boundary : pas de correspondance à l'intérieur d'un mot ("joint" ne
+  correspond plus à "jointly")
+- accent_folding : "etancheite" correspond à "étanchéité"
 """
 
 import re
+import unicodedata
 import structlog
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from src.agent_1b.models import KeywordAnalysisResult
 
 logger = structlog.get_logger()
 
+_WORD_CHAR = re.compile(r"\w")
+_NON_ASCII = re.compile(r"[^\x00-\x7f]")
+
+
+def normalize_text(text: str, accent_folding: bool = True) -> Tuple[str, Optional[List[int]]]:
+    """
+    Passe le texte en minuscules (et retire les accents si demandé)
+    
+    Args:
+        text: Texte original
+        accent_folding: Retirer les diacritiques
+    
+    Returns:
+        Tuple (texte normalisé, table de correspondance position normalisée ->
+        position originale ; None quand les positions sont identiques)
+    """
+    if text.isascii():
+        return text.lower(), None
+    
+    # Seuls les caractères non ASCII (peu nombreux) passent par la table,
+    # construite sur l'alphabet du document et non sur le document lui-même
+    table = {}
+    for char in set(_NON_ASCII.findall(text)):
+        folded = char.lower()
+        if accent_folding:
+            folded = "".join(c for c in unicodedata.normalize("NFD", folded) if not unicodedata.combining(c))
+        table[char] = folded
+    
+    normalized = _NON_ASCII.sub(lambda match: table[match.group()], text).lower()
+    
+    if all(len(folded) == 1 for folded in table.values()):
+        return normalized, None
+    
+    # Certains caractères changent de longueur (ex: "İ", ligatures) : conserver
+    # la position d'origine de chaque caractère normalisé
+    offsets = []
+    for index, char in enumerate(text):
+        offsets.extend([index] * len(table.get(char, char)))
+    
+    return normalized, offsets
+
+
+class KeywordAutomaton:
+    """
+    Automate multi-motifs compilé une fois pour une liste de mots-clés
+    
+    Trouve en un seul passage toutes les occurrences de tous les mots-clés.
+    """
+    
+    def __init__(self, keywords: List[str], word_boundary: bool = True, accent_folding: bool = True):
+        """
+        Args:
+            keywords: Mots-clés (tels qu'ils seront rapportés)
+            word_boundary: N'accepter que des mots entiers
+            accent_folding: Ignorer les accents
+        """
+        self.word_boundary = word_boundary
+        self.accent_folding = accent_folding
+        
+        # Forme normalisée -> mots-clés rapportés (plusieurs si doublons après normalisation)
+        self.keywords_by_form: Dict[str, List[str]] = {}
+        for keyword in dict.fromkeys(keywords):
+            form = normalize_text(keyword, accent_folding)[0]
+            if form:
+                self.keywords_by_form.setdefault(form, []).append(keyword)
+        
+        # Mots-clés préfixes d'un autre : trouvés à la même position que le plus
+        # long. Chaque forme correspond donc à une liste (longueur, mots-clés)
+        forms = list(self.keywords_by_form)
+        self.matches_by_form: Dict[str, List[Tuple[int, List[str]]]] = {
+            form: [
+                (len(prefix), self.keywords_by_form[prefix]) for prefix in forms
+                if form.startswith(prefix)
+                and (prefix == form or not (word_boundary and _WORD_CHAR.match(form[len(prefix)])))
+            ]
+            for form in forms
+        }
+        
+        self.pattern = self._compile(forms) if forms else None
+    
+    def _compile(self, forms: List[str]) -> "re.Pattern":
+        trie: Dict = {}
+        for form in forms:
+            node = trie
+            for char in form:
+                node = node.setdefault(char, {})
+            node[""] = True
+        
+        def to_regex(node: Dict) -> str:
+            branches = [re.escape(char) + to_regex(child) for char, child in sorted(node.items()) if char]
+            if not branches:
+                return ""
+            if len(branches) == 1 and "" not in node:
+                return branches[0]
+            # Quantificateur gourmand : le mot-clé le plus long est essayé en premier
+            return "(?:" + "|".join(branches) + ")" + ("?" if "" in node else "")
+        
+        trie_regex = to_regex(trie)
+        
+        # Lookahead de largeur nulle : une tentative à chaque position, donc
+        # aussi les occurrences qui se chevauchent
+        if self.word_boundary:
+            return re.compile(rf"(?<!\w)(?=({trie_regex})(?!\w))")
+        return re.compile(rf"(?=({trie_regex}))")
+    
+    def find_all(self, text: str) -> Dict[str, List[Tuple[int, int]]]:
+        """
+        Trouve toutes les occurrences des mots-clés
+        
+        Args:
+            text: Texte original
+        
+        Returns:
+            Dict {mot-clé: [(début, fin), ...]} (positions dans le texte original)
+        """
+        occurrences: Dict[str, List[Tuple[int, int]]] = {}
+        
+        if self.pattern is None or not text:
+            return occurrences
+        
+        normalized, offsets = normalize_text(text, self.accent_folding)
+        
+        for match in self.pattern.finditer(normalized):
+            start = match.start(1)
+            
+            for length, keywords in self.matches_by_form[match.group(1)]:
+                if offsets is not None:
+                    span = (offsets[start], offsets[start + length - 1] + 1)
+                else:
+                    span = (start, start + length)
+                for keyword in keywords:
+                    occurrences.setdefault(keyword, []).append(span)
+        
+        return occurrences
+
 
 class KeywordFilter:
     """Filtre de pertinence basé sur les mots-clés métier"""
     
-    def __init__(self, keywords: List[str]):
+    def __init__(
+        self,
+        keywords: List[str],
+        word_boundary: Optional[bool] = None,
+        accent_folding: Optional[bool] = None
+    ):
         """
         Args:
             keywords: Liste des mots-clés du profil entreprise
+            word_boundary: Mots entiers uniquement (défaut: settings.keyword_word_boundary)
+            accent_folding: Ignorer les accents (défaut: settings.keyword_accent_folding)
         """
+        from src.config import settings
+        
         self.keywords = [k.lower().strip() for k in keywords]
         self.total_keywords = len(self.keywords)
+        self.automaton = KeywordAutomaton(
+            self.keywords,
+            word_boundary=settings.keyword_word_boundary if word_boundary is None else word_boundary,
+            accent_folding=settings.keyword_accent_folding if accent_folding is None else accent_folding
+        )
     
     def analyze(self, document_text: str) -> KeywordAnalysisResult:
         """
@@ -29,25 +191,55 @@ class KeywordFilter:
         
         Args:
             document_text: Texte complet du document
-            
+        
         Returns:
             KeywordAnalysisResult avec score et détails
         """
         logger.info("keyword_filter_started", total_keywords=self.total_keywords)
         
-        document_lower = document_text.lower()
+        # Un seul passage sur le document pour tous les mots-clés
+        return self.score_occurrences(document_text, self.automaton.find_all(document_text))
+    
+    def score_occurrences(
+        self,
+        document_text: str,
+        occurrences: Dict[str, List[Tuple[int, int]]]
+    ) -> KeywordAnalysisResult:
+        """
+        Score du profil à partir d'occurrences déjà trouvées
+        
+        Les occurrences peuvent venir d'un automate partagé par plusieurs
+        profils (voir src/agent_1b/fan_out.py) : seuls les mots-clés de ce
+        filtre sont retenus.
+        
+        Args:
+            document_text: Texte complet du document
+            occurrences: {mot-clé: [(début, fin), ...]} (voir KeywordAutomaton.find_all)
+        
+        Returns:
+            KeywordAnalysisResult avec score et détails
+        """
+        # Contexte (100 caractères avant/après) de la première occurrence
+        return self.score_hits({
+            keyword: (len(occurrences[keyword]), self._extract_context(document_text, *occurrences[keyword][0]))
+            for keyword in self.keywords if keyword in occurrences
+        })
+    
+    def score_hits(self, hits: Dict[str, Tuple[int, str]]) -> KeywordAnalysisResult:
+        """
+        Score du profil à partir d'occurrences déjà comptées, sans le texte
         
-        keywords_found = []
-        context_snippets = {}
+        Les occurrences peuvent venir de l'enregistrement de caractéristiques
+        du document, calculé à la collecte (voir src/agent_1b/features.py).
         
-        for keyword in self.keywords:
-            # Recherche case-insensitive
-            if keyword in document_lower:
-                keywords_found.append(keyword)
-                
-                # Extraire le contexte (100 caractères avant/après)
-                context = self._extract_context(document_text, keyword)
-                context_snippets[keyword] = context
+        Args:
+            hits: {mot-clé: (nombre d'occurrences, contexte de la première)}
+        
+        Returns:
+            KeywordAnalysisResult avec score et détails
+        """
+        # Ordre du profil
+        keywords_found = [k for k in self.keywords if k in hits]
         
         # Calculer le score
         if self.total_keywords == 0:
@@ -72,32 +264,31 @@ class KeywordFilter:
             keywords_found=keywords_found,
             total_keywords_searched=self.total_keywords,
             keyword_density=keyword_density,
-            context_snippets=context_snippets
+            context_snippets={keyword: hits[keyword][1] for keyword in keywords_found},
+            occurrences={keyword: hits[keyword][0] for keyword in keywords_found}
         )
     
-    def _extract_context(self, text: str, keyword: str, chars_before: int = 100, chars_after: int = 100) -> str:
+    @staticmethod
+    def _extract_context(
+        text: str,
+        start_pos: int,
+        end_pos: int,
+        chars_before: int = 100,
+        chars_after: int = 100
+    ) -> str:
         """
-        Extrait le contexte autour du mot-clé
+        Extrait le contexte autour d'une occurrence
         
         Args:
             text: Texte complet
-            keyword: Mot-clé à chercher
+            start_pos: Début de l'occurrence
+            end_pos: Fin de l'occurrence
             chars_before: Caractères avant le mot-clé
             chars_after: Caractères après le mot-clé
-            
+        
         Returns:
             Contexte autour du mot-clé
         """
-        # Recherche case-insensitive
-        pattern = re.compile(re.escape(keyword), re.IGNORECASE)
-        match = pattern.search(text)
-        
-        if not match:
-            return ""
-        
-        start_pos = match.start()
-        end_pos = match.end()
-        
         # Extraire le contexte
         context_start = max(0, start_pos - chars_before)
         context_end = min(len(text), end_pos + chars_after)
@@ -117,10 +308,13 @@ def analyze_keywords(document_text: str, company_keywords: List[str]) -> Keyword
     """
     Fonction helper pour analyser les mots-clés
     
+    Pour plusieurs documents d'un même profil, préférer une instance de
+    KeywordFilter réutilisée (l'automate n'est compilé qu'une fois).
+    
     Args:
         document_text: Texte du document à analyser
         company_keywords: Liste des mots-clés du profil entreprise
-        
+    
     Returns:
         KeywordAnalysisResult
     """
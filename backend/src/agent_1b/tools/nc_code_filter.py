@@ -2,16 +2,71 @@
 Filtre Niveau 2 - Analyse par codes NC/SH
 
 Détecte les codes NC (nomenclature combinée) dans le document.
+
+Les codes du profil (et les codes critiques) sont compilés une fois en un trie
+de chiffres : la correspondance exacte ou partielle (préfixe dans un sens ou
+dans l'autre, ex: 4001 vs 4001.22) d'un code du document se résout en
+O(longueur du code), quel que soit le nombre de codes du profil.
 """
 
 import re
 import structlog
-from typing import List, Dict, Set
+from typing import List, Dict, Optional
 from src.agent_1b.models import NCCodeAnalysisResult
 
 logger = structlog.get_logger()
 
 
+class NCCodeTrie:
+    """Trie des codes NC (sans les points) pour les correspondances par préfixe"""
+    
+    # Clé marquant la fin d'un code dans un noeud
+    _END = ""
+    
+    def __init__(self, codes: List[str]):
+        self.root: Dict = {}
+        self.size = 0
+        
+        for code in codes:
+            node = self.root
+            for digit in code.replace('.', ''):
+                node = node.setdefault(digit, {})
+            node[self._END] = True
+            self.size += 1
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def matches(self, code: str) -> bool:
+        """
+        Vérifie si un code correspond partiellement à un code du trie
+        
+        Même sémantique que NCCodeFilter._is_partial_match : l'un des deux
+        codes (sans les points) est préfixe de l'autre.
+        
+        Args:
+            code: Code NC normalisé
+        
+        Returns:
+            True si un code du trie est préfixe du code, ou le code préfixe
+            d'un code du trie
+        """
+        if not self.size:
+            return False
+        
+        node = self.root
+        for digit in code.replace('.', ''):
+            # Un code du trie est préfixe du code cherché
+            if self._END in node:
+                return True
+            node = node.get(digit)
+            if node is None:
+                return False
+        
+        # Code entièrement parcouru : il est préfixe (ou égal) d'un code du trie
+        return True
+
+
 class NCCodeFilter:
     """Filtre de pertinence basé sur les codes NC/SH douaniers"""
     
@@ -27,6 +82,12 @@ class NCCodeFilter:
         self.company_nc_codes = [self._normalize_code(code) for code in company_nc_codes]
         self.critical_codes = [self._normalize_code(code) for code in (critical_codes or [])]
         
+        # Index compilés une fois par profil
+        self._company_code_set = set(self.company_nc_codes)
+        self._company_trie = NCCodeTrie(self.company_nc_codes)
+        self._critical_code_set = set(self.critical_codes)
+        self._critical_trie = NCCodeTrie(self.critical_codes)
+        
     def analyze(self, document_text: str) -> NCCodeAnalysisResult:
         """
         Analyse le document pour trouver les codes NC
@@ -44,6 +105,29 @@ class NCCodeFilter:
         
         logger.debug("nc_codes_extracted", count=len(document_codes))
         
+        return self.score_codes(document_text, document_codes)
+    
+    def score_codes(
+        self,
+        document_text: Optional[str],
+        document_codes: List[str],
+        code_contexts: Optional[Dict[str, str]] = None
+    ) -> NCCodeAnalysisResult:
+        """
+        Score du profil à partir des codes NC déjà extraits du document
+        
+        L'extraction ne dépend pas du profil : elle est faite une fois par
+        document quand plusieurs profils sont analysés (voir src/agent_1b/fan_out.py),
+        ou dès la collecte (voir src/agent_1b/features.py).
+        
+        Args:
+            document_text: Texte complet du document (inutile si code_contexts)
+            document_codes: Codes NC normalisés du document (voir extract_codes)
+            code_contexts: Contextes déjà extraits par code (voir extract_contexts)
+            
+        Returns:
+            NCCodeAnalysisResult avec score et détails
+        """
         # Comparer avec les codes de l'entreprise
         exact_matches = []
         partial_matches = []
@@ -54,27 +138,24 @@ class NCCodeFilter:
             is_match = False
             
             # Vérifier correspondance exacte
-            if doc_code in self.company_nc_codes:
+            if doc_code in self._company_code_set:
                 exact_matches.append(doc_code)
                 is_match = True
-            else:
-                # Vérifier correspondance partielle (ex: 4001 vs 4001.22)
-                for company_code in self.company_nc_codes:
-                    if self._is_partial_match(doc_code, company_code):
-                        partial_matches.append(doc_code)
-                        is_match = True
-                        break
+            elif self._company_trie.matches(doc_code):
+                # Correspondance partielle (ex: 4001 vs 4001.22)
+                partial_matches.append(doc_code)
+                is_match = True
             
             # Vérifier si code critique
-            if doc_code in self.critical_codes or any(
-                self._is_partial_match(doc_code, crit) for crit in self.critical_codes
-            ):
+            if doc_code in self._critical_code_set or self._critical_trie.matches(doc_code):
                 critical_codes_found.append(doc_code)
             
             # Extraire contexte pour les codes matchés
             if is_match:
-                context = self._extract_context(document_text, doc_code)
-                context_snippets[doc_code] = context
+                if code_contexts is not None:
+                    context_snippets[doc_code] = code_contexts.get(doc_code, "")
+                else:
+                    context_snippets[doc_code] = self._extract_context(document_text, doc_code)
         
         # Calculer le score
         nc_codes_found = list(set(exact_matches + partial_matches))
@@ -97,14 +178,20 @@ class NCCodeFilter:
             context_snippets=context_snippets
         )
     
-    def _extract_nc_codes(self, text: str) -> List[str]:
-        """Extrait tous les codes NC du texte"""
-        matches = self.NC_CODE_PATTERN.findall(text)
+    @classmethod
+    def extract_codes(cls, text: str) -> List[str]:
+        """Extrait tous les codes NC du texte (indépendant du profil)"""
+        matches = cls.NC_CODE_PATTERN.findall(text)
         # Normaliser et dédupliquer
-        codes = list(set(self._normalize_code(code) for code in matches))
+        codes = list(set(cls._normalize_code(code) for code in matches))
         return codes
     
-    def _normalize_code(self, code: str) -> str:
+    def _extract_nc_codes(self, text: str) -> List[str]:
+        """Extrait tous les codes NC du texte"""
+        return self.extract_codes(text)
+    
+    @staticmethod
+    def _normalize_code(code: str) -> str:
         """Normalise un code NC (enlever espaces, formater)"""
         return code.strip().replace(' ', '')
     
@@ -113,14 +200,14 @@ class NCCodeFilter:
         Vérifie si deux codes correspondent partiellement
         Ex: 4001 vs 4001.22 -> True
         """
-        # Le plus court code doit être le préfixe du plus long
-        shorter = min(code1, code2, key=len)
-        longer = max(code1, code2, key=len)
-        
         # Enlever les points pour comparaison
-        shorter_clean = shorter.replace('.', '')
-        longer_clean = longer.replace('.', '')
+        # (à longueur égale, min() et max() renvoyaient tous deux code1 : deux
+        # codes de même longueur étaient toujours considérés comme correspondants)
+        shorter_clean, longer_clean = sorted(
+            (code1.replace('.', ''), code2.replace('.', '')), key=len
+        )
         
+        # Le plus court code doit être le préfixe du plus long
         return longer_clean.startswith(shorter_clean)
     
     def _calculate_score(self, exact_matches: List[str], partial_matches: List[str], critical_codes: List[str]) -> float:
@@ -152,17 +239,21 @@ class NCCodeFilter:
         
         return normalized_score
     
-    def _extract_context(self, text: str, code: str, chars_before: int = 150, chars_after: int = 150) -> str:
+    @classmethod
+    def extract_contexts(cls, text: str, document_codes: List[str]) -> Dict[str, str]:
+        """Contexte de chaque code NC du document, indépendant du profil"""
+        return {code: cls._extract_context(text, code) for code in document_codes}
+    
+    @staticmethod
+    def _extract_context(text: str, code: str, chars_before: int = 150, chars_after: int = 150) -> str:
         """Extrait le contexte autour d'un code NC"""
-        # Chercher le code avec le pattern
-        pattern = re.compile(re.escape(code))
-        match = pattern.search(text)
+        # Chercher la première occurrence du code
+        start_pos = text.find(code)
         
-        if not match:
+        if start_pos == -1:
             return ""
         
-        start_pos = match.start()
-        end_pos = match.end()
+        end_pos = start_pos + len(code)
         
         context_start = max(0, start_pos - chars_before)
         context_end = min(len(text), end_pos + chars_after)
@@ -6,7 +6,7 @@ Combine les résultats des 3 filtres pour produire un score final.
 
 import structlog
 import uuid
-from typing import Dict, List
+from typing import Dict, List, Tuple
 from datetime import datetime
 
 from src.agent_1b.models import (
@@ -52,6 +52,23 @@ class RelevanceScorer:
             "low": 0.20
         }
     
+    @classmethod
+    def from_settings(cls) -> "RelevanceScorer":
+        """Scorer configuré par les poids et seuils de Settings"""
+        from src.config import settings
+        
+        return cls(
+            keyword_weight=settings.keyword_weight,
+            nc_code_weight=settings.nc_code_weight,
+            semantic_weight=settings.llm_semantic_weight,
+            thresholds={
+                "critical": settings.critical_threshold,
+                "high": settings.high_threshold,
+                "medium": settings.medium_threshold,
+                "low": settings.low_threshold
+            }
+        )
+    
     def calculate_score(
         self,
         keyword_result: KeywordAnalysisResult,
@@ -124,6 +141,22 @@ class RelevanceScorer:
         # Boost si très applicable selon LLM
         high_applicability = semantic_result.is_applicable and semantic_result.score > 0.7
         
+        return self.criticality_for_score(score, has_critical_codes, high_applicability)
+    
+    def criticality_for_score(
+        self,
+        score: float,
+        has_critical_codes: bool = False,
+        high_applicability: bool = False
+    ) -> Criticality:
+        """
+        Criticité pour un score final et les deux facteurs de boost
+        
+        Args:
+            score: Score final pondéré
+            has_critical_codes: Codes NC critiques trouvés
+            high_applicability: Applicable selon le LLM avec un score > 0.7
+        """
         # Déterminer criticité de base
         if score >= self.thresholds["critical"]:
             base_criticality = Criticality.CRITICAL
@@ -145,6 +178,41 @@ class RelevanceScorer:
         
         return base_criticality
     
+    def local_score(self, keyword_score: float, nc_code_score: float) -> float:
+        """Part du score final apportée par les niveaux 1 et 2 (sans LLM)"""
+        return keyword_score * self.keyword_weight + nc_code_score * self.nc_code_weight
+    
+    def criticality_bounds(
+        self,
+        keyword_score: float,
+        nc_code_score: float,
+        has_critical_codes: bool = False
+    ) -> Tuple[Criticality, Criticality]:
+        """
+        Criticités atteignables selon le résultat du LLM, niveaux 1-2 connus
+        
+        La criticité croît avec le score sémantique : la borne basse
+        correspond à un score sémantique de 0 (non applicable), la borne
+        haute à un score de 1 (applicable). Si les deux bornes sont égales,
+        l'appel LLM ne peut pas changer la criticité.
+        
+        Args:
+            keyword_score: Score du niveau 1
+            nc_code_score: Score du niveau 2
+            has_critical_codes: Codes NC critiques trouvés
+        
+        Returns:
+            (criticité minimale, criticité maximale)
+        """
+        local_score = self.local_score(keyword_score, nc_code_score)
+        
+        return (
+            self.criticality_for_score(round(local_score, 3), has_critical_codes, high_applicability=False),
+            self.criticality_for_score(
+                round(local_score + self.semantic_weight, 3), has_critical_codes, high_applicability=True
+            )
+        )
+    
     def identify_impacted_processes(
         self,
         semantic_result: SemanticAnalysisResult,
@@ -240,7 +308,7 @@ def create_document_analysis(
         DocumentAnalysis complète
     """
     if scorer is None:
-        scorer = RelevanceScorer()
+        scorer = RelevanceScorer.from_settings()
     
     # Calculer le score final
     relevance_score = scorer.calculate_score(keyword_result, nc_code_result, semantic_result)
@@ -2,39 +2,43 @@
 Filtre Niveau 3 - Analyse sémantique avec LLM
 
 Utilise Claude pour une analyse contextuelle approfondie.
+
+L'analyseur (client ChatAnthropic, parser Pydantic, chaîne LangChain et
+instructions de format) est construit une fois par processus et partagé entre
+documents : voir get_semantic_analyzer(). Le client Anthropic et son pool de
+connexions HTTP sont ainsi réutilisés d'un document à l'autre.
 """
 
+import asyncio
+import threading
+import time
 import structlog
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from langchain_anthropic import ChatAnthropic
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
 from langchain_core.prompts import PromptTemplate
+from langchain_core.runnables import RunnableLambda
 from langchain_core.output_parsers import PydanticOutputParser
 
 from src.agent_1b.models import SemanticAnalysisResult
+from src.agent_1b.tools.content_selector import CHARS_PER_TOKEN, build_query, select_passages
+from src.agent_1b.tools.semantic_cache import SemanticResultCache, make_cache_key
 from src.config import settings
+from src.utils.llm_usage import token_usage, tracker
 
 logger = structlog.get_logger()
 
 
-# Prompt pour l'analyse sémantique
-SEMANTIC_ANALYSIS_PROMPT = PromptTemplate.from_template(
-    """Tu es un expert en analyse réglementaire et compliance internationale. 
-
-Ta mission est d'analyser un document réglementaire pour déterminer s'il est pertinent et applicable pour une entreprise spécifique.
+# Prompt pour l'analyse sémantique, découpé pour le cache de prompt Anthropic :
+# les parties invariantes (instructions, format, puis profil entreprise)
+# forment un préfixe identique d'un document à l'autre, marqué
+# "cache_control" ; seul l'extrait du document, à la fin, change à chaque appel.
 
-# CONTEXTE ENTREPRISE
-Nom: {company_name}
-Secteur: {industry}
-Produits: {products}
-Codes NC/SH: {nc_codes}
-Pays d'opération: {countries}
-Réglementations suivies: {regulations}
+# Instructions communes à toutes les entreprises et tous les documents
+SEMANTIC_INSTRUCTIONS_PROMPT = PromptTemplate.from_template(
+    """Tu es un expert en analyse réglementaire et compliance internationale. 
 
-# DOCUMENT À ANALYSER
-Titre: {document_title}
-Type: {regulation_type}
-Contenu (extrait):
-{document_content}
+Ta mission est d'analyser un document réglementaire pour déterminer s'il est pertinent et applicable pour une entreprise spécifique. Le contexte de l'entreprise suit ces instructions ; le document à analyser est fourni dans le message de l'utilisateur.
 
 # TA TÂCHE
 1. **Lire et comprendre** le document dans son contexte
@@ -60,33 +64,375 @@ Contenu (extrait):
 - 0.4-0.6: Pertinence moyenne (applicable indirectement)
 - 0.6-0.8: Haute pertinence (applicable directement)
 - 0.8-1.0: Pertinence critique (impact majeur immédiat)
+"""
+)
+
+# Profil entreprise : identique pour tous les documents d'un même run
+SEMANTIC_COMPANY_PROMPT = PromptTemplate.from_template(
+    """# CONTEXTE ENTREPRISE
+Nom: {company_name}
+Secteur: {industry}
+Produits: {products}
+Codes NC/SH: {nc_codes}
+Pays d'opération: {countries}
+Réglementations suivies: {regulations}
+"""
+)
+
+# Document : seule partie propre à chaque appel
+SEMANTIC_DOCUMENT_PROMPT = PromptTemplate.from_template(
+    """# DOCUMENT À ANALYSER
+Titre: {document_title}
+Type: {regulation_type}
+Contenu (extrait):
+{document_content}
 
 Procède à l'analyse maintenant.
 """
 )
 
 
+def profile_prompt_inputs(company_profile: Dict) -> Dict[str, str]:
+    """
+    Variables de SEMANTIC_COMPANY_PROMPT pour un profil entreprise
+    
+    Calculées une fois par profil dans son index (voir src/agent_1b/profile_index.py).
+    
+    Args:
+        company_profile: Dictionnaire du profil entreprise
+    
+    Returns:
+        Dict des variables de SEMANTIC_COMPANY_PROMPT
+    """
+    # nc_codes peut être un dict ou une liste
+    nc_codes_raw = company_profile.get("nc_codes", {})
+    if isinstance(nc_codes_raw, dict):
+        nc_codes = ", ".join(list(nc_codes_raw.keys())[:20])  # Top 20 codes
+    else:
+        nc_codes = ", ".join(nc_codes_raw[:20])
+    
+    return {
+        "company_name": company_profile.get("company_name", "Unknown"),
+        "industry": company_profile.get("industry", ""),
+        "products": ", ".join(company_profile.get("products", [])[:5]),  # Top 5 produits
+        "nc_codes": nc_codes,
+        "countries": company_profile.get("countries", ""),
+        "regulations": ", ".join(company_profile.get("regulations", []))
+    }
+
+
+def semantic_system_blocks(inputs: Dict[str, str], cache_prefix: bool = True) -> List[Dict]:
+    """
+    Blocs du prompt système (instructions puis profil entreprise)
+    
+    Args:
+        inputs: Variables du prompt (voir SemanticAnalyzer.build_inputs)
+        cache_prefix: Marquer les instructions et le profil comme préfixe
+            cacheable (cache_control "ephemeral")
+    
+    Returns:
+        Blocs texte au format de l'API Messages
+    """
+    system_blocks = [
+        {"type": "text", "text": SEMANTIC_INSTRUCTIONS_PROMPT.format(**inputs)},
+        {"type": "text", "text": SEMANTIC_COMPANY_PROMPT.format(**inputs)},
+    ]
+    
+    if cache_prefix:
+        # Deux points de cache : instructions (communes à toutes les
+        # entreprises) puis instructions + profil
+        for block in system_blocks:
+            block["cache_control"] = {"type": "ephemeral"}
+    
+    return system_blocks
+
+
+def build_semantic_messages(inputs: Dict[str, str], cache_prefix: bool = True) -> List[BaseMessage]:
+    """
+    Messages envoyés à Claude pour un document
+    
+    Args:
+        inputs: Variables du prompt (voir SemanticAnalyzer.build_inputs)
+        cache_prefix: Marquer les instructions et le profil comme préfixe cacheable
+    
+    Returns:
+        [message système (instructions + profil), message utilisateur (document)]
+    """
+    return [
+        SystemMessage(content=semantic_system_blocks(inputs, cache_prefix)),
+        HumanMessage(content=SEMANTIC_DOCUMENT_PROMPT.format(**inputs)),
+    ]
+
+
+DEFAULT_MODEL_NAME = "claude-sonnet-4-5-20250929"
+DEFAULT_TEMPERATURE = 0.1
+DEFAULT_MAX_TOKENS = 2000
+
+# Version du prompt et de la préparation du contenu, incluse dans la clé du
+# cache : à incrémenter à chaque modification qui change la réponse attendue
+PROMPT_VERSION = "3"
+
+# Statuts HTTP de limitation de débit (429) et de surcharge de l'API (529)
+RATE_LIMIT_STATUS_CODES = (429, 529)
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """L'erreur signale-t-elle une limitation de débit de l'API ?"""
+    return getattr(error, "status_code", None) in RATE_LIMIT_STATUS_CODES
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Délai demandé par l'API (en-tête retry-after), si présent"""
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers["retry-after"])
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return None
+
+
+class RateLimitBackoff:
+    """
+    Pause commune à tous les appels concurrents d'un analyseur
+    
+    Quand un appel reçoit un 429, les autres attendent la même échéance au
+    lieu de saturer l'API avec des requêtes vouées à échouer.
+    """
+    
+    def __init__(self):
+        self._resume_at = 0.0
+        self.pauses = 0
+    
+    def pause(self, seconds: float) -> None:
+        self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+        self.pauses += 1
+    
+    async def wait(self) -> None:
+        delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
 class SemanticAnalyzer:
-    """Analyseur sémantique utilisant un LLM"""
+    """
+    Analyseur sémantique utilisant un LLM
     
-    def __init__(self, model_name: str = "claude-sonnet-4-5-20250929", temperature: float = 0.1):
+    Une instance est sans état par document et peut être partagée entre
+    threads : la chaîne LangChain et le client Anthropic (httpx) supportent
+    les appels concurrents.
+    """
+    
+    def __init__(
+        self,
+        model_name: str = DEFAULT_MODEL_NAME,
+        temperature: float = DEFAULT_TEMPERATURE,
+        cache: Optional[SemanticResultCache] = None
+    ):
         """
         Args:
             model_name: Nom du modèle Anthropic à utiliser
             temperature: Température pour la génération (0-1)
+            cache: Cache persistant des résultats (optionnel)
         """
+        self.model_name = model_name
+        self.temperature = temperature
+        self.cache = cache
+        
+        llm_options = {"base_url": settings.anthropic_base_url} if settings.anthropic_base_url else {}
         self.llm = ChatAnthropic(
             model=model_name,
             api_key=settings.anthropic_api_key,
             temperature=temperature,
-            max_tokens=2000
+            max_tokens=DEFAULT_MAX_TOKENS,
+            **llm_options
         )
         
         # Parser Pydantic pour structurer la sortie
         self.output_parser = PydanticOutputParser(pydantic_object=SemanticAnalysisResult)
         
-        # Créer la chaîne LangChain
-        self.chain = SEMANTIC_ANALYSIS_PROMPT | self.llm | self.output_parser
+        # Instructions de format générées une seule fois (schéma JSON du modèle)
+        self.format_instructions = self.output_parser.get_format_instructions()
+        
+        # Créer la chaîne LangChain (le message brut est conservé pour la
+        # consommation de tokens, puis parsé par output_parser)
+        self.cache_prefix = settings.semantic_prompt_caching
+        self.chain = RunnableLambda(lambda inputs: build_semantic_messages(inputs, self.cache_prefix)) | self.llm
+        
+        # Limitation de débit partagée par les appels asynchrones
+        self.backoff = RateLimitBackoff()
+        
+        # Analyse map-reduce des documents très longs (construite au premier usage)
+        self._map_reduce = None
+    
+    @property
+    def map_reduce(self):
+        """Analyse map-reduce partageant le client et le prompt de cet analyseur"""
+        if self._map_reduce is None:
+            from src.agent_1b.tools.semantic_map_reduce import SemanticMapReduce
+            self._map_reduce = SemanticMapReduce(self)
+        return self._map_reduce
+    
+    def uses_map_reduce(self, document_content: str) -> bool:
+        """Le document est-il analysé en map-reduce (SEMANTIC_MAP_REDUCE_*) ?"""
+        return (
+            settings.semantic_map_reduce_enabled
+            and len(document_content) > settings.semantic_map_reduce_min_tokens * CHARS_PER_TOKEN
+        )
+    
+    def prompt_version(self, document_content: str) -> str:
+        """Version du prompt pour le cache (distincte en map-reduce)"""
+        return f"{PROMPT_VERSION}-map-reduce" if self.uses_map_reduce(document_content) else PROMPT_VERSION
+    
+    def warm_up(self) -> None:
+        """Construit le client Anthropic (et son pool HTTP) avant le premier document"""
+        _ = self.llm._client
+    
+    def profile_inputs(self, company_profile: Dict) -> Dict[str, str]:
+        """
+        Champs du profil entreprise injectés dans le prompt
+        
+        Args:
+            company_profile: Dictionnaire du profil entreprise
+        
+        Returns:
+            Dict des variables de SEMANTIC_COMPANY_PROMPT
+        """
+        return profile_prompt_inputs(company_profile)
+    
+    def content_query(self, company_profile: Dict, regulation_type: str) -> Dict[str, float]:
+        """
+        Termes du profil servant à classer les passages d'un document long
+        
+        Args:
+            company_profile: Dictionnaire du profil entreprise
+            regulation_type: Type de réglementation (CBAM, EUDR, etc.)
+        
+        Returns:
+            Requête pondérée (mots-clés, produits, codes NC, réglementation)
+        """
+        nc_codes_raw = company_profile.get("nc_codes", {})
+        if isinstance(nc_codes_raw, dict):
+            # Format structuré (imports/exports) ou dict {code: description}
+            entries = nc_codes_raw.get("imports", []) + nc_codes_raw.get("exports", [])
+            nc_codes = [entry.get("code", "") if isinstance(entry, dict) else str(entry) for entry in entries]
+            nc_codes = nc_codes or list(nc_codes_raw.keys())
+        else:
+            nc_codes = nc_codes_raw
+        
+        return build_query(
+            keywords=list(company_profile.get("keywords", [])) + list(company_profile.get("products", [])),
+            nc_codes=nc_codes,
+            extra_terms=[regulation_type]
+        )
+    
+    def build_inputs(
+        self,
+        document_content: str,
+        document_title: str,
+        regulation_type: str,
+        company_profile: Dict
+    ) -> Dict[str, str]:
+        """
+        Variables du prompt pour un document
+        
+        Args:
+            document_content: Texte du document (peut être tronqué)
+            document_title: Titre du document
+            regulation_type: Type de réglementation (CBAM, EUDR, etc.)
+            company_profile: Dictionnaire du profil entreprise
+        
+        Returns:
+            Dict des variables des trois parties du prompt
+        """
+        # Préparer le contenu (budget SEMANTIC_CONTENT_BUDGET_TOKENS, 8000 tokens ~= 32000 chars)
+        content_excerpt = self._prepare_content(
+            document_content,
+            max_chars=settings.semantic_content_budget_tokens * CHARS_PER_TOKEN,
+            query=self.content_query(company_profile, regulation_type)
+        )
+        
+        return {
+            **self.profile_inputs(company_profile),
+            "document_title": document_title,
+            "regulation_type": regulation_type,
+            "document_content": content_excerpt,
+            "format_instructions": self.format_instructions
+        }
+    
+    def cache_key(
+        self,
+        document_content: str,
+        document_title: str,
+        regulation_type: str,
+        company_profile: Dict,
+        prompt_version: Optional[str] = None
+    ) -> str:
+        """Clé de cache de l'analyse de ce document pour ce profil"""
+        return make_cache_key(
+            document_content,
+            document_title,
+            regulation_type,
+            self.profile_inputs(company_profile),
+            model_name=self.model_name,
+            temperature=self.temperature,
+            prompt_version=prompt_version or self.prompt_version(document_content),
+            content_settings=self.content_settings(company_profile, regulation_type)
+        )
+    
+    def content_settings(self, company_profile: Dict, regulation_type: str) -> Dict:
+        """
+        Paramètres de l'extrait envoyé au LLM, pour la clé de cache
+        
+        Un changement de budget, de sélection, de découpage map-reduce ou des
+        termes du profil change l'extrait : l'analyse en cache n'est plus valable.
+        """
+        return {
+            "budget_tokens": settings.semantic_content_budget_tokens,
+            "selection": settings.semantic_content_selection,
+            "map_reduce_chunk_tokens": settings.semantic_map_reduce_chunk_tokens,
+            "map_reduce_max_tokens": settings.semantic_map_reduce_max_tokens,
+            "query": self.content_query(company_profile, regulation_type)
+        }
+    
+    def request_params(
+        self,
+        document_content: str,
+        document_title: str,
+        regulation_type: str,
+        company_profile: Dict
+    ) -> Dict:
+        """
+        Corps de requête de l'API Messages pour un document
+        
+        Même prompt que analyze() ; utilisé pour soumettre les documents en
+        lot (voir src/agent_1b/message_batch.py).
+        
+        Args:
+            document_content: Texte du document (peut être tronqué)
+            document_title: Titre du document
+            regulation_type: Type de réglementation (CBAM, EUDR, etc.)
+            company_profile: Dictionnaire du profil entreprise
+        
+        Returns:
+            Dict model, max_tokens, temperature, system et messages
+        """
+        inputs = self.build_inputs(document_content, document_title, regulation_type, company_profile)
+        
+        return {
+            "model": self.model_name,
+            "max_tokens": DEFAULT_MAX_TOKENS,
+            "temperature": self.temperature,
+            "system": semantic_system_blocks(inputs, self.cache_prefix),
+            "messages": [{"role": "user", "content": SEMANTIC_DOCUMENT_PROMPT.format(**inputs)}]
+        }
+    
+    def parse_response(self, text: str) -> SemanticAnalysisResult:
+        """
+        Parse le texte d'une réponse de Claude
+        
+        Raises:
+            OutputParserException: Réponse non conforme au schéma attendu
+        """
+        return self.output_parser.parse(text)
     
     def analyze(
         self,
@@ -113,68 +459,231 @@ class SemanticAnalyzer:
             regulation_type=regulation_type
         )
         
-        # Préparer le contenu (limiter à 8000 tokens ~= 32000 chars)
-        content_excerpt = self._prepare_content(document_content, max_chars=32000)
-        
-        # Extraire les infos du profil
-        company_name = company_profile.get("company_name", "Unknown")
-        industry = company_profile.get("industry", "")
-        products = ", ".join(company_profile.get("products", [])[:5])  # Top 5 produits
+        cache_key, cached = self.lookup(document_content, document_title, regulation_type, company_profile)
+        if cached is not None:
+            return cached
         
-        # nc_codes peut être un dict ou une liste
-        nc_codes_raw = company_profile.get("nc_codes", {})
-        if isinstance(nc_codes_raw, dict):
-            nc_codes = ", ".join(list(nc_codes_raw.keys())[:20])  # Top 20 codes
-        else:
-            nc_codes = ", ".join(nc_codes_raw[:20])
+        if self.uses_map_reduce(document_content):
+            try:
+                result, usage = self.map_reduce.run(document_content, document_title, regulation_type, company_profile)
+            except Exception as e:
+                logger.error("semantic_analysis_failed", error=str(e), map_reduce=True)
+                return self._fallback_result()
+            
+            self.store(cache_key, result, usage, self.prompt_version(document_content))
+            return result
         
-        countries = company_profile.get("countries", "")
-        regulations = ", ".join(company_profile.get("regulations", []))
+        start = time.perf_counter()
+        inputs = self.build_inputs(document_content, document_title, regulation_type, company_profile)
+        prepare_time = time.perf_counter() - start
         
+        message = None
         try:
             # Invoquer la chaîne LangChain
-            result = self.chain.invoke({
-                "company_name": company_name,
-                "industry": industry,
-                "products": products,
-                "nc_codes": nc_codes,
-                "countries": countries,
-                "regulations": regulations,
-                "document_title": document_title,
-                "regulation_type": regulation_type,
-                "document_content": content_excerpt,
-                "format_instructions": self.output_parser.get_format_instructions()
-            })
+            message = self.chain.invoke(inputs)
+            llm_time = time.perf_counter() - start - prepare_time
+            usage = token_usage(message)
+            tracker.record(self.model_name, usage, latency_ms=llm_time * 1000, agent="agent_1b", stage="semantic")
+            result = self.output_parser.invoke(message)
             
             logger.info(
                 "semantic_analysis_completed",
                 score=result.score,
                 is_applicable=result.is_applicable,
-                confidence=result.confidence_level
+                confidence=result.confidence_level,
+                prepare_ms=round(prepare_time * 1000, 2),
+                llm_ms=round(llm_time * 1000, 1),
+                **usage
             )
             
+            self.store(cache_key, result, usage)
             return result
             
         except Exception as e:
+            if message is None:
+                tracker.record(
+                    self.model_name,
+                    latency_ms=(time.perf_counter() - start - prepare_time) * 1000,
+                    error=str(e)[:200],
+                    agent="agent_1b",
+                    stage="semantic"
+                )
             logger.error("semantic_analysis_failed", error=str(e))
             
             # Retourner un résultat par défaut en cas d'erreur
-            return SemanticAnalysisResult(
-                score=0.0,
-                is_applicable=False,
-                explanation="Erreur lors de l'analyse sémantique. Impossible d'obtenir une réponse du LLM.",
-                regulation_summary="Document non analysable par le LLM en raison d'une erreur technique.",
-                impact_explanation="",
-                confidence_level=0.0
-            )
+            return self._fallback_result()
+    
+    async def aanalyze(
+        self,
+        document_content: str,
+        document_title: str,
+        regulation_type: str,
+        company_profile: Dict
+    ) -> SemanticAnalysisResult:
+        """
+        Analyse sémantique asynchrone d'un document
+        
+        Même résultat que analyze(). En cas de limitation de débit (429/529),
+        tous les appels en cours de l'analyseur marquent une pause commune
+        (retry-after ou backoff exponentiel) avant de réessayer.
+        
+        Args:
+            document_content: Texte du document (peut être tronqué)
+            document_title: Titre du document
+            regulation_type: Type de réglementation (CBAM, EUDR, etc.)
+            company_profile: Dictionnaire du profil entreprise
+            
+        Returns:
+            SemanticAnalysisResult
+        """
+        logger.info(
+            "semantic_analysis_started",
+            document_title=document_title[:50],
+            regulation_type=regulation_type
+        )
+        
+        cache_key, cached = self.lookup(document_content, document_title, regulation_type, company_profile)
+        if cached is not None:
+            return cached
+        
+        if self.uses_map_reduce(document_content):
+            await self.backoff.wait()
+            try:
+                result, usage = await self.map_reduce.arun(
+                    document_content, document_title, regulation_type, company_profile
+                )
+            except Exception as e:
+                logger.error("semantic_analysis_failed", error=str(e), map_reduce=True)
+                return self._fallback_result()
+            
+            self.store(cache_key, result, usage, self.prompt_version(document_content))
+            return result
+        
+        start = time.perf_counter()
+        inputs = self.build_inputs(document_content, document_title, regulation_type, company_profile)
+        prepare_time = time.perf_counter() - start
+        
+        for attempt in range(settings.semantic_max_retries + 1):
+            await self.backoff.wait()
+            
+            message = None
+            try:
+                message = await self.chain.ainvoke(inputs)
+                llm_time = time.perf_counter() - start - prepare_time
+                usage = token_usage(message)
+                tracker.record(
+                    self.model_name,
+                    usage,
+                    latency_ms=llm_time * 1000,
+                    retries=attempt,
+                    agent="agent_1b",
+                    stage="semantic"
+                )
+                result = self.output_parser.invoke(message)
+                
+                logger.info(
+                    "semantic_analysis_completed",
+                    score=result.score,
+                    is_applicable=result.is_applicable,
+                    confidence=result.confidence_level,
+                    prepare_ms=round(prepare_time * 1000, 2),
+                    llm_ms=round(llm_time * 1000, 1),
+                    attempts=attempt + 1,
+                    **usage
+                )
+                
+                self.store(cache_key, result, usage)
+                return result
+            
+            except Exception as e:
+                if is_rate_limit_error(e) and attempt < settings.semantic_max_retries:
+                    delay = retry_after_seconds(e) or settings.semantic_retry_base_seconds * 2 ** attempt
+                    logger.warning("semantic_analysis_rate_limited", attempt=attempt + 1, retry_in=delay)
+                    self.backoff.pause(delay)
+                    continue
+                
+                if message is None:
+                    tracker.record(
+                        self.model_name,
+                        latency_ms=(time.perf_counter() - start - prepare_time) * 1000,
+                        retries=attempt,
+                        error=str(e)[:200],
+                        agent="agent_1b",
+                        stage="semantic"
+                    )
+                logger.error("semantic_analysis_failed", error=str(e))
+                return self._fallback_result()
+        
+        return self._fallback_result()
+    
+    def lookup(
+        self,
+        document_content: str,
+        document_title: str,
+        regulation_type: str,
+        company_profile: Dict,
+        prompt_version: Optional[str] = None
+    ) -> Tuple[Optional[str], Optional[SemanticAnalysisResult]]:
+        """
+        Clé de cache et résultat déjà obtenu (None si absent ou cache désactivé)
+        
+        prompt_version force la version de prompt de la clé (par défaut : celle
+        du mode d'analyse du document, voir prompt_version()).
+        """
+        if self.cache is None:
+            return None, None
+        
+        cache_key = self.cache_key(document_content, document_title, regulation_type, company_profile, prompt_version)
+        cached = self.cache.get(cache_key)
+        
+        if cached is None:
+            return cache_key, None
+        
+        result, usage = cached
+        logger.info(
+            "semantic_analysis_completed",
+            score=result.score,
+            is_applicable=result.is_applicable,
+            confidence=result.confidence_level,
+            cached=True
+        )
+        return cache_key, result
+    
+    def store(
+        self,
+        cache_key: Optional[str],
+        result: SemanticAnalysisResult,
+        usage: Dict,
+        prompt_version: str = PROMPT_VERSION
+    ) -> None:
+        """Met en cache un résultat obtenu du LLM (jamais le résultat de repli)"""
+        if self.cache is not None and cache_key is not None:
+            self.cache.put(cache_key, result, usage, model_name=self.model_name, prompt_version=prompt_version)
     
-    def _prepare_content(self, content: str, max_chars: int = 32000) -> str:
+    def _fallback_result(self) -> SemanticAnalysisResult:
+        """Résultat par défaut quand le LLM n'a pas pu répondre"""
+        return SemanticAnalysisResult(
+            score=0.0,
+            is_applicable=False,
+            explanation="Erreur lors de l'analyse sémantique. Impossible d'obtenir une réponse du LLM.",
+            regulation_summary="Document non analysable par le LLM en raison d'une erreur technique.",
+            impact_explanation="",
+            confidence_level=0.0
+        )
+    
+    def _prepare_content(
+        self,
+        content: str,
+        max_chars: int = 32000,
+        query: Optional[Dict[str, float]] = None
+    ) -> str:
         """
         Prépare le contenu pour l'analyse (chunking si nécessaire)
         
         Args:
             content: Contenu complet
             max_chars: Nombre maximum de caractères
+            query: Termes du profil pour classer les passages (voir content_query)
             
         Returns:
             Contenu tronqué intelligemment
@@ -182,25 +691,78 @@ class SemanticAnalyzer:
         if len(content) <= max_chars:
             return content
         
-        # Stratégie: Prendre le début (contient souvent le contexte) 
-        # et la fin (contient souvent les annexes/tableaux importants)
-        first_part_size = int(max_chars * 0.7)
-        last_part_size = int(max_chars * 0.3)
-        
-        first_part = content[:first_part_size]
-        last_part = content[-last_part_size:]
-        
-        excerpt = first_part + "\n\n[...CONTENU TRONQUÉ...]\n\n" + last_part
+        if settings.semantic_content_selection == "ranked" and query:
+            # Sections classées par BM25 contre le profil, ordre du document conservé
+            excerpt = select_passages(content, query, max_chars)
+            strategy = "ranked"
+        else:
+            # Stratégie: Prendre le début (contient souvent le contexte) 
+            # et la fin (contient souvent les annexes/tableaux importants)
+            first_part_size = int(max_chars * 0.7)
+            last_part_size = int(max_chars * 0.3)
+            
+            first_part = content[:first_part_size]
+            last_part = content[-last_part_size:]
+            
+            excerpt = first_part + "\n\n[...CONTENU TRONQUÉ...]\n\n" + last_part
+            strategy = "head_tail"
         
         logger.warning(
             "content_truncated",
             original_length=len(content),
-            truncated_length=len(excerpt)
+            truncated_length=len(excerpt),
+            strategy=strategy
         )
         
         return excerpt
 
 
+# Analyseurs partagés par le processus, un par (modèle, température)
+_analyzers: Dict[Tuple[str, float], SemanticAnalyzer] = {}
+_analyzers_lock = threading.Lock()
+
+
+def get_semantic_analyzer(
+    model_name: str = DEFAULT_MODEL_NAME,
+    temperature: float = DEFAULT_TEMPERATURE
+) -> SemanticAnalyzer:
+    """
+    Analyseur sémantique partagé par le processus (créé au premier appel)
+    
+    Args:
+        model_name: Nom du modèle Anthropic
+        temperature: Température pour la génération
+    
+    Returns:
+        SemanticAnalyzer réutilisé pour tous les documents
+    """
+    key = (model_name, temperature)
+    
+    with _analyzers_lock:
+        analyzer = _analyzers.get(key)
+        if analyzer is None:
+            analyzer = SemanticAnalyzer(
+                model_name=model_name,
+                temperature=temperature,
+                cache=SemanticResultCache.from_settings()
+            )
+            _analyzers[key] = analyzer
+            logger.info("semantic_analyzer_created", model=model_name, temperature=temperature)
+    
+    return analyzer
+
+
+def reset_semantic_analyzers() -> None:
+    """
+    Oublie les analyseurs partagés
+    
+    Le prochain get_semantic_analyzer() recrée l'analyseur, par exemple après
+    un changement de clé API ou entre deux tests.
+    """
+    with _analyzers_lock:
+        _analyzers.clear()
+
+
 def analyze_semantically(
     document_content: str,
     document_title: str,
@@ -219,7 +781,7 @@ def analyze_semantically(
     Returns:
         SemanticAnalysisResult
     """
-    analyzer = SemanticAnalyzer()
+    analyzer = get_semantic_analyzer()
     return analyzer.analyze(
         document_content,
         document_title,
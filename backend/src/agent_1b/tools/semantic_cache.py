@@ -0,0 +1,214 @@
+"""
+Cache persistant des analyses sémantiques LLM (Niveau 3)
+
+Quand un run est relancé ou qu'un document repasse en "raw", l'analyse
+sémantique reçoit exactement les mêmes entrées : le résultat Pydantic déjà
+obtenu (et sa consommation de tokens) est rejoué depuis la table
+"semantic_cache" au lieu de repayer l'appel à Claude.
+
+La clé combine :
+- le hash du document (contenu, titre, type de réglementation)
+- l'empreinte du profil entreprise (champs injectés dans le prompt)
+- la version du prompt (PROMPT_VERSION de semantic_analyzer)
+- la préparation de l'extrait (budget, sélection, map-reduce, termes de la
+  requête de classement des passages)
+- le modèle et la température
+"""
+
+import hashlib
+import json
+import threading
+import structlog
+from typing import Callable, Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from src.agent_1b.models import SemanticAnalysisResult
+from src.config import settings
+
+logger = structlog.get_logger()
+
+
+def sha256_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def profile_fingerprint(profile_inputs: Dict[str, str]) -> str:
+    """Empreinte stable des champs du profil utilisés dans le prompt"""
+    return sha256_text(json.dumps(profile_inputs, sort_keys=True, ensure_ascii=False))
+
+
+def make_cache_key(
+    document_content: str,
+    document_title: str,
+    regulation_type: str,
+    profile_inputs: Dict[str, str],
+    model_name: str,
+    temperature: float,
+    prompt_version: str,
+    content_settings: Optional[Dict] = None
+) -> str:
+    """
+    Clé de cache d'une analyse sémantique
+    
+    Args:
+        document_content: Texte complet du document
+        document_title: Titre du document
+        regulation_type: Type de réglementation
+        profile_inputs: Champs du profil injectés dans le prompt
+        model_name: Modèle Anthropic
+        temperature: Température
+        prompt_version: Version du prompt et de la préparation du contenu
+        content_settings: Paramètres de l'extrait envoyé au LLM (budget,
+            sélection, map-reduce, requête de classement)
+    
+    Returns:
+        Hash SHA-256 hexadécimal
+    """
+    parts = [
+        sha256_text("\x1f".join([document_content, document_title, regulation_type])),
+        profile_fingerprint(profile_inputs),
+        prompt_version,
+        model_name,
+        repr(float(temperature)),
+    ]
+    if content_settings is not None:
+        parts.append(sha256_text(json.dumps(content_settings, sort_keys=True, ensure_ascii=False)))
+    return sha256_text("|".join(parts))
+
+
+class SemanticResultCache:
+    """
+    Cache des résultats LLM avec statistiques de hit/miss
+    
+    Chaque opération ouvre sa propre session courte : le cache peut être
+    partagé par les appels concurrents d'un même analyseur. Une erreur de base
+    de données n'interrompt jamais l'analyse (le cache est ignoré).
+    """
+    
+    def __init__(
+        self,
+        ttl_days: int = 0,
+        max_mb: float = 0,
+        session_factory: Optional[Callable[[], Session]] = None
+    ):
+        """
+        Args:
+            ttl_days: Durée de vie d'une entrée (0: pas d'expiration)
+            max_mb: Taille maximale du cache, éviction LRU au-delà (0: illimitée)
+            session_factory: Fabrique de sessions (défaut: get_session)
+        """
+        if session_factory is None:
+            from src.storage.database import get_session
+            session_factory = get_session
+        
+        self.ttl_days = ttl_days
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.session_factory = session_factory
+        
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.errors = 0
+    
+    @classmethod
+    def from_settings(cls) -> Optional["SemanticResultCache"]:
+        """Cache configuré par SEMANTIC_CACHE_* (None si désactivé)"""
+        if not settings.semantic_cache_enabled:
+            return None
+        return cls(ttl_days=settings.semantic_cache_ttl_days, max_mb=settings.semantic_cache_max_mb)
+    
+    def get(self, cache_key: str) -> Optional[Tuple[SemanticAnalysisResult, Dict]]:
+        """
+        Résultat en cache (une entrée plus ancienne que ttl_days est un miss)
+        
+        Returns:
+            (SemanticAnalysisResult, usage tokens de l'appel d'origine), ou None
+        """
+        from src.storage.semantic_cache_repository import SemanticCacheRepository
+        
+        session = self.session_factory()
+        try:
+            entry = SemanticCacheRepository(session).get(cache_key, ttl_days=self.ttl_days)
+            if entry is not None:
+                result = SemanticAnalysisResult.model_validate_json(entry.result_json)
+                usage = entry.usage or {}
+            else:
+                result = None
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            self._count("errors")
+            logger.warning("semantic_cache_read_failed", error=str(e))
+            result = None
+        finally:
+            session.close()
+        
+        if result is None:
+            self._count("misses")
+            return None
+        
+        self._count("hits")
+        logger.info("semantic_cache_hit", cache_key=cache_key[:12])
+        return result, usage
+    
+    def put(
+        self,
+        cache_key: str,
+        result: SemanticAnalysisResult,
+        usage: Optional[Dict],
+        model_name: str,
+        prompt_version: str
+    ) -> None:
+        """Enregistre un résultat puis applique l'éviction TTL/LRU"""
+        from src.storage.semantic_cache_repository import SemanticCacheRepository
+        
+        session = self.session_factory()
+        try:
+            repo = SemanticCacheRepository(session)
+            repo.put(cache_key, model_name, prompt_version, result.model_dump_json(), usage)
+            evicted = repo.evict(ttl_days=self.ttl_days, max_bytes=self.max_bytes)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            self._count("errors")
+            logger.warning("semantic_cache_write_failed", error=str(e))
+            return
+        finally:
+            session.close()
+        
+        self._count("writes")
+        self._count("evictions", evicted)
+    
+    def stats(self, since: Optional[Dict] = None) -> Dict:
+        """
+        Compteurs du cache
+        
+        Args:
+            since: Statistiques d'un appel précédent, pour n'obtenir que
+                l'activité depuis (ex: un run, le cache étant partagé)
+        
+        Returns:
+            Dict hits, misses, hit_rate, writes, evictions, errors
+        """
+        with self._lock:
+            counters = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "evictions": self.evictions,
+                "errors": self.errors,
+            }
+        
+        if since:
+            counters = {name: value - since.get(name, 0) for name, value in counters.items()}
+        
+        lookups = counters["hits"] + counters["misses"]
+        counters["hit_rate"] = round(counters["hits"] / lookups, 3) if lookups else None
+        return counters
+    
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
@@ -0,0 +1,230 @@
+"""
+Cascade de pertinence - Décide si l'appel LLM du niveau 3 est utile
+
+Les niveaux 1 (mots-clés) et 2 (codes NC) sont calculés d'abord. À partir
+des poids et seuils du RelevanceScorer, on borne la criticité atteignable
+quel que soit le résultat du LLM (score sémantique 0 ou 1) :
+
+- "off"   : le LLM est toujours appelé (comportement historique)
+- "exact" : l'appel est sauté quand les deux bornes sont égales ; la
+  criticité ne peut pas changer, aucune décision n'est modifiée
+- "gate"  : comme "exact", et l'appel est en plus différé quand le score
+  local (niveaux 1-2 pondérés) ne dépasse pas `local_floor` ; la criticité
+  aurait pu changer, le rapport de calibration mesure combien de fois
+
+La décision est enregistrée dans DocumentAnalysis.semantic_decision.
+"""
+
+import re
+import structlog
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from src.agent_1b.models import Criticality, SemanticAnalysisResult
+from src.agent_1b.tools.relevance_scorer import RelevanceScorer
+
+logger = structlog.get_logger()
+
+CASCADE_MODES = ("off", "exact", "gate")
+
+
+@dataclass
+class CascadeDecision:
+    """Décision de la cascade pour un document"""
+    decision: str  # called, skipped, deferred ou preclassified (pré-classifieur)
+    reason: str
+    local_score: float
+    min_criticality: Criticality
+    max_criticality: Criticality
+    
+    @property
+    def call_llm(self) -> bool:
+        return self.decision == "called"
+
+
+class SemanticCascade:
+    """Filtre d'appel au LLM fondé sur les niveaux 1-2 et le RelevanceScorer"""
+    
+    def __init__(
+        self,
+        scorer: RelevanceScorer,
+        mode: Optional[str] = None,
+        local_floor: Optional[float] = None
+    ):
+        """
+        Args:
+            scorer: Scorer utilisé pour l'agrégation (poids et seuils)
+            mode: "off", "exact" ou "gate" (défaut: settings.semantic_cascade_mode)
+            local_floor: Score local jusqu'auquel l'appel est différé en mode
+                "gate" (défaut: settings.semantic_cascade_local_floor)
+        """
+        from src.config import settings
+        
+        self.scorer = scorer
+        self.mode = settings.semantic_cascade_mode if mode is None else mode
+        self.local_floor = settings.semantic_cascade_local_floor if local_floor is None else local_floor
+        
+        if self.mode not in CASCADE_MODES:
+            raise ValueError(f"Mode de cascade inconnu: {self.mode} (attendu: {', '.join(CASCADE_MODES)})")
+    
+    def decide(
+        self,
+        keyword_score: float,
+        nc_code_score: float,
+        has_critical_codes: bool = False
+    ) -> CascadeDecision:
+        """
+        Décide de l'appel LLM pour un document
+        
+        Args:
+            keyword_score: Score du niveau 1
+            nc_code_score: Score du niveau 2
+            has_critical_codes: Codes NC critiques trouvés
+        
+        Returns:
+            CascadeDecision (called, skipped ou deferred)
+        """
+        local_score = round(self.scorer.local_score(keyword_score, nc_code_score), 3)
+        low, high = self.scorer.criticality_bounds(keyword_score, nc_code_score, has_critical_codes)
+        
+        if self.mode == "off":
+            decision, reason = "called", "Cascade désactivée"
+        elif low == high:
+            decision, reason = "skipped", f"Criticité {low.value} quel que soit le résultat LLM"
+        elif self.mode == "gate" and local_score <= self.local_floor:
+            decision, reason = "deferred", f"Score local {local_score:.3f} <= {self.local_floor:.3f}"
+        else:
+            decision, reason = "called", f"Criticité entre {low.value} et {high.value} selon le LLM"
+        
+        return CascadeDecision(decision, reason, local_score, low, high)
+    
+    def placeholder_result(self, decision: CascadeDecision) -> SemanticAnalysisResult:
+        """Résultat du niveau 3 quand le LLM n'est pas appelé (score sémantique 0)"""
+        label = {
+            "skipped": "sautée par la cascade de pertinence",
+            "preclassified": "écartée par le pré-classifieur local",
+        }.get(decision.decision, "différée par la cascade de pertinence")
+        return SemanticAnalysisResult(
+            score=0.0,
+            is_applicable=False,
+            explanation=f"Analyse LLM {label} : {decision.reason}.",
+            regulation_summary="Document non résumé : l'analyse LLM n'a pas été effectuée pour ce document.",
+            impact_explanation=(
+                f"Impact estimé sur les niveaux mots-clés et codes NC seuls "
+                f"(score local {decision.local_score:.3f})."
+            ),
+            confidence_level=0.0
+        )
+
+
+# Section "📊 Scores" du reasoning sauvegardé avec chaque analyse
+_REASONING_SCORES = {
+    "keyword_score": re.compile(r"Mots-clés \(\d+%\): ([\d.]+)%"),
+    "nc_code_score": re.compile(r"Codes NC \(\d+%\): ([\d.]+)%"),
+    "semantic_score": re.compile(r"Sémantique \(\d+%\): ([\d.]+)%"),
+}
+
+
+def scores_from_reasoning(document_id: str, llm_reasoning: str) -> Optional[Dict]:
+    """
+    Scores par niveau d'une analyse historique, relus dans son reasoning
+    
+    Returns:
+        Dict document_id, keyword_score, nc_code_score, semantic_score
+        (None si la section des scores est absente)
+    """
+    record = {"document_id": document_id}
+    
+    for name, pattern in _REASONING_SCORES.items():
+        match = pattern.search(llm_reasoning or "")
+        if match is None:
+            return None
+        record[name] = float(match.group(1)) / 100
+    
+    return record
+
+
+def scores_from_document_analysis(analysis: Dict) -> Dict:
+    """Scores par niveau d'une DocumentAnalysis sérialisée (model_dump)"""
+    return {
+        "document_id": analysis["document_id"],
+        "keyword_score": analysis["relevance_score"]["keyword_score"],
+        "nc_code_score": analysis["relevance_score"]["nc_code_score"],
+        "semantic_score": analysis["relevance_score"]["semantic_score"],
+        "is_applicable": analysis["semantic_analysis"]["is_applicable"],
+        "has_critical_codes": bool(analysis["nc_code_analysis"].get("critical_codes")),
+    }
+
+
+def calibrate_cascade(records: Iterable[Dict], cascade: SemanticCascade) -> Dict:
+    """
+    Rejoue la cascade sur des analyses historiques
+    
+    Pour chaque analyse, la criticité obtenue avec le LLM (recalculée avec les
+    poids et seuils du scorer) est comparée à celle que la cascade aurait
+    enregistrée (score sémantique 0 si l'appel est sauté
+    ou différé). Les analyses sans is_applicable connu (reasoning) sont
+    supposées applicables pour le boost "score sémantique > 0.7".
+    
+    Args:
+        records: Dicts keyword_score, nc_code_score, semantic_score (0-1), et
+            optionnellement document_id, is_applicable, has_critical_codes
+        cascade: Cascade à évaluer
+    
+    Returns:
+        Rapport : appels économisés, décisions par type, décisions inversées
+    """
+    scorer = cascade.scorer
+    decisions = {"called": 0, "skipped": 0, "deferred": 0}
+    flips: List[Dict] = []
+    total = 0
+    
+    for record in records:
+        total += 1
+        has_critical_codes = record.get("has_critical_codes", False)
+        semantic_score = record["semantic_score"]
+        decision = cascade.decide(record["keyword_score"], record["nc_code_score"], has_critical_codes)
+        decisions[decision.decision] += 1
+        
+        criticality = scorer.criticality_for_score(
+            round(decision.local_score + semantic_score * scorer.semantic_weight, 3),
+            has_critical_codes,
+            high_applicability=record.get("is_applicable", True) and semantic_score > 0.7
+        )
+        
+        if decision.call_llm:
+            continue
+        
+        cascade_criticality = decision.min_criticality
+        if cascade_criticality != criticality:
+            flips.append({
+                "document_id": record.get("document_id"),
+                "decision": decision.decision,
+                "criticality": criticality.value,
+                "cascade_criticality": cascade_criticality.value,
+                "local_score": decision.local_score,
+                "semantic_score": semantic_score,
+            })
+    
+    saved = decisions["skipped"] + decisions["deferred"]
+    report = {
+        "mode": cascade.mode,
+        "local_floor": cascade.local_floor,
+        "documents": total,
+        "decisions": decisions,
+        "llm_calls_saved": saved,
+        "llm_calls_saved_share": round(saved / total, 3) if total else None,
+        "flipped": len(flips),
+        "flipped_share": round(len(flips) / total, 3) if total else None,
+        "flips": flips,
+    }
+    
+    logger.info(
+        "semantic_cascade_calibrated",
+        mode=cascade.mode,
+        documents=total,
+        llm_calls_saved=saved,
+        flipped=len(flips)
+    )
+    
+    return report
@@ -0,0 +1,306 @@
+"""
+Analyse sémantique map-reduce des documents très longs
+
+Au lieu d'un appel unique sur un extrait, le document est découpé en
+passages bornés en tokens :
+- map : un appel court par passage, en parallèle (SEMANTIC_MAP_REDUCE_CONCURRENCY),
+  qui extrait obligations, produits, codes NC et portée géographique
+- reduce : les extractions sont fusionnées en une synthèse, analysée par le
+  prompt sémantique habituel (même préfixe cacheable) pour produire un
+  SemanticAnalysisResult
+
+La durée reste proche de celle d'un appel unique : les appels map sont
+simultanés et leur réponse est courte. Au-delà du budget par document
+(SEMANTIC_MAP_REDUCE_MAX_TOKENS), seuls les passages les mieux classés par
+BM25 contre le profil sont envoyés.
+"""
+
+import time
+import structlog
+from typing import Dict, List, Tuple
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langchain_core.output_parsers import PydanticOutputParser
+from langchain_core.prompts import PromptTemplate
+from langchain_core.runnables import RunnableLambda
+
+from src.agent_1b.models import ChunkExtraction, SemanticAnalysisResult
+from src.agent_1b.tools.content_selector import CHARS_PER_TOKEN, bm25_scores, split_sections, tokenize
+from src.agent_1b.tools.semantic_analyzer import (
+    SEMANTIC_COMPANY_PROMPT,
+    SemanticAnalyzer,
+    token_usage
+)
+from src.config import settings
+from src.utils.llm_usage import tracker
+
+logger = structlog.get_logger()
+
+# Réponse courte de la phase map
+MAP_MAX_TOKENS = 800
+
+CHUNK_EXTRACTION_PROMPT = PromptTemplate.from_template(
+    """Tu es un expert en analyse réglementaire. Le message de l'utilisateur contient UN passage d'un long document réglementaire ; d'autres passages sont analysés séparément.
+
+Extrais uniquement ce que dit CE passage, de façon factuelle et concise :
+- les obligations ou actions requises (déclaration, taxe, interdiction, etc.)
+- les produits et matériaux mentionnés
+- les codes NC/SH cités
+- les pays/régions concernés
+- si le passage concerne l'entreprise décrite ci-dessous
+
+N'invente rien : une liste vide vaut mieux qu'une supposition.
+
+# FORMAT DE RÉPONSE
+{format_instructions}
+"""
+)
+
+CHUNK_DOCUMENT_PROMPT = PromptTemplate.from_template(
+    """# PASSAGE {chunk_index}/{chunk_count}
+Document: {document_title} ({regulation_type})
+
+{chunk}
+"""
+)
+
+
+def _unique(values: List[str]) -> List[str]:
+    """Dédoublonne en conservant l'ordre (insensible à la casse)"""
+    seen = {}
+    for value in values:
+        key = value.strip().lower()
+        if key and key not in seen:
+            seen[key] = value.strip()
+    return list(seen.values())
+
+
+def render_extractions(extractions: List[Tuple[int, ChunkExtraction]], chunk_count: int) -> str:
+    """
+    Synthèse des extractions, remise au prompt sémantique à la place du document
+    
+    Args:
+        extractions: (index du passage, extraction), dans l'ordre du document
+        chunk_count: Nombre total de passages
+    """
+    relevant = [(index, extraction) for index, extraction in extractions if extraction.is_relevant]
+    lines = [
+        f"Synthèse de {len(extractions)} passages analysés sur {chunk_count} "
+        f"({len(relevant)} concernent l'entreprise).",
+        "",
+    ]
+    
+    sections = [
+        ("Obligations identifiées", [o for _, e in extractions for o in e.obligations]),
+        ("Produits / matériaux mentionnés", [p for _, e in extractions for p in e.products]),
+        ("Codes NC cités", [c for _, e in extractions for c in e.nc_codes]),
+        ("Portée géographique", [g for _, e in extractions for g in e.geographical_scope]),
+    ]
+    for title, values in sections:
+        values = _unique(values)
+        lines.append(f"{title}:")
+        lines.extend(f"- {value}" for value in values[:30]) if values else lines.append("- (aucun)")
+        lines.append("")
+    
+    lines.append("Passages concernant l'entreprise:")
+    for index, extraction in relevant or extractions[:5]:
+        lines.append(f"[Passage {index + 1}/{chunk_count}] {extraction.summary}")
+    
+    return "\n".join(lines)
+
+
+class SemanticMapReduce:
+    """Analyse map-reduce d'un document long pour un SemanticAnalyzer"""
+    
+    def __init__(self, analyzer: SemanticAnalyzer):
+        """
+        Args:
+            analyzer: Analyseur sémantique (client LLM, profil, prompt de réduction)
+        """
+        self.analyzer = analyzer
+        self.parser = PydanticOutputParser(pydantic_object=ChunkExtraction)
+        self.format_instructions = self.parser.get_format_instructions()
+        
+        # Phase map : réponse courte, même client que l'analyse unique
+        self.map_chain = RunnableLambda(self.build_chunk_messages) | analyzer.llm.bind(max_tokens=MAP_MAX_TOKENS)
+    
+    def split(self, document_content: str, query: Dict[str, float]) -> Tuple[List[str], int]:
+        """
+        Passages envoyés à la phase map
+        
+        Args:
+            document_content: Texte complet
+            query: Termes du profil (voir SemanticAnalyzer.content_query)
+        
+        Returns:
+            (passages retenus dans l'ordre du document, nombre total de passages)
+        """
+        chunk_chars = settings.semantic_map_reduce_chunk_tokens * CHARS_PER_TOKEN
+        spans = split_sections(document_content, chunk_chars)
+        budget = settings.semantic_map_reduce_max_tokens * CHARS_PER_TOKEN
+        
+        if sum(end - start for start, end in spans) > budget:
+            # Budget par document dépassé : passages les mieux classés d'abord
+            scores = bm25_scores([tokenize(document_content[start:end]) for start, end in spans], query)
+            kept, used = [], 0
+            for index in sorted(range(len(spans)), key=lambda i: (-scores[i], i)):
+                length = spans[index][1] - spans[index][0]
+                if used + length <= budget:
+                    kept.append(index)
+                    used += length
+            selected = sorted(kept)
+        else:
+            selected = range(len(spans))
+        
+        return [document_content[spans[i][0]:spans[i][1]] for i in selected], len(spans)
+    
+    def build_chunk_messages(self, inputs: Dict) -> List[BaseMessage]:
+        """Messages de la phase map (profil en préfixe cacheable, passage en fin)"""
+        system_blocks = [
+            {"type": "text", "text": CHUNK_EXTRACTION_PROMPT.format(format_instructions=self.format_instructions)},
+            {"type": "text", "text": SEMANTIC_COMPANY_PROMPT.format(**inputs)},
+        ]
+        if self.analyzer.cache_prefix:
+            for block in system_blocks:
+                block["cache_control"] = {"type": "ephemeral"}
+        
+        return [
+            SystemMessage(content=system_blocks),
+            HumanMessage(content=CHUNK_DOCUMENT_PROMPT.format(**inputs)),
+        ]
+    
+    def _map_inputs(
+        self,
+        chunks: List[str],
+        document_title: str,
+        regulation_type: str,
+        company_profile: Dict
+    ) -> List[Dict]:
+        profile = self.analyzer.profile_inputs(company_profile)
+        return [
+            {
+                **profile,
+                "chunk": chunk,
+                "chunk_index": index + 1,
+                "chunk_count": len(chunks),
+                "document_title": document_title,
+                "regulation_type": regulation_type,
+            }
+            for index, chunk in enumerate(chunks)
+        ]
+    
+    def _reduce_inputs(
+        self,
+        messages: List,
+        chunk_count: int,
+        document_title: str,
+        regulation_type: str,
+        company_profile: Dict
+    ) -> Tuple[Dict, List[Dict]]:
+        """Variables du prompt de réduction et consommation de la phase map"""
+        extractions = []
+        usages = []
+        
+        for index, message in enumerate(messages):
+            if isinstance(message, Exception):
+                logger.warning("map_reduce_chunk_failed", chunk=index + 1, error=str(message))
+                continue
+            try:
+                extractions.append((index, self.parser.invoke(message)))
+                usages.append(token_usage(message))
+            except Exception as e:
+                logger.warning("map_reduce_chunk_unparsable", chunk=index + 1, error=str(e))
+        
+        if not extractions:
+            raise RuntimeError("Aucun passage n'a pu être analysé")
+        
+        inputs = {
+            **self.analyzer.profile_inputs(company_profile),
+            "document_title": document_title,
+            "regulation_type": regulation_type,
+            "document_content": render_extractions(extractions, chunk_count),
+            "format_instructions": self.analyzer.format_instructions,
+        }
+        return inputs, usages
+    
+    def _finish(
+        self,
+        message,
+        usages: List[Dict],
+        chunks: List[str],
+        chunk_count: int,
+        start: float
+    ) -> Tuple[SemanticAnalysisResult, Dict]:
+        result = self.analyzer.output_parser.invoke(message)
+        usages.append(token_usage(message))
+        usage = {name: sum(u[name] for u in usages) for name in usages[0]}
+        wall_time = time.perf_counter() - start
+        
+        # Un enregistrement pour l'ensemble : la durée utile est celle du document
+        tracker.record(
+            self.analyzer.model_name,
+            usage,
+            latency_ms=wall_time * 1000,
+            calls=len(usages),
+            agent="agent_1b",
+            stage="semantic_map_reduce"
+        )
+        
+        logger.info(
+            "semantic_analysis_completed",
+            score=result.score,
+            is_applicable=result.is_applicable,
+            confidence=result.confidence_level,
+            map_reduce=True,
+            chunks=len(chunks),
+            chunks_total=chunk_count,
+            llm_calls=len(usages),
+            wall_ms=round(wall_time * 1000, 1),
+            **usage
+        )
+        return result, usage
+    
+    def run(
+        self,
+        document_content: str,
+        document_title: str,
+        regulation_type: str,
+        company_profile: Dict
+    ) -> Tuple[SemanticAnalysisResult, Dict]:
+        """
+        Analyse map-reduce (appels map en parallèle sur des threads)
+        
+        Returns:
+            (SemanticAnalysisResult, consommation de tokens cumulée)
+        """
+        start = time.perf_counter()
+        chunks, chunk_count = self.split(document_content, self.analyzer.content_query(company_profile, regulation_type))
+        
+        messages = self.map_chain.batch(
+            self._map_inputs(chunks, document_title, regulation_type, company_profile),
+            config={"max_concurrency": settings.semantic_map_reduce_concurrency},
+            return_exceptions=True
+        )
+        inputs, usages = self._reduce_inputs(messages, chunk_count, document_title, regulation_type, company_profile)
+        
+        return self._finish(self.analyzer.chain.invoke(inputs), usages, chunks, chunk_count, start)
+    
+    async def arun(
+        self,
+        document_content: str,
+        document_title: str,
+        regulation_type: str,
+        company_profile: Dict
+    ) -> Tuple[SemanticAnalysisResult, Dict]:
+        """Analyse map-reduce asynchrone (même résultat que run())"""
+        start = time.perf_counter()
+        chunks, chunk_count = self.split(document_content, self.analyzer.content_query(company_profile, regulation_type))
+        
+        messages = await self.map_chain.abatch(
+            self._map_inputs(chunks, document_title, regulation_type, company_profile),
+            config={"max_concurrency": settings.semantic_map_reduce_concurrency},
+            return_exceptions=True
+        )
+        inputs, usages = self._reduce_inputs(messages, chunk_count, document_title, regulation_type, company_profile)
+        
+        return self._finish(await self.analyzer.chain.ainvoke(inputs), usages, chunks, chunk_count, start)
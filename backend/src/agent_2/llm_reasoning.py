@@ -8,6 +8,8 @@ from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 import os
 
+from src.utils.llm_usage import create_message, llm_context
+
 
 class LLMReasoning:
     """
@@ -72,7 +74,8 @@ class LLMReasoning:
         )
         
         if self.llm_available:
-            return self._call_claude(prompt)
+            with llm_context(agent="agent_2", document_id=event.get("id")):
+                return self._call_claude(prompt)
         else:
             return self._simulate_reasoning(event, affected_entity, entity_type)
     
@@ -403,7 +406,10 @@ RÉPONDS UNIQUEMENT EN JSON :
     def _call_claude(self, prompt: str) -> Dict[str, Any]:
         """Appelle Claude Sonnet avec le prompt"""
         try:
-            response = self.client.messages.create(
+            # Tokens, latence et tentatives enregistrés (src/utils/llm_usage.py)
+            response = create_message(
+                self.client,
+                stage="cascade_reasoning",
                 model=self.model,
                 max_tokens=4096,
                 temperature=0.3,  # Température basse pour des réponses plus déterministes
@@ -10,6 +10,7 @@ from typing import Optional
 import structlog
 
 from src.orchestration.pipeline import run_pipeline
+from src.utils.llm_usage import end_run, persist_run, start_run
 
 logger = structlog.get_logger()
 
@@ -353,11 +354,12 @@ async def trigger_agent2_sync(request: Agent2Request = Agent2Request()):
         )
     
     _agent2_running = True
+    run_id, run_token = start_run("agent2")
     
     try:
         from src.agent_2.agent import Agent2
         
-        logger.info("agent2_sync_started", analysis_id=request.analysis_id)
+        logger.info("agent2_sync_started", analysis_id=request.analysis_id, run_id=run_id)
         
         agent = Agent2()
         
@@ -385,16 +387,22 @@ async def trigger_agent2_sync(request: Agent2Request = Agent2Request()):
         return PipelineStatus(
             status="completed",
             message="Agent 2 terminé avec succès",
-            details={"response": content[:1000] if content else "No response"}
+            details={
+                "response": content[:1000] if content else "No response",
+                "run_id": run_id,
+                "llm_usage": persist_run(run_id)
+            }
         )
         
     except Exception as e:
         logger.error("agent2_sync_failed", error=str(e), exc_info=True)
+        persist_run(run_id)
         raise HTTPException(
             status_code=500,
             detail=f"Erreur lors de l'exécution de l'Agent 2: {str(e)}"
         )
     finally:
+        end_run(run_token)
         _agent2_running = False
 
 
@@ -450,11 +458,12 @@ def _run_agent2_background(analysis_id: Optional[str], limit: int):
     """Exécute l'Agent 2 en arrière-plan."""
     global _agent2_running
     _agent2_running = True
+    run_id, run_token = start_run("agent2")
     
     try:
         from src.agent_2.agent import Agent2
         
-        logger.info("agent2_background_started", analysis_id=analysis_id)
+        logger.info("agent2_background_started", analysis_id=analysis_id, run_id=run_id)
         
         agent = Agent2()
         
@@ -468,7 +477,54 @@ def _run_agent2_background(analysis_id: Optional[str], limit: int):
     except Exception as e:
         logger.error("agent2_background_failed", error=str(e), exc_info=True)
     finally:
+        persist_run(run_id, token=run_token)
         _agent2_running = False
 
 
 # Note: L'ancien endpoint /status a été remplacé par /agent1/status et /agent2/status
+
+
+# ============================================================
+# CONSOMMATION LLM (tokens, latence, coût par run)
+# ============================================================
+
+@router.get("/usage")
+async def get_llm_usage_runs(limit: int = 20):
+    """
+    Derniers runs avec leur consommation LLM (appels, tokens, coût estimé, durée).
+    """
+    from src.storage.database import get_session
+    from src.storage.llm_usage_repository import LLMUsageRepository
+    
+    session = get_session()
+    try:
+        return {"runs": LLMUsageRepository(session).recent_runs(limit=limit)}
+    finally:
+        session.close()
+
+
+@router.get("/usage/{run_id}")
+async def get_llm_usage_run(run_id: str):
+    """
+    Consommation LLM d'un run, détaillée par agent, étape et modèle
+    (tokens d'entrée/sortie et de cache, tentatives, latence moyenne/max, coût estimé).
+    
+    - **run_id**: ID du run (ou "latest" pour le dernier run enregistré)
+    """
+    from src.storage.database import get_session
+    from src.storage.llm_usage_repository import LLMUsageRepository
+    from src.utils.llm_usage import summarize
+    
+    session = get_session()
+    try:
+        repository = LLMUsageRepository(session)
+        if run_id == "latest":
+            run_id = repository.latest_run_id()
+        rows = repository.find_by_run(run_id) if run_id else []
+    finally:
+        session.close()
+    
+    if not rows:
+        raise HTTPException(status_code=404, detail=f"Aucune consommation LLM enregistrée pour le run {run_id}")
+    
+    return {"run_id": run_id, **summarize(rows)}
@@ -25,6 +25,10 @@ class Settings(BaseSettings):
     # API Keys
     anthropic_api_key: str = Field(default="", description="ClÇ¸ API Anthropic (Claude)")
     google_api_key: str = Field(default="", description="Cle API Google (Gemini)")
+    anthropic_base_url: str = Field(default="", description="URL de l'API Anthropic (vide: API publique)")
+
+    # Comptabilité des appels LLM (tokens, latence, coût ; table llm_usage)
+    llm_usage_tracking: bool = Field(default=True)
 
     # Database
     database_url: str = Field(
@@ -51,13 +55,95 @@ class Settings(BaseSettings):
     log_file: str = Field(default="logs/agent.log")
 
     # Sources
+    eurlex_base_url: str = Field(default="https://eur-lex.europa.eu")
     cbam_source_url: str = Field(
         default="https://taxation-customs.ec.europa.eu/carbon-border-adjustment-mechanism/cbam-legislation-and-guidance_en"
     )
 
+    # Agent 1A - Ordre de préférence des rendus EUR-Lex (repli sur le suivant si absent)
+    eurlex_format_preference: str = Field(default="html,pdf")
+
+    # Agent 1A - Ordonnancement des téléchargements (voir agent_1a/tools/fetch_scheduler.py)
+    fetch_concurrency: int = Field(default=4)
+    fetch_large_file_mb: float = Field(default=10.0, description="Seuil d'un fichier lourd")
+    fetch_large_slots: int = Field(default=1, description="Fichiers lourds téléchargés en parallèle")
+    fetch_priority_document_types: str = Field(default="REGULATION:0,DIRECTIVE:1,DECISION:2,OTHER:3")
+    fetch_priority_categories: str = Field(
+        default="guidance:1,faq:2,default_values:2,template:3,tool:4,other:4"
+    )
+    fetch_priority_regulations: str = Field(default="CBAM")
+
+    # Agent 1A - Frontière de crawl : part du budget EUR-Lex réservée aux actes cités
+    citation_frontier_share: float = Field(default=0.3)
+    citation_frontier_max_attempts: int = Field(default=3)
+
+    # Agent 1A - Cassettes HTTP (off, record, replay) pour exécutions hors-ligne
+    http_cassette_mode: str = Field(default="off")
+    http_cassette_dir: Path = Field(default_factory=lambda: Path(__file__).parent.parent / "data" / "cassettes")
+    http_cassette_latency_ms: int = Field(default=0, description="Latence injectée en mode replay")
+
     # Company Profile
     default_company_profile: str = Field(default="aerorubber_industries")
 
+    # Agent 1B - Filtre mots-clés (mots entiers, insensible aux accents)
+    keyword_word_boundary: bool = Field(default=True)
+    keyword_accent_folding: bool = Field(default=True)
+
+    # Agent 1B - Analyse concurrente des documents bruts (appels LLM simultanés)
+    analysis_concurrency: int = Field(default=4)
+    semantic_max_retries: int = Field(default=4, description="Nouvelles tentatives après un 429/529")
+    semantic_retry_base_seconds: float = Field(default=2.0, description="Backoff sans en-tête retry-after")
+
+    # Agent 1B - File d'analyse par priorité (niveaux 1-2, type de document, source, fraîcheur)
+    analysis_priority_sources: str = Field(default="eurlex:0,cbam_guidance:1")
+    analysis_priority_freshness_days: float = Field(default=180.0, description="Demi-vie de la fraîcheur (0: ignorée)")
+
+    # Agent 1B - Cascade : appel LLM sauté si la criticité est déjà déterminée (off, exact, gate)
+    semantic_cascade_mode: str = Field(default="off")
+    semantic_cascade_local_floor: float = Field(default=0.0, description="Mode gate : score local jusqu'auquel le LLM est différé")
+
+    # Agent 1B - Analyse en masse par la Message Batches API (python -m src.main --bulk)
+    message_batch_poll_seconds: float = Field(default=60.0, description="Intervalle de consultation du lot")
+    message_batch_max_requests: int = Field(default=10000, description="Documents soumis par lot")
+
+    # Agent 1B - Mode headless (python -m src.main --headless) : analyses en JSONL, commits groupés
+    headless_commit_every: int = Field(default=50, description="Analyses enregistrées par commit")
+    headless_output_dir: Path = Field(default_factory=lambda: Path(__file__).parent.parent / "data" / "headless")
+
+    # Agent 1B - Extrait envoyé au LLM pour les documents longs
+    semantic_content_budget_tokens: int = Field(default=8000, description="Budget de l'extrait (~4 caractères/token)")
+    semantic_content_selection: str = Field(default="ranked", description="ranked (sections classées BM25) ou head_tail")
+
+    # Agent 1B - Map-reduce des documents très longs (extraction par passage en parallèle, puis synthèse)
+    semantic_map_reduce_enabled: bool = Field(default=False)
+    semantic_map_reduce_min_tokens: int = Field(default=24000, description="Taille à partir de laquelle le document est découpé")
+    semantic_map_reduce_chunk_tokens: int = Field(default=6000, description="Taille d'un passage")
+    semantic_map_reduce_concurrency: int = Field(default=8, description="Appels d'extraction simultanés")
+    semantic_map_reduce_max_tokens: int = Field(default=120000, description="Budget par document (passages les mieux classés au-delà)")
+
+    # Agent 1B - Cache de prompt Anthropic (instructions + profil en préfixe cacheable)
+    semantic_prompt_caching: bool = Field(default=True)
+
+    # Agent 1B - Cache persistant des analyses sémantiques (table semantic_cache)
+    semantic_cache_enabled: bool = Field(default=True)
+    semantic_cache_ttl_days: int = Field(default=90, description="0: pas d'expiration")
+    semantic_cache_max_mb: float = Field(default=100.0, description="Éviction LRU au-delà (0: illimitée)")
+
+    # Agent 1B - Index compilé des profils entreprise (automate mots-clés, trie NC, contexte du prompt)
+    profile_index_disk_cache: bool = Field(default=True)
+    profile_index_dir: Path = Field(default_factory=lambda: Path(__file__).parent.parent / "data" / "profile_index")
+
+    # Agent 1B - Re-scoring incrémental après modification d'un profil (diff avec l'index précédent)
+    profile_edit_rescoring: bool = Field(default=True, description="Au début de chaque analyse du backlog")
+
+    # Agent 1B - Pré-classifieur local (n-grammes hachés, entraîné sur les verdicts LLM : off, shadow, gate)
+    pre_classifier_mode: str = Field(default="off")
+    pre_classifier_dir: Path = Field(default_factory=lambda: Path(__file__).parent.parent / "data" / "pre_classifier")
+    pre_classifier_negative_threshold: float = Field(default=0.05, description="Mode gate : LLM sauté si P(applicable) < seuil")
+    pre_classifier_min_training_samples: int = Field(default=50, description="Analyses étiquetées nécessaires à l'entraînement")
+    pre_classifier_min_shadow_samples: int = Field(default=100, description="Comparaisons shadow avant d'autoriser le gate")
+    pre_classifier_min_shadow_precision: float = Field(default=0.98, description="Part des négatifs prédits confirmés par le LLM")
+
     # Agent 1B - Scoring weights
     keyword_weight: float = Field(default=0.3)
     nc_code_weight: float = Field(default=0.3)
@@ -5,6 +5,8 @@
 import json
 from typing import Dict, List, Any
 from anthropic import Anthropic
+
+from src.utils.llm_usage import create_message, llm_context
 from .prompts import (
     JUDGE_SYSTEM_PROMPT,
     EVALUATE_PERTINENCE_CHECKER_PROMPT,
@@ -53,15 +55,18 @@ class CriteriaEvaluator:
             suppliers_count=suppliers_count
         )
         
-        response = self.client.messages.create(
-            model=self.llm_model,
-            max_tokens=4096,
-            temperature=0.1,  # Faible température pour plus de cohérence
-            system=JUDGE_SYSTEM_PROMPT,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
+        with llm_context(agent="judge", document_id=document.get("id")):
+            response = create_message(
+                self.client,
+                stage="evaluate_pertinence_checker",
+                model=self.llm_model,
+                max_tokens=4096,
+                temperature=0.1,  # Faible température pour plus de cohérence
+                system=JUDGE_SYSTEM_PROMPT,
+                messages=[
+                    {"role": "user", "content": prompt}
+                ]
+            )
         
         result_text = response.content[0].text.strip()
         
@@ -113,15 +118,18 @@ class CriteriaEvaluator:
             relationships_count=relationships_count
         )
         
-        response = self.client.messages.create(
-            model=self.llm_model,
-            max_tokens=4096,
-            temperature=0.1,
-            system=JUDGE_SYSTEM_PROMPT,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
+        with llm_context(agent="judge", document_id=document.get("id")):
+            response = create_message(
+                self.client,
+                stage="evaluate_risk_analyzer",
+                model=self.llm_model,
+                max_tokens=4096,
+                temperature=0.1,
+                system=JUDGE_SYSTEM_PROMPT,
+                messages=[
+                    {"role": "user", "content": prompt}
+                ]
+            )
         
         result_text = response.content[0].text.strip()
         
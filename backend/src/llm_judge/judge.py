@@ -7,6 +7,7 @@ from typing import Dict, List, Any
 from datetime import datetime
 from anthropic import Anthropic
 
+from src.utils.llm_usage import create_message, llm_context
 from .criteria_evaluator import CriteriaEvaluator
 from .weights_config import get_weights, calculate_weighted_score
 from .prompts import JUDGE_SYSTEM_PROMPT, FINAL_DECISION_PROMPT
@@ -110,14 +111,15 @@ class Judge:
         
         # 4. Déterminer l'action recommandée
         print("\n🤔 Détermination de l'action...")
-        decision = self._determine_action(
-            pertinence_weighted_score,
-            pertinence_confidence,
-            risk_weighted_score,
-            risk_confidence,
-            overall_score,
-            overall_confidence
-        )
+        with llm_context(agent="judge", document_id=document.get('id')):
+            decision = self._determine_action(
+                pertinence_weighted_score,
+                pertinence_confidence,
+                risk_weighted_score,
+                risk_confidence,
+                overall_score,
+                overall_confidence
+            )
         
         print(f"   ✅ Action: {decision['action_recommended']}")
         print(f"   📝 Raisonnement: {decision['reasoning']}")
@@ -176,7 +178,9 @@ class Judge:
             overall_confidence=overall_confidence
         )
         
-        response = self.client.messages.create(
+        response = create_message(
+            self.client,
+            stage="final_decision",
             model=self.llm_model,
             max_tokens=1024,
             temperature=0.0,  # Déterministe pour la décision
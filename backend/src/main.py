@@ -7,6 +7,7 @@ from pathlib import Path
 import structlog
 
 from src.config import settings
+from src.utils.llm_usage import format_summary
 from src.utils.logging_config import setup_logging
 
 logger = structlog.get_logger()
@@ -23,6 +24,77 @@ def main():
         action="store_true",
         help="Exécuter l'agent une seule fois (mode développement)",
     )
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="Analyser les couples (document, profil) en attente en masse via la Message Batches API",
+    )
+    parser.add_argument(
+        "--resume-batch",
+        metavar="BATCH_ID",
+        help="Reprendre un lot Message Batches déjà soumis (implique --bulk, avec --profile)",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="PROFILE_ID",
+        help="Avec --bulk ou --resume-batch : profil à analyser (défaut: tous les profils actifs)",
+    )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="Analyser les couples (document, profil) en attente sans affichage, analyses écrites en JSONL",
+    )
+    parser.add_argument(
+        "--jsonl",
+        type=Path,
+        metavar="PATH",
+        help="Avec --headless : fichier JSONL (défaut: HEADLESS_OUTPUT_DIR/<run_id>.jsonl)",
+    )
+    parser.add_argument(
+        "--display",
+        action="store_true",
+        help="Avec --headless : afficher aussi chaque analyse (Rich)",
+    )
+    parser.add_argument(
+        "--commit-every",
+        type=int,
+        metavar="N",
+        help="Avec --headless : analyses enregistrées par commit (défaut: HEADLESS_COMMIT_EVERY)",
+    )
+    parser.add_argument(
+        "--usage",
+        nargs="?",
+        const="latest",
+        metavar="RUN_ID",
+        help="Afficher la consommation LLM d'un run (défaut: le dernier) puis quitter",
+    )
+    parser.add_argument(
+        "--rescore",
+        action="store_true",
+        help="Recalculer score et criticité des analyses stockées (poids et seuils actuels, sans LLM) puis quitter",
+    )
+    parser.add_argument(
+        "--profile-edits",
+        action="store_true",
+        help="Re-scorer les analyses des profils modifiés (niveaux 1-2, sans LLM) et afficher les documents touchés puis quitter",
+    )
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="Avec --rescore ou --profile-edits : écrire les nouveaux scores (défaut: essai à blanc)",
+    )
+    parser.add_argument(
+        "--train-pre-classifier",
+        nargs="?",
+        const="all",
+        metavar="PROFILE_ID",
+        help="Entraîner une nouvelle version du pré-classifieur local (défaut: tous les profils analysés) puis quitter",
+    )
+    parser.add_argument(
+        "--pre-classifier-report",
+        action="store_true",
+        help="Afficher l'accord shadow entre le pré-classifieur et le LLM puis quitter",
+    )
     parser.add_argument(
         "--log-level",
         default=settings.log_level,
@@ -32,20 +104,64 @@ def main():
 
     args = parser.parse_args()
 
+    if args.usage:
+        sys.exit(show_llm_usage(args.usage))
+
+    if args.rescore:
+        sys.exit(rescore_analyses(apply=args.apply))
+
+    if args.profile_edits:
+        sys.exit(rescore_profile_edits(apply=args.apply))
+
+    if args.train_pre_classifier:
+        sys.exit(train_pre_classifiers(args.train_pre_classifier))
+
+    if args.pre_classifier_report:
+        sys.exit(show_pre_classifier_agreement())
+
     logger.info(
         "démarrage_agent",
-        mode="once" if args.run_once else "scheduler",
+        mode=(
+            "bulk" if args.bulk or args.resume_batch
+            else "headless" if args.headless
+            else "once" if args.run_once
+            else "scheduler"
+        ),
         company_profile=settings.default_company_profile,
     )
 
     try:
-        if args.run_once:
+        if args.bulk or args.resume_batch:
+            # Analyse en masse (premier chargement, re-scoring du corpus)
+            from src.orchestration.pipeline import run_bulk_analysis
+
+            result = run_bulk_analysis(batch_id=args.resume_batch, profile_id=args.profile)
+            logger.info("analyse_en_masse_terminée", status=result["status"])
+            print(format_summary(result["run_id"], result["llm_usage"]))
+            if result["status"] != "success":
+                sys.exit(1)
+        elif args.headless:
+            # Traitement en lot sans affichage (production, pipelines)
+            from src.orchestration.pipeline import format_throughput, run_headless_analysis
+
+            result = run_headless_analysis(output=args.jsonl, display=args.display, commit_every=args.commit_every)
+            logger.info("analyse_headless_terminée", status=result["status"], output=result["output"])
+            if result["status"] == "success":
+                print(format_throughput(result))
+            print(format_summary(result["run_id"], result["llm_usage"]))
+            if result["status"] != "success":
+                sys.exit(1)
+        elif args.run_once:
             # Mode exécution unique (développement)
             from src.orchestration.pipeline import run_pipeline
 
             logger.info("exécution_unique_démarrée")
-            run_pipeline()
+            result = run_pipeline()
             logger.info("exécution_unique_terminée")
+            print(format_summary(result["run_id"], result["llm_usage"]))
+            first_critical = result.get("agent_1b", {}).get("time_to_first_critical_seconds")
+            if first_critical is not None:
+                print(f"Première analyse critique : {first_critical:.1f} s après le début de l'Agent 1B")
         else:
             # Mode scheduler (production)
             from src.orchestration.scheduler import start_scheduler
@@ -61,5 +177,113 @@ def main():
         sys.exit(1)
 
 
+def show_llm_usage(run_id: str) -> int:
+    """Affiche la consommation LLM d'un run enregistré (code de sortie)."""
+    from src.storage.database import get_session
+    from src.storage.llm_usage_repository import LLMUsageRepository
+    from src.utils.llm_usage import summarize
+
+    session = get_session()
+    try:
+        repository = LLMUsageRepository(session)
+        if run_id == "latest":
+            run_id = repository.latest_run_id()
+        rows = repository.find_by_run(run_id) if run_id else []
+    finally:
+        session.close()
+
+    if not rows:
+        print(f"Aucune consommation LLM enregistrée pour le run {run_id}")
+        return 1
+
+    print(format_summary(run_id, summarize(rows)))
+    return 0
+
+
+def rescore_analyses(apply: bool) -> int:
+    """Re-score les analyses stockées et affiche les changements (code de sortie)."""
+    from src.agent_1b.rescoring import format_rescore_report, rescore_stored_analyses
+    from src.storage.database import get_session
+
+    session = get_session()
+    try:
+        report = rescore_stored_analyses(session, apply=apply)
+    finally:
+        session.close()
+
+    print(format_rescore_report(report))
+    return 0
+
+
+def rescore_profile_edits(apply: bool) -> int:
+    """Re-score incrémental des profils actifs modifiés et rapport des documents touchés (code de sortie)."""
+    from src.agent_1b.profile_update import format_profile_edit_report, rescore_profile_edits as rescore
+    from src.orchestration.pipeline import load_active_profiles
+    from src.storage.database import get_session
+
+    profiles = load_active_profiles()
+    session = get_session()
+    try:
+        reports = [rescore(session, profile_index, apply=apply) for profile_index in profiles]
+    finally:
+        session.close()
+
+    print(format_profile_edit_report(reports))
+    return 0
+
+
+def _analyzed_profile_ids(session) -> list:
+    """Profils ayant des analyses Agent 1B enregistrées."""
+    from src.storage.models import DocumentProfileAnalysis
+
+    return [
+        profile_id for (profile_id,) in session.query(DocumentProfileAnalysis.company_profile_id)
+        .distinct().order_by(DocumentProfileAnalysis.company_profile_id)
+    ]
+
+
+def train_pre_classifiers(profile_id: str) -> int:
+    """Entraîne le pré-classifieur local de chaque profil (code de sortie)."""
+    from src.agent_1b.pre_classifier import format_training_report, train_pre_classifier
+    from src.storage.database import get_session
+
+    session = get_session()
+    try:
+        profile_ids = _analyzed_profile_ids(session) if profile_id == "all" else [profile_id]
+        reports = [train_pre_classifier(session, profile) for profile in profile_ids]
+    finally:
+        session.close()
+
+    if not reports:
+        print("Aucune analyse enregistrée : rien à entraîner")
+        return 1
+
+    print(format_training_report(reports))
+    return 0 if any(report["status"] == "trained" for report in reports) else 1
+
+
+def show_pre_classifier_agreement() -> int:
+    """Affiche l'accord shadow du dernier modèle de chaque profil (code de sortie)."""
+    from src.agent_1b.pre_classifier import format_shadow_report, model_versions, shadow_agreement
+    from src.storage.database import get_session
+
+    session = get_session()
+    try:
+        agreements = [
+            shadow_agreement(session, profile_id, model_versions(profile_id)[-1])
+            for profile_id in _analyzed_profile_ids(session)
+            if model_versions(profile_id)
+        ]
+    finally:
+        session.close()
+
+    if not agreements:
+        print("Aucun pré-classifieur entraîné (--train-pre-classifier)")
+        return 1
+
+    print(format_shadow_report(agreements))
+    return 0
+
+
 if __name__ == "__main__":
     main()
@@ -6,16 +6,32 @@ Orchestration du workflow: Agent 1A → Agent 1B → Notifications
 
 import asyncio
 import structlog
-from typing import Dict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import defer
 
 from src.storage.database import get_session
-from src.storage.models import Document
+from src.storage.document_feature_repository import DocumentFeatureRepository
+from src.storage.document_profile_repository import DocumentProfileRepository
+from src.storage.models import CompanyProfile, Document, DocumentProfileAnalysis
 from src.agent_1a.agent import run_agent_1a_combined
 from src.agent_1b.agent import Agent1B
-from src.agent_1b.display import process_and_display_analysis
+from src.agent_1b.fan_out import FanOutAnalyzer
+from src.agent_1b.features import covers, extend_features, featurize, is_current
+from src.agent_1b.models import DocumentFeatures
+from src.agent_1b.priority import priority_attributes
+from src.agent_1b.profile_update import rescore_profile_edits
+from src.agent_1b.profile_index import ProfileIndex, profile_index_for_row
+from src.agent_1b.message_batch import MessageBatchAnalyzer
+from src.agent_1b.sinks import AnalysisSink, DatabaseSink, JsonlSink, RichSink
+from src.utils.llm_usage import persist_run, start_run
 
 logger = structlog.get_logger()
 
+# Profil analysé avant le suivi par profil (documents déjà marqués 'analyzed')
+LEGACY_COMPANY_NAME = "HUTCHINSON"
+
 
 def run_pipeline(
     keyword: str = "CBAM",
@@ -27,13 +43,14 @@ def run_pipeline(
     Exécute le pipeline complet de veille réglementaire.
     
     Workflow:
-    1. Lancer Agent 1A pour collecter les nouveaux documents
-    2. Si Agent 1A réussit → Charger le profil entreprise
-    3. Récupérer les documents NON ANALYSÉS (workflow_status = 'raw')
-    4. Pour chaque document:
-       - Lancer Agent 1B pour l'analyser
-       - Mettre à jour workflow_status = 'analyzed'
-    5. Retourner les statistiques
+    1. Lancer Agent 1A pour collecter les nouveaux documents (une seule fois,
+       quel que soit le nombre de profils)
+    2. Si Agent 1A réussit → Charger les profils entreprise actifs
+    3. Récupérer les couples (document, profil) NON ANALYSÉS
+    4. Analyser les documents pour chaque profil (voir _analyze_backlog) :
+       affichage Rich de chaque analyse, sauvegarde et commit au fil de l'eau
+       (workflow_status = 'analyzed' quand tous les profils l'ont analysé)
+    5. Retourner les statistiques (dont la consommation LLM du run)
     
     Args:
         keyword: Mot-clé pour EUR-Lex (CBAM, EUDR, CSRD)
@@ -47,6 +64,9 @@ def run_pipeline(
     
     logger.info("pipeline_started")
     
+    # Appels LLM du run rattachés à run_id (table llm_usage)
+    run_id, run_token = start_run("pipeline")
+    
     try:
         # ====================================================================
         # ÉTAPE 1 : AGENT 1A - COLLECTE DES DOCUMENTS
@@ -73,154 +93,546 @@ def run_pipeline(
         )
         
         # ====================================================================
-        # ÉTAPE 2 : CHARGER LE PROFIL ENTREPRISE
+        # ÉTAPE 2 : CHARGER LES PROFILS ENTREPRISE ACTIFS
         # ====================================================================
-        logger.info("step_2_loading_company_profile")
+        logger.info("step_2_loading_company_profiles")
         
-        company_profile = load_company_profile()
+        # Profils compilés (mots-clés, codes NC, contexte) réutilisés tant
+        # que leur updated_at ne change pas
+        company_profiles = load_active_profiles()
         
-        logger.info(
-            "company_profile_loaded",
-            company=company_profile.get("company_name"),
-            keywords=len(company_profile.get("keywords", [])),
-            nc_codes=len(company_profile.get("nc_codes", {}))
-        )
+        for profile_index in company_profiles:
+            logger.info(
+                "company_profile_loaded",
+                company=profile_index.company_name,
+                keywords=profile_index.keyword_filter.total_keywords,
+                nc_codes=len(profile_index.nc_code_filter.company_nc_codes)
+            )
         
         # ====================================================================
-        # ÉTAPE 3 : RÉCUPÉRER LES DOCUMENTS NON ANALYSÉS
+        # ÉTAPES 3-4 : AGENT 1B - COUPLES (DOCUMENT, PROFIL) NON ANALYSÉS
         # ====================================================================
-        logger.info("step_3_fetching_unanalyzed_documents")
-        
         session = get_session()
         
         try:
-            # Chercher les documents avec workflow_status = 'raw'
-            unanalyzed_docs = session.query(Document).filter(
-                Document.workflow_status == "raw"
-            ).all()
-            
-            logger.info(
-                "unanalyzed_documents_found",
-                count=len(unanalyzed_docs)
-            )
-            
-            if len(unanalyzed_docs) == 0:
-                logger.info("no_documents_to_analyze")
-                return {
-                    "status": "success",
-                    "agent_1a": result_1a,
-                    "agent_1b": {
-                        "documents_analyzed": 0,
-                        "relevant_count": 0,
-                        "critical_count": 0
-                    }
-                }
-            
-            # ====================================================================
-            # ÉTAPE 4 : AGENT 1B - ANALYSE DES DOCUMENTS
-            # ====================================================================
-            logger.info("step_4_launching_agent_1b", count=len(unanalyzed_docs))
-            
-            agent = Agent1B(company_profile)
-            
-            analyses_created = []
-            relevant_count = 0
-            critical_count = 0
-            analysis_errors = []
-            
-            for idx, doc in enumerate(unanalyzed_docs, 1):
-                try:
-                    logger.info(
-                        "analyzing_document",
-                        index=f"{idx}/{len(unanalyzed_docs)}",
-                        document_id=doc.id,
-                        title=doc.title[:60]
-                    )
-                    
-                    # Analyser le document
-                    analysis = agent.analyze_document(
-                        document_id=doc.id,
-                        document_content=doc.content or "",
-                        document_title=doc.title,
-                        regulation_type=doc.regulation_type or "CBAM"
-                    )
-                    
-                    # Sauvegarder l'analyse en BDD
-                    analysis_id = process_and_display_analysis(analysis, save_to_db=True)
-                    
-                    if analysis_id:
-                        analyses_created.append(analysis_id)
-                    
-                    # Compter les stats
-                    if analysis.is_relevant:
-                        relevant_count += 1
-                    if analysis.relevance_score.criticality.value == "CRITICAL":
-                        critical_count += 1
-                    
-                    # Mettre à jour le workflow_status
-                    doc.workflow_status = "analyzed"
-                    doc.analyzed_at = analysis.analysis_timestamp
-                    session.commit()
-                    
-                    logger.info(
-                        "document_analyzed",
-                        document_id=doc.id,
-                        is_relevant=analysis.is_relevant,
-                        criticality=analysis.relevance_score.criticality.value
-                    )
-                    
-                except Exception as e:
-                    logger.error(
-                        "analysis_failed",
-                        document_id=doc.id,
-                        error=str(e),
-                        exc_info=True
-                    )
-                    analysis_errors.append({
-                        "document_id": doc.id,
-                        "error": str(e)
-                    })
-                    session.rollback()
-            
-            logger.info(
-                "agent_1b_completed",
-                analyzed=len(analyses_created),
-                relevant=relevant_count,
-                critical=critical_count,
-                errors=len(analysis_errors)
-            )
-            
-            # ====================================================================
-            # RÉSULTAT FINAL
-            # ====================================================================
-            
-            result = {
-                "status": "success",
-                "agent_1a": result_1a,
-                "agent_1b": {
-                    "documents_analyzed": len(analyses_created),
-                    "relevant_count": relevant_count,
-                    "critical_count": critical_count,
-                    "errors": len(analysis_errors)
-                }
-            }
-            
-            logger.info("pipeline_completed", result=result)
-            
-            return result
-            
+            # Affichage Rich de chaque analyse, commit après chaque analyse
+            agent_1b = _analyze_backlog(session, company_profiles, sinks=[RichSink()], commit_every=1)
         finally:
             session.close()
         
+        # ====================================================================
+        # RÉSULTAT FINAL
+        # ====================================================================
+        
+        result = {
+            "status": "success",
+            "agent_1a": result_1a,
+            "agent_1b": agent_1b,
+            "run_id": run_id,
+            "llm_usage": persist_run(run_id, token=run_token)
+        }
+        
+        logger.info("pipeline_completed", result=result)
+        
+        return result
+        
     except Exception as e:
         logger.error("pipeline_failed", error=str(e), exc_info=True)
         return {
             "status": "error",
-            "error": str(e)
+            "error": str(e),
+            "run_id": run_id,
+            "llm_usage": persist_run(run_id, token=run_token)
+        }
+
+
+def _analyze_backlog(
+    session,
+    company_profiles: List[ProfileIndex],
+    sinks: List[AnalysisSink],
+    commit_every: int = 1
+) -> Dict:
+    """
+    Analyse les couples (document, profil) en attente
+    
+    - Niveaux 1-2 : un seul balayage par document pour tous les profils
+    - Couples traités par priorité décroissante, niveau 3 un appel LLM par profil
+    - Chaque analyse est remise aux autres destinations (affichage Rich,
+      JSONL écrit au commit) puis enregistrée sur la session du run
+      (DatabaseSink, commit toutes les `commit_every` écritures) ; l'échec
+      d'une autre destination n'affecte pas l'enregistrement en base
+    
+    Args:
+        session: Session SQLAlchemy du run
+        company_profiles: Profils actifs compilés
+        sinks: Destinations supplémentaires des analyses
+        commit_every: Écritures par commit
+    
+    Returns:
+        Statistiques Agent 1B du run
+    """
+    logger.info("step_3_fetching_unanalyzed_documents")
+    
+    states = DocumentProfileRepository(session)
+    _backfill_legacy_states(session, states, company_profiles)
+    profile_edits = _rescore_profile_edits(session, company_profiles)
+    
+    pending = states.pending([profile_index.profile_id for profile_index in company_profiles])
+    # Texte chargé à la demande : les niveaux 1-2 lisent les caractéristiques
+    unanalyzed_docs = session.query(Document)\
+        .options(defer(Document.content))\
+        .filter(Document.id.in_(list(pending)))\
+        .all()
+    order = {doc_id: index for index, doc_id in enumerate(pending)}
+    unanalyzed_docs.sort(key=lambda doc: order[doc.id])
+    pair_count = sum(len(profile_ids) for profile_ids in pending.values())
+    
+    logger.info(
+        "unanalyzed_documents_found",
+        count=len(unanalyzed_docs),
+        pairs=pair_count,
+        profiles=len(company_profiles)
+    )
+    
+    stats = {
+        "profiles": len(company_profiles),
+        "documents": len(unanalyzed_docs),
+        "pairs": pair_count,
+        "documents_analyzed": 0,
+        "relevant_count": 0,
+        "critical_count": 0,
+        "errors": 0,
+        "profile_edits": profile_edits,
+    }
+    
+    if len(unanalyzed_docs) == 0:
+        logger.info("no_documents_to_analyze")
+        return stats
+    
+    logger.info("step_4_launching_agent_1b", count=len(unanalyzed_docs), pairs=pair_count)
+    
+    # Un agent par profil, même client LLM (partagé par le processus)
+    agents = {profile_index.profile_id: Agent1B(profile_index) for profile_index in company_profiles}
+    
+    # Client LLM prêt avant le premier document, réutilisé pour tous
+    next(iter(agents.values())).semantic_analyzer.warm_up()
+    
+    features = _document_features(session, unanalyzed_docs, pending, company_profiles)
+    
+    database = DatabaseSink(
+        session,
+        {doc.id: doc for doc in unanalyzed_docs},
+        pending,
+        commit_every=commit_every,
+        listeners=sinks
+    )
+    
+    def save_analysis(document: dict, profile_id: str, analysis) -> None:
+        """Analyse remise à chaque destination dès qu'elle est prête"""
+        # Avant l'écriture en base : un rollback annule aussi ses lignes JSONL
+        for sink in sinks:
+            _deliver(sink.write, document, profile_id, analysis)
+        # Échec d'écriture en base : le couple passe en erreur (save_error)
+        database.write(document, profile_id, analysis)
+        
+        stats["documents_analyzed"] += 1
+        if analysis.is_relevant:
+            stats["relevant_count"] += 1
+        if analysis.relevance_score.criticality.value == "CRITICAL":
+            stats["critical_count"] += 1
+        
+        logger.info(
+            "document_analyzed",
+            index=f"{stats['documents_analyzed']}/{pair_count}",
+            document_id=document["document_id"],
+            profile_id=profile_id,
+            is_relevant=analysis.is_relevant,
+            criticality=analysis.relevance_score.criticality.value
+        )
+    
+    def save_error(document: dict, profile_id: str, error: Exception) -> None:
+        """Échec conservé : le couple sera repris au prochain run"""
+        for sink in sinks:
+            _deliver(sink.error, document, profile_id, error)
+        _deliver(database.error, document, profile_id, error)
+    
+    try:
+        # Niveaux 1-2 une fois par document, puis couples (document, profil) par
+        # priorité décroissante, appels LLM en parallèle (ANALYSIS_CONCURRENCY)
+        batch_stats = asyncio.run(FanOutAnalyzer(agents).run(
+            [
+                {
+                    "document_id": doc.id,
+                    "document_content": None,
+                    "load_content": lambda doc=doc: doc.content or "",
+                    "features": features.get(doc.id),
+                    "document_title": doc.title,
+                    "regulation_type": doc.regulation_type or "CBAM",
+                    "profile_ids": pending[doc.id],
+                    **priority_attributes(doc)
+                }
+                for doc in unanalyzed_docs
+            ],
+            on_analysis=save_analysis,
+            on_error=save_error
+        ))
+    finally:
+        try:
+            database.close()
+        finally:
+            for sink in sinks:
+                _deliver(sink.close)
+    
+    stats.update(
+        documents_saved=database.saved,
+        documents_lost=database.lost,
+        commits=database.commits,
+        errors=len(batch_stats["errors"]),
+        concurrency=batch_stats["concurrency"],
+        rate_limit_pauses=batch_stats["rate_limit_pauses"],
+        semantic_cache=batch_stats["semantic_cache"],
+        wall_time_seconds=batch_stats["wall_time_seconds"],
+        time_to_first_critical_seconds=batch_stats["first_critical_seconds"],
+        first_critical_position=batch_stats["first_critical_position"]
+    )
+    
+    logger.info(
+        "agent_1b_completed",
+        analyzed=stats["documents_analyzed"],
+        relevant=stats["relevant_count"],
+        critical=stats["critical_count"],
+        errors=stats["errors"],
+        commits=stats["commits"],
+        time_to_first_critical_seconds=stats["time_to_first_critical_seconds"]
+    )
+    return stats
+
+
+def _deliver(method, *args) -> None:
+    """Appel d'une destination d'analyses : son échec est journalisé sans interrompre le run"""
+    try:
+        method(*args)
+    except Exception as e:
+        logger.error(
+            "analysis_sink_failed",
+            sink=type(method.__self__).__name__,
+            method=method.__name__,
+            error=str(e),
+            exc_info=True
+        )
+
+
+def run_headless_analysis(output: Optional[Path] = None, display: bool = False, commit_every: Optional[int] = None) -> Dict:
+    """
+    Analyse Agent 1B du backlog sans affichage (production, traitements en lot)
+    
+    Pas de collecte Agent 1A : les couples (document, profil) en attente sont
+    analysés, chaque analyse est écrite au fil de l'eau dans un fichier JSONL
+    et enregistrée en base sur une seule session, avec un commit toutes les
+    `commit_every` écritures.
+    
+    Args:
+        output: Fichier JSONL (défaut: <HEADLESS_OUTPUT_DIR>/<run_id>.jsonl)
+        display: Afficher aussi chaque analyse (Rich)
+        commit_every: Écritures par commit (défaut: settings.headless_commit_every)
+    
+    Returns:
+        dict: Statistiques du run (dont débit et chemin du JSONL)
+    """
+    from src.config import settings
+    
+    run_id, run_token = start_run("headless")
+    output = Path(output or settings.headless_output_dir / f"{run_id}.jsonl")
+    commit_every = settings.headless_commit_every if commit_every is None else commit_every
+    logger.info("headless_analysis_started", run_id=run_id, output=str(output), commit_every=commit_every)
+    
+    session = get_session()
+    
+    try:
+        sinks = [JsonlSink.open(output)] + ([RichSink()] if display else [])
+        agent_1b = _analyze_backlog(session, load_active_profiles(), sinks=sinks, commit_every=commit_every)
+        
+        wall_time = agent_1b.get("wall_time_seconds")
+        agent_1b["analyses_per_minute"] = (
+            round(agent_1b["documents_analyzed"] / wall_time * 60, 1) if wall_time else None
+        )
+        return {
+            "status": "success",
+            "agent_1b": agent_1b,
+            "output": str(output),
+            "run_id": run_id,
+            "llm_usage": persist_run(run_id, token=run_token)
+        }
+    
+    except Exception as e:
+        logger.error("headless_analysis_failed", error=str(e), exc_info=True)
+        return {
+            "status": "error",
+            "error": str(e),
+            "output": str(output),
+            "run_id": run_id,
+            "llm_usage": persist_run(run_id, token=run_token)
+        }
+    
+    finally:
+        session.close()
+
+
+def format_throughput(result: Dict) -> str:
+    """Résumé de débit (terminal) d'un run headless"""
+    stats = result["agent_1b"]
+    lines = [
+        f"Agent 1B headless - run {result['run_id']}",
+        f"  Couples analysés : {stats['documents_analyzed']}/{stats['pairs']} "
+        f"({stats['documents']} documents, {stats['profiles']} profils), erreurs : {stats['errors']}",
+    ]
+    if stats.get("wall_time_seconds"):
+        lines.append(
+            f"  Durée : {stats['wall_time_seconds']:.1f} s, {stats['analyses_per_minute']} analyses/min "
+            f"(concurrence {stats['concurrency']}, pauses 429 : {stats['rate_limit_pauses']})"
+        )
+        lines.append(
+            f"  Base : {stats['documents_saved']} analyses enregistrées en {stats['commits']} commits"
+            + (f", {stats['documents_lost']} perdues (reprises au prochain run)" if stats["documents_lost"] else "")
+        )
+    lines.append(f"  Pertinentes : {stats['relevant_count']}, critiques : {stats['critical_count']}")
+    if stats.get("time_to_first_critical_seconds") is not None:
+        lines.append(f"  Première analyse critique : {stats['time_to_first_critical_seconds']:.1f} s")
+    lines.append(f"  JSONL : {result['output']}")
+    return "\n".join(lines)
+
+
+def _document_features(
+    session,
+    documents: List[Document],
+    pending: Dict[str, List[str]],
+    company_profiles: List[ProfileIndex]
+) -> Dict[str, DocumentFeatures]:
+    """
+    Caractéristiques des documents à analyser, couvrant leurs profils en attente
+    
+    Normalement calculées à la collecte par l'Agent 1A. Le texte n'est lu que
+    pour un document sans caractéristiques à jour (collecté avant, ou modifié)
+    ou dont un profil en attente n'est pas encore couvert (profil ajouté ou
+    modifié) ; l'enregistrement complété est sauvegardé pour les runs suivants.
+    """
+    repository = DocumentFeatureRepository(session)
+    stored = repository.get_many([doc.id for doc in documents])
+    indexes = {profile_index.profile_id: profile_index for profile_index in company_profiles}
+    features = {}
+    computed = 0
+    
+    for doc in documents:
+        profile_indexes = [indexes[profile_id] for profile_id in pending[doc.id]]
+        current = stored.get(doc.id)
+        
+        if not is_current(current, doc.hash_sha256):
+            current = featurize(doc.content or "", profile_indexes, content_hash=doc.hash_sha256)
+        elif all(covers(current, profile_index) for profile_index in profile_indexes):
+            features[doc.id] = current
+            continue
+        else:
+            extend_features(current, doc.content or "", profile_indexes)
+        
+        repository.save(doc.id, current)
+        features[doc.id] = current
+        computed += 1
+    
+    session.commit()
+    logger.info("document_features_loaded", documents=len(documents), computed=computed)
+    return features
+
+
+def _rescore_profile_edits(session, company_profiles: List[ProfileIndex]) -> Dict[str, Dict]:
+    """
+    Profils modifiés depuis leurs analyses : niveaux 1-2 recalculés depuis les
+    caractéristiques des documents, ré-analyse LLM (couples "stale", repris
+    dans ce run) seulement si la criticité dépend encore du LLM
+    
+    Returns:
+        {ID de profil: documents touchés, ré-analyses, corpus} des profils modifiés
+    """
+    from src.config import settings
+    
+    if not settings.profile_edit_rescoring:
+        return {}
+    
+    edits = {}
+    for profile_index in company_profiles:
+        report = rescore_profile_edits(session, profile_index, apply=True)
+        if report["outdated"]:
+            edits[profile_index.profile_id] = {
+                key: report[key] for key in ("corpus", "outdated", "touched", "reanalysis", "documents_scanned")
+            }
+    return edits
+
+
+def _backfill_legacy_states(session, states: DocumentProfileRepository, company_profiles: List[ProfileIndex]) -> None:
+    """
+    Documents analysés avant le suivi par profil (workflow_status = 'analyzed',
+    aucun couple enregistré) : considérés comme déjà analysés pour le profil
+    historique, sans nouvel appel LLM
+    """
+    tracked = session.query(DocumentProfileAnalysis.document_id)\
+        .filter(DocumentProfileAnalysis.document_id == Document.id)\
+        .exists()
+    for profile_index in company_profiles:
+        if profile_index.company_name == LEGACY_COMPANY_NAME:
+            analyzed = session.query(Document.id)\
+                .filter(Document.workflow_status == "analyzed", ~tracked)\
+                .all()
+            states.backfill(profile_index.profile_id, [doc_id for (doc_id,) in analyzed])
+            session.commit()
+
+
+def run_bulk_analysis(
+    batch_id: Optional[str] = None,
+    max_wait_seconds: Optional[float] = None,
+    profile_id: Optional[str] = None
+) -> Dict:
+    """
+    Analyse en masse des couples (document, profil) en attente via la Message Batches API.
+    
+    Pour un premier chargement ou un profil ajouté : pas de collecte Agent 1A.
+    Un lot par profil actif pour (au plus MESSAGE_BATCH_MAX_REQUESTS) documents
+    en attente ; ceux dont la criticité ne dépend pas du LLM (cascade) sont
+    analysés localement, sans requête. Les analyses d'un profil sont
+    sauvegardées en une transaction et chaque couple est marqué analysé.
+    
+    Args:
+        batch_id: Lot déjà soumis à reprendre (ex: après un arrêt pendant
+            l'attente), pour un seul profil
+        max_wait_seconds: Durée maximale d'attente du lot (None: jusqu'à la fin)
+        profile_id: Profil à analyser (défaut: tous les profils actifs)
+    
+    Returns:
+        dict: Statistiques des lots par profil (batch_id à conserver pour une reprise)
+    """
+    logger.info("bulk_analysis_started", batch_id=batch_id, profile_id=profile_id)
+    run_id, run_token = start_run("bulk")
+    
+    session = get_session()
+    
+    try:
+        active_profiles = load_active_profiles()
+        company_profiles = [
+            profile_index for profile_index in active_profiles
+            if profile_id is None or profile_index.profile_id == profile_id
+        ]
+        if not company_profiles:
+            raise ValueError(f"Profil entreprise '{profile_id}' non trouvé ou désactivé")
+        if batch_id is not None and len(company_profiles) > 1:
+            raise ValueError("Un lot appartient à un seul profil : précisez-le pour le reprendre (--profile)")
+        
+        states = DocumentProfileRepository(session)
+        _backfill_legacy_states(session, states, company_profiles)
+        
+        stats = {}
+        analyzed_at = {}
+        for profile_index in company_profiles:
+            stats[profile_index.profile_id] = _bulk_analyze_profile(
+                session, states, profile_index, batch_id, max_wait_seconds, analyzed_at
+            )
+        
+        # Documents analysés pour tous les profils actifs
+        remaining = states.pending([profile_index.profile_id for profile_index in active_profiles])
+        for doc in session.query(Document).filter(Document.id.in_([
+            document_id for document_id in analyzed_at if document_id not in remaining
+        ])):
+            doc.workflow_status = "analyzed"
+            doc.analyzed_at = analyzed_at[doc.id]
+        session.commit()
+        
+        logger.info(
+            "bulk_analysis_completed",
+            profiles=len(stats),
+            analyzed=sum(profile_stats["analyzed"] for profile_stats in stats.values()),
+            local=sum(profile_stats["local"] for profile_stats in stats.values()),
+            errors=sum(len(profile_stats["errors"]) for profile_stats in stats.values())
+        )
+        return {
+            "status": "success",
+            "agent_1b": stats,
+            "run_id": run_id,
+            "llm_usage": persist_run(run_id, token=run_token)
+        }
+    
+    except Exception as e:
+        session.rollback()
+        logger.error("bulk_analysis_failed", batch_id=batch_id, error=str(e), exc_info=True)
+        return {
+            "status": "error",
+            "error": str(e),
+            "batch_id": batch_id,
+            "run_id": run_id,
+            "llm_usage": persist_run(run_id, token=run_token)
         }
+    
+    finally:
+        session.close()
 
 
-def load_company_profile(company_name: str = "HUTCHINSON") -> dict:
+def _bulk_analyze_profile(
+    session,
+    states: DocumentProfileRepository,
+    profile_index: ProfileIndex,
+    batch_id: Optional[str],
+    max_wait_seconds: Optional[float],
+    analyzed_at: Dict
+) -> Dict:
+    """
+    Lot Message Batches des documents en attente pour un profil
+    
+    Returns:
+        Statistiques du lot (voir MessageBatchAnalyzer.run)
+    """
+    from src.config import settings
+    from src.storage.analysis_repository import AnalysisRepository
+    
+    profile_id = profile_index.profile_id
+    pending = states.pending([profile_id], limit=settings.message_batch_max_requests)
+    # Texte chargé à la demande : seulement pour les documents soumis au LLM
+    docs = session.query(Document)\
+        .options(defer(Document.content))\
+        .filter(Document.id.in_(list(pending)))\
+        .all()
+    order = {doc_id: index for index, doc_id in enumerate(pending)}
+    docs.sort(key=lambda doc: order[doc.id])
+    
+    logger.info("unanalyzed_documents_found", profile_id=profile_id, count=len(docs))
+    
+    features = _document_features(session, docs, pending, [profile_index])
+    
+    def save_analyses(analyses) -> None:
+        """Sauvegarde groupée (un seul commit) des analyses du lot, couples marqués analysés"""
+        repository = AnalysisRepository(session)
+        for document, analysis in analyses:
+            repository.save_from_document_analysis(
+                analysis, document["document_id"], commit=False, update_document=False
+            )
+            states.mark_analyzed(document["document_id"], profile_id, analysis)
+            analyzed_at[document["document_id"]] = analysis.analysis_timestamp
+        session.commit()
+    
+    return MessageBatchAnalyzer(Agent1B(profile_index)).run(
+        [
+            {
+                "document_id": doc.id,
+                "document_content": None,
+                "load_content": lambda doc=doc: doc.content or "",
+                "features": features.get(doc.id),
+                "document_title": doc.title,
+                "regulation_type": doc.regulation_type or "CBAM"
+            }
+            for doc in docs
+        ],
+        on_analyses=save_analyses,
+        batch_id=batch_id,
+        max_wait_seconds=max_wait_seconds
+    )
+
+
+def load_company_profile(company_name: str = LEGACY_COMPANY_NAME) -> dict:
     """
     Charge le profil de l'entreprise depuis la base de données.
     
@@ -233,13 +645,10 @@ def load_company_profile(company_name: str = "HUTCHINSON") -> dict:
     Raises:
         ValueError: Si le profil n'existe pas en BDD
     """
-    from src.storage.repositories import CompanyProfileRepository
-    
     session = get_session()
     
     try:
-        repo = CompanyProfileRepository(session)
-        profile = repo.find_by_name(company_name)
+        profile = session.query(CompanyProfile).filter(CompanyProfile.company_name == company_name).first()
         
         if not profile:
             raise ValueError(
@@ -250,15 +659,34 @@ def load_company_profile(company_name: str = "HUTCHINSON") -> dict:
         if not profile.active:
             raise ValueError(f"Profil entreprise '{company_name}' est désactivé")
         
-        return {
-            "company_id": profile.id,
-            "company_name": profile.company_name,
-            "nc_codes": profile.nc_codes or [],
-            "keywords": profile.keywords or [],
-            "regulations": profile.regulations or ["CBAM"],
-            "contact_emails": profile.contact_emails or [],
-            "config": profile.config or {}
-        }
+        return profile_index_for_row(profile).profile
+    
+    finally:
+        session.close()
+
+
+def load_active_profiles() -> List[ProfileIndex]:
+    """
+    Charge tous les profils entreprise actifs depuis la base de données.
+    
+    Returns:
+        list: Profils compilés pour Agent 1B (recompilés quand updated_at change)
+        
+    Raises:
+        ValueError: Si aucun profil actif n'existe en BDD
+    """
+    session = get_session()
+    
+    try:
+        profiles = session.query(CompanyProfile).filter(CompanyProfile.active.is_(True)).all()
+        
+        if not profiles:
+            raise ValueError(
+                "Aucun profil entreprise actif en BDD. "
+                "Exécutez d'abord: python scripts/init_db.py"
+            )
+        
+        return [profile_index_for_row(profile) for profile in profiles]
     
     finally:
         session.close()
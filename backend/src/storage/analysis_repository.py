@@ -27,7 +27,8 @@ class AnalysisRepository:
         matched_keywords: List[str] = None,
         matched_nc_codes: List[str] = None,
         llm_reasoning: str = None,
-        metadata: Dict = None
+        metadata: Dict = None,
+        commit: bool = True
     ) -> Analysis:
         """
         Crée une nouvelle analyse
@@ -40,6 +41,7 @@ class AnalysisRepository:
             matched_nc_codes: Codes NC trouvés
             llm_reasoning: Explication du LLM
             metadata: Métadonnées additionnelles
+            commit: Commiter immédiatement (False: flush seulement)
             
         Returns:
             Analysis créée
@@ -55,7 +57,10 @@ class AnalysisRepository:
         )
         
         self.session.add(analysis)
-        self.session.commit()
+        if commit:
+            self.session.commit()
+        else:
+            self.session.flush()
         
         logger.info(
             "analysis_created",
@@ -70,7 +75,9 @@ class AnalysisRepository:
     def save_from_document_analysis(
         self,
         document_analysis,  # DocumentAnalysis Pydantic
-        document_id: str
+        document_id: str,
+        commit: bool = True,
+        update_document: bool = True
     ) -> Analysis:
         """
         Sauvegarde une analyse depuis une DocumentAnalysis Pydantic
@@ -78,6 +85,9 @@ class AnalysisRepository:
         Args:
             document_analysis: Objet DocumentAnalysis (Pydantic)
             document_id: ID du document
+            commit: Commiter immédiatement (False: flush seulement)
+            update_document: Passer le document en 'analyzed' (False: l'appelant
+                le fait quand tous les profils l'ont analysé)
             
         Returns:
             Analysis sauvegardée
@@ -110,18 +120,39 @@ class AnalysisRepository:
             confidence=min(1.0, max(0.0, confidence)),  # Clamp 0-1
             matched_keywords=matched_keywords,
             matched_nc_codes=matched_nc_codes,
-            llm_reasoning=llm_reasoning
+            llm_reasoning=llm_reasoning,
+            commit=commit
         )
         
         # Mettre à jour le statut du document
-        document = self.session.query(Document).filter_by(id=document_id).first()
+        document = self.session.query(Document).filter_by(id=document_id).first() if update_document else None
         if document:
             document.workflow_status = "analyzed"
             document.analyzed_at = datetime.utcnow()
-            self.session.commit()
+            if commit:
+                self.session.commit()
         
         return analysis
     
+    def save_many(self, document_analyses: List) -> List[Analysis]:
+        """
+        Sauvegarde plusieurs DocumentAnalysis en une seule transaction
+        
+        Args:
+            document_analyses: Objets DocumentAnalysis (Pydantic)
+            
+        Returns:
+            Analyses sauvegardées
+        """
+        analyses = [
+            self.save_from_document_analysis(document_analysis, document_analysis.document_id, commit=False)
+            for document_analysis in document_analyses
+        ]
+        self.session.commit()
+        
+        logger.info("analyses_saved", count=len(analyses))
+        return analyses
+    
     def find_by_id(self, analysis_id: str) -> Optional[Analysis]:
         """Récupère une analyse par son ID"""
         return self.session.query(Analysis).filter_by(id=analysis_id).first()
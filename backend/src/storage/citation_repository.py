@@ -0,0 +1,144 @@
+"""
+Repository pour les citations CELEX - Tables "document_citations" et "crawl_frontier"
+
+La frontière contient les actes cités par des documents collectés mais pas
+encore présents en base. Elle est dédupliquée par CELEX et ordonnée par
+nombre de documents citants (les actes les plus cités d'abord).
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import structlog
+from sqlalchemy.orm import Session
+
+from src.storage.models import CrawlFrontierEntry, Document, DocumentCitation
+
+logger = structlog.get_logger()
+
+
+class CitationRepository:
+    """Repository pour le graphe de citations et la frontière de crawl"""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def is_known(self, celex: str) -> bool:
+        """Un document de cet acte est-il déjà en base ?"""
+        return self.session.query(Document.id)\
+            .filter(Document.source_url.like(f"%CELEX:{celex}%"))\
+            .first() is not None
+
+    def record_citations(
+        self,
+        citing_url: str,
+        references: Dict[str, str],
+        citing_celex: Optional[str] = None,
+        citing_document_id: Optional[str] = None
+    ) -> int:
+        """
+        Enregistre les actes cités par un document et alimente la frontière
+
+        Args:
+            citing_url: URL du document citant
+            references: Dict {celex cité: référence textuelle}
+            citing_celex: CELEX du document citant (None pour CBAM Guidance)
+            citing_document_id: ID du document citant s'il est sauvegardé
+
+        Returns:
+            Nombre de nouvelles arêtes
+        """
+        if citing_celex:
+            self.mark_fetched(citing_celex)
+
+        existing = {
+            celex for (celex,) in self.session.query(DocumentCitation.cited_celex)
+            .filter(DocumentCitation.citing_url == citing_url)
+        }
+
+        new_edges = 0
+
+        for celex, reference in references.items():
+            if celex in existing:
+                continue
+
+            self.session.add(DocumentCitation(
+                citing_document_id=citing_document_id,
+                citing_url=citing_url,
+                citing_celex=citing_celex,
+                cited_celex=celex,
+                reference=reference[:200]
+            ))
+            new_edges += 1
+
+            entry = self.session.get(CrawlFrontierEntry, celex)
+            if entry is None:
+                entry = CrawlFrontierEntry(
+                    celex=celex,
+                    status="known" if self.is_known(celex) else "pending",
+                    citation_count=0,
+                    attempts=0
+                )
+                self.session.add(entry)
+            entry.citation_count += 1
+
+        self.session.flush()
+
+        logger.info("citations_recorded", citing_url=citing_url, references=len(references), new_edges=new_edges)
+        return new_edges
+
+    def next_batch(self, limit: int) -> List[CrawlFrontierEntry]:
+        """
+        Actes à collecter, les plus cités d'abord
+
+        Args:
+            limit: Nombre maximum d'actes
+
+        Returns:
+            Entrées "pending" de la frontière
+        """
+        if limit <= 0:
+            return []
+
+        return self.session.query(CrawlFrontierEntry)\
+            .filter(CrawlFrontierEntry.status == "pending")\
+            .order_by(CrawlFrontierEntry.citation_count.desc(), CrawlFrontierEntry.first_seen)\
+            .limit(limit)\
+            .all()
+
+    def count_pending(self) -> int:
+        """Nombre d'actes en attente dans la frontière"""
+        return self.session.query(CrawlFrontierEntry)\
+            .filter(CrawlFrontierEntry.status == "pending")\
+            .count()
+
+    def mark_fetched(self, celex: str) -> None:
+        """Marque un acte comme collecté (crée l'entrée si besoin pour éviter de le remettre en file)"""
+        entry = self.session.get(CrawlFrontierEntry, celex)
+        if entry is None:
+            entry = CrawlFrontierEntry(celex=celex, citation_count=0, attempts=0)
+            self.session.add(entry)
+
+        entry.status = "fetched"
+        entry.fetched_at = datetime.utcnow()
+        self.session.flush()
+
+    def mark_failed(self, celex: str, error: str, max_attempts: int = 3) -> None:
+        """
+        Enregistre un échec de collecte ; l'acte est abandonné après max_attempts
+
+        Args:
+            celex: Numéro CELEX
+            error: Message d'erreur
+            max_attempts: Nombre de tentatives avant statut "failed"
+        """
+        entry = self.session.get(CrawlFrontierEntry, celex)
+        if entry is None:
+            return
+
+        entry.attempts += 1
+        entry.last_error = error
+        entry.last_attempt = datetime.utcnow()
+        if entry.attempts >= max_attempts:
+            entry.status = "failed"
+        self.session.flush()
@@ -0,0 +1,55 @@
+"""
+Repository des caractéristiques de documents - Table "document_features"
+
+Un enregistrement par document, écrit à la collecte par l'Agent 1A et complété
+par l'Agent 1B quand un profil n'est pas encore couvert. Il n'est valable que
+pour la version du document (hash) et du calcul (FEATURES_VERSION) qui l'a produit.
+"""
+
+from typing import Dict, List
+
+import structlog
+from sqlalchemy.orm import Session
+
+from src.agent_1b.features import FEATURES_VERSION
+from src.agent_1b.models import DocumentFeatures
+from src.storage.models import DocumentFeatureRecord
+
+logger = structlog.get_logger()
+
+
+class DocumentFeatureRepository:
+    """Repository des caractéristiques de documents"""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def save(self, document_id: str, features: DocumentFeatures) -> DocumentFeatureRecord:
+        """Crée ou remplace l'enregistrement d'un document"""
+        record = self.session.get(DocumentFeatureRecord, document_id)
+        if record is None:
+            record = DocumentFeatureRecord(document_id=document_id)
+            self.session.add(record)
+
+        record.content_hash = features.content_hash
+        record.version = features.version
+        record.features = features.model_dump(mode="json")
+        self.session.flush()
+        return record
+
+    def get_many(self, document_ids: List[str]) -> Dict[str, DocumentFeatures]:
+        """
+        Caractéristiques de plusieurs documents, au format actuel
+
+        Returns:
+            {ID de document: DocumentFeatures} (documents sans enregistrement
+            ou d'une version antérieure du calcul absents)
+        """
+        if not document_ids:
+            return {}
+
+        records = self.session.query(DocumentFeatureRecord)\
+            .filter(DocumentFeatureRecord.document_id.in_(document_ids))\
+            .filter(DocumentFeatureRecord.version == FEATURES_VERSION)\
+            .all()
+        return {record.document_id: DocumentFeatures.model_validate(record.features) for record in records}
@@ -0,0 +1,241 @@
+"""
+Repository de l'état d'analyse par profil - Table "document_profile_analyses"
+
+Un document est collecté une fois, puis analysé par l'Agent 1B pour chaque
+profil entreprise actif. Un couple (document, profil) sans ligne "analyzed"
+est en attente : nouveau document, échec précédent, ou profil ajouté après
+la collecte.
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import structlog
+from sqlalchemy import and_, or_, update
+from sqlalchemy.orm import Session
+
+from src.storage.models import Document, DocumentProfileAnalysis
+
+logger = structlog.get_logger()
+
+
+class DocumentProfileRepository:
+    """Repository de l'état d'analyse des couples (document, profil)"""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def pending(self, profile_ids: List[str], limit: Optional[int] = None) -> Dict[str, List[str]]:
+        """
+        Couples (document, profil) restant à analyser
+
+        Args:
+            profile_ids: Profils actifs
+            limit: Nombre maximal de documents (les plus anciens d'abord)
+
+        Returns:
+            {ID de document: [IDs de profil en attente]}, documents par date de collecte
+        """
+        pending: Dict[str, List[str]] = {}
+        created: Dict[str, datetime] = {}
+
+        for profile_id in profile_ids:
+            rows = self.session.query(Document.id, Document.created_at)\
+                .outerjoin(DocumentProfileAnalysis, and_(
+                    DocumentProfileAnalysis.document_id == Document.id,
+                    DocumentProfileAnalysis.company_profile_id == profile_id,
+                    DocumentProfileAnalysis.status == "analyzed"
+                ))\
+                .filter(DocumentProfileAnalysis.id.is_(None))\
+                .all()
+            for document_id, created_at in rows:
+                pending.setdefault(document_id, []).append(profile_id)
+                created[document_id] = created_at
+
+        ordered = sorted(pending, key=lambda document_id: (created[document_id], document_id))
+        if limit is not None:
+            ordered = ordered[:limit]
+        return {document_id: pending[document_id] for document_id in ordered}
+
+    def mark_analyzed(self, document_id: str, profile_id: str, analysis) -> DocumentProfileAnalysis:
+        """
+        Enregistre l'analyse d'un document pour un profil
+
+        Args:
+            analysis: DocumentAnalysis de l'Agent 1B
+        """
+        entry = self._get_or_create(document_id, profile_id)
+        entry.status = "analyzed"
+        entry.relevance_score = analysis.relevance_score.final_score
+        entry.criticality = analysis.relevance_score.criticality.value
+        entry.is_relevant = analysis.is_relevant
+        entry.keyword_score = analysis.relevance_score.keyword_score
+        entry.nc_code_score = analysis.relevance_score.nc_code_score
+        entry.semantic_score = analysis.relevance_score.semantic_score
+        entry.semantic_applicable = analysis.semantic_analysis.is_applicable
+        entry.has_critical_codes = bool(analysis.nc_code_analysis.critical_codes)
+        entry.semantic_decision = analysis.semantic_decision
+        entry.pre_classifier_probability = analysis.pre_classifier_probability
+        entry.pre_classifier_version = analysis.pre_classifier_version
+        entry.profile_hash = analysis.profile_hash
+        entry.error_message = None
+        entry.analyzed_at = analysis.analysis_timestamp
+        self.session.flush()
+        return entry
+
+    def mark_error(self, document_id: str, profile_id: str, error: str) -> DocumentProfileAnalysis:
+        """Enregistre un échec (le couple reste en attente pour le prochain run)"""
+        entry = self._get_or_create(document_id, profile_id)
+        entry.status = "error"
+        entry.error_message = error[:2000]
+        self.session.flush()
+        return entry
+
+    def backfill(self, profile_id: str, document_ids: List[str]) -> int:
+        """
+        Marque comme analysés, pour un profil, des documents analysés avant le
+        suivi par profil (workflow_status = 'analyzed')
+
+        Returns:
+            Nombre de couples créés
+        """
+        existing = {
+            document_id for (document_id,) in self.session.query(DocumentProfileAnalysis.document_id)
+            .filter(DocumentProfileAnalysis.company_profile_id == profile_id)
+            .filter(DocumentProfileAnalysis.document_id.in_(document_ids))
+        }
+        created = 0
+        for document_id in document_ids:
+            if document_id not in existing:
+                self.session.add(DocumentProfileAnalysis(
+                    document_id=document_id,
+                    company_profile_id=profile_id,
+                    status="analyzed",
+                    attempts=0
+                ))
+                created += 1
+
+        self.session.flush()
+        if created:
+            logger.info("document_profile_states_backfilled", profile_id=profile_id, documents=created)
+        return created
+
+    def scored(self) -> List[Tuple]:
+        """
+        Analyses dont les scores par niveau sont connus (re-scoring)
+
+        Returns:
+            Tuples (id, document_id, company_profile_id, keyword_score,
+            nc_code_score, semantic_score, semantic_applicable,
+            has_critical_codes, relevance_score, criticality, is_relevant,
+            semantic_decision), semantic_score étant un 0 de remplacement
+            quand semantic_decision n'est pas "called" (ni None)
+        """
+        return self.session.query(
+            DocumentProfileAnalysis.id,
+            DocumentProfileAnalysis.document_id,
+            DocumentProfileAnalysis.company_profile_id,
+            DocumentProfileAnalysis.keyword_score,
+            DocumentProfileAnalysis.nc_code_score,
+            DocumentProfileAnalysis.semantic_score,
+            DocumentProfileAnalysis.semantic_applicable,
+            DocumentProfileAnalysis.has_critical_codes,
+            DocumentProfileAnalysis.relevance_score,
+            DocumentProfileAnalysis.criticality,
+            DocumentProfileAnalysis.is_relevant,
+            DocumentProfileAnalysis.semantic_decision
+        )\
+            .filter(DocumentProfileAnalysis.status == "analyzed")\
+            .filter(DocumentProfileAnalysis.keyword_score.isnot(None))\
+            .filter(DocumentProfileAnalysis.nc_code_score.isnot(None))\
+            .filter(DocumentProfileAnalysis.semantic_score.isnot(None))\
+            .order_by(DocumentProfileAnalysis.id)\
+            .all()
+
+    def count_unscored(self) -> int:
+        """Analyses sans scores par niveau (antérieures, ou reprises du suivi HUTCHINSON)"""
+        return self.session.query(DocumentProfileAnalysis)\
+            .filter(DocumentProfileAnalysis.status == "analyzed")\
+            .filter(or_(
+                DocumentProfileAnalysis.keyword_score.is_(None),
+                DocumentProfileAnalysis.nc_code_score.is_(None),
+                DocumentProfileAnalysis.semantic_score.is_(None)
+            ))\
+            .count()
+
+    def outdated(self, profile_id: str, profile_hash: str) -> List[Tuple]:
+        """
+        Analyses d'un profil faites avec une autre version du profil compilé
+
+        Args:
+            profile_id: Profil entreprise
+            profile_hash: Hash de la version actuelle (ProfileIndex.content_hash)
+
+        Returns:
+            Tuples (id, document_id, profile_hash, keyword_score, nc_code_score,
+            semantic_score, semantic_applicable, has_critical_codes,
+            relevance_score, criticality, is_relevant), profile_hash None pour
+            une analyse antérieure au suivi des versions
+        """
+        return self.session.query(
+            DocumentProfileAnalysis.id,
+            DocumentProfileAnalysis.document_id,
+            DocumentProfileAnalysis.profile_hash,
+            DocumentProfileAnalysis.keyword_score,
+            DocumentProfileAnalysis.nc_code_score,
+            DocumentProfileAnalysis.semantic_score,
+            DocumentProfileAnalysis.semantic_applicable,
+            DocumentProfileAnalysis.has_critical_codes,
+            DocumentProfileAnalysis.relevance_score,
+            DocumentProfileAnalysis.criticality,
+            DocumentProfileAnalysis.is_relevant
+        )\
+            .filter(DocumentProfileAnalysis.company_profile_id == profile_id)\
+            .filter(DocumentProfileAnalysis.status == "analyzed")\
+            .filter(or_(
+                DocumentProfileAnalysis.profile_hash.is_(None),
+                DocumentProfileAnalysis.profile_hash != profile_hash
+            ))\
+            .order_by(DocumentProfileAnalysis.id)\
+            .all()
+
+    def count_analyzed(self, profile_id: str) -> int:
+        """Analyses d'un profil (corpus du profil)"""
+        return self.session.query(DocumentProfileAnalysis)\
+            .filter(DocumentProfileAnalysis.company_profile_id == profile_id)\
+            .filter(DocumentProfileAnalysis.status == "analyzed")\
+            .count()
+
+    def update_scores(self, rows: List[Dict]) -> int:
+        """
+        Met à jour en une requête groupée score, criticité et pertinence
+
+        Args:
+            rows: Dicts id, relevance_score, criticality, is_relevant (mêmes
+                clés pour toutes les lignes ; autres colonnes acceptées, ex:
+                scores par niveau, profile_hash, status)
+
+        Returns:
+            Nombre de lignes mises à jour
+        """
+        if rows:
+            self.session.execute(update(DocumentProfileAnalysis), rows)
+            self.session.flush()
+        return len(rows)
+
+    def find_by_document(self, document_id: str) -> List[DocumentProfileAnalysis]:
+        """États d'un document pour tous les profils"""
+        return self.session.query(DocumentProfileAnalysis)\
+            .filter(DocumentProfileAnalysis.document_id == document_id)\
+            .all()
+
+    def _get_or_create(self, document_id: str, profile_id: str) -> DocumentProfileAnalysis:
+        entry = self.session.query(DocumentProfileAnalysis).filter_by(
+            document_id=document_id, company_profile_id=profile_id
+        ).first()
+        if entry is None:
+            entry = DocumentProfileAnalysis(document_id=document_id, company_profile_id=profile_id, attempts=0)
+            self.session.add(entry)
+
+        entry.attempts += 1
+        return entry
@@ -0,0 +1,147 @@
+"""
+Repository pour la consommation LLM - Table "llm_usage"
+
+Écrit aussi les colonnes llm_tokens / processing_time_ms des tables de
+résultats (document_profile_analyses, risk_analyses, judge_evaluations) pour
+les lignes déjà créées.
+"""
+
+from typing import Dict, List, Optional
+
+import structlog
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from src.storage.models import DocumentProfileAnalysis, JudgeEvaluation, LLMUsageAggregate, RiskAnalysis
+
+logger = structlog.get_logger()
+
+# Colonnes additionnées d'un enregistrement à l'autre d'un même run
+SUMMED_COLUMNS = (
+    "calls", "retries", "errors", "input_tokens", "output_tokens",
+    "cache_read_input_tokens", "cache_creation_input_tokens", "latency_ms_total", "cost_usd",
+)
+
+
+class LLMUsageRepository:
+    """Repository pour la consommation des appels LLM"""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def save_aggregates(self, rows: List[Dict]) -> None:
+        """
+        Ajoute des agrégats (voir src.utils.llm_usage.aggregate)
+
+        Un run enregistré en plusieurs fois (ex: Agent 2 puis Judge) cumule
+        ses valeurs sur la même ligne (run, agent, étape, modèle).
+        """
+        for row in rows:
+            entry = self.session.query(LLMUsageAggregate).filter_by(
+                run_id=row["run_id"], agent=row["agent"], stage=row["stage"], model_name=row["model_name"]
+            ).first()
+            if entry is None:
+                entry = LLMUsageAggregate(
+                    **{k: row[k] for k in ("run_id", "agent", "stage", "model_name")},
+                    **{column: 0 for column in SUMMED_COLUMNS},
+                    latency_ms_max=0.0
+                )
+                self.session.add(entry)
+
+            for column in SUMMED_COLUMNS:
+                setattr(entry, column, getattr(entry, column) + row[column])
+            entry.latency_ms_max = max(entry.latency_ms_max, row["latency_ms_max"])
+
+        self.session.flush()
+
+    def update_result_columns(self, totals: Dict[tuple, Dict[str, int]]) -> int:
+        """
+        Reporte tokens et durée dans les tables de résultats
+
+        Les valeurs du run remplacent celles d'un run précédent (ré-analyse
+        d'un document) au lieu de s'y ajouter.
+
+        Args:
+            totals: {(agent, document_id, profile_id): {"llm_tokens", "processing_time_ms"}}
+
+        Returns:
+            Nombre de lignes mises à jour
+        """
+        updated = 0
+        for (agent, document_id, profile_id), values in totals.items():
+            row = self._result_row(agent, document_id, profile_id)
+            if row is None:
+                continue
+            row.llm_tokens = values["llm_tokens"]
+            row.processing_time_ms = values["processing_time_ms"]
+            updated += 1
+
+        self.session.flush()
+        return updated
+
+    def _result_row(self, agent: str, document_id: str, profile_id: Optional[str]):
+        """Ligne de résultat d'un agent pour un document (None si absente)"""
+        if agent == "agent_1b":
+            # Une analyse Agent 1B par (document, profil)
+            if profile_id is None:
+                return None
+            return self.session.query(DocumentProfileAnalysis).filter_by(
+                document_id=document_id, company_profile_id=profile_id
+            ).first()
+        if agent == "agent_2":
+            return self.session.query(RiskAnalysis).filter_by(document_id=document_id).first()
+        if agent == "judge":
+            return self.session.query(JudgeEvaluation)\
+                .join(RiskAnalysis, JudgeEvaluation.risk_analysis_id == RiskAnalysis.id)\
+                .filter(RiskAnalysis.document_id == document_id)\
+                .first()
+        return None
+
+    def find_by_run(self, run_id: str) -> List[Dict]:
+        """Agrégats d'un run (dicts au format de aggregate())"""
+        entries = self.session.query(LLMUsageAggregate).filter_by(run_id=run_id).all()
+        return [self._to_dict(entry) for entry in entries]
+
+    def recent_runs(self, limit: int = 20) -> List[Dict]:
+        """Derniers runs : totaux de tokens, coût et durée"""
+        rows = self.session.query(
+            LLMUsageAggregate.run_id,
+            func.min(LLMUsageAggregate.created_at),
+            func.sum(LLMUsageAggregate.calls),
+            func.sum(LLMUsageAggregate.input_tokens),
+            func.sum(LLMUsageAggregate.output_tokens),
+            func.sum(LLMUsageAggregate.cost_usd),
+            func.sum(LLMUsageAggregate.latency_ms_total),
+        ).group_by(LLMUsageAggregate.run_id)\
+            .order_by(func.min(LLMUsageAggregate.created_at).desc())\
+            .limit(limit)\
+            .all()
+
+        return [
+            {
+                "run_id": run_id,
+                "created_at": created_at.isoformat() if created_at else None,
+                "calls": calls,
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "cost_usd": round(cost, 6),
+                "latency_ms_total": round(latency, 1),
+            }
+            for run_id, created_at, calls, input_tokens, output_tokens, cost, latency in rows
+        ]
+
+    def latest_run_id(self) -> Optional[str]:
+        """Run enregistré le plus récemment"""
+        runs = self.recent_runs(limit=1)
+        return runs[0]["run_id"] if runs else None
+
+    @staticmethod
+    def _to_dict(entry: LLMUsageAggregate) -> Dict:
+        return {
+            "run_id": entry.run_id,
+            "agent": entry.agent,
+            "stage": entry.stage,
+            "model_name": entry.model_name,
+            "latency_ms_max": entry.latency_ms_max,
+            **{column: getattr(entry, column) for column in SUMMED_COLUMNS},
+        }
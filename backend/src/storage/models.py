@@ -8,7 +8,7 @@ Architecture: 3 types de risques + projection géographique + validation qualit
 from datetime import datetime
 from uuid import uuid4
 from sqlalchemy import (
-    Column, String, DateTime, Text, JSON, Boolean, Float, Integer, ForeignKey, Date
+    Column, String, DateTime, Text, JSON, Boolean, Float, Integer, ForeignKey, Date, UniqueConstraint
 )
 from sqlalchemy.orm import declarative_base, relationship
 
@@ -98,6 +98,10 @@ class Document(Base):
     geographic_scope = Column(JSON, nullable=True)  # {countries: [], regions: [], coordinates: {}}
     extra_metadata = Column(JSON, nullable=True)
     status = Column(String(20), nullable=False, default="new")  # new, modified, unchanged
+    regulation_type = Column(String(50), nullable=True)  # CBAM, EUDR, etc. (prompt Agent 1B)
+    # Workflow Agent 1B : raw, analyzed (tous les profils actifs), validated, rejected_analysis, rejected_validation
+    workflow_status = Column(String(20), nullable=False, default="raw")
+    analyzed_at = Column(DateTime, nullable=True)
     first_seen = Column(DateTime, nullable=False, default=datetime.utcnow)
     last_checked = Column(DateTime, nullable=False, default=datetime.utcnow)
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -108,6 +112,69 @@ class Document(Base):
     risk_analysis = relationship("RiskAnalysis", back_populates="document", uselist=False)
     alerts = relationship("Alert", back_populates="document")
     ground_truth_case = relationship("GroundTruthCase", back_populates="document", uselist=False)
+    analyses = relationship("Analysis", back_populates="document")
+
+
+class DocumentFeatureRecord(Base):
+    """
+    Caractéristiques d'un document calculées à la collecte (Agent 1A)
+    
+    Codes NC, statistiques du texte et occurrences des mots-clés des profils :
+    l'Agent 1B score ses niveaux 1 et 2 sans relire le texte complet
+    (voir src/agent_1b/features.py).
+    """
+    __tablename__ = "document_features"
+    
+    document_id = Column(String, ForeignKey("documents.id"), primary_key=True)
+    content_hash = Column(String(64), nullable=False)  # Document.hash_sha256 au calcul
+    version = Column(Integer, nullable=False)
+    features = Column(JSON, nullable=False)  # DocumentFeatures sérialisé
+    
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+# ============================================================================
+# CITATIONS CELEX & FRONTIÈRE DE CRAWL (Agent 1A)
+# ============================================================================
+
+# Statuts d'un acte dans la frontière de crawl
+FRONTIER_STATUSES = ["pending", "fetched", "failed", "known"]
+
+
+class DocumentCitation(Base):
+    """
+    Arête du graphe de citations : un document collecté cite un acte CELEX
+    """
+    __tablename__ = "document_citations"
+    __table_args__ = (
+        UniqueConstraint("citing_url", "cited_celex", name="uq_document_citation"),
+    )
+    
+    id = Column(String, primary_key=True, default=generate_uuid)
+    citing_document_id = Column(String, ForeignKey("documents.id"), nullable=True)
+    citing_url = Column(String(1000), nullable=False)
+    citing_celex = Column(String(20), nullable=True)  # None pour les documents CBAM Guidance
+    cited_celex = Column(String(20), nullable=False, index=True)
+    reference = Column(String(200), nullable=True)  # Ex: "Implementing Regulation (EU) 2023/1773"
+    
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class CrawlFrontierEntry(Base):
+    """
+    Acte cité mais pas encore collecté, à télécharger lors d'un prochain run
+    """
+    __tablename__ = "crawl_frontier"
+    
+    celex = Column(String(20), primary_key=True)
+    status = Column(String(20), nullable=False, default="pending")  # pending, fetched, failed, known
+    citation_count = Column(Integer, nullable=False, default=0)  # Nombre de documents citants
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    first_seen = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_attempt = Column(DateTime, nullable=True)
+    fetched_at = Column(DateTime, nullable=True)
 
 
 # ============================================================================
@@ -209,6 +276,35 @@ class SupplierRelationship(Base):
 # PIPELINE D'ANALYSE
 # ============================================================================
 
+class Analysis(Base):
+    """
+    Analyses Agent 1B d'un document (une ligne par profil analysé), validées
+    ensuite par un juriste dans l'UI
+    """
+    __tablename__ = "analyses"
+    
+    id = Column(String, primary_key=True, default=generate_uuid)
+    document_id = Column(String, ForeignKey("documents.id"), nullable=False)
+    
+    is_relevant = Column(Boolean, nullable=False, default=False)
+    confidence = Column(Float, nullable=False, default=0.0)  # 0-1
+    matched_keywords = Column(JSON, nullable=True)
+    matched_nc_codes = Column(JSON, nullable=True)
+    llm_reasoning = Column(Text, nullable=True)
+    
+    # Validation humaine (UI)
+    validation_status = Column(String(20), nullable=False, default="pending")  # pending, approved, rejected
+    validation_comment = Column(Text, nullable=True)
+    validated_by = Column(String(200), nullable=True)
+    validated_at = Column(DateTime, nullable=True)
+    regulation_type = Column(String(50), nullable=True)
+    
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    
+    # Relations
+    document = relationship("Document", back_populates="analyses")
+
+
 class PertinenceCheck(Base):
     """
     Résultats de l'Agent 1B (Pertinence Checker)
@@ -464,6 +560,60 @@ class CompanyProfile(Base):
     notification_settings = Column(JSON, nullable=True)
     data_sources_config = Column(JSON, nullable=True)  # Configuration des sources de données
     llm_config = Column(JSON, nullable=True)  # Configuration des LLM
+    # Profil de veille Agent 1B
+    nc_codes = Column(JSON, nullable=True)  # Codes NC surveillés
+    keywords = Column(JSON, nullable=True)  # Mots-clés surveillés
+    regulations = Column(JSON, nullable=True)  # Réglementations surveillées (défaut: CBAM)
+    contact_emails = Column(JSON, nullable=True)  # Destinataires des alertes
+    config = Column(JSON, nullable=True)  # Configuration Agent 1B du profil
+    active = Column(Boolean, nullable=False, default=True)  # Profil analysé par l'Agent 1B
+    
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+# Statuts de l'analyse d'un document pour un profil
+PROFILE_ANALYSIS_STATUSES = ["analyzed", "error"]
+
+
+class DocumentProfileAnalysis(Base):
+    """
+    État de l'analyse Agent 1B d'un document pour un profil entreprise
+    
+    Un document collecté une fois est analysé pour chaque profil actif : un
+    couple (document, profil) sans ligne "analyzed" reste à analyser, y compris
+    pour un profil ajouté après la collecte.
+    """
+    __tablename__ = "document_profile_analyses"
+    __table_args__ = (
+        UniqueConstraint("document_id", "company_profile_id", name="uq_document_profile_analysis"),
+    )
+    
+    id = Column(String, primary_key=True, default=generate_uuid)
+    document_id = Column(String, ForeignKey("documents.id"), nullable=False, index=True)
+    company_profile_id = Column(String, ForeignKey("company_profile.id"), nullable=False, index=True)
+    status = Column(String(20), nullable=False)  # analyzed, error, stale (à ré-analyser après modification du profil)
+    relevance_score = Column(Float, nullable=True)
+    criticality = Column(String(20), nullable=True)  # CRITICAL, HIGH, MEDIUM, LOW
+    is_relevant = Column(Boolean, nullable=True)
+    # Scores par niveau : re-scoring sans appel LLM quand poids ou seuils changent
+    keyword_score = Column(Float, nullable=True)
+    nc_code_score = Column(Float, nullable=True)
+    semantic_score = Column(Float, nullable=True)
+    semantic_applicable = Column(Boolean, nullable=True)
+    has_critical_codes = Column(Boolean, nullable=True)
+    semantic_decision = Column(String(20), nullable=True)  # called, skipped, deferred, preclassified
+    # Prédiction du pré-classifieur local (comparée au verdict LLM en mode shadow)
+    pre_classifier_probability = Column(Float, nullable=True)
+    pre_classifier_version = Column(Integer, nullable=True)
+    # Hash du profil compilé de l'analyse (diff du profil après modification)
+    profile_hash = Column(String(64), nullable=True)
+    error_message = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    analyzed_at = Column(DateTime, nullable=True)
+    # Consommation LLM de la dernière analyse (voir src/utils/llm_usage.py)
+    llm_tokens = Column(Integer, nullable=True)
+    processing_time_ms = Column(Integer, nullable=True)
     
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -488,3 +638,66 @@ class ExecutionLog(Base):
     extra_metadata = Column(JSON, nullable=True)
     
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+# ============================================================================
+# CACHE DES ANALYSES LLM (Agent 1B)
+# ============================================================================
+
+class SemanticCacheEntry(Base):
+    """
+    Résultat d'analyse sémantique LLM mis en cache
+    
+    La clé est un hash des entrées qui déterminent la réponse (contenu du
+    document, profil entreprise, version du prompt, modèle, température) :
+    un même document ré-analysé rejoue le résultat à l'identique sans appel.
+    """
+    __tablename__ = "semantic_cache"
+    
+    cache_key = Column(String(64), primary_key=True)
+    model_name = Column(String(100), nullable=False)
+    prompt_version = Column(String(20), nullable=False)
+    result_json = Column(Text, nullable=False)  # SemanticAnalysisResult sérialisé
+    usage = Column(JSON, nullable=True)  # Tokens consommés par l'appel d'origine
+    size_bytes = Column(Integer, nullable=False, default=0)
+    hits = Column(Integer, nullable=False, default=0)
+    
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_used_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+
+# ============================================================================
+# CONSOMMATION LLM (tokens, latence, coût par run)
+# ============================================================================
+
+class LLMUsageAggregate(Base):
+    """
+    Consommation des appels LLM d'un run, par agent, étape et modèle
+    
+    Le détail par document est reporté dans les colonnes llm_tokens /
+    processing_time_ms de document_profile_analyses (Agent 1B, par profil),
+    risk_analyses et judge_evaluations.
+    """
+    __tablename__ = "llm_usage"
+    __table_args__ = (
+        UniqueConstraint("run_id", "agent", "stage", "model_name", name="uq_llm_usage_run_stage"),
+    )
+    
+    id = Column(String, primary_key=True, default=generate_uuid)
+    run_id = Column(String(64), nullable=False, index=True)
+    agent = Column(String(50), nullable=False)  # agent_1b, agent_2, judge
+    stage = Column(String(50), nullable=False)  # semantic, cascade_reasoning, evaluate_risk_analyzer, ...
+    model_name = Column(String(100), nullable=False)
+    
+    calls = Column(Integer, nullable=False, default=0)
+    retries = Column(Integer, nullable=False, default=0)
+    errors = Column(Integer, nullable=False, default=0)
+    input_tokens = Column(Integer, nullable=False, default=0)  # Cache de prompt compris
+    output_tokens = Column(Integer, nullable=False, default=0)
+    cache_read_input_tokens = Column(Integer, nullable=False, default=0)
+    cache_creation_input_tokens = Column(Integer, nullable=False, default=0)
+    latency_ms_total = Column(Float, nullable=False, default=0.0)
+    latency_ms_max = Column(Float, nullable=False, default=0.0)
+    cost_usd = Column(Float, nullable=False, default=0.0)
+    
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
@@ -17,231 +17,7 @@ from src.storage.models import (
     CompanyProcess,
     ImpactAssessment,
 )
-
-
-class DocumentRepository:
-    """Repository pour gérer les documents réglementaires"""
-    
-    def __init__(self, session: Session):
-        self.session = session
-    
-    def save(self, document: Document) -> Document:
-        """
-        Sauvegarder un document
-        
-        Args:
-            document: Instance de Document
-        
-        Returns:
-            Document sauvegardé avec ID
-        """
-        self.session.add(document)
-        self.session.flush()  # Pour obtenir l'ID sans commit
-        return document
-    
-    def find_by_id(self, document_id: str) -> Optional[Document]:
-        """Trouver un document par ID"""
-        return self.session.query(Document).filter(Document.id == document_id).first()
-    
-    def find_by_hash(self, hash_sha256: str) -> Optional[Document]:
-        """
-        Trouver un document par son hash SHA-256
-        
-        Usage: Détection de documents déjà connus ou modifiés
-        
-        Args:
-            hash_sha256: Hash SHA-256 du contenu
-        
-        Returns:
-            Document ou None
-        """
-        return self.session.query(Document)\
-            .filter(Document.hash_sha256 == hash_sha256)\
-            .first()
-    
-    def find_by_url(self, source_url: str) -> Optional[Document]:
-        """
-        Trouver un document par son URL source
-        
-        Args:
-            source_url: URL du document
-        
-        Returns:
-            Document ou None
-        """
-        return self.session.query(Document)\
-            .filter(Document.source_url == source_url)\
-            .first()
-    
-    def upsert_document(
-        self,
-        source_url: str,
-        hash_sha256: str,
-        title: str,
-        content: str,
-        nc_codes: Optional[list] = None,
-        regulation_type: str = "CBAM",
-        publication_date: Optional[datetime] = None,
-        document_metadata: Optional[dict] = None
-    ) -> tuple[Document, str]:
-        """
-        Insérer ou mettre à jour un document (upsert)
-        
-        Args:
-            source_url: URL source du document
-            hash_sha256: Hash SHA-256 du contenu
-            title: Titre du document
-            content: Contenu textuel extrait
-            nc_codes: Liste des codes NC trouvés
-            regulation_type: Type de réglementation
-            publication_date: Date de publication
-            document_metadata: Métadonnées additionnelles
-        
-        Returns:
-            Tuple (document, status) où status est "new", "modified" ou "unchanged"
-        """
-        existing = self.find_by_url(source_url)
-        
-        if existing:
-            # Document existant - vérifier si modifié
-            if existing.hash_sha256 != hash_sha256:
-                existing.status = "modified"
-                existing.content = content
-                existing.hash_sha256 = hash_sha256
-                existing.nc_codes = nc_codes
-                existing.document_metadata = document_metadata
-                existing.last_checked = datetime.utcnow()
-                self.session.flush()
-                return (existing, "modified")
-            else:
-                existing.status = "unchanged"
-                existing.last_checked = datetime.utcnow()
-                self.session.flush()
-                return (existing, "unchanged")
-        else:
-            # Nouveau document
-            document = Document(
-                source_url=source_url,
-                hash_sha256=hash_sha256,
-                title=title,
-                content=content,
-                nc_codes=nc_codes,
-                regulation_type=regulation_type,
-                publication_date=publication_date,
-                document_metadata=document_metadata,
-                status="new",
-                workflow_status="raw",
-                first_seen=datetime.utcnow(),
-                last_checked=datetime.utcnow()
-            )
-            self.session.add(document)
-            self.session.flush()
-            return (document, "new")
-    
-    def list_new_documents(self, limit: int = 50) -> List[Document]:
-        """
-        Lister les documents avec status='new'
-        
-        Args:
-            limit: Nombre maximum de résultats
-        
-        Returns:
-            Liste de documents nouveaux
-        """
-        return self.session.query(Document)\
-            .filter(Document.status == "new")\
-            .order_by(Document.first_seen.desc())\
-            .limit(limit)\
-            .all()
-    
-    def list_by_regulation_type(self, regulation_type: str) -> List[Document]:
-        """
-        Lister les documents par type de réglementation
-        
-        Args:
-            regulation_type: CBAM, EUDR, CSRD, etc.
-        
-        Returns:
-            Liste de documents
-        """
-        return self.session.query(Document)\
-            .filter(Document.regulation_type == regulation_type)\
-            .order_by(Document.publication_date.desc())\
-            .all()
-    
-    def update_status(self, document_id: str, status: str) -> None:
-        """
-        Mettre à jour le statut d'un document
-        
-        Args:
-            document_id: ID du document
-            status: Nouveau statut (new, modified, unchanged)
-        """
-        document = self.find_by_id(document_id)
-        if document:
-            document.status = status
-            document.last_checked = datetime.utcnow()
-            self.session.flush()
-    
-    def count_by_status(self) -> dict:
-        """
-        Compter les documents par statut
-        
-        Returns:
-            Dict {'new': 5, 'modified': 2, 'unchanged': 30}
-        """
-        from sqlalchemy import func
-        
-        results = self.session.query(
-            Document.status,
-            func.count(Document.id)
-        ).group_by(Document.status).all()
-        
-        return {status: count for status, count in results}
-    
-    def find_by_workflow_status(self, workflow_status: str) -> List[Document]:
-        """
-        Trouver les documents par workflow_status
-        
-        Args:
-            workflow_status: raw, analyzed, rejected_analysis, validated, rejected_validation
-        
-        Returns:
-            Liste de documents
-        """
-        return self.session.query(Document)\
-            .filter(Document.workflow_status == workflow_status)\
-            .order_by(Document.created_at.desc())\
-            .all()
-    
-    def update_workflow_status(
-        self,
-        document_id: str,
-        workflow_status: str,
-        analyzed_at: Optional[datetime] = None,
-        validated_at: Optional[datetime] = None,
-        validated_by: Optional[str] = None
-    ) -> None:
-        """
-        Mettre à jour le workflow_status d'un document
-        
-        Args:
-            document_id: ID du document
-            workflow_status: Nouveau statut workflow
-            analyzed_at: Date d'analyse (optionnel)
-            validated_at: Date de validation (optionnel)
-            validated_by: Email du validateur (optionnel)
-        """
-        document = self.find_by_id(document_id)
-        if document:
-            document.workflow_status = workflow_status
-            if analyzed_at:
-                document.analyzed_at = analyzed_at
-            if validated_at:
-                document.validated_at = validated_at
-            if validated_by:
-                document.validated_by = validated_by
-            self.session.flush()
+from src.storage.document_repository import DocumentRepository  # noqa: F401 (réexport)
 
 
 class AnalysisRepository:
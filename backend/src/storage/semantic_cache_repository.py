@@ -0,0 +1,121 @@
+"""
+Repository pour le cache des analyses sémantiques - Table "semantic_cache"
+
+Éviction :
+- TTL : les entrées plus anciennes que ttl_days sont supprimées (et ne sont
+  jamais relues, même sans écriture qui déclenche l'éviction)
+- LRU par taille : au-delà de max_bytes, les entrées les moins récemment
+  utilisées sont supprimées en premier
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+import structlog
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from src.storage.models import SemanticCacheEntry
+
+logger = structlog.get_logger()
+
+
+class SemanticCacheRepository:
+    """Repository pour le cache des résultats LLM de l'Agent 1B"""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get(self, cache_key: str, ttl_days: int = 0) -> Optional[SemanticCacheEntry]:
+        """
+        Entrée du cache (et mise à jour de sa date d'utilisation pour le LRU)
+
+        Args:
+            ttl_days: Durée de vie en jours (0: pas d'expiration) ; une entrée
+                expirée est supprimée et traitée comme absente
+        """
+        entry = self.session.get(SemanticCacheEntry, cache_key)
+        if entry is None:
+            return None
+
+        if ttl_days > 0 and entry.created_at < datetime.utcnow() - timedelta(days=ttl_days):
+            self.session.delete(entry)
+            self.session.flush()
+            logger.info("semantic_cache_expired", cache_key=cache_key[:12])
+            return None
+
+        entry.hits += 1
+        entry.last_used_at = datetime.utcnow()
+        self.session.flush()
+        return entry
+
+    def put(
+        self,
+        cache_key: str,
+        model_name: str,
+        prompt_version: str,
+        result_json: str,
+        usage: Optional[Dict] = None
+    ) -> SemanticCacheEntry:
+        """Enregistre (ou remplace) un résultat"""
+        entry = self.session.get(SemanticCacheEntry, cache_key)
+        if entry is None:
+            entry = SemanticCacheEntry(cache_key=cache_key, hits=0)
+            self.session.add(entry)
+
+        entry.model_name = model_name
+        entry.prompt_version = prompt_version
+        entry.result_json = result_json
+        entry.usage = usage
+        entry.size_bytes = len(result_json.encode("utf-8"))
+        entry.created_at = entry.last_used_at = datetime.utcnow()
+        self.session.flush()
+        return entry
+
+    def evict(self, ttl_days: int = 0, max_bytes: int = 0) -> int:
+        """
+        Supprime les entrées expirées puis les moins récemment utilisées
+
+        Args:
+            ttl_days: Durée de vie en jours (0: pas d'expiration)
+            max_bytes: Taille maximale du cache (0: illimitée)
+
+        Returns:
+            Nombre d'entrées supprimées
+        """
+        removed = 0
+
+        if ttl_days > 0:
+            cutoff = datetime.utcnow() - timedelta(days=ttl_days)
+            removed += self.session.query(SemanticCacheEntry)\
+                .filter(SemanticCacheEntry.created_at < cutoff)\
+                .delete(synchronize_session=False)
+
+        if max_bytes > 0:
+            total = self.total_bytes()
+            if total > max_bytes:
+                candidates = self.session.query(SemanticCacheEntry.cache_key, SemanticCacheEntry.size_bytes)\
+                    .order_by(SemanticCacheEntry.last_used_at)\
+                    .all()
+                for key, size in candidates:
+                    if total <= max_bytes:
+                        break
+                    self.session.query(SemanticCacheEntry)\
+                        .filter(SemanticCacheEntry.cache_key == key)\
+                        .delete(synchronize_session=False)
+                    total -= size
+                    removed += 1
+
+        if removed:
+            self.session.flush()
+            logger.info("semantic_cache_evicted", removed=removed)
+
+        return removed
+
+    def total_bytes(self) -> int:
+        """Taille totale des résultats en cache"""
+        return self.session.query(func.coalesce(func.sum(SemanticCacheEntry.size_bytes), 0)).scalar()
+
+    def count(self) -> int:
+        """Nombre d'entrées en cache"""
+        return self.session.query(SemanticCacheEntry).count()
@@ -0,0 +1,335 @@
+"""
+Cassettes HTTP - Enregistrement et rejeu hors-ligne des échanges réseau
+
+Permet de rejouer une exécution complète de l'Agent 1A sans accès à
+eur-lex.europa.eu ni taxation-customs.ec.europa.eu :
+
+- mode "record" : chaque couple requête/réponse (corps et en-têtes) est
+  enregistré dans un dossier de cassettes (un fichier .json.gz par échange)
+- mode "replay" : les réponses sont servies depuis la cassette, avec une
+  latence injectée optionnelle, aucune requête ne sort sur le réseau
+- mode "off" : comportement normal
+
+Deux points d'accroche :
+- `get_http_transport()` pour les clients httpx (document_fetcher)
+- `CassetteDownloaderMiddleware` pour les spiders Scrapy (exécutés en subprocess)
+
+Configuration (variables d'environnement / .env) :
+    HTTP_CASSETTE_MODE=off|record|replay
+    HTTP_CASSETTE_DIR=data/cassettes/run_2026_01
+    HTTP_CASSETTE_LATENCY_MS=150
+"""
+
+import asyncio
+import base64
+import gzip
+import hashlib
+import json
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+import structlog
+
+logger = structlog.get_logger()
+
+CASSETTE_MODES = ("off", "record", "replay")
+
+# En-têtes liés au transport, non pertinents une fois le corps décodé
+_HOP_BY_HOP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+class CassetteMiss(httpx.TransportError):
+    """Aucune réponse enregistrée pour cette requête (mode replay)."""
+
+
+class Cassette:
+    """Dossier de cassettes : un fichier JSON compressé par échange HTTP"""
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory: Dossier de la cassette (créé si absent)
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def request_key(method: str, url: str, body: bytes = b"") -> str:
+        """Clé stable d'une requête : méthode + URL + hash du corps"""
+        digest = hashlib.sha256()
+        digest.update(method.upper().encode())
+        digest.update(b" ")
+        digest.update(url.encode())
+        if body:
+            digest.update(b"\n")
+            digest.update(hashlib.sha256(body).digest())
+        return digest.hexdigest()[:32]
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json.gz"
+
+    def save(
+        self,
+        method: str,
+        url: str,
+        request_headers: List[Tuple[str, str]],
+        request_body: bytes,
+        status_code: int,
+        response_headers: List[Tuple[str, str]],
+        response_body: bytes
+    ) -> str:
+        """
+        Enregistre un échange requête/réponse
+
+        Returns:
+            Clé de l'échange
+        """
+        key = self.request_key(method, url, request_body)
+
+        entry = {
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "request": {
+                "method": method.upper(),
+                "url": url,
+                "headers": request_headers,
+                "body": base64.b64encode(request_body).decode("ascii"),
+            },
+            "response": {
+                "status_code": status_code,
+                "headers": response_headers,
+                "body": base64.b64encode(response_body).decode("ascii"),
+            },
+        }
+
+        with gzip.open(self._path(key), "wt", encoding="utf-8") as f:
+            json.dump(entry, f)
+
+        logger.debug("cassette_recorded", method=method, url=url, key=key, size=len(response_body))
+        return key
+
+    def load(self, method: str, url: str, body: bytes = b"") -> Optional[Dict]:
+        """
+        Charge la réponse enregistrée pour une requête
+
+        Returns:
+            Dict {status_code, headers, body (bytes)} ou None si absente
+        """
+        path = self._path(self.request_key(method, url, body))
+
+        if not path.exists():
+            return None
+
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            response = json.load(f)["response"]
+
+        response["headers"] = [tuple(header) for header in response["headers"]]
+        response["body"] = base64.b64decode(response["body"])
+        return response
+
+
+class CassetteTransport(httpx.AsyncBaseTransport):
+    """Transport httpx qui enregistre ou rejoue les échanges via une Cassette"""
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        mode: str,
+        latency_ms: int = 0,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        """
+        Args:
+            cassette: Cassette à utiliser
+            mode: "record" ou "replay"
+            latency_ms: Latence injectée par réponse rejouée
+            transport: Transport réel utilisé en mode record
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Mode de cassette invalide: {mode}")
+
+        self.cassette = cassette
+        self.mode = mode
+        self.latency_ms = latency_ms
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = await request.aread()
+        url = str(request.url)
+
+        if self.mode == "replay":
+            recorded = self.cassette.load(request.method, url, body)
+
+            if recorded is None:
+                raise CassetteMiss(f"No recorded response for {request.method} {url}", request=request)
+
+            if self.latency_ms:
+                await asyncio.sleep(self.latency_ms / 1000)
+
+            return httpx.Response(
+                status_code=recorded["status_code"],
+                headers=recorded["headers"],
+                content=recorded["body"],
+                request=request,
+            )
+
+        # Mode record : requête réelle puis enregistrement du corps décodé
+        response = await self.transport.handle_async_request(request)
+        content = await response.aread()
+        await response.aclose()
+
+        headers = [
+            (name, value) for name, value in response.headers.multi_items()
+            if name.lower() not in _HOP_BY_HOP_HEADERS
+        ]
+
+        self.cassette.save(
+            request.method,
+            url,
+            list(request.headers.multi_items()),
+            body,
+            response.status_code,
+            headers,
+            content,
+        )
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=headers,
+            content=content,
+            request=request,
+        )
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def get_http_transport() -> Optional[httpx.AsyncBaseTransport]:
+    """
+    Retourne le transport httpx correspondant au mode de cassette configuré
+
+    Returns:
+        CassetteTransport, ou None en mode "off" (transport httpx par défaut)
+    """
+    from src.config import settings
+
+    mode = settings.http_cassette_mode.lower()
+
+    if mode == "off":
+        return None
+
+    if mode not in CASSETTE_MODES:
+        raise ValueError(f"HTTP_CASSETTE_MODE invalide: {mode} (attendu: {', '.join(CASSETTE_MODES)})")
+
+    return CassetteTransport(
+        Cassette(str(settings.http_cassette_dir)),
+        mode=mode,
+        latency_ms=settings.http_cassette_latency_ms,
+    )
+
+
+def cassette_subprocess_env() -> Dict[str, str]:
+    """
+    Variables d'environnement à transmettre aux spiders Scrapy (subprocess)
+
+    Propage la configuration de cassette et rend le package `src` importable
+    depuis les scripts temporaires des spiders.
+    """
+    from src.config import settings
+
+    env = dict(os.environ)
+    env["HTTP_CASSETTE_MODE"] = settings.http_cassette_mode.lower()
+    env["HTTP_CASSETTE_DIR"] = str(Path(settings.http_cassette_dir).resolve())
+    env["HTTP_CASSETTE_LATENCY_MS"] = str(settings.http_cassette_latency_ms)
+
+    base_dir = str(settings.base_dir)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [base_dir, env.get("PYTHONPATH")]))
+
+    return env
+
+
+class CassetteDownloaderMiddleware:
+    """
+    Downloader middleware Scrapy : enregistre ou rejoue les réponses
+
+    À déclarer avec une priorité élevée (proche du downloader) pour que les
+    réponses rejouées traversent la décompression comme des réponses réelles :
+        DOWNLOADER_MIDDLEWARES = {"src.utils.http_cassette.CassetteDownloaderMiddleware": 950}
+    """
+
+    def __init__(self, cassette: Cassette, mode: str, latency_ms: int = 0):
+        self.cassette = cassette
+        self.mode = mode
+        self.latency_ms = latency_ms
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        from scrapy.exceptions import NotConfigured
+
+        mode = os.environ.get("HTTP_CASSETTE_MODE", "off").lower()
+        if mode not in ("record", "replay"):
+            raise NotConfigured("HTTP cassette disabled")
+
+        return cls(
+            Cassette(os.environ["HTTP_CASSETTE_DIR"]),
+            mode=mode,
+            latency_ms=int(os.environ.get("HTTP_CASSETTE_LATENCY_MS", "0")),
+        )
+
+    def process_request(self, request, spider=None):
+        if self.mode != "replay":
+            return None
+
+        from scrapy.exceptions import IgnoreRequest
+        from scrapy.http import Headers
+        from scrapy.responsetypes import responsetypes
+
+        recorded = self.cassette.load(request.method, request.url, request.body or b"")
+
+        if recorded is None:
+            logger.error("cassette_miss", method=request.method, url=request.url)
+            raise IgnoreRequest(f"No recorded response for {request.method} {request.url}")
+
+        # Spiders exécutés avec CONCURRENT_REQUESTS=1 : une pause bloquante
+        # reproduit la latence sans sérialiser davantage le crawl
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+        headers = Headers()
+        for name, value in recorded["headers"]:
+            headers.appendlist(name, value)
+
+        response_cls = responsetypes.from_args(headers=headers, url=request.url, body=recorded["body"])
+        return response_cls(
+            url=request.url,
+            status=recorded["status_code"],
+            headers=headers,
+            body=recorded["body"],
+            request=request,
+        )
+
+    def process_response(self, request, response, spider=None):
+        if self.mode == "record":
+            headers = [
+                (name.decode("latin-1"), value.decode("latin-1"))
+                for name, values in response.headers.items()
+                for value in values
+            ]
+            self.cassette.save(
+                request.method,
+                request.url,
+                [
+                    (name.decode("latin-1"), value.decode("latin-1"))
+                    for name, values in request.headers.items()
+                    for value in values
+                ],
+                request.body or b"",
+                response.status,
+                headers,
+                response.body,
+            )
+
+        return response
@@ -0,0 +1,442 @@
+"""
+Comptabilité des appels LLM (tokens, latence, tentatives, coût)
+
+Chaque appel à Claude - Agent 1B (analyse sémantique), Agent 2 (raisonnement
+en cascade), LLM Judge (critères et décision) - est enregistré avec :
+- agent, étape, document (et profil entreprise pour l'Agent 1B) et modèle
+- tokens d'entrée (total, lus et écrits en cache de prompt) et de sortie
+- latence, nombre de tentatives et erreur éventuelle
+
+Le contexte (run, agent, document) est porté par des contextvars : il suit
+les tâches asyncio et les threads LangChain, et l'appelant le pose une fois
+avec llm_context() au lieu de le passer à chaque couche.
+
+Persistance (persist_run) :
+- colonnes llm_tokens / processing_time_ms des lignes existantes de
+  document_profile_analyses (agent_1b, par profil), risk_analyses (agent_2)
+  et judge_evaluations (judge)
+- table agrégée "llm_usage" : une ligne par (run, agent, étape, modèle)
+"""
+
+import contextvars
+import threading
+import time
+import uuid
+import structlog
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.config import settings
+
+logger = structlog.get_logger()
+
+# Prix en USD par million de tokens (entrée, sortie), par préfixe de modèle
+MODEL_PRICES_USD = [
+    ("claude-opus-4-5", 5.0, 25.0),
+    ("claude-opus-4-6", 5.0, 25.0),
+    ("claude-opus", 15.0, 75.0),
+    ("claude-sonnet", 3.0, 15.0),
+    ("claude-3-5-sonnet", 3.0, 15.0),
+    ("claude-3-7-sonnet", 3.0, 15.0),
+    ("claude-haiku-4-5", 1.0, 5.0),
+    ("claude-3-5-haiku", 0.8, 4.0),
+    ("claude-3-haiku", 0.25, 1.25),
+]
+
+# Multiplicateurs du prix d'entrée pour le cache de prompt, remise Message Batches
+CACHE_READ_PRICE_FACTOR = 0.1
+CACHE_WRITE_PRICE_FACTOR = 1.25
+BATCH_PRICE_FACTOR = 0.5
+
+USAGE_FIELDS = ("input_tokens", "output_tokens", "cache_read_input_tokens", "cache_creation_input_tokens")
+
+# Pas de dict par défaut (partagé entre contextes) : chaque run pose le sien
+_context: contextvars.ContextVar[Optional[Dict[str, str]]] = contextvars.ContextVar("llm_usage_context", default=None)
+
+
+def _tags() -> Dict[str, str]:
+    """Étiquettes du contexte courant"""
+    return _context.get() or {}
+
+
+def token_usage(message) -> Dict[str, int]:
+    """
+    Consommation de tokens d'une réponse (usage_metadata LangChain)
+
+    input_tokens est le total en entrée, y compris les tokens lus depuis le
+    cache de prompt (cache_read_input_tokens) et ceux écrits dans le cache
+    (cache_creation_input_tokens).
+    """
+    usage = getattr(message, "usage_metadata", None) or {}
+    details = usage.get("input_token_details") or {}
+    cache_creation = sum(
+        details.get(key) or 0
+        for key in ("cache_creation", "ephemeral_5m_input_tokens", "ephemeral_1h_input_tokens")
+    )
+    return {
+        "input_tokens": usage.get("input_tokens", 0),
+        "output_tokens": usage.get("output_tokens", 0),
+        "cache_read_input_tokens": details.get("cache_read") or 0,
+        "cache_creation_input_tokens": cache_creation
+    }
+
+
+def api_token_usage(usage) -> Dict[str, int]:
+    """
+    Consommation de tokens au format de token_usage() à partir du champ
+    usage brut de l'API (SDK anthropic, résultats de la Message Batches API)
+
+    L'API compte à part les tokens lus/écrits en cache : ils sont ajoutés à
+    input_tokens pour rester comparables aux appels passés par LangChain.
+    """
+    cache_read = getattr(usage, "cache_read_input_tokens", None) or 0
+    cache_creation = getattr(usage, "cache_creation_input_tokens", None) or 0
+    return {
+        "input_tokens": (getattr(usage, "input_tokens", None) or 0) + cache_read + cache_creation,
+        "output_tokens": getattr(usage, "output_tokens", None) or 0,
+        "cache_read_input_tokens": cache_read,
+        "cache_creation_input_tokens": cache_creation
+    }
+
+
+def estimate_cost_usd(model: str, usage: Dict[str, int], batch: bool = False) -> float:
+    """
+    Coût estimé d'un appel (0 pour un modèle absent de MODEL_PRICES_USD)
+
+    Args:
+        model: Nom du modèle
+        usage: Consommation au format de token_usage()
+        batch: Appel passé par la Message Batches API (moitié prix)
+    """
+    prices = next(((i, o) for prefix, i, o in MODEL_PRICES_USD if model.startswith(prefix)), None)
+    if prices is None:
+        return 0.0
+
+    input_price, output_price = prices
+    cache_read = usage.get("cache_read_input_tokens", 0)
+    cache_creation = usage.get("cache_creation_input_tokens", 0)
+    uncached = max(0, usage.get("input_tokens", 0) - cache_read - cache_creation)
+
+    cost = (
+        uncached * input_price
+        + cache_read * input_price * CACHE_READ_PRICE_FACTOR
+        + cache_creation * input_price * CACHE_WRITE_PRICE_FACTOR
+        + usage.get("output_tokens", 0) * output_price
+    ) / 1_000_000
+    return cost * BATCH_PRICE_FACTOR if batch else cost
+
+
+@dataclass
+class LLMCall:
+    """Un appel LLM (ou un groupe d'appels d'une même analyse, voir calls)"""
+
+    run_id: str
+    agent: str
+    stage: str
+    model: str
+    document_id: Optional[str] = None
+    profile_id: Optional[str] = None
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_input_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    latency_ms: float = 0.0
+    calls: int = 1
+    retries: int = 0
+    error: Optional[str] = None
+    batch: bool = False
+    cost_usd: float = 0.0
+
+
+@contextmanager
+def llm_context(**tags: Optional[str]) -> Iterator[None]:
+    """
+    Étiquettes des appels LLM effectués dans ce bloc
+
+    Args:
+        tags: run_id, agent, stage, document_id, profile_id (None: inchangé)
+    """
+    token = _context.set({**_tags(), **{k: v for k, v in tags.items() if v is not None}})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+def new_run_id(prefix: str = "run") -> str:
+    """Identifiant de run lisible et trié par date (ex: pipeline-20260101T120000-1a2b3c)"""
+    return f"{prefix}-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def start_run(prefix: str = "run") -> Tuple[str, contextvars.Token]:
+    """
+    Ouvre un run dans le contexte courant : les appels suivants lui sont rattachés
+
+    Returns:
+        (run_id, jeton) : le jeton referme le run (persist_run(token=...) ou end_run)
+    """
+    run_id = new_run_id(prefix)
+    return run_id, _context.set({"run_id": run_id})
+
+
+def end_run(token: contextvars.Token) -> None:
+    """Referme un run ouvert par start_run : le contexte précédent est rétabli"""
+    _context.reset(token)
+
+
+class LLMUsageTracker:
+    """Enregistrements des appels LLM du processus, regroupés par run"""
+
+    def __init__(self):
+        self._calls: List[LLMCall] = []
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        model: str,
+        usage: Optional[Dict[str, int]] = None,
+        latency_ms: float = 0.0,
+        retries: int = 0,
+        calls: int = 1,
+        error: Optional[str] = None,
+        batch: bool = False,
+        **tags: Optional[str]
+    ) -> Optional[LLMCall]:
+        """
+        Enregistre un appel avec les étiquettes du contexte (voir llm_context)
+
+        Seuls les appels rattachés à un run (start_run, llm_context(run_id=...))
+        sont conservés jusqu'à persist_run().
+
+        Args:
+            model: Modèle appelé
+            usage: Consommation au format de token_usage() (None: appel échoué)
+            latency_ms: Durée de l'appel, tentatives comprises
+            retries: Nouvelles tentatives (429/529, erreurs réseau)
+            calls: Appels regroupés dans cet enregistrement (ex: map-reduce)
+            error: Erreur finale, le cas échéant
+            batch: Appel passé par la Message Batches API
+            tags: Étiquettes prioritaires sur le contexte (agent, stage, document_id, profile_id)
+        """
+        if not settings.llm_usage_tracking:
+            return None
+
+        context = {**_tags(), **{k: v for k, v in tags.items() if v is not None}}
+        usage = usage or {}
+        call = LLMCall(
+            run_id=context.get("run_id", "adhoc"),
+            agent=context.get("agent", "unknown"),
+            stage=context.get("stage", "unknown"),
+            document_id=context.get("document_id"),
+            profile_id=context.get("profile_id"),
+            model=model,
+            latency_ms=round(latency_ms, 1),
+            calls=calls,
+            retries=retries,
+            error=error,
+            batch=batch,
+            cost_usd=estimate_cost_usd(model, usage, batch),
+            **{name: usage.get(name, 0) for name in USAGE_FIELDS}
+        )
+
+        # Hors run (appel isolé), l'appel est seulement journalisé
+        if "run_id" in context:
+            with self._lock:
+                self._calls.append(call)
+
+        logger.debug("llm_call_recorded", **asdict(call))
+        return call
+
+    def calls(self, run_id: Optional[str] = None) -> List[LLMCall]:
+        """Appels enregistrés (d'un run, ou tous)"""
+        with self._lock:
+            return [call for call in self._calls if run_id is None or call.run_id == run_id]
+
+    def pop_run(self, run_id: str) -> List[LLMCall]:
+        """Retire et renvoie les appels d'un run (après persistance)"""
+        with self._lock:
+            calls = [call for call in self._calls if call.run_id == run_id]
+            self._calls = [call for call in self._calls if call.run_id != run_id]
+        return calls
+
+    def summary(self, run_id: Optional[str] = None) -> Dict:
+        """Résumé coût / tokens / latence (voir summarize)"""
+        return summarize(self.calls(run_id))
+
+
+def aggregate(calls: List[LLMCall]) -> List[Dict]:
+    """Agrégats par (run, agent, étape, modèle), lignes de la table llm_usage"""
+    groups: Dict[tuple, Dict] = {}
+    for call in calls:
+        key = (call.run_id, call.agent, call.stage, call.model)
+        row = groups.setdefault(key, {
+            "run_id": call.run_id, "agent": call.agent, "stage": call.stage, "model_name": call.model,
+            "calls": 0, "retries": 0, "errors": 0, "latency_ms_total": 0.0, "latency_ms_max": 0.0,
+            "cost_usd": 0.0, **{name: 0 for name in USAGE_FIELDS}
+        })
+        row["calls"] += call.calls
+        row["retries"] += call.retries
+        row["errors"] += call.error is not None
+        row["latency_ms_total"] += call.latency_ms
+        row["latency_ms_max"] = max(row["latency_ms_max"], call.latency_ms)
+        row["cost_usd"] += call.cost_usd
+        for name in USAGE_FIELDS:
+            row[name] += getattr(call, name)
+    return list(groups.values())
+
+
+def summarize(rows: List) -> Dict:
+    """
+    Résumé d'un run : totaux et détail par agent/étape
+
+    Args:
+        rows: LLMCall ou lignes agrégées (dicts de aggregate() ou de LLMUsageRepository)
+    """
+    if rows and isinstance(rows[0], LLMCall):
+        rows = aggregate(rows)
+
+    totals = {
+        name: sum(row[name] for row in rows)
+        for name in ("calls", "retries", "errors", *USAGE_FIELDS, "latency_ms_total")
+    }
+    totals["cost_usd"] = round(sum(row["cost_usd"] for row in rows), 6)
+    totals["latency_ms_mean"] = round(totals["latency_ms_total"] / totals["calls"], 1) if totals["calls"] else 0.0
+    totals["latency_ms_max"] = max((row["latency_ms_max"] for row in rows), default=0.0)
+
+    return {
+        **totals,
+        "by_stage": [
+            {
+                **{k: row[k] for k in ("agent", "stage", "model_name", "calls", "retries", "errors", *USAGE_FIELDS)},
+                "cost_usd": round(row["cost_usd"], 6),
+                "latency_ms_mean": round(row["latency_ms_total"] / row["calls"], 1) if row["calls"] else 0.0,
+                "latency_ms_max": row["latency_ms_max"],
+            }
+            for row in sorted(rows, key=lambda r: (r["agent"], r["stage"], r["model_name"]))
+        ],
+    }
+
+
+def format_summary(run_id: str, summary: Dict) -> str:
+    """Résumé texte d'un run pour la CLI"""
+    lines = [
+        f"Consommation LLM du run {run_id}",
+        f"  Appels: {summary['calls']} (tentatives supplémentaires: {summary['retries']}, erreurs: {summary['errors']})",
+        f"  Tokens: {summary['input_tokens']} en entrée dont {summary['cache_read_input_tokens']} lus en cache, "
+        f"{summary['output_tokens']} en sortie",
+        f"  Latence: {summary['latency_ms_mean']} ms en moyenne, {summary['latency_ms_max']} ms au maximum",
+        f"  Coût estimé: {summary['cost_usd']:.4f} USD",
+    ]
+    for row in summary["by_stage"]:
+        lines.append(
+            f"  - {row['agent']}/{row['stage']} ({row['model_name']}): {row['calls']} appels, "
+            f"{row['input_tokens']}+{row['output_tokens']} tokens, {row['latency_ms_mean']} ms, "
+            f"{row['cost_usd']:.4f} USD"
+        )
+    return "\n".join(lines)
+
+
+def document_totals(calls: List[LLMCall]) -> Dict[tuple, Dict[str, int]]:
+    """Tokens et durée par (agent, document, profil), pour les colonnes des tables de résultats"""
+    totals: Dict[tuple, Dict[str, int]] = {}
+    for call in calls:
+        if call.document_id is None:
+            continue
+        entry = totals.setdefault(
+            (call.agent, call.document_id, call.profile_id), {"llm_tokens": 0, "processing_time_ms": 0.0}
+        )
+        entry["llm_tokens"] += call.input_tokens + call.output_tokens
+        entry["processing_time_ms"] += call.latency_ms
+    return {
+        key: {"llm_tokens": value["llm_tokens"], "processing_time_ms": int(round(value["processing_time_ms"]))}
+        for key, value in totals.items()
+    }
+
+
+# Enregistrements du processus
+tracker = LLMUsageTracker()
+
+
+def create_message(client, stage: Optional[str] = None, document_id: Optional[str] = None, **params):
+    """
+    client.messages.create() mesuré (SDK anthropic)
+
+    Les nouvelles tentatives internes du SDK sont comptées (retries_taken) ;
+    l'appel est enregistré avec les étiquettes du contexte, y compris en cas
+    d'erreur (qui est relancée).
+
+    Args:
+        client: Client anthropic.Anthropic
+        stage: Étape (prioritaire sur le contexte)
+        document_id: Document (prioritaire sur le contexte)
+        params: Paramètres de messages.create()
+    """
+    start = time.perf_counter()
+    try:
+        raw = client.messages.with_raw_response.create(**params)
+        message = raw.parse()
+    except Exception as e:
+        tracker.record(
+            params.get("model", ""),
+            latency_ms=(time.perf_counter() - start) * 1000,
+            error=str(e)[:200],
+            stage=stage,
+            document_id=document_id
+        )
+        raise
+
+    tracker.record(
+        params.get("model", ""),
+        api_token_usage(message.usage),
+        latency_ms=(time.perf_counter() - start) * 1000,
+        retries=getattr(raw, "retries_taken", 0) or 0,
+        stage=stage,
+        document_id=document_id
+    )
+    return message
+
+
+def persist_run(
+    run_id: str,
+    session_factory: Optional[Callable] = None,
+    token: Optional[contextvars.Token] = None
+) -> Dict:
+    """
+    Enregistre les appels d'un run en base et renvoie son résumé
+
+    Args:
+        run_id: Run à enregistrer (ses appels sont retirés du tracker)
+        session_factory: Fabrique de sessions (par défaut get_session)
+        token: Jeton de start_run : le run est refermé dans le contexte courant
+
+    Returns:
+        Résumé du run (voir summarize)
+    """
+    if token is not None:
+        end_run(token)
+
+    calls = tracker.pop_run(run_id)
+    summary = summarize(calls)
+    if not calls:
+        return summary
+
+    if session_factory is None:
+        from src.storage.database import get_session as session_factory
+    from src.storage.llm_usage_repository import LLMUsageRepository
+
+    session = session_factory()
+    try:
+        repository = LLMUsageRepository(session)
+        repository.save_aggregates(aggregate(calls))
+        updated = repository.update_result_columns(document_totals(calls))
+        session.commit()
+        logger.info("llm_usage_persisted", run_id=run_id, calls=summary["calls"], rows_updated=updated)
+    except Exception as e:
+        session.rollback()
+        logger.error("llm_usage_persist_failed", run_id=run_id, error=str(e))
+    finally:
+        session.close()
+
+    return summary
@@ -0,0 +1,97 @@
+"""Tests pour l'extraction des citations CELEX et la frontière de crawl."""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.agent_1a.tools.celex_citations import extract_celex_references
+from src.storage.citation_repository import CitationRepository
+from src.storage.models import Base, CrawlFrontierEntry, Document, DocumentCitation
+
+
+@pytest.fixture
+def db_session():
+    """Session SQLite en mémoire"""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+class TestCelexExtraction:
+    """Tests de la conversion des références en numéros CELEX"""
+
+    def test_reference_forms(self):
+        """Les différentes formes de citation sont converties en CELEX"""
+        text = (
+            "Having regard to Regulation (EU) 2023/956 and to Commission Implementing "
+            "Regulation (EU) 2023/1773, amending Regulation (EC) No 1907/2006 and "
+            "Council Regulation (EEC) No 2658/87, Directive 2003/87/EC, Decision (EU) "
+            "2015/1814, Decision No 406/2009/EC. See also CELEX:32019R2144."
+        )
+
+        references = extract_celex_references(text)
+
+        assert list(references) == [
+            "32023R0956", "32023R1773", "32006R1907", "31987R2658",
+            "32003L0087", "32015D1814", "32009D0406", "32019R2144",
+        ]
+        assert references["32023R1773"] == "Commission Implementing Regulation (EU) 2023/1773"
+
+    def test_self_citation_and_line_breaks(self):
+        """L'acte lui-même est exclu, les références coupées par un saut de ligne sont reconnues"""
+        text = "This Regulation (EU) 2023/956 amends Directive\n2003/87/EC."
+
+        assert list(extract_celex_references(text, exclude="32023R0956")) == ["32003L0087"]
+
+    def test_no_false_positive(self):
+        """Les fractions hors référence d'acte sont ignorées"""
+        assert extract_celex_references("Article 3/4 applies from 2026/01") == {}
+
+
+@pytest.mark.database
+# Les modèles utilisent datetime.utcnow (déprécié depuis Python 3.12)
+@pytest.mark.filterwarnings("ignore:datetime.datetime.utcnow:DeprecationWarning")
+class TestCitationRepository:
+    """Tests du graphe de citations et de la frontière"""
+
+    def test_frontier_deduplicated_and_ordered(self, db_session):
+        """Un acte cité par plusieurs documents n'apparaît qu'une fois, en tête de frontière"""
+        repo = CitationRepository(db_session)
+
+        repo.record_citations("https://a", {"32023R1773": "r1", "32003L0087": "r2"}, citing_celex="32023R0956")
+        repo.record_citations("https://b", {"32023R1773": "r1"})
+        repo.record_citations("https://b", {"32023R1773": "r1"})  # Même document : pas de doublon
+
+        assert db_session.query(DocumentCitation).count() == 3
+        assert [entry.celex for entry in repo.next_batch(10)] == ["32023R1773", "32003L0087"]
+        assert db_session.get(CrawlFrontierEntry, "32023R1773").citation_count == 2
+        assert db_session.get(CrawlFrontierEntry, "32023R0956").status == "fetched"
+
+    def test_known_and_fetched_acts_leave_frontier(self, db_session):
+        """Un acte déjà en base ou collecté depuis n'est pas remis en file"""
+        db_session.add(Document(
+            title="CBAM",
+            source_url="https://eur-lex.europa.eu/legal-content/EN/TXT/HTML/?uri=CELEX:32023R0956",
+            event_type="reglementaire",
+            hash_sha256="0" * 64,
+        ))
+        db_session.flush()
+        repo = CitationRepository(db_session)
+
+        repo.record_citations("https://a", {"32023R0956": "r", "32023R1773": "r1"})
+        repo.record_citations("https://x", {}, citing_celex="32023R1773")
+
+        assert repo.next_batch(10) == []
+
+    def test_failed_fetch_abandoned_after_max_attempts(self, db_session):
+        """Un acte introuvable est abandonné après le nombre de tentatives configuré"""
+        repo = CitationRepository(db_session)
+        repo.record_citations("https://a", {"32099R9999": "r"})
+
+        repo.mark_failed("32099R9999", "404", max_attempts=2)
+        assert repo.count_pending() == 1
+
+        repo.mark_failed("32099R9999", "404", max_attempts=2)
+        assert repo.count_pending() == 0
@@ -0,0 +1,104 @@
+"""Tests pour l'ordonnancement des téléchargements de l'Agent 1A."""
+
+import asyncio
+
+from src.agent_1a.tools.cbam_guidance_scraper import CbamDocument
+from src.agent_1a.tools.fetch_scheduler import FetchScheduler, parse_size, prioritize
+from src.agent_1a.tools.scraper import EurlexDocument
+
+
+def _eurlex(celex: str, document_type: str = "REGULATION") -> dict:
+    doc = EurlexDocument(
+        celex_number=celex,
+        title=f"{document_type.title()} {celex}",
+        url=f"https://eur-lex.europa.eu/legal-content/AUTO/?uri=CELEX:{celex}",
+        pdf_url=None,
+        document_type=document_type,
+        keyword="CBAM",
+    )
+    return {"source": "eurlex", "doc": doc, "url": doc.url}
+
+
+def _cbam(title: str, category: str, size: str) -> dict:
+    doc = CbamDocument(
+        title=title,
+        url=f"https://taxation-customs.ec.europa.eu/{title}.zip",
+        size=size,
+        category=category,
+        format="ZIP",
+    )
+    return {"source": "cbam", "doc": doc, "url": doc.url}
+
+
+class TestPriorities:
+    """Tests du calcul de priorité et de taille"""
+
+    def test_parse_size(self):
+        """Les tailles affichées sur le site CBAM sont converties en octets"""
+        assert parse_size("PDF - 1 MB") == 1024 * 1024
+        assert parse_size("XLSX - 250 KB") == 250 * 1024
+        assert parse_size("ZIP - 1,5 MB") == int(1.5 * 1024 * 1024)
+        assert parse_size("") is None
+        assert parse_size("English") is None
+
+    def test_regulations_before_large_tools(self):
+        """Un règlement passe avant un outil ZIP, à priorité égale le plus petit d'abord"""
+        items = [
+            _cbam("Self-assessment tool", "tool", "ZIP - 40 MB"),
+            _eurlex("32023D1234", "DECISION"),
+            _cbam("Guidance for importers", "guidance", "PDF - 3 MB"),
+            _cbam("Guidance for operators", "guidance", "PDF - 1 MB"),
+            _eurlex("32023R0956"),
+        ]
+
+        ordered = [item["url"] for item in prioritize(items)]
+
+        assert ordered[0] == items[4]["url"]
+        assert ordered.index(items[3]["url"]) < ordered.index(items[2]["url"])
+        assert ordered[-1] == items[0]["url"]
+
+
+class TestFetchScheduler:
+    """Tests du pool de workers"""
+
+    async def test_large_files_do_not_starve_small_ones(self):
+        """Les gros fichiers n'occupent jamais plus de large_slots workers"""
+        items = [_cbam(f"Tool {i}", "tool", "ZIP - 40 MB") for i in range(3)]
+        items += [_eurlex(f"3202{i}R0001") for i in range(6)]
+
+        in_flight_large = 0
+        max_large = 0
+        completed = []
+
+        async def worker(item):
+            nonlocal in_flight_large, max_large
+            is_large = item["source"] == "cbam"
+            if is_large:
+                in_flight_large += 1
+                max_large = max(max_large, in_flight_large)
+            await asyncio.sleep(0.05 if is_large else 0.005)
+            if is_large:
+                in_flight_large -= 1
+            completed.append(item["source"])
+
+        scheduler = FetchScheduler(concurrency=3, large_file_bytes=10 * 1024 * 1024, large_slots=1)
+        await scheduler.run(items, worker)
+
+        assert len(completed) == len(items)
+        assert max_large == 1
+        # Tous les petits actes sont terminés avant le premier gros fichier
+        assert completed[:6] == ["eurlex"] * 6
+
+    async def test_worker_errors_are_isolated(self):
+        """Une erreur sur un document n'interrompt pas les autres"""
+        items = [_eurlex(f"3202{i}R0001") for i in range(4)]
+        done = []
+
+        async def worker(item):
+            if item["doc"].celex_number == "32021R0001":
+                raise RuntimeError("boom")
+            done.append(item["doc"].celex_number)
+
+        await FetchScheduler(concurrency=2).run(items, worker)
+
+        assert len(done) == 3
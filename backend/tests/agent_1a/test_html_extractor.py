@@ -0,0 +1,148 @@
+"""Tests pour l'extraction du rendu HTML EUR-Lex et la sélection du format."""
+
+from unittest.mock import Mock, patch
+
+from src.agent_1a.agent import _eurlex_candidate_urls
+from src.agent_1a.tools.html_extractor import extract_html_content, is_eurlex_html_rendition
+
+
+EURLEX_HTML = """<html><head><script>var x = 1;</script></head><body>
+<div id="document1">
+<p class="oj-doc-ti">REGULATION (EU) 2023/956</p>
+<p class="oj-normal">establishing a carbon border adjustment mechanism</p>
+<p class="oj-ti-art">Article 1</p>
+<p class="oj-normal">This Regulation establishes a carbon border adjustment mechanism.</p>
+<p class="oj-ti-art">Article 2</p>
+<p class="oj-normal">This Regulation shall apply to goods listed in Annex I.</p>
+<p class="oj-doc-ti">ANNEX I</p>
+<table>
+<tr><td><p>CN code</p></td><td><p>Description</p></td></tr>
+<tr><td><p>7601.10</p></td><td><p>Unwrought aluminium, not alloyed, combined nomenclature goods</p></td></tr>
+</table>
+</div>
+</body></html>
+""" + "<!-- padding -->" * 200
+
+
+# Acte du Journal officiel : en-tête (oj-hd-*) avant le titre en plusieurs paragraphes
+OJ_HTML = """<html><body>
+<div id="document1">
+<table class="oj-table"><tr>
+<td><p class="oj-hd-date">18.8.2023</p></td>
+<td><p class="oj-hd-lg">EN</p></td>
+<td><p class="oj-hd-ti">Official Journal of the European Union</p></td>
+<td><p class="oj-hd-oj">L 228/94</p></td>
+</tr></table>
+<p class="oj-hd-info">2023/1773</p>
+<div class="eli-main-title">
+<p class="oj-doc-ti">COMMISSION IMPLEMENTING REGULATION (EU) 2023/1773</p>
+<p class="oj-doc-ti">of 17 August 2023</p>
+<p class="oj-doc-ti">laying down the rules for the application of Regulation (EU) 2023/956</p>
+</div>
+<p class="oj-normal">THE EUROPEAN COMMISSION,</p>
+<p class="oj-ti-art">Article 1</p>
+<p class="oj-normal">This Regulation lays down reporting obligations.</p>
+<p class="oj-doc-ti">ANNEX I</p>
+<p class="oj-normal">Goods under CN 7601.10.</p>
+</div>
+</body></html>
+""" + "<!-- padding -->" * 200
+
+
+class TestHtmlExtractor:
+    """Tests de l'extracteur HTML"""
+
+    async def test_extract_sections_tables_and_nc_codes(self, tmp_path):
+        """Les articles/annexes deviennent des sections, les tableaux et codes NC sont extraits"""
+        html_file = tmp_path / "act.html"
+        html_file.write_text(EURLEX_HTML, encoding="utf-8")
+
+        content = await extract_html_content(str(html_file))
+
+        assert content.status == "success"
+        assert content.metadata["sections"] == [
+            "REGULATION (EU) 2023/956", "Article 1", "Article 2", "ANNEX I"
+        ]
+        assert content.page_count == 4
+        assert content.metadata["document_title"] == "REGULATION (EU) 2023/956"
+        assert "--- Article 2 ---" in content.text
+        assert "var x" not in content.text
+
+        assert len(content.tables) == 1
+        assert content.tables[0]["data"][1][0] == "7601.10"
+
+        nc_codes = {nc.code: nc.page for nc in content.nc_codes}
+        assert nc_codes["7601.10"] == 4
+
+    async def test_document_title_after_oj_header(self, tmp_path):
+        """Le titre de l'acte est lu après l'en-tête du JO (section "Preamble"), annexes exclues"""
+        html_file = tmp_path / "act.html"
+        html_file.write_text(OJ_HTML, encoding="utf-8")
+
+        content = await extract_html_content(str(html_file))
+
+        assert content.metadata["sections"][0] == "Preamble"
+        assert content.metadata["document_title"] == (
+            "COMMISSION IMPLEMENTING REGULATION (EU) 2023/1773 of 17 August 2023 "
+            "laying down the rules for the application of Regulation (EU) 2023/956"
+        )
+
+    async def test_document_title_missing(self, tmp_path):
+        """Sans paragraphe de titre, pas de titre (l'agent garde "CELEX ...")"""
+        html_file = tmp_path / "act.html"
+        html_file.write_text(EURLEX_HTML.replace("oj-doc-ti", "oj-normal"), encoding="utf-8")
+
+        content = await extract_html_content(str(html_file))
+
+        assert content.metadata["document_title"] is None
+
+    async def test_missing_file(self, tmp_path):
+        """Un fichier absent retourne un statut d'erreur"""
+        content = await extract_html_content(str(tmp_path / "missing.html"))
+
+        assert content.status == "error"
+
+    def test_rendition_detection(self, tmp_path):
+        """Une page EUR-Lex sans texte d'acte n'est pas un rendu exploitable"""
+        act = tmp_path / "act.html"
+        act.write_text(EURLEX_HTML, encoding="utf-8")
+        error_page = tmp_path / "error.html"
+        error_page.write_text(
+            "<html><body><p>The requested document does not exist.</p></body></html>" * 50,
+            encoding="utf-8"
+        )
+
+        assert is_eurlex_html_rendition(str(act))
+        assert not is_eurlex_html_rendition(str(error_page))
+
+
+class TestFormatSelection:
+    """Tests de la politique de sélection du rendu EUR-Lex"""
+
+    def _doc(self):
+        doc = Mock()
+        doc.url = "https://eur-lex.europa.eu/legal-content/AUTO/?uri=CELEX:32023R0956"
+        doc.pdf_url = "https://eur-lex.europa.eu/legal-content/EN/TXT/PDF/?uri=CELEX:32023R0956"
+        doc.html_url = "https://eur-lex.europa.eu/legal-content/EN/TXT/HTML/?uri=CELEX:32023R0956"
+        return doc
+
+    def test_html_preferred_by_default(self):
+        """HTML d'abord, PDF en repli"""
+        doc = self._doc()
+
+        assert _eurlex_candidate_urls(doc) == [doc.html_url, doc.pdf_url]
+
+    def test_preference_from_settings(self):
+        """L'ordre suit settings.eurlex_format_preference"""
+        doc = self._doc()
+
+        with patch("src.config.settings.eurlex_format_preference", "pdf"):
+            assert _eurlex_candidate_urls(doc) == [doc.pdf_url]
+
+    def test_fallback_to_notice_url(self):
+        """Sans CELEX, seule la page de notice est disponible"""
+        doc = self._doc()
+        doc.pdf_url = None
+        doc.html_url = None
+
+        assert _eurlex_candidate_urls(doc) == [doc.url]
@@ -0,0 +1,99 @@
+"""Tests pour l'enregistrement et le rejeu des cassettes HTTP."""
+
+import time
+
+import httpx
+import pytest
+from scrapy.http import Request, HtmlResponse
+
+from src.utils.http_cassette import (
+    Cassette,
+    CassetteMiss,
+    CassetteTransport,
+    CassetteDownloaderMiddleware,
+)
+
+
+def _upstream(request: httpx.Request) -> httpx.Response:
+    """Faux serveur distant"""
+    return httpx.Response(
+        200,
+        headers={"content-type": "application/pdf", "etag": "abc"},
+        content=b"%PDF-1.7 " + request.url.path.encode(),
+    )
+
+
+class TestCassetteTransport:
+    """Tests du transport httpx"""
+
+    async def test_record_then_replay(self, tmp_path):
+        """Une réponse enregistrée est rejouée à l'identique, sans réseau"""
+        cassette = Cassette(str(tmp_path))
+        recorder = CassetteTransport(cassette, "record", transport=httpx.MockTransport(_upstream))
+
+        async with httpx.AsyncClient(transport=recorder) as client:
+            recorded = await client.get("https://eur-lex.europa.eu/doc.pdf")
+
+        assert list(tmp_path.glob("*.json.gz"))
+
+        player = CassetteTransport(cassette, "replay")
+        async with httpx.AsyncClient(transport=player) as client:
+            replayed = await client.get("https://eur-lex.europa.eu/doc.pdf")
+
+        assert replayed.status_code == recorded.status_code
+        assert replayed.content == recorded.content
+        assert replayed.headers["etag"] == "abc"
+
+    async def test_replay_miss(self, tmp_path):
+        """Une requête absente de la cassette lève CassetteMiss (httpx.TransportError)"""
+        player = CassetteTransport(Cassette(str(tmp_path)), "replay")
+
+        async with httpx.AsyncClient(transport=player) as client:
+            with pytest.raises(CassetteMiss):
+                await client.get("https://eur-lex.europa.eu/unknown.pdf")
+
+    async def test_methods_are_distinct(self, tmp_path):
+        """HEAD et GET sur la même URL sont enregistrés séparément"""
+        cassette = Cassette(str(tmp_path))
+        recorder = CassetteTransport(cassette, "record", transport=httpx.MockTransport(_upstream))
+
+        async with httpx.AsyncClient(transport=recorder) as client:
+            await client.head("https://eur-lex.europa.eu/doc.pdf")
+
+        assert cassette.load("HEAD", "https://eur-lex.europa.eu/doc.pdf") is not None
+        assert cassette.load("GET", "https://eur-lex.europa.eu/doc.pdf") is None
+
+    async def test_latency_injection(self, tmp_path):
+        """La latence configurée est appliquée en replay"""
+        cassette = Cassette(str(tmp_path))
+        cassette.save("GET", "https://example.org/a", [], b"", 200, [], b"ok")
+        player = CassetteTransport(cassette, "replay", latency_ms=50)
+
+        async with httpx.AsyncClient(transport=player) as client:
+            start = time.perf_counter()
+            await client.get("https://example.org/a")
+
+        assert time.perf_counter() - start >= 0.05
+
+
+class TestCassetteDownloaderMiddleware:
+    """Tests du middleware Scrapy"""
+
+    def test_record_then_replay(self, tmp_path):
+        """Le middleware enregistre puis rejoue une page de résultats"""
+        cassette = Cassette(str(tmp_path))
+        request = Request("https://eur-lex.europa.eu/search.html?text=CBAM")
+        response = HtmlResponse(
+            url=request.url,
+            status=200,
+            headers={"Content-Type": "text/html; charset=utf-8"},
+            body=b'<a id="cellar_1" href="/legal-content/EN/AUTO/?uri=CELEX:32023R0956">CBAM</a>',
+            request=request,
+        )
+
+        CassetteDownloaderMiddleware(cassette, "record").process_response(request, response)
+        replayed = CassetteDownloaderMiddleware(cassette, "replay").process_request(request)
+
+        assert isinstance(replayed, HtmlResponse)
+        assert replayed.body == response.body
+        assert replayed.css('a[id^="cellar_"]::attr(href)').get().endswith("32023R0956")
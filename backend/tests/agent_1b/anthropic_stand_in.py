@@ -0,0 +1,250 @@
+"""
+Stand-in local de l'API Anthropic Messages pour les tests de l'Agent 1B
+
+Sert POST /v1/messages sur 127.0.0.1 et renvoie une réponse au format de
+l'API, avec des champs usage qui imitent le cache de prompt :
+- le préfixe jusqu'à chaque bloc marqué "cache_control" est mémorisé
+- un préfixe déjà vu est compté en cache_read_input_tokens, la partie
+  nouvelle jusqu'au dernier point de cache en cache_creation_input_tokens,
+  le reste en input_tokens
+- les tokens sont estimés à 4 caractères par token
+
+Chaque appel /v1/messages peut durer `latency_ms` (tests de concurrence).
+
+Message Batches API : POST /v1/messages/batches crée un lot, GET
+/v1/messages/batches/{id} indique "in_progress" pendant `batch_polls`
+consultations puis "ended", et GET /v1/messages/batches/{id}/results renvoie
+les résultats en JSONL (dans l'ordre inverse des requêtes, l'API ne
+garantissant pas l'ordre). Les custom_id de `failing_custom_ids` reviennent
+en "errored".
+
+Les requêtes reçues sont conservées dans `requests` pour inspection.
+"""
+
+import hashlib
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4) if text else 0
+
+
+def content_blocks(request: Dict) -> List[Dict]:
+    """Blocs texte dans l'ordre de mise en cache (system puis messages)"""
+    blocks = []
+    system = request.get("system") or []
+    if isinstance(system, str):
+        system = [{"type": "text", "text": system}]
+    blocks.extend(system)
+
+    for message in request.get("messages", []):
+        content = message["content"]
+        if isinstance(content, str):
+            content = [{"type": "text", "text": content}]
+        blocks.extend(content)
+
+    return blocks
+
+
+class AnthropicStandIn:
+    """Serveur local imitant /v1/messages (et l'usage du cache de prompt)"""
+
+    def __init__(
+        self,
+        respond: Optional[Callable[[Dict], str]] = None,
+        min_cacheable_tokens: int = 0,
+        batch_polls: int = 1,
+        failing_custom_ids: Iterable[str] = (),
+        latency_ms: float = 0.0
+    ):
+        """
+        Args:
+            respond: Fonction (requête JSON) -> texte de la réponse
+            min_cacheable_tokens: Taille minimale d'un préfixe pour être mis en cache
+            batch_polls: Consultations d'un lot avant qu'il soit terminé
+            failing_custom_ids: Requêtes de lot renvoyées en erreur
+            latency_ms: Durée simulée de chaque appel /v1/messages
+        """
+        self.respond = respond or (lambda request: "{}")
+        self.min_cacheable_tokens = min_cacheable_tokens
+        self.batch_polls = batch_polls
+        self.failing_custom_ids = set(failing_custom_ids)
+        self.latency_ms = latency_ms
+        self.requests: List[Dict] = []
+        self.usages: List[Dict] = []
+        self.batches: Dict[str, Dict] = {}
+        self._batch_ids = itertools.count(1)
+        self._prefixes = set()
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "AnthropicStandIn":
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("content-length", 0))
+                self._reply(*stand_in.handle("POST", self.path.split("?")[0], json.loads(self.rfile.read(length))))
+            
+            def do_GET(self):
+                self._reply(*stand_in.handle("GET", self.path.split("?")[0], None))
+            
+            def _reply(self, status: int, content_type: str, payload: bytes):
+                self.send_response(status)
+                self.send_header("content-type", content_type)
+                self.send_header("content-length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def __enter__(self) -> "AnthropicStandIn":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def handle(self, method: str, path: str, request: Optional[Dict]) -> Tuple[int, str, bytes]:
+        """Réponse à une requête : (statut HTTP, content-type, corps)"""
+        parts = path.strip("/").split("/")
+        
+        if method == "POST" and path == "/v1/messages":
+            time.sleep(self.latency_ms / 1000)
+            return self._json(self.message_response(request))
+        if method == "POST" and path == "/v1/messages/batches":
+            return self._json(self.create_batch(request))
+        if method == "GET" and parts[:3] == ["v1", "messages", "batches"] and parts[3:4] and parts[3] in self.batches:
+            if parts[4:] == ["results"]:
+                return 200, "application/binary", self.batch_results(parts[3]).encode("utf-8")
+            if not parts[4:]:
+                return self._json(self.retrieve_batch(parts[3]))
+        
+        return 404, "application/json", json.dumps(
+            {"type": "error", "error": {"type": "not_found_error", "message": path}}
+        ).encode("utf-8")
+    
+    def _json(self, body: Dict) -> Tuple[int, str, bytes]:
+        return 200, "application/json", json.dumps(body).encode("utf-8")
+    
+    def create_batch(self, request: Dict) -> Dict:
+        batch_id = f"msgbatch_stand_in_{next(self._batch_ids)}"
+        self.batches[batch_id] = {"requests": request["requests"], "polls": 0, "results": None}
+        return self._batch_object(batch_id, ended=False)
+    
+    def retrieve_batch(self, batch_id: str) -> Dict:
+        batch = self.batches[batch_id]
+        batch["polls"] += 1
+        ended = batch["polls"] > self.batch_polls
+        
+        if ended and batch["results"] is None:
+            # Traitement au moment où le lot se termine (et une seule fois)
+            batch["results"] = [self._batch_result(item) for item in reversed(batch["requests"])]
+        
+        return self._batch_object(batch_id, ended)
+    
+    def batch_results(self, batch_id: str) -> str:
+        return "".join(json.dumps(result) + "\n" for result in self.batches[batch_id]["results"])
+    
+    def _batch_result(self, item: Dict) -> Dict:
+        custom_id = item["custom_id"]
+        if custom_id in self.failing_custom_ids:
+            result = {"type": "errored", "error": {"type": "error", "error": {
+                "type": "invalid_request_error", "message": "stand-in failure"
+            }}}
+        else:
+            result = {"type": "succeeded", "message": self.message_response(item["params"], f"msg_{custom_id}")}
+        return {"custom_id": custom_id, "result": result}
+    
+    def _batch_object(self, batch_id: str, ended: bool) -> Dict:
+        batch = self.batches[batch_id]
+        counts = {"processing": 0, "succeeded": 0, "errored": 0, "canceled": 0, "expired": 0}
+        if ended:
+            for result in batch["results"]:
+                counts[result["result"]["type"]] += 1
+        else:
+            counts["processing"] = len(batch["requests"])
+        
+        return {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": counts,
+            "created_at": "2026-01-01T00:00:00Z",
+            "expires_at": "2026-01-02T00:00:00Z",
+            "ended_at": "2026-01-01T01:00:00Z" if ended else None,
+            "archived_at": None,
+            "cancel_initiated_at": None,
+            "results_url": f"{self.base_url}/v1/messages/batches/{batch_id}/results" if ended else None,
+        }
+
+    def message_response(self, request: Dict, message_id: str = "msg_stand_in") -> Dict:
+        """Message de réponse au format de l'API, avec usage du cache de prompt"""
+        usage = self.usage_for(request)
+        with self._lock:
+            self.requests.append(request)
+            self.usages.append(usage)
+
+        return {
+            "id": message_id,
+            "type": "message",
+            "role": "assistant",
+            "model": request.get("model"),
+            "content": [{"type": "text", "text": self.respond(request)}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": usage,
+        }
+
+    def usage_for(self, request: Dict) -> Dict:
+        blocks = content_blocks(request)
+        tokens = [estimate_tokens(block.get("text", "")) for block in blocks]
+        breakpoints = [i for i, block in enumerate(blocks) if block.get("cache_control")]
+
+        read = creation = 0
+        with self._lock:
+            # Plus long préfixe déjà en cache
+            cached_until = -1
+            for index in reversed(breakpoints):
+                if self._prefix_key(blocks, index) in self._prefixes:
+                    cached_until = index
+                    break
+            read = sum(tokens[:cached_until + 1])
+
+            # Nouveaux préfixes écrits en cache (jusqu'au dernier point)
+            for index in breakpoints:
+                if index > cached_until and sum(tokens[:index + 1]) >= self.min_cacheable_tokens:
+                    self._prefixes.add(self._prefix_key(blocks, index))
+                    creation = sum(tokens[cached_until + 1:index + 1])
+
+        return {
+            "input_tokens": sum(tokens) - read - creation,
+            "output_tokens": 200,
+            "cache_read_input_tokens": read,
+            "cache_creation_input_tokens": creation,
+        }
+
+    def _prefix_key(self, blocks: List[Dict], index: int) -> str:
+        prefix = [block.get("text", "") for block in blocks[:index + 1]]
+        return hashlib.sha256(json.dumps(prefix).encode("utf-8")).hexdigest()
@@ -0,0 +1,124 @@
+"""Tests pour l'analyse concurrente d'un lot de documents (Agent 1B)."""
+
+import asyncio
+
+import httpx
+from anthropic import RateLimitError
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+
+from src.agent_1b.agent import Agent1B
+from src.agent_1b.batch import BatchAnalyzer
+from src.agent_1b.models import SemanticAnalysisResult
+from src.agent_1b.tools.semantic_analyzer import SemanticAnalyzer
+
+PROFILE = {
+    "company_id": "acme",
+    "company_name": "ACME",
+    "keywords": ["cbam", "rubber"],
+    "nc_codes": ["4016.93"],
+}
+
+RESULT = SemanticAnalysisResult(
+    score=0.8,
+    is_applicable=True,
+    explanation="Le règlement impose une déclaration CBAM pour les importations concernées.",
+    regulation_summary="Déclaration trimestrielle des émissions intégrées.",
+    impact_explanation="Les joints en caoutchouc importés relèvent du code NC 4016.93 déclaré.",
+    confidence_level=0.9
+)
+
+# Réponse brute du LLM (JSON du résultat + consommation de tokens)
+RESPONSE = AIMessage(
+    content=RESULT.model_dump_json(),
+    usage_metadata={"input_tokens": 9000, "output_tokens": 400, "total_tokens": 9400}
+)
+
+
+def rate_limit_error(retry_after: str) -> RateLimitError:
+    request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+    response = httpx.Response(429, headers={"retry-after": retry_after}, request=request)
+    return RateLimitError("rate limited", response=response, body=None)
+
+
+def make_agent(fake_llm) -> Agent1B:
+    """Agent 1B dont la chaîne LLM est remplacée par une coroutine locale"""
+    analyzer = SemanticAnalyzer()
+    analyzer.chain = RunnableLambda(lambda inputs: RESPONSE, afunc=fake_llm)
+    return Agent1B(PROFILE, semantic_analyzer=analyzer)
+
+
+def documents(count: int) -> list:
+    return [
+        {
+            "document_id": f"doc-{i:04d}",
+            "document_content": "CBAM applies to rubber goods under CN 4016.93.",
+            "document_title": f"Document {i}",
+            "regulation_type": "CBAM",
+        }
+        for i in range(count)
+    ]
+
+
+class TestBatchAnalyzer:
+    """Tests du lot concurrent"""
+
+    async def test_bounded_concurrency(self):
+        """Jamais plus de `concurrency` appels LLM simultanés"""
+        in_flight = 0
+        peak = 0
+
+        async def fake_llm(inputs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return RESPONSE
+
+        saved = []
+        stats = await BatchAnalyzer(make_agent(fake_llm), concurrency=3).run(
+            documents(10), on_analysis=lambda doc, analysis: saved.append(analysis.document_id)
+        )
+
+        assert peak == 3
+        assert stats["analyzed"] == 10
+        assert sorted(saved) == [f"doc-{i:04d}" for i in range(10)]
+
+    async def test_error_isolation(self):
+        """Un document en échec n'empêche pas les autres d'être sauvegardés"""
+        async def fake_llm(inputs):
+            return RESPONSE
+
+        def save(doc, analysis):
+            if doc["document_id"] == "doc-0002":
+                raise RuntimeError("database locked")
+
+        failed = []
+        stats = await BatchAnalyzer(make_agent(fake_llm), concurrency=2).run(
+            documents(5), on_analysis=save, on_error=lambda doc, error: failed.append(doc["document_id"])
+        )
+
+        assert stats["analyzed"] == 4
+        assert failed == ["doc-0002"]
+        assert stats["errors"] == [{"document_id": "doc-0002", "error": "database locked"}]
+
+    async def test_rate_limit_pauses_and_retries(self):
+        """Un 429 met en pause les appels puis l'analyse est réessayée"""
+        calls = 0
+
+        async def fake_llm(inputs):
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                raise rate_limit_error("0.05")
+            return RESPONSE
+
+        saved = []
+        stats = await BatchAnalyzer(make_agent(fake_llm), concurrency=2).run(
+            documents(3), on_analysis=lambda doc, analysis: saved.append(analysis)
+        )
+
+        assert stats["rate_limit_pauses"] == 1
+        assert calls == 4
+        assert all(analysis.semantic_analysis.score == 0.8 for analysis in saved)
@@ -0,0 +1,125 @@
+"""Tests de la calibration des poids et seuils du scorer."""
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.agent_1b.calibration import (
+    CalibrationData,
+    calibrate,
+    evaluate_thresholds,
+    labels_from_ground_truth,
+    load_calibration_data,
+    settings_block,
+    threshold_grid,
+    weight_grid,
+)
+from src.agent_1b.rescoring import score_arrays
+from src.agent_1b.tools.relevance_scorer import RelevanceScorer
+from src.storage.models import Analysis, Base, CompanyProfile, Document, DocumentProfileAnalysis, GroundTruthCase
+
+TARGET = RelevanceScorer(0.2, 0.2, 0.6, {"critical": 0.75, "high": 0.55, "medium": 0.35, "low": 0.15})
+
+
+def synthetic_data(size: int = 400) -> CalibrationData:
+    """Étiquettes produites par une configuration connue (TARGET)"""
+    rng = np.random.default_rng(3)
+    scores = np.column_stack([rng.random(size), rng.random(size), rng.random(size)]).round(2)
+    critical = rng.random(size) < 0.1
+    applicable = rng.random(size) < 0.5
+    truth = score_arrays(scores[:, 0], scores[:, 1], scores[:, 2], critical, applicable, TARGET)
+    return CalibrationData(
+        scores=scores,
+        has_critical_codes=critical,
+        semantic_applicable=applicable,
+        relevant=truth["is_relevant"].astype(np.int8),
+        criticality=truth["criticality"].astype(np.int8)
+    )
+
+
+def test_grids():
+    weights = weight_grid(0.1)
+    thresholds = threshold_grid(0.1)
+
+    assert len(weights) == 66 and np.allclose(weights.sum(axis=1), 1)
+    assert len(thresholds) == 210 and (np.diff(thresholds, axis=1) > 0).all()
+
+
+def test_evaluation_matches_scorer():
+    """Configuration cible : F1 de 1, comme le scorer ligne à ligne"""
+    data = synthetic_data()
+    metrics = evaluate_thresholds(data, np.array([0.2, 0.2, 0.6]), np.array([[0.15, 0.35, 0.55, 0.75], [0.3, 0.5, 0.7, 0.9]]))
+
+    assert metrics["relevance_f1"][0] == 1.0 and metrics["criticality_f1"][0] == 1.0
+
+    # Autre configuration : mêmes criticités que le scorer vectorisé du re-scoring
+    scorer = RelevanceScorer(0.2, 0.2, 0.6, {"critical": 0.9, "high": 0.7, "medium": 0.5, "low": 0.3})
+    predicted = score_arrays(
+        data.scores[:, 0], data.scores[:, 1], data.scores[:, 2], data.has_critical_codes, data.semantic_applicable, scorer
+    )
+    assert metrics["criticality_accuracy"][1] == pytest.approx((predicted["criticality"] == data.criticality).mean())
+    assert metrics["criticality_accuracy"][1] < 1.0
+    tp = (predicted["is_relevant"] & (data.relevant == 1)).sum()
+    assert metrics["relevance_f1"][1] == pytest.approx(2 * tp / (predicted["is_relevant"].sum() + (data.relevant == 1).sum()))
+
+
+def test_calibrate_recovers_target():
+    data = synthetic_data()
+    report = calibrate(data, weights=weight_grid(0.1), thresholds=threshold_grid(0.1, minimum=0.05), top=3)
+
+    assert report["configurations"] == 66 * 210
+    assert report["best"]["objective"] >= report["baseline"]["objective"]
+    assert report["best"]["weights"] == [0.2, 0.2, 0.6]
+    assert report["best"]["thresholds"] == [0.15, 0.35, 0.55, 0.75]
+    assert report["best"]["metrics"]["criticality"]["HIGH"]["recall"] == 1.0
+    assert "LLM_SEMANTIC_WEIGHT=0.6" in settings_block(report["best"]["weights"], report["best"]["thresholds"])
+
+
+def test_ground_truth_labels():
+    assert labels_from_ground_truth("OUI", "Fort") == (1, 3)
+    assert labels_from_ground_truth("PARTIELLEMENT", "Faible") == (1, 1)
+    assert labels_from_ground_truth("NON", "Critique") == (0, 0)
+    assert labels_from_ground_truth("?", None) == (-1, -1)
+
+
+@pytest.mark.database
+@pytest.mark.filterwarnings("ignore:datetime.datetime.utcnow:DeprecationWarning")
+def test_load_calibration_data():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(CompanyProfile(id="acme", company_name="ACME", headquarters_country="FR"))
+    for index in range(3):
+        document_id = f"doc-{index}"
+        session.add(Document(id=document_id, title="Doc", source_url="http://x", event_type="reglementaire",
+                             hash_sha256=str(index) * 64))
+        session.add(DocumentProfileAnalysis(
+            document_id=document_id, company_profile_id="acme", status="analyzed", attempts=1,
+            keyword_score=0.1 * index, nc_code_score=0.2, semantic_score=0.8,
+            semantic_applicable=True, has_critical_codes=False, semantic_decision="called"
+        ))
+    # LLM non appelé : score sémantique de remplacement, écarté
+    session.add(Document(id="doc-3", title="Doc", source_url="http://x", event_type="reglementaire",
+                         hash_sha256="3" * 64))
+    session.add(DocumentProfileAnalysis(
+        document_id="doc-3", company_profile_id="acme", status="analyzed", attempts=1,
+        keyword_score=0.9, nc_code_score=0.9, semantic_score=0.0,
+        semantic_applicable=False, has_critical_codes=True, semantic_decision="skipped"
+    ))
+    session.add(GroundTruthCase(
+        document_id="doc-0", expert_pertinence_decision="OUI", expert_pertinence_reasoning="-",
+        expert_risk_level="Moyen", expert_recommendations="-", expert_name="Expert"
+    ))
+    for index, status in enumerate(["rejected", "rejected", "pending"]):
+        session.add(Analysis(document_id=f"doc-{index}", validation_status=status))
+    session.commit()
+
+    data = load_calibration_data(session, "acme")
+
+    assert data.document_ids == ["doc-0", "doc-1", "doc-2"]
+    # Le cas de référence prime sur la validation
+    assert data.relevant.tolist() == [1, 0, -1]
+    assert data.criticality.tolist() == [2, -1, -1]
+    assert data.scores[2].tolist() == [0.2, 0.2, 0.8]
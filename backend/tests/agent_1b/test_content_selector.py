@@ -0,0 +1,82 @@
+"""Tests de la sélection des passages pertinents d'un document long."""
+
+import pytest
+
+from src.agent_1b.tools.content_selector import (
+    bm25_scores,
+    build_query,
+    select_passages,
+    split_sections,
+    tokenize,
+)
+from src.agent_1b.tools.semantic_analyzer import SemanticAnalyzer
+from src.config import settings
+
+FILLER = "The Commission should be empowered to adopt delegated acts in accordance with the Treaty. "
+
+
+def long_regulation() -> str:
+    recitals = "".join(f"({i}) {FILLER * 3}\n" for i in range(1, 80))
+    articles = [f"Article {i}\n{FILLER * 4}\n" for i in range(1, 41)]
+    articles[20] = "Article 21\nThis Regulation applies to gaskets of vulcanised rubber, CN code 4016 93 00.\n"
+    return "REGULATION (EU) 2026/1\n" + recitals + "".join(articles) + "ANNEX I\nCN 7208 10 00\n"
+
+
+class TestContentSelector:
+    """Découpage, classement BM25 et sélection dans un budget"""
+
+    def test_nc_code_spellings_match(self):
+        """Les graphies d'un code NC partagent leurs termes"""
+        assert "401693" in tokenize("CN code 4016 93 00")
+        assert "401693" in tokenize("4016.93")
+        assert tokenize("Étanchéité") == ["etancheite"]
+
+    def test_sections_cover_text(self):
+        """Les sections couvrent tout le texte, sans trou ni chevauchement"""
+        text = long_regulation()
+        spans = split_sections(text, max_chars=1500)
+
+        assert spans[0][0] == 0 and spans[-1][1] == len(text)
+        assert all(end == next_start for (_, end), (next_start, _) in zip(spans, spans[1:]))
+        assert all(end - start <= 1500 for start, end in spans)
+
+    def test_bm25_ranks_matching_section_first(self):
+        query = build_query(keywords=["rubber"], nc_codes=["4016.93"])
+        scores = bm25_scores([tokenize(FILLER), tokenize("rubber gaskets 4016 93"), tokenize("steel")], query)
+
+        assert scores[1] > scores[0] == scores[2] == 0.0
+
+    def test_middle_article_kept_in_order(self):
+        """L'article central du profil est retenu ; ordre du document et budget respectés"""
+        text = long_regulation()
+        query = build_query(keywords=["rubber"], nc_codes=["4016.93"])
+
+        excerpt = select_passages(text, query, max_chars=4000)
+
+        assert len(excerpt) <= 4000
+        assert "CN code 4016 93 00" in excerpt
+        assert excerpt.startswith("REGULATION (EU) 2026/1")
+        assert "caractères omis" in excerpt
+        assert excerpt.index("REGULATION") < excerpt.index("Article 21")
+
+    def test_short_content_unchanged(self):
+        assert select_passages("Short text", {"text": 1.0}, max_chars=100) == "Short text"
+
+
+# Le SDK anthropic signale les modèles en fin de vie (DeprecationWarning)
+@pytest.mark.filterwarnings("ignore:The model:DeprecationWarning")
+def test_analyzer_strategy_setting(monkeypatch):
+    """SEMANTIC_CONTENT_SELECTION=head_tail conserve la troncature début/fin"""
+    analyzer = SemanticAnalyzer()
+    profile = {"keywords": ["rubber"], "nc_codes": ["4016.93"]}
+    text = long_regulation()
+
+    monkeypatch.setattr(settings, "semantic_content_budget_tokens", 1000)
+    ranked = analyzer.build_inputs(text, "Doc", "CBAM", profile)["document_content"]
+
+    monkeypatch.setattr(settings, "semantic_content_selection", "head_tail")
+    head_tail = analyzer.build_inputs(text, "Doc", "CBAM", profile)["document_content"]
+
+    assert "4016 93 00" in ranked
+    assert "4016 93 00" not in head_tail
+    assert "[...CONTENU TRONQUÉ...]" in head_tail
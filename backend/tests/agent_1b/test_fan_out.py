@@ -0,0 +1,161 @@
+"""Tests de l'analyse multi-profils (un document, une analyse par profil)."""
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.agent_1b.agent import Agent1B
+from src.agent_1b.fan_out import FanOutAnalyzer, ProfileMatchers
+from src.agent_1b.models import SemanticAnalysisResult
+from src.agent_1b.tools.keyword_filter import KeywordAutomaton
+from src.agent_1b.tools.semantic_analyzer import SemanticAnalyzer
+from src.storage.document_profile_repository import DocumentProfileRepository
+from src.storage.models import Base, CompanyProfile, Document
+
+PROFILES = {
+    "acme": {"company_id": "acme", "company_name": "ACME", "keywords": ["cbam", "rubber"], "nc_codes": ["4016.93"]},
+    "steel": {"company_id": "steel", "company_name": "Steel", "keywords": ["cbam", "steel"], "nc_codes": ["7208"]},
+    "wood": {"company_id": "wood", "company_name": "Wood", "keywords": ["deforestation"], "nc_codes": ["4403"]},
+}
+
+RESPONSE = AIMessage(
+    content=SemanticAnalysisResult(
+        score=0.7,
+        is_applicable=True,
+        explanation="Le règlement impose une déclaration pour les importations concernées.",
+        regulation_summary="Déclaration trimestrielle des émissions intégrées.",
+        impact_explanation="Les produits importés relèvent des codes NC déclarés par l'entreprise.",
+        confidence_level=0.9
+    ).model_dump_json(),
+    usage_metadata={"input_tokens": 1000, "output_tokens": 100, "total_tokens": 1100}
+)
+
+DOCUMENTS = [
+    {
+        "document_id": "doc-1",
+        "document_content": "CBAM applies to rubber goods under CN 4016.93 and steel under 7208.10.",
+        "document_title": "CBAM",
+        "regulation_type": "CBAM",
+    },
+    {
+        "document_id": "doc-2",
+        "document_content": "The deforestation regulation covers wood under CN 4403.",
+        "document_title": "EUDR",
+        "regulation_type": "EUDR",
+    },
+]
+
+
+def make_agents(llm_calls: list) -> dict:
+    """Agents 1B partageant un analyseur dont la chaîne LLM est locale"""
+    async def fake_llm(inputs):
+        llm_calls.append(inputs["company_name"])
+        return RESPONSE
+
+    analyzer = SemanticAnalyzer()
+    analyzer.chain = RunnableLambda(lambda inputs: RESPONSE, afunc=fake_llm)
+    return {profile_id: Agent1B(profile, semantic_analyzer=analyzer) for profile_id, profile in PROFILES.items()}
+
+
+def test_scan_matches_per_profile_filters():
+    """Un balayage partagé donne les mêmes niveaux 1-2 que chaque agent seul"""
+    agents = make_agents([])
+    matchers = ProfileMatchers(agents)
+
+    for document in DOCUMENTS:
+        scans = matchers.scan(document["document_content"])
+        for profile_id, agent in agents.items():
+            keyword_result, nc_code_result = agent._analyze_local_levels(document["document_content"])
+            assert scans[profile_id][0] == keyword_result
+            assert scans[profile_id][1] == nc_code_result
+
+
+class TestFanOutAnalyzer:
+    """Niveaux 1-2 une fois par document, niveau 3 par profil"""
+
+    async def test_one_scan_per_document(self, monkeypatch):
+        scans = []
+        find_all = KeywordAutomaton.find_all
+        monkeypatch.setattr(KeywordAutomaton, "find_all", lambda self, text: scans.append(text) or find_all(self, text))
+
+        llm_calls = []
+        analyses = {}
+        stats = await FanOutAnalyzer(make_agents(llm_calls), concurrency=4).run(
+            DOCUMENTS,
+            on_analysis=lambda document, profile_id, analysis: analyses.update(
+                {(document["document_id"], profile_id): analysis}
+            )
+        )
+
+        assert len(scans) == len(DOCUMENTS)
+        assert stats["pairs"] == stats["analyzed"] == 6 and stats["errors"] == []
+        assert all(analysis.company_profile_id == profile_id for (_, profile_id), analysis in analyses.items())
+        # Appel LLM par profil, sauf quand la cascade l'écarte (aucune correspondance)
+        assert {"ACME", "Steel"} <= set(llm_calls) <= {"ACME", "Steel", "Wood"}
+        assert analyses[("doc-1", "steel")].keyword_analysis.keywords_found == ["cbam", "steel"]
+        assert analyses[("doc-2", "acme")].keyword_analysis.keywords_found == []
+
+    async def test_pending_profiles_only(self):
+        """Seuls les profils encore en attente du document sont analysés"""
+        analyzed = []
+        await FanOutAnalyzer(make_agents([])).run(
+            [{**DOCUMENTS[0], "profile_ids": ["steel"]}, {**DOCUMENTS[1], "profile_ids": ["wood", "unknown"]}],
+            on_analysis=lambda document, profile_id, analysis: analyzed.append((document["document_id"], profile_id))
+        )
+
+        assert sorted(analyzed) == [("doc-1", "steel"), ("doc-2", "wood")]
+
+    async def test_failure_isolated_to_profile(self):
+        agents = make_agents([])
+
+        async def failing(*args, **kwargs):
+            raise RuntimeError("LLM indisponible")
+
+        agents["wood"].aanalyze_document = failing
+        failed = []
+
+        stats = await FanOutAnalyzer(agents).run(
+            DOCUMENTS,
+            on_analysis=lambda *args: None,
+            on_error=lambda document, profile_id, error: failed.append((document["document_id"], profile_id))
+        )
+
+        assert sorted(failed) == [("doc-1", "wood"), ("doc-2", "wood")]
+        assert stats["analyzed"] == 4
+
+
+@pytest.mark.database
+@pytest.mark.filterwarnings("ignore:datetime.datetime.utcnow:DeprecationWarning")
+def test_pending_pairs():
+    """Un profil ajouté après la collecte voit les documents déjà collectés"""
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+
+    for profile_id in ("acme", "steel"):
+        session.add(CompanyProfile(id=profile_id, company_name=profile_id, headquarters_country="FR"))
+    for index in (1, 2):
+        session.add(Document(id=f"doc-{index}", title="Doc", source_url="http://x", event_type="reglementaire",
+                             hash_sha256=str(index) * 64))
+    session.commit()
+
+    states = DocumentProfileRepository(session)
+    agents = make_agents([])
+    analysis = agents["acme"].analyze_document_with_semantic(
+        "doc-1", DOCUMENTS[0]["document_content"], "CBAM", "CBAM",
+        SemanticAnalysisResult.model_validate_json(RESPONSE.content)
+    )
+    states.mark_analyzed("doc-1", "acme", analysis)
+    states.mark_error("doc-2", "acme", "timeout")
+    states.backfill("steel", ["doc-1"])
+    session.commit()
+
+    assert states.pending(["acme", "steel"]) == {"doc-2": ["acme", "steel"]}
+    assert states.pending(["acme", "steel", "wood"]) == {"doc-1": ["wood"], "doc-2": ["acme", "steel", "wood"]}
+    assert states.pending(["wood"], limit=1) == {"doc-1": ["wood"]}
+
+    [state] = [s for s in states.find_by_document("doc-1") if s.company_profile_id == "acme"]
+    assert state.status == "analyzed" and state.relevance_score == analysis.relevance_score.final_score
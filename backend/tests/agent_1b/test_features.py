@@ -0,0 +1,141 @@
+"""Tests des caractéristiques de documents calculées à la collecte."""
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.agent_1b.agent import Agent1B
+from src.agent_1b.fan_out import FanOutAnalyzer, ProfileMatchers
+from src.agent_1b.features import FEATURES_VERSION, covers, extend_features, featurize, is_current
+from src.agent_1b.models import SemanticAnalysisResult
+from src.agent_1b.tools.keyword_filter import KeywordAutomaton
+from src.agent_1b.tools.semantic_analyzer import SemanticAnalyzer
+from src.config import settings
+from src.storage.document_feature_repository import DocumentFeatureRepository
+from src.storage.models import Base, Document
+
+PROFILES = {
+    "acme": {"company_id": "acme", "company_name": "ACME", "keywords": ["cbam", "rubber"], "nc_codes": ["4016.93"]},
+    "steel": {"company_id": "steel", "company_name": "Steel", "keywords": ["cbam", "steel"], "nc_codes": ["7208"]},
+    "wood": {"company_id": "wood", "company_name": "Wood", "keywords": ["deforestation"], "nc_codes": ["4403"]},
+}
+
+RESPONSE = AIMessage(
+    content=SemanticAnalysisResult(
+        score=0.7,
+        is_applicable=True,
+        explanation="Le règlement impose une déclaration pour les importations concernées.",
+        regulation_summary="Déclaration trimestrielle des émissions intégrées.",
+        impact_explanation="Les produits importés relèvent des codes NC déclarés par l'entreprise.",
+        confidence_level=0.9
+    ).model_dump_json()
+)
+
+TEXTS = {
+    "doc-1": "CBAM applies to rubber goods under CN 4016.93 and steel under 7208.10. CBAM reporting is quarterly.",
+    "doc-2": "The deforestation regulation covers wood under CN 4403.",
+}
+
+
+def make_agents() -> dict:
+    analyzer = SemanticAnalyzer()
+    analyzer.chain = RunnableLambda(lambda inputs: RESPONSE)
+    return {profile_id: Agent1B(profile, semantic_analyzer=analyzer) for profile_id, profile in PROFILES.items()}
+
+
+def test_features_match_text_scan():
+    """Niveaux 1-2 lus dans les caractéristiques = niveaux 1-2 calculés sur le texte"""
+    agents = make_agents()
+    matchers = ProfileMatchers(agents)
+    indexes = [agent.profile_index for agent in agents.values()]
+
+    for text in TEXTS.values():
+        features = featurize(text, indexes)
+        assert matchers.scan_features(features) == matchers.scan(text)
+
+    features = featurize(TEXTS["doc-1"], indexes)
+    assert features.keyword_hits["cbam"].count == 2
+    assert set(features.nc_codes) >= {"4016.93", "7208.10"}
+    assert features.token_stats["words"] == len(TEXTS["doc-1"].split())
+
+
+def test_extend_features_for_new_profile():
+    agents = make_agents()
+    features = featurize(TEXTS["doc-2"], [agents["acme"].profile_index], content_hash="h1")
+
+    assert not covers(features, agents["wood"].profile_index)
+    assert "deforestation" not in features.keyword_hits
+
+    extend_features(features, TEXTS["doc-2"], [agents["wood"].profile_index])
+
+    assert covers(features, agents["wood"].profile_index)
+    assert features.keyword_hits["deforestation"].count == 1
+    assert is_current(features, "h1") and not is_current(features, "h2")
+
+
+async def test_fan_out_loads_text_only_for_llm(monkeypatch):
+    """Caractéristiques couvrant les profils : aucun balayage, texte lu pour le LLM seulement"""
+    monkeypatch.setattr(settings, "semantic_cascade_mode", "gate")
+    agents = make_agents()
+    indexes = [agent.profile_index for agent in agents.values()]
+    features = {document_id: featurize(text, indexes) for document_id, text in TEXTS.items()}
+
+    scans = []
+    monkeypatch.setattr(KeywordAutomaton, "find_all", lambda self, text: scans.append(text) or {})
+    loads = []
+    analyses = {}
+
+    def load(document_id):
+        loads.append(document_id)
+        return TEXTS[document_id]
+
+    stats = await FanOutAnalyzer(agents).run(
+        [
+            {
+                "document_id": document_id,
+                "document_content": None,
+                "load_content": lambda document_id=document_id: load(document_id),
+                "features": features[document_id],
+                "profile_ids": profile_ids,
+            }
+            for document_id, profile_ids in (("doc-1", ["acme", "steel", "wood"]), ("doc-2", ["acme", "steel"]))
+        ],
+        on_analysis=lambda document, profile_id, analysis: analyses.update(
+            {(document["document_id"], profile_id): analysis}
+        )
+    )
+
+    assert stats["analyzed"] == 5
+    assert scans == []
+    # doc-1 lu une fois pour ses deux appels LLM ; doc-2 sans correspondance : différé, jamais lu
+    assert loads == ["doc-1"]
+    assert analyses[("doc-1", "acme")].keyword_analysis.occurrences == {"cbam": 2, "rubber": 1}
+    assert analyses[("doc-2", "steel")].semantic_decision == "deferred"
+
+
+@pytest.mark.database
+@pytest.mark.filterwarnings("ignore:datetime.datetime.utcnow:DeprecationWarning")
+def test_repository_roundtrip():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(Document(id="doc-1", title="Doc", source_url="http://x", event_type="reglementaire",
+                         hash_sha256="a" * 64))
+    session.commit()
+
+    repository = DocumentFeatureRepository(session)
+    features = featurize(
+        TEXTS["doc-1"],
+        [make_agents()["acme"].profile_index],
+        nc_occurrences=[{"code": "4016.93", "context": "rubber goods", "page": 3, "confidence": 1.0}],
+        content_hash="a" * 64
+    )
+    repository.save("doc-1", features)
+    session.commit()
+
+    assert repository.get_many(["doc-1", "doc-2"]) == {"doc-1": features}
+    assert features.version == FEATURES_VERSION
+    assert repository.get_many(["doc-1"])["doc-1"].nc_occurrences[0]["page"] == 3
@@ -0,0 +1,57 @@
+"""Tests pour le filtre mots-clés (Niveau 1) de l'Agent 1B."""
+
+from src.agent_1b.tools.keyword_filter import KeywordFilter, analyze_keywords
+
+
+class TestKeywordFilter:
+    """Tests de l'automate de mots-clés"""
+
+    def test_word_boundary(self):
+        """Un mot-clé ne correspond pas à l'intérieur d'un autre mot"""
+        text = "Suppliers report jointly; the joint declaration is due."
+
+        result = KeywordFilter(["joint"], word_boundary=True).analyze(text)
+        assert result.occurrences == {"joint": 1}
+        assert "joint declaration" in result.context_snippets["joint"]
+
+        # Ancien comportement (sous-chaîne) toujours disponible
+        result = KeywordFilter(["joint"], word_boundary=False).analyze(text)
+        assert result.occurrences == {"joint": 2}
+
+    def test_accent_folding(self):
+        """Accents et casse sont ignorés, le contexte reste le texte original"""
+        text = "Exigences d'ÉTANCHÉITÉ des joints"
+
+        result = KeywordFilter(["etancheite"], accent_folding=True).analyze(text)
+        assert result.keywords_found == ["etancheite"]
+        assert "ÉTANCHÉITÉ" in result.context_snippets["etancheite"]
+
+        result = KeywordFilter(["etancheite"], accent_folding=False).analyze(text)
+        assert result.keywords_found == []
+
+    def test_nested_and_repeated_keywords(self):
+        """Mots-clés imbriqués comptés chacun, toutes les occurrences comptées"""
+        text = "Carbon border adjustment: carbon border measures and carbon pricing."
+
+        result = KeywordFilter(["carbon", "carbon border", "pricing", "steel"]).analyze(text)
+
+        assert result.keywords_found == ["carbon", "carbon border", "pricing"]
+        assert result.occurrences == {"carbon": 3, "carbon border": 2, "pricing": 1}
+        assert result.total_keywords_searched == 4
+        assert result.keyword_density == 0.75
+        assert result.score == 1.0
+
+    def test_offsets_with_length_changing_characters(self):
+        """Les positions restent justes quand la normalisation allonge le texte"""
+        text = "İİİ " + "x" * 200 + " rubber seals"
+
+        result = KeywordFilter(["rubber"]).analyze(text)
+
+        assert result.context_snippets["rubber"].endswith("rubber seals")
+
+    def test_empty_profile(self):
+        """Un profil sans mots-clés donne un score nul"""
+        result = analyze_keywords("CBAM regulation", [])
+
+        assert result.score == 0.0
+        assert result.keywords_found == []
@@ -0,0 +1,161 @@
+"""Tests de la comptabilité des appels LLM (tokens, latence, coût par run)."""
+
+import anthropic
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from anthropic_stand_in import AnthropicStandIn
+from src.agent_1b.models import SemanticAnalysisResult
+from src.agent_1b.tools.semantic_analyzer import SemanticAnalyzer
+from src.config import settings
+from src.storage.llm_usage_repository import LLMUsageRepository
+from src.storage.models import Base, Document, DocumentProfileAnalysis
+from src.utils.llm_usage import (
+    create_message,
+    estimate_cost_usd,
+    llm_context,
+    new_run_id,
+    persist_run,
+    start_run,
+    tracker,
+)
+
+PROFILE = {"company_name": "ACME", "nc_codes": ["4016.93"], "regulations": ["CBAM"]}
+
+RESULT = SemanticAnalysisResult(
+    score=0.8,
+    is_applicable=True,
+    explanation="Le règlement impose une déclaration CBAM pour les importations concernées.",
+    regulation_summary="Déclaration trimestrielle des émissions intégrées.",
+    confidence_level=0.9
+)
+
+
+@pytest.fixture
+def stand_in(monkeypatch):
+    with AnthropicStandIn(respond=lambda request: RESULT.model_dump_json()) as server:
+        monkeypatch.setattr(settings, "anthropic_base_url", server.base_url)
+        monkeypatch.setattr(settings, "anthropic_api_key", "sk-ant-test")
+        yield server
+
+
+@pytest.fixture
+def session_factory():
+    """Base SQLite en mémoire partagée par toutes les sessions"""
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+
+def test_cost_counts_cache_and_batch():
+    usage = {"input_tokens": 1_000_000, "output_tokens": 0, "cache_read_input_tokens": 1_000_000,
+             "cache_creation_input_tokens": 0}
+
+    assert estimate_cost_usd("claude-sonnet-4-5-20250929", usage) == pytest.approx(0.3)
+    assert estimate_cost_usd("claude-sonnet-4-5-20250929", usage, batch=True) == pytest.approx(0.15)
+    assert estimate_cost_usd("unknown-model", usage) == 0.0
+
+
+# Le SDK anthropic signale les modèles en fin de vie (DeprecationWarning)
+@pytest.mark.filterwarnings("ignore:The model:DeprecationWarning")
+class TestCallRecording:
+    """Appels enregistrés avec les étiquettes du contexte"""
+
+    def test_semantic_call_tagged(self, stand_in):
+        run_id = new_run_id("test")
+        with llm_context(run_id=run_id, document_id="doc-1"):
+            SemanticAnalyzer().analyze("CBAM text. " * 40, "Doc", "CBAM", PROFILE)
+            SemanticAnalyzer().analyze("Other CBAM text. " * 40, "Doc 2", "CBAM", PROFILE)
+
+        first, second = tracker.pop_run(run_id)
+
+        assert (first.agent, first.stage, first.document_id) == ("agent_1b", "semantic", "doc-1")
+        assert first.input_tokens == sum(
+            stand_in.usages[0][key]
+            for key in ("input_tokens", "cache_read_input_tokens", "cache_creation_input_tokens")
+        )
+        assert first.output_tokens == 200
+        assert second.cache_read_input_tokens > 0
+        assert first.latency_ms > 0 and first.cost_usd > 0
+
+    def test_sdk_call_tagged(self, stand_in):
+        """Appel direct au SDK (Agent 2, Judge) : étape et tentatives"""
+        client = anthropic.Anthropic(api_key="sk-ant-test", base_url=stand_in.base_url)
+        run_id = new_run_id("test")
+
+        with llm_context(run_id=run_id, agent="judge", document_id="doc-2"):
+            message = create_message(
+                client,
+                stage="final_decision",
+                model="claude-sonnet-4-20250514",
+                max_tokens=100,
+                messages=[{"role": "user", "content": "Décision ?"}]
+            )
+
+        assert message.content[0].text == RESULT.model_dump_json()
+        [call] = tracker.pop_run(run_id)
+        assert (call.agent, call.stage, call.document_id, call.retries) == ("judge", "final_decision", "doc-2", 0)
+        assert call.input_tokens > 0 and call.error is None
+
+    def test_tracking_disabled(self, stand_in, monkeypatch):
+        monkeypatch.setattr(settings, "llm_usage_tracking", False)
+        run_id = new_run_id("test")
+
+        with llm_context(run_id=run_id):
+            SemanticAnalyzer().analyze("CBAM text", "Doc", "CBAM", PROFILE)
+
+        assert tracker.pop_run(run_id) == []
+
+
+@pytest.mark.database
+@pytest.mark.filterwarnings("ignore:datetime.datetime.utcnow:DeprecationWarning")
+def test_persist_run(session_factory):
+    """Agrégats dans llm_usage, tokens et durée dans document_profile_analyses"""
+    session = session_factory()
+    session.add(Document(id="doc-1", title="Doc", source_url="http://x", event_type="reglementaire",
+                         hash_sha256="a" * 64))
+    # Valeurs d'un run précédent : remplacées, pas additionnées
+    session.add(DocumentProfileAnalysis(document_id="doc-1", company_profile_id="acme", status="analyzed",
+                                        llm_tokens=5000, processing_time_ms=9000))
+    session.commit()
+
+    run_id = new_run_id("test")
+    usage = {"input_tokens": 1000, "output_tokens": 200, "cache_read_input_tokens": 800,
+             "cache_creation_input_tokens": 0}
+    with llm_context(run_id=run_id, agent="agent_1b", stage="semantic", document_id="doc-1", profile_id="acme"):
+        tracker.record("claude-sonnet-4-5-20250929", usage, latency_ms=1500.0)
+        tracker.record("claude-sonnet-4-5-20250929", usage, latency_ms=500.0, retries=2)
+    with llm_context(run_id=run_id, agent="judge", stage="final_decision", document_id="doc-1"):
+        tracker.record("claude-sonnet-4-20250514", error="overloaded", latency_ms=100.0)
+
+    summary = persist_run(run_id, session_factory=session_factory)
+
+    assert summary["calls"] == 3 and summary["retries"] == 2 and summary["errors"] == 1
+    assert summary["input_tokens"] == 2000 and summary["cache_read_input_tokens"] == 1600
+    assert summary["latency_ms_max"] == 1500.0
+
+    state = session_factory().query(DocumentProfileAnalysis).one()
+    assert (state.llm_tokens, state.processing_time_ms) == (2400, 2000)
+
+    rows = LLMUsageRepository(session_factory()).find_by_run(run_id)
+    assert {(row["agent"], row["stage"], row["calls"]) for row in rows} == {
+        ("agent_1b", "semantic", 2), ("judge", "final_decision", 1)
+    }
+    assert tracker.calls(run_id) == []
+
+
+@pytest.mark.database
+@pytest.mark.filterwarnings("ignore:datetime.datetime.utcnow:DeprecationWarning")
+def test_run_context_closed_by_persist_run(session_factory):
+    """Après persist_run(token=...), les appels ne sont plus rattachés au run"""
+    run_id, token = start_run("test")
+    with llm_context(agent="agent_1b"):
+        tracker.record("claude-sonnet-4-5-20250929", latency_ms=10.0)
+
+    persist_run(run_id, session_factory=session_factory, token=token)
+    after = tracker.record("claude-sonnet-4-5-20250929", latency_ms=10.0)
+
+    assert after.run_id == "adhoc" and after.agent == "unknown"
+    assert tracker.calls(run_id) == []
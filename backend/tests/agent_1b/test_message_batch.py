@@ -0,0 +1,197 @@
+"""Tests de l'analyse en masse par la Message Batches API (Agent 1B)."""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import src.orchestration.pipeline as pipeline
+from anthropic_stand_in import AnthropicStandIn
+from src.agent_1b.agent import Agent1B
+from src.agent_1b.message_batch import MessageBatchAnalyzer, custom_id_for
+from src.agent_1b.models import SemanticAnalysisResult
+from src.agent_1b.profile_index import reset_profile_indexes
+from src.agent_1b.tools.semantic_analyzer import SemanticAnalyzer
+from src.agent_1b.tools.semantic_cache import SemanticResultCache
+from src.config import settings
+from src.storage.models import Analysis, Base, CompanyProfile, Document, DocumentProfileAnalysis
+
+PROFILE = {
+    "company_id": "acme",
+    "company_name": "ACME",
+    "keywords": ["cbam", "rubber"],
+    "nc_codes": ["4016.93"],
+}
+
+RESULT = SemanticAnalysisResult(
+    score=0.8,
+    is_applicable=True,
+    explanation="Le règlement impose une déclaration CBAM pour les importations concernées.",
+    regulation_summary="Déclaration trimestrielle des émissions intégrées.",
+    impact_explanation="Les joints en caoutchouc importés relèvent du code NC 4016.93 déclaré.",
+    confidence_level=0.9
+)
+
+
+def documents(count: int) -> list:
+    return [
+        {
+            "document_id": f"doc-{i:04d}",
+            "document_content": f"CBAM applies to rubber goods under CN 4016.93 (document {i}).",
+            "document_title": f"Document {i}",
+            "regulation_type": "CBAM",
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def stand_in(monkeypatch):
+    with AnthropicStandIn(
+        respond=lambda request: RESULT.model_dump_json(),
+        batch_polls=2,
+        failing_custom_ids={"doc-0003"}
+    ) as server:
+        monkeypatch.setattr(settings, "anthropic_base_url", server.base_url)
+        monkeypatch.setattr(settings, "anthropic_api_key", "sk-ant-test")
+        yield server
+
+
+def make_batch_analyzer(cache=None) -> MessageBatchAnalyzer:
+    agent = Agent1B(PROFILE, semantic_analyzer=SemanticAnalyzer(cache=cache))
+    return MessageBatchAnalyzer(agent, poll_seconds=0)
+
+
+# Le SDK anthropic signale les modèles en fin de vie (DeprecationWarning)
+@pytest.mark.filterwarnings("ignore:The model:DeprecationWarning")
+class TestMessageBatchAnalyzer:
+    """Soumission, attente, parsing et sauvegarde groupée"""
+
+    def test_bulk_analysis(self, stand_in):
+        """Un seul lot pour tous les documents, analyses remises en une fois"""
+        saved = []
+
+        stats = make_batch_analyzer().run(documents(5), on_analyses=saved.append)
+
+        assert len(stand_in.batches) == 1
+        batch = stand_in.batches[stats["batch_id"]]
+        assert [item["custom_id"] for item in batch["requests"]] == [f"doc-{i:04d}" for i in range(5)]
+        # 2 consultations "in_progress", 1 "ended" (+ celle du SDK avant les résultats)
+        assert batch["polls"] >= 3
+
+        # Résultats rendus dans le désordre : rattachés par custom_id
+        assert len(saved) == 1
+        assert [document["document_id"] for document, _ in saved[0]] == ["doc-0000", "doc-0001", "doc-0002", "doc-0004"]
+        analysis = saved[0][0][1]
+        assert analysis.document_id == "doc-0000"
+        assert analysis.semantic_analysis.score == RESULT.score
+        assert analysis.keyword_analysis.keywords_found == ["cbam", "rubber"]
+
+        assert stats["analyzed"] == 4
+        assert stats["errors"] == [{"document_id": "doc-0003", "error": "stand-in failure"}]
+        assert stats["request_counts"]["succeeded"] == 4
+        assert stats["usage"]["input_tokens"] > 0
+
+    def test_request_uses_semantic_prompt(self, stand_in):
+        """Les requêtes du lot reprennent le prompt de l'analyse interactive"""
+        make_batch_analyzer().run(documents(1), on_analyses=lambda analyses: None)
+
+        params = next(iter(stand_in.batches.values()))["requests"][0]["params"]
+        assert params["system"][0]["cache_control"] == {"type": "ephemeral"}
+        assert "Document 0" in params["messages"][0]["content"]
+
+    def test_resume_by_batch_id(self, stand_in):
+        """Un lot soumis est repris par son ID, sans nouvelle soumission"""
+        analyzer = make_batch_analyzer()
+        batch_id = analyzer.submit(documents(3))
+
+        # Nouveau processus : reprise avec la liste des documents encore bruts
+        saved = []
+        stats = make_batch_analyzer().run(documents(3), on_analyses=saved.append, batch_id=batch_id)
+
+        assert list(stand_in.batches) == [batch_id]
+        assert stats["batch_id"] == batch_id
+        assert len(saved[0]) == 3
+
+    def test_wait_timeout_keeps_batch(self, stand_in):
+        """Attente abandonnée : le lot reste à reprendre"""
+        analyzer = make_batch_analyzer()
+        analyzer.poll_seconds = 10
+        batch_id = analyzer.submit(documents(2))
+
+        with pytest.raises(TimeoutError):
+            analyzer.wait(batch_id, max_wait_seconds=1)
+
+        assert stand_in.batches[batch_id]["results"] is None
+
+    def test_custom_id_format(self):
+        """Les ID de document hors format de l'API sont remplacés par une empreinte"""
+        assert custom_id_for("0b9f6f3c-5d0e-4c43-9d1c-3f0a9a3c2d11") == "0b9f6f3c-5d0e-4c43-9d1c-3f0a9a3c2d11"
+        assert custom_id_for("doc/1 é").startswith("doc-")
+        assert custom_id_for("doc/1 é") != custom_id_for("doc/2 é")
+
+    @pytest.mark.database
+    # Les modèles utilisent datetime.utcnow (déprécié depuis Python 3.12)
+    @pytest.mark.filterwarnings("ignore:datetime.datetime.utcnow:DeprecationWarning")
+    def test_results_fill_semantic_cache(self, stand_in):
+        """Les résultats du lot sont mis en cache : un second run ne soumet rien"""
+        engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+        Base.metadata.create_all(engine)
+        cache = SemanticResultCache(session_factory=sessionmaker(bind=engine))
+
+        make_batch_analyzer(cache).run(documents(3), on_analyses=lambda analyses: None)
+        stats = make_batch_analyzer(cache).run(documents(3), on_analyses=lambda analyses: None)
+
+        assert len(stand_in.batches) == 1
+        assert stats["batch_id"] is None
+        assert stats["cached"] == stats["analyzed"] == 3
+
+
+@pytest.mark.database
+@pytest.mark.filterwarnings("ignore:The model:DeprecationWarning")
+@pytest.mark.filterwarnings("ignore:datetime.datetime.utcnow:DeprecationWarning")
+def test_run_bulk_analysis_pending_pairs(stand_in, monkeypatch):
+    """Un lot par profil pour ses couples en attente, cascade appliquée avant soumission, aucun doublon"""
+    monkeypatch.setattr(settings, "message_batch_poll_seconds", 0)
+    monkeypatch.setattr(settings, "semantic_cache_enabled", False)
+    monkeypatch.setattr(settings, "profile_index_disk_cache", False)
+    # Aucun mot-clé ni code NC : LLM différé, analyse locale
+    monkeypatch.setattr(settings, "semantic_cascade_mode", "gate")
+    reset_profile_indexes()
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(pipeline, "get_session", session_factory)
+
+    session = session_factory()
+    session.add_all([
+        CompanyProfile(id="acme", company_name="ACME", headquarters_country="FR",
+                       keywords=["cbam", "rubber"], nc_codes=["4016.93"]),
+        CompanyProfile(id="steel", company_name="Steel", headquarters_country="DE",
+                       keywords=["cbam", "steel"], nc_codes=["7208"]),
+        Document(id="doc-0000", title="Acte", source_url="http://x", event_type="reglementaire",
+                 hash_sha256="0" * 64, content="CBAM applies to rubber goods under CN 4016.93 and steel under 7208.10."),
+        Document(id="doc-0001", title="Acte", source_url="http://x", event_type="reglementaire",
+                 hash_sha256="1" * 64, content="CBAM declarations for steel products under CN 7208.10."),
+        Document(id="doc-0002", title="Acte", source_url="http://x", event_type="reglementaire",
+                 hash_sha256="2" * 64, content="Fishing quotas in the Atlantic."),
+    ])
+    session.commit()
+
+    result = pipeline.run_bulk_analysis()
+
+    assert result["status"] == "success"
+    stats = result["agent_1b"]
+    assert [(stats[profile_id]["local"], stats[profile_id]["submitted"]) for profile_id in ("acme", "steel")] == [(1, 2), (1, 2)]
+    assert len(stand_in.batches) == 2
+    assert session.query(Analysis).count() == 6
+    assert session.query(DocumentProfileAnalysis).filter_by(status="analyzed").count() == 6
+    assert {doc.workflow_status for doc in session.query(Document)} == {"analyzed"}
+
+    # Second run : plus rien en attente, aucune analyse dupliquée
+    result = pipeline.run_bulk_analysis()
+    assert {profile_stats["documents"] for profile_stats in result["agent_1b"].values()} == {0}
+    assert len(stand_in.batches) == 2 and session.query(Analysis).count() == 6
+    session.close()
+    reset_profile_indexes()
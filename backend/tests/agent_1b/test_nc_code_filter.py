@@ -0,0 +1,64 @@
+"""Tests pour le filtre codes NC (Niveau 2) de l'Agent 1B."""
+
+import random
+
+from src.agent_1b.tools.nc_code_filter import NCCodeFilter, NCCodeTrie
+
+
+class TestNCCodeTrie:
+    """Tests du trie de codes NC"""
+
+    def test_prefix_in_both_directions(self):
+        """Un code correspond s'il prolonge ou est prolongé par un code du trie"""
+        trie = NCCodeTrie(["4016.93", "7208"])
+
+        assert trie.matches("4016.93")
+        assert trie.matches("4016")            # Chapitre d'un code du profil
+        assert trie.matches("4016.93.00")      # Sous-position d'un code du profil
+        assert trie.matches("72081000")        # Points ignorés
+        assert not trie.matches("4016.99")     # Même longueur qu'un code du profil
+        assert not trie.matches("4017")
+        assert not NCCodeTrie([]).matches("4016")
+
+    def test_same_semantics_as_partial_match(self):
+        """Le trie donne le même résultat que la comparaison code à code"""
+        rng = random.Random(0)
+        codes = [
+            ".".join([str(rng.randint(4000, 4020))] + [f"{rng.randint(0, 3):02d}"] * rng.randint(0, 2))
+            for _ in range(300)
+        ]
+        nc_filter = NCCodeFilter(codes[:50])
+        trie = NCCodeTrie(nc_filter.company_nc_codes)
+
+        for code in codes[50:]:
+            expected = any(nc_filter._is_partial_match(code, company) for company in nc_filter.company_nc_codes)
+            assert trie.matches(code) == expected, code
+
+
+class TestNCCodeFilter:
+    """Tests de l'analyse codes NC d'un document"""
+
+    def test_exact_partial_and_critical(self):
+        """Correspondances exactes, partielles et critiques"""
+        text = "Goods under 4016.93.00 and 4016, steel 7208.10 and 9999.99."
+
+        result = NCCodeFilter(["4016.93.00", "7208"], critical_codes=["7208"]).analyze(text)
+
+        assert result.exact_matches == ["4016.93.00"]
+        assert sorted(result.partial_matches) == ["4016", "7208.10"]
+        assert result.critical_codes == ["7208.10"]
+        assert "steel 7208.10" in result.context_snippets["7208.10"]
+
+    def test_same_length_codes_do_not_match(self):
+        """
+        Deux codes distincts de même longueur ne correspondent pas
+
+        À longueur égale, min() et max() renvoyaient tous deux le premier code :
+        4016.93 et 7208.10 étaient comptés comme correspondance partielle.
+        """
+        nc_filter = NCCodeFilter(["4016.93"], critical_codes=["7208"])
+        result = nc_filter.analyze("See heading 7208.10 and chapter 4403")
+
+        assert not nc_filter._is_partial_match("7208.10", "4016.93")
+        # 4403 (même longueur que 7208) n'est pas critique
+        assert result.nc_codes_found == [] and result.critical_codes == ["7208.10"]
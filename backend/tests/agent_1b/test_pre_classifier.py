@@ -0,0 +1,144 @@
+"""Tests du pré-classifieur local (n-grammes hachés, verdicts LLM)."""
+
+import numpy as np
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.agent_1b.agent import Agent1B
+from src.agent_1b.models import SemanticAnalysisResult
+from src.agent_1b.pre_classifier import (
+    PreClassifierGate,
+    fit_pre_classifier,
+    gate_allowed,
+    load_pre_classifier,
+    load_training_data,
+    model_versions,
+    shadow_agreement,
+    train_pre_classifier,
+)
+from src.agent_1b.tools.semantic_analyzer import SemanticAnalyzer
+from src.config import settings
+from src.storage.models import Base, CompanyProfile, Document, DocumentProfileAnalysis, GroundTruthCase
+
+PROFILE = {"company_id": "acme", "company_name": "ACME", "keywords": ["cbam", "rubber"], "nc_codes": ["4016.93"]}
+
+APPLICABLE = ["cbam declaration for rubber imports", "carbon border adjustment on rubber goods"]
+NOT_APPLICABLE = ["fishing quotas in the atlantic", "capital requirements for banks"]
+FILLER = "the regulation shall apply in member states from the date of publication".split()
+
+
+def corpus(size: int = 300, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    labels = (rng.random(size) < 0.4).astype(float)
+    texts = [
+        f"{(APPLICABLE if label else NOT_APPLICABLE)[rng.integers(2)]} {' '.join(rng.choice(FILLER, 20))}"
+        for label in labels
+    ]
+    return [f"doc-{index}" for index in range(size)], texts, labels
+
+
+def test_fit_save_load(tmp_path):
+    document_ids, texts, labels = corpus()
+    model = fit_pre_classifier("acme", document_ids, texts, labels, negative_threshold=0.05)
+
+    assert model.metadata["calibrated"] and model.metadata["holdout"]["accuracy"] == 1.0
+    assert model.metadata["holdout"]["missed_applicable"] == 0
+    assert model.predict("capital requirements for banks") < 0.05
+    assert model.predict("cbam declaration for rubber imports") > 0.5
+
+    model.save(tmp_path)
+    model.version = 2
+    model.save(tmp_path)
+
+    assert model_versions("acme", tmp_path) == [1, 2]
+    loaded = load_pre_classifier("acme", version=1, directory=tmp_path)
+    assert loaded.version == 1 and loaded.metadata["samples"] == 300
+    assert loaded.predict(texts[0]) == pytest.approx(model.predict(texts[0]), abs=1e-5)
+    assert load_pre_classifier("steel", directory=tmp_path) is None
+
+
+def make_agent(gate: PreClassifierGate, calls: list) -> Agent1B:
+    response = AIMessage(
+        content=SemanticAnalysisResult(
+            score=0.2,
+            is_applicable=False,
+            explanation="Le règlement ne concerne pas les produits de l'entreprise.",
+            regulation_summary="Fixation des quotas de pêche dans l'Atlantique pour l'année suivante.",
+            impact_explanation="Aucun produit importé ne relève des secteurs visés par ce règlement.",
+            confidence_level=0.9
+        ).model_dump_json()
+    )
+    analyzer = SemanticAnalyzer()
+    analyzer.chain = RunnableLambda(lambda inputs: calls.append(inputs) or response)
+    return Agent1B(PROFILE, semantic_analyzer=analyzer, pre_classifier=gate)
+
+
+@pytest.mark.parametrize("mode,approved,llm_called", [("shadow", True, True), ("gate", False, True), ("gate", True, False)])
+def test_agent_shadow_and_gate(monkeypatch, mode, approved, llm_called):
+    """Le LLM n'est sauté qu'en mode gate, pour un modèle validé en shadow"""
+    monkeypatch.setattr(settings, "semantic_cascade_mode", "off")
+    monkeypatch.setattr(settings, "semantic_cache_enabled", False)
+    document_ids, texts, labels = corpus()
+    gate = PreClassifierGate(fit_pre_classifier("acme", document_ids, texts, labels), mode, 0.05, approved)
+    calls = []
+
+    analysis = make_agent(gate, calls).analyze_document("doc-x", "fishing quotas in the atlantic", "Pêche")
+
+    assert bool(calls) == llm_called
+    assert analysis.semantic_decision == ("called" if llm_called else "preclassified")
+    assert analysis.pre_classifier_probability < 0.05 and analysis.pre_classifier_version == 1
+    if not llm_called:
+        assert "pré-classifieur" in analysis.semantic_analysis.explanation
+
+
+@pytest.mark.database
+@pytest.mark.filterwarnings("ignore:datetime.datetime.utcnow:DeprecationWarning")
+def test_training_data_and_shadow_agreement(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "pre_classifier_min_shadow_samples", 3)
+    monkeypatch.setattr(settings, "pre_classifier_min_shadow_precision", 0.9)
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(CompanyProfile(id="acme", company_name="ACME", headquarters_country="FR"))
+    rows = [
+        # (décision, applicable selon le LLM, probabilité shadow)
+        ("called", True, 0.9),
+        ("called", False, 0.01),
+        ("called", False, 0.02),
+        ("called", False, 0.03),
+        ("deferred", False, None),
+    ]
+    for index, (decision, applicable, probability) in enumerate(rows):
+        document_id = f"doc-{index}"
+        session.add(Document(id=document_id, title="Doc", source_url="http://x", event_type="reglementaire",
+                             hash_sha256=str(index) * 64, content=f"texte {index}"))
+        session.add(DocumentProfileAnalysis(
+            document_id=document_id, company_profile_id="acme", status="analyzed", attempts=1,
+            semantic_decision=decision, semantic_applicable=applicable,
+            pre_classifier_probability=probability, pre_classifier_version=1 if probability else None
+        ))
+    # Le cas de référence prime sur le verdict LLM, y compris pour une analyse différée
+    session.add(GroundTruthCase(
+        document_id="doc-4", expert_pertinence_decision="OUI", expert_pertinence_reasoning="-",
+        expert_risk_level="Moyen", expert_recommendations="-", expert_name="Expert"
+    ))
+    session.commit()
+
+    data = load_training_data(session, "acme")
+    assert data.document_ids == ["doc-0", "doc-1", "doc-2", "doc-3", "doc-4"]
+    assert data.labels.tolist() == [1, 0, 0, 0, 1] and data.human_labels == 1
+
+    agreement = shadow_agreement(session, "acme", 1, negative_threshold=0.05)
+    assert (agreement["comparisons"], agreement["agreement"], agreement["predicted_negatives"]) == (4, 1.0, 3)
+    assert agreement["negative_precision"] == 1.0 and gate_allowed(agreement)
+    assert not gate_allowed(shadow_agreement(session, "acme", 2))
+
+    report = train_pre_classifier(session, "acme", directory=tmp_path, min_samples=10)
+    assert report["status"] == "skipped" and model_versions("acme", tmp_path) == []
+    report = train_pre_classifier(session, "acme", directory=tmp_path, min_samples=5)
+    assert (report["status"], report["version"]) == ("trained", 1)
+    assert model_versions("acme", tmp_path) == [1]
@@ -0,0 +1,90 @@
+"""Tests de la file d'analyse par priorité (Agent 1B)."""
+
+from datetime import datetime, timedelta
+
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+
+from src.agent_1b.agent import Agent1B
+from src.agent_1b.fan_out import FanOutAnalyzer
+from src.agent_1b.models import KeywordAnalysisResult, NCCodeAnalysisResult, SemanticAnalysisResult
+from src.agent_1b.priority import AnalysisPriority
+from src.agent_1b.tools.relevance_scorer import RelevanceScorer
+from src.agent_1b.tools.semantic_analyzer import SemanticAnalyzer
+
+NOW = datetime(2026, 6, 1)
+
+PRIORITY = AnalysisPriority(
+    document_type_ranks={"regulation": 0, "other": 3},
+    category_ranks={"guidance": 1, "faq": 2},
+    source_ranks={"eurlex": 0, "cbam_guidance": 1},
+    freshness_days=30,
+    now=NOW
+)
+
+PROFILE = {"company_id": "acme", "company_name": "ACME", "keywords": ["cbam", "rubber"], "nc_codes": ["4016.93"]}
+
+RESPONSE = AIMessage(
+    content=SemanticAnalysisResult(
+        score=1.0,
+        is_applicable=True,
+        explanation="Le règlement impose une déclaration pour les importations concernées.",
+        regulation_summary="Déclaration trimestrielle des émissions intégrées.",
+        impact_explanation="Les produits importés relèvent des codes NC déclarés par l'entreprise.",
+        confidence_level=0.9
+    ).model_dump_json()
+)
+
+
+def test_priority_components():
+    scorer = RelevanceScorer()
+    keyword = KeywordAnalysisResult(score=0.5, total_keywords_searched=2, keyword_density=0.1)
+    nc_code = NCCodeAnalysisResult(score=1.0, critical_codes=["4016.93"])
+    regulation = {"document_type": "REGULATION", "source": "eurlex", "published_at": NOW - timedelta(days=30)}
+
+    components = PRIORITY.components(regulation, keyword, nc_code, scorer)
+
+    assert components == {"local": 0.75, "critical_codes": 1.0, "document_type": 1.0, "source": 1.0, "freshness": 0.5}
+    faq = {"category": "faq", "source": "cbam_guidance", "published_at": None}
+    assert PRIORITY.components(faq, keyword, NCCodeAnalysisResult(score=0.0), scorer)["document_type"] == 0.6
+    assert PRIORITY.score(faq, keyword, NCCodeAnalysisResult(score=0.0), scorer) < PRIORITY.score(
+        regulation, keyword, nc_code, scorer
+    )
+
+
+async def test_highest_priority_analyzed_first():
+    """Un seul worker : l'acte CBAM passe avant les FAQ collectées plus tôt"""
+    analyzer = SemanticAnalyzer()
+    analyzer.chain = RunnableLambda(lambda inputs: RESPONSE)
+    agents = {"acme": Agent1B(PROFILE, semantic_analyzer=analyzer)}
+    faqs = [
+        {
+            "document_id": f"faq-{index}",
+            "document_content": "Frequently asked questions about the rubber sector.",
+            "document_title": "FAQ",
+            "category": "faq",
+            "source": "cbam_guidance",
+            "published_at": NOW - timedelta(days=400),
+        }
+        for index in range(5)
+    ]
+    act = {
+        "document_id": "act",
+        "document_content": "CBAM implementing act: rubber goods under CN 4016.93 and CBAM declarations.",
+        "document_title": "Implementing Regulation",
+        "document_type": "REGULATION",
+        "source": "eurlex",
+        "published_at": NOW - timedelta(days=2),
+    }
+    order = []
+
+    stats = await FanOutAnalyzer(agents, concurrency=1, priority=PRIORITY).run(
+        faqs + [act],
+        on_analysis=lambda document, profile_id, analysis: order.append(
+            (document["document_id"], analysis.relevance_score.criticality.value)
+        )
+    )
+
+    assert order[0] == ("act", "CRITICAL")
+    assert [document_id for document_id, _ in order[1:]] == [f"faq-{index}" for index in range(5)]
+    assert stats["first_critical_position"] == 1 and stats["first_critical_seconds"] is not None
@@ -0,0 +1,120 @@
+"""Tests de l'index compilé des profils entreprise."""
+
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from src.agent_1b.agent import Agent1B
+from src.agent_1b.profile_index import (
+    ProfileIndex,
+    ProfileIndexCache,
+    flatten_nc_codes,
+    load_profile_index,
+    profile_from_json,
+    reset_profile_indexes,
+)
+from src.config import settings
+
+PROFILE = {
+    "company_id": "acme",
+    "company_name": "ACME",
+    "keywords": ["cbam", "caoutchouc"],
+    "nc_codes": {"imports": [{"code": "4016.93"}, "4001.22"], "exports": [{"code": "4016.93"}]},
+    "countries": ["FR", "DE"],
+}
+
+HUTCHINSON_PATH = "data/company_profiles/Hutchinson_SA.json"
+
+
+@pytest.fixture
+def memory_only(monkeypatch):
+    monkeypatch.setattr(settings, "profile_index_disk_cache", False)
+    reset_profile_indexes()
+    yield
+    reset_profile_indexes()
+
+
+def test_compile_profile():
+    index = ProfileIndex.compile(PROFILE)
+
+    assert index.profile["nc_codes"] == ["4016.93", "4001.22"]
+    assert index.countries == frozenset({"FR", "DE"})
+    assert "Codes NC/SH: 4016.93, 4001.22" in index.context
+    assert "Pays d'opération: DE, FR" in index.context
+    assert index.keyword_filter.analyze("Le caoutchouc naturel").keywords_found == ["caoutchouc"]
+    assert index.nc_code_filter.analyze("CN 4001.22 et 4016").nc_codes_found
+
+
+def test_flatten_nc_codes_formats():
+    assert flatten_nc_codes(["4001", " 4002 ", "4001"]) == ["4001", "4002"]
+    assert flatten_nc_codes({"4001.21": "Caoutchouc naturel"}) == ["4001.21"]
+    assert flatten_nc_codes(None) == []
+
+
+def test_hutchinson_json_profile(memory_only):
+    index = load_profile_index(HUTCHINSON_PATH)
+
+    assert index.company_name == "HUTCHINSON"
+    assert "4001.21" in index.profile["nc_codes"]
+    assert "FR" in index.countries
+    # Même fichier inchangé : même index, sans relecture
+    assert load_profile_index(HUTCHINSON_PATH) is index
+    # Mots-clés générés dans un ordre stable
+    assert profile_from_json({"products": ["Joints caoutchouc", "Aluminium"]})["keywords"] == [
+        "aluminium", "caoutchouc", "étanchéité"
+    ]
+
+
+def test_disk_cache_shared_between_processes(tmp_path):
+    first = ProfileIndexCache(tmp_path)
+    index = first.get(PROFILE)
+
+    # Un autre processus (nouveau cache) relit l'index compilé sur disque
+    second = ProfileIndexCache(tmp_path)
+    loaded = second.get(dict(PROFILE))
+
+    assert (first.compiled, second.compiled, second.disk_hits) == (1, 0, 1)
+    assert loaded.content_hash == index.content_hash
+    assert loaded.keyword_filter.analyze("CBAM et caoutchouc") == index.keyword_filter.analyze("CBAM et caoutchouc")
+
+
+def test_content_hash_follows_keyword_options(monkeypatch):
+    cache = ProfileIndexCache()
+    index = cache.get(PROFILE)
+
+    monkeypatch.setattr(settings, "keyword_accent_folding", False)
+
+    assert cache.get(PROFILE).content_hash != index.content_hash
+    assert cache.compiled == 2
+
+
+def test_row_invalidated_on_updated_at():
+    cache = ProfileIndexCache()
+    loads = []
+    row = SimpleNamespace(id="acme", updated_at=datetime(2026, 1, 1), profile=dict(PROFILE))
+
+    def load():
+        loads.append(row.updated_at)
+        return row.profile
+
+    first = cache.get_source(f"company_profile:{row.id}", row.updated_at, load)
+    assert cache.get_source(f"company_profile:{row.id}", row.updated_at, load) is first
+
+    row.profile = {**PROFILE, "keywords": ["cbam", "acier"]}
+    row.updated_at = datetime(2026, 2, 1)
+    updated = cache.get_source(f"company_profile:{row.id}", row.updated_at, load)
+
+    assert len(loads) == 2
+    assert updated.content_hash != first.content_hash
+    assert updated.keyword_filter.keywords == ["cbam", "acier"]
+
+
+def test_agents_share_index(memory_only):
+    """Deux agents du même profil réutilisent l'automate compilé"""
+    first = Agent1B(PROFILE, semantic_analyzer=object())
+    second = Agent1B(dict(PROFILE), semantic_analyzer=object())
+
+    assert second.profile_index is first.profile_index
+    assert second.keyword_filter is first.keyword_filter
+    assert first.company_profile["nc_codes"] == ["4016.93", "4001.22"]
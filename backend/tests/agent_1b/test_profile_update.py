@@ -0,0 +1,105 @@
+"""Tests du re-scoring incrémental après modification d'un profil."""
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.agent_1b.features import featurize
+from src.agent_1b.profile_index import ProfileIndex, get_profile_index, reset_profile_indexes
+from src.agent_1b.profile_update import diff_profiles, format_profile_edit_report, rescore_profile_edits
+from src.agent_1b.rescoring import CRITICALITY_LEVELS, score_arrays
+from src.agent_1b.tools.relevance_scorer import RelevanceScorer
+from src.config import settings
+from src.storage.document_feature_repository import DocumentFeatureRepository
+from src.storage.document_profile_repository import DocumentProfileRepository
+from src.storage.models import Base, CompanyProfile, Document, DocumentProfileAnalysis
+
+PROFILE = {"company_id": "acme", "company_name": "ACME", "keywords": ["cbam", "rubber"], "nc_codes": ["4016.93"]}
+
+DOCUMENTS = {
+    # (texte, score sémantique enregistré, applicable selon le LLM)
+    "doc-a": ("CBAM declarations for rubber goods under CN 4016.93.", 0.9, True),
+    "doc-b": ("Rubber sector statistics for the last quarter.", 0.9, True),
+    "doc-c": ("Aluminium smelters and their electricity prices.", 0.0, False),
+    "doc-d": ("Fishing quotas in the Atlantic.", 0.0, False),
+}
+
+
+@pytest.fixture
+def memory_only(monkeypatch):
+    monkeypatch.setattr(settings, "profile_index_disk_cache", False)
+    reset_profile_indexes()
+    yield
+    reset_profile_indexes()
+
+
+def test_diff_profiles():
+    old = ProfileIndex.compile(PROFILE)
+    new = ProfileIndex.compile({**PROFILE, "keywords": ["CBAM", "aluminium"], "nc_codes": ["4016.93", "7601"]})
+
+    diff = diff_profiles(old, new, old.content_hash)
+
+    assert (diff.added_keywords, diff.removed_keywords) == (["aluminium"], ["rubber"])
+    assert (diff.added_nc_codes, diff.removed_nc_codes) == (["7601"], [])
+    assert diff.context_changed and diff.keywords_changed and diff.nc_codes_changed
+    unknown = diff_profiles(None, new, "0" * 64)
+    assert not unknown.previous_known and unknown.keywords_changed and unknown.nc_codes_changed
+
+
+@pytest.mark.database
+@pytest.mark.filterwarnings("ignore:datetime.datetime.utcnow:DeprecationWarning")
+def test_rescore_profile_edits(memory_only):
+    """Mot-clé ajouté : seuls les documents concernés sont re-scorés, et ré-analysés si le LLM peut changer la criticité"""
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(CompanyProfile(id="acme", company_name="ACME", headquarters_country="FR"))
+    scorer = RelevanceScorer.from_settings()
+    old = get_profile_index(PROFILE)
+
+    for index, (document_id, (content, semantic_score, applicable)) in enumerate(DOCUMENTS.items()):
+        session.add(Document(id=document_id, title="Doc", source_url="http://x", event_type="reglementaire",
+                             hash_sha256=str(index) * 64, content=content))
+        features = featurize(content, [old], content_hash=str(index) * 64)
+        DocumentFeatureRepository(session).save(document_id, features)
+        hits = {keyword: (hit.count, hit.context) for keyword, hit in features.keyword_hits.items()}
+        keyword_score = old.keyword_filter.score_hits(hits).score
+        nc_code_score = old.nc_code_filter.score_codes(None, list(features.nc_codes), features.nc_codes).score
+        result = score_arrays(np.array([keyword_score]), np.array([nc_code_score]), np.array([semantic_score]),
+                              np.array([False]), np.array([applicable]), scorer)
+        session.add(DocumentProfileAnalysis(
+            document_id=document_id, company_profile_id="acme", status="analyzed", attempts=1,
+            keyword_score=keyword_score, nc_code_score=nc_code_score, semantic_score=semantic_score,
+            semantic_applicable=applicable, has_critical_codes=False, profile_hash=old.content_hash,
+            relevance_score=float(result["final_score"][0]), is_relevant=bool(result["is_relevant"][0]),
+            criticality=CRITICALITY_LEVELS[result["criticality"][0]].value
+        ))
+    # Analyse antérieure au suivi des versions : rattachée sans re-scoring
+    session.add(Document(id="doc-e", title="Doc", source_url="http://x", event_type="reglementaire",
+                         hash_sha256="e" * 64, content="Texte"))
+    session.add(DocumentProfileAnalysis(document_id="doc-e", company_profile_id="acme", status="analyzed", attempts=0))
+    session.commit()
+
+    new = get_profile_index({**PROFILE, "keywords": ["cbam", "rubber", "aluminium"]})
+    dry_run = rescore_profile_edits(session, new)
+    assert dry_run["touched"] == 2 and session.query(DocumentProfileAnalysis).filter_by(status="stale").count() == 0
+
+    report = rescore_profile_edits(session, new, apply=True)
+
+    assert (report["corpus"], report["outdated"], report["baselined"]) == (5, 5, 1)
+    # doc-a : score mots-clés plafonné, inchangé ; doc-d : aucun mot-clé
+    assert (report["candidates"], report["touched"], report["reanalysis"]) == (3, 2, 2)
+    assert report["documents_scanned"] == 4 and report["diffs"][0]["added_keywords"] == ["aluminium"]
+    states = {entry.document_id: entry for entry in session.query(DocumentProfileAnalysis)}
+    assert {document_id for document_id, entry in states.items() if entry.status == "stale"} == {"doc-b", "doc-c"}
+    assert states["doc-b"].keyword_score == 0.5 and states["doc-c"].keyword_score == 0.5
+    assert all(entry.profile_hash == new.content_hash for entry in states.values())
+    assert set(DocumentProfileRepository(session).pending(["acme"])) == {"doc-b", "doc-c"}
+    assert "Documents touchés : 2 sur 5" in format_profile_edit_report([report])
+
+    # Mot-clé retiré : caractéristiques suffisantes, aucun texte relu
+    latest = get_profile_index(PROFILE)
+    report = rescore_profile_edits(session, latest, apply=True)
+    assert (report["outdated"], report["documents_scanned"], report["touched"]) == (3, 0, 0)
@@ -0,0 +1,160 @@
+"""Tests du re-scoring vectorisé des analyses stockées."""
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.agent_1b.models import KeywordAnalysisResult, NCCodeAnalysisResult, SemanticAnalysisResult
+from src.agent_1b.rescoring import CRITICALITY_LEVELS, rescore_rows, rescore_stored_analyses, score_arrays
+from src.agent_1b.tools.relevance_scorer import RelevanceScorer, create_document_analysis
+from src.storage.document_profile_repository import DocumentProfileRepository
+from src.storage.models import Base, CompanyProfile, Document, DocumentProfileAnalysis
+
+SCORERS = [
+    RelevanceScorer(),
+    RelevanceScorer(0.2, 0.5, 0.3, {"critical": 0.7, "high": 0.5, "medium": 0.35, "low": 0.1}),
+]
+
+
+@pytest.mark.parametrize("scorer", SCORERS)
+def test_score_arrays_matches_scorer(scorer):
+    """Même score final et même criticité que RelevanceScorer, analyse par analyse"""
+    rng = np.random.default_rng(7)
+    size = 5000
+    keyword = np.round(rng.random(size) * 20) / 20
+    nc_code = np.round(rng.random(size) * 13) / 13
+    semantic = np.round(rng.random(size), 2)
+    critical = rng.random(size) < 0.2
+    applicable = rng.random(size) < 0.6
+
+    result = score_arrays(keyword, nc_code, semantic, critical, applicable, scorer)
+
+    for i in range(size):
+        expected = round(
+            keyword[i] * scorer.keyword_weight + nc_code[i] * scorer.nc_code_weight + semantic[i] * scorer.semantic_weight,
+            3
+        )
+        assert result["final_score"][i] == expected
+        assert CRITICALITY_LEVELS[result["criticality"][i]] == scorer.criticality_for_score(
+            expected, bool(critical[i]), bool(applicable[i] and semantic[i] > 0.7)
+        )
+        assert result["is_relevant"][i] == (expected >= scorer.thresholds["low"])
+
+
+def test_rescore_rows_parity_with_calculate_score():
+    """Analyses enregistrées par calculate_score, scores sur une grille de 0.0005 (arrondis à mi-chemin) : aucun changement"""
+    rng = np.random.default_rng(11)
+    scorer = RelevanceScorer()
+    semantic_result = SemanticAnalysisResult(
+        score=0.0,
+        is_applicable=True,
+        explanation="Le règlement s'applique aux importations de l'entreprise.",
+        regulation_summary="Déclaration trimestrielle des émissions intégrées.",
+        impact_explanation="Les produits importés relèvent des codes NC déclarés par l'entreprise."
+    )
+    rows = []
+    for index in range(10000):
+        keyword, nc_code, semantic = (int(value) / 2000 for value in rng.integers(0, 2001, 3))
+        critical, applicable = bool(rng.random() < 0.2), bool(rng.random() < 0.6)
+        result = scorer.calculate_score(
+            KeywordAnalysisResult(score=keyword, total_keywords_searched=10, keyword_density=keyword),
+            NCCodeAnalysisResult(score=nc_code, critical_codes=["7208"] if critical else []),
+            semantic_result.model_copy(update={"score": semantic, "is_applicable": applicable})
+        )
+        rows.append((str(index), f"doc-{index}", "acme", keyword, nc_code, semantic, applicable, critical,
+                     result.final_score, result.criticality.value, result.final_score >= scorer.thresholds["low"],
+                     "called"))
+
+    report = rescore_rows(rows, scorer)
+
+    assert (report["analyses"], report["changed"], report["transitions"]) == (10000, 0, {})
+
+
+def make_analysis(document_id: str, keyword: float, nc_code: float, semantic: float, semantic_decision: str = "called"):
+    analysis = create_document_analysis(
+        document_id, "acme", "Doc", "CBAM",
+        KeywordAnalysisResult(score=keyword, total_keywords_searched=10, keyword_density=keyword),
+        NCCodeAnalysisResult(score=nc_code),
+        SemanticAnalysisResult(
+            score=semantic,
+            is_applicable=semantic > 0,
+            explanation="Le règlement s'applique aux importations de l'entreprise.",
+            regulation_summary="Déclaration trimestrielle des émissions intégrées.",
+            impact_explanation="Les produits importés relèvent des codes NC déclarés par l'entreprise."
+        ),
+        scorer=RelevanceScorer()
+    )
+    analysis.semantic_decision = semantic_decision
+    return analysis
+
+
+@pytest.mark.database
+@pytest.mark.filterwarnings("ignore:datetime.datetime.utcnow:DeprecationWarning")
+def test_rescore_dry_run_then_apply():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(CompanyProfile(id="acme", company_name="ACME", headquarters_country="FR"))
+    for index in range(4):
+        session.add(Document(id=f"doc-{index}", title="Doc", source_url="http://x", event_type="reglementaire",
+                             hash_sha256=str(index) * 64))
+    session.commit()
+
+    states = DocumentProfileRepository(session)
+    # 0.3*0.5 + 0.3*0.5 + 0.4*0.5 = 0.5 (MEDIUM) ; 0.3*1 + 0.3*1 + 0.4*0.1 = 0.64 (HIGH)
+    states.mark_analyzed("doc-0", "acme", make_analysis("doc-0", 0.5, 0.5, 0.5))
+    states.mark_analyzed("doc-1", "acme", make_analysis("doc-1", 1.0, 1.0, 0.1))
+    states.mark_analyzed("doc-2", "acme", make_analysis("doc-2", 0.0, 0.0, 0.4))
+    states.backfill("acme", ["doc-3"])  # Analysé avant l'enregistrement des scores par niveau
+    session.commit()
+
+    # Le sémantique pèse plus : doc-0 inchangé (0.5), doc-1 descend (0.46), doc-2 devient pertinent (0.24)
+    scorer = RelevanceScorer(0.2, 0.2, 0.6)
+    report = rescore_stored_analyses(session, scorer)
+
+    assert (report["analyses"], report["unscored"], report["changed"]) == (3, 1, 2)
+    assert report["transitions"] == {"HIGH -> MEDIUM": 1, "NOT_RELEVANT -> LOW": 1}
+    assert report["relevance_flips"] == 1
+    assert {change["document_id"] for change in report["changes"]} == {"doc-1", "doc-2"}
+    assert session.query(DocumentProfileAnalysis).filter_by(document_id="doc-1").one().criticality == "HIGH"
+
+    rescore_stored_analyses(session, scorer, apply=True)
+    session.expire_all()
+
+    row = session.query(DocumentProfileAnalysis).filter_by(document_id="doc-2").one()
+    assert (row.relevance_score, row.criticality, row.is_relevant) == (0.24, "LOW", True)
+    assert rescore_stored_analyses(session, scorer)["changed"] == 0
+
+
+@pytest.mark.database
+@pytest.mark.filterwarnings("ignore:datetime.datetime.utcnow:DeprecationWarning")
+def test_rescore_placeholder_semantic_scores():
+    """LLM non appelé : re-scoré si la criticité ne dépend pas du LLM, sinon à ré-analyser"""
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(CompanyProfile(id="acme", company_name="ACME", headquarters_country="FR"))
+    for index in range(3):
+        session.add(Document(id=f"doc-{index}", title="Doc", source_url="http://x", event_type="reglementaire",
+                             hash_sha256=str(index) * 64))
+    session.commit()
+
+    states = DocumentProfileRepository(session)
+    states.mark_analyzed("doc-0", "acme", make_analysis("doc-0", 0.5, 0.5, 0.5))
+    states.mark_analyzed("doc-1", "acme", make_analysis("doc-1", 1.0, 1.0, 0.0, "skipped"))
+    states.mark_analyzed("doc-2", "acme", make_analysis("doc-2", 0.5, 0.5, 0.0, "preclassified"))
+    session.commit()
+
+    # doc-1 : 0.9 quel que soit le LLM (CRITICAL) ; doc-2 : MEDIUM (0.45) ou HIGH (0.55, applicable)
+    scorer = RelevanceScorer(0.45, 0.45, 0.1)
+    report = rescore_stored_analyses(session, scorer, apply=True)
+
+    assert (report["analyses"], report["changed"], report["reanalysis"]) == (3, 2, 1)
+    assert report["transitions"] == {"HIGH -> CRITICAL": 1, "LOW -> MEDIUM": 1}
+    session.expire_all()
+    states_by_document = {entry.document_id: entry for entry in session.query(DocumentProfileAnalysis)}
+    assert (states_by_document["doc-1"].status, states_by_document["doc-1"].criticality) == ("analyzed", "CRITICAL")
+    assert states_by_document["doc-2"].status == "stale"
+    assert list(states.pending(["acme"])) == ["doc-2"]
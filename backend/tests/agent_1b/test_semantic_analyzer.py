@@ -0,0 +1,66 @@
+"""Tests pour l'analyseur sémantique (Niveau 3) de l'Agent 1B."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+
+from src.agent_1b.models import SemanticAnalysisResult
+from src.agent_1b.tools.semantic_analyzer import get_semantic_analyzer, reset_semantic_analyzers
+from src.config import settings
+
+
+@pytest.fixture(autouse=True)
+def fresh_analyzers(monkeypatch):
+    """Registre d'analyseurs vide pour chaque test, sans cache en base"""
+    monkeypatch.setattr(settings, "semantic_cache_enabled", False)
+    reset_semantic_analyzers()
+    yield
+    reset_semantic_analyzers()
+
+
+class TestSharedAnalyzer:
+    """Tests du cycle de vie de l'analyseur partagé"""
+
+    def test_same_instance_across_calls_and_threads(self):
+        """Un seul analyseur par (modèle, température), même en concurrence"""
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            analyzers = list(pool.map(lambda _: get_semantic_analyzer(), range(32)))
+
+        assert len({id(analyzer) for analyzer in analyzers}) == 1
+        assert get_semantic_analyzer(temperature=0.5) is not analyzers[0]
+
+    def test_reset_creates_new_instance(self):
+        """reset_semantic_analyzers() force la reconstruction"""
+        first = get_semantic_analyzer()
+        reset_semantic_analyzers()
+
+        assert get_semantic_analyzer() is not first
+
+    def test_chain_reused_with_cached_format_instructions(self):
+        """Chaque document réutilise la même chaîne et les mêmes instructions de format"""
+        analyzer = get_semantic_analyzer()
+        calls = []
+
+        def fake_chain(inputs):
+            calls.append(inputs)
+            return AIMessage(content=SemanticAnalysisResult(
+                score=0.7,
+                is_applicable=True,
+                explanation="Le document impose une déclaration CBAM pour les produits importés.",
+                regulation_summary="Obligation de déclaration trimestrielle CBAM.",
+                impact_explanation="Impact",
+                confidence_level=0.9
+            ).model_dump_json())
+
+        analyzer.chain = RunnableLambda(fake_chain)
+        profile = {"company_name": "ACME", "nc_codes": ["4016.93"]}
+
+        for title in ("Doc 1", "Doc 2"):
+            result = analyzer.analyze("CBAM content", title, "CBAM", profile)
+            assert result.score == 0.7
+
+        assert [call["document_title"] for call in calls] == ["Doc 1", "Doc 2"]
+        assert calls[0]["format_instructions"] is calls[1]["format_instructions"]
+        assert calls[0]["nc_codes"] == "4016.93"
@@ -0,0 +1,146 @@
+"""Tests pour le cache persistant des analyses sémantiques (Agent 1B)."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.agent_1b.models import SemanticAnalysisResult
+from src.agent_1b.tools.semantic_analyzer import SemanticAnalyzer
+from src.agent_1b.tools.semantic_cache import SemanticResultCache
+from src.config import settings
+from src.storage.models import Base, SemanticCacheEntry
+from src.storage.semantic_cache_repository import SemanticCacheRepository
+
+PROFILE = {"company_name": "ACME", "industry": "Caoutchouc", "nc_codes": ["4016.93"]}
+
+RESULT = SemanticAnalysisResult(
+    score=0.8,
+    is_applicable=True,
+    explanation="Le règlement impose une déclaration CBAM pour les importations concernées.",
+    regulation_summary="Déclaration trimestrielle des émissions intégrées.",
+    impact_explanation="Les joints importés relèvent du code NC 4016.93.",
+    obligations_identified=["Déclaration trimestrielle"],
+    confidence_level=0.9
+)
+
+
+@pytest.fixture
+def session_factory():
+    """Base SQLite en mémoire partagée par toutes les sessions"""
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+
+def make_analyzer(cache, responses, **kwargs) -> SemanticAnalyzer:
+    """Analyseur dont l'appel LLM est remplacé par une liste de réponses"""
+    analyzer = SemanticAnalyzer(cache=cache, **kwargs)
+    analyzer.chain = RunnableLambda(lambda inputs: responses.pop(0))
+    return analyzer
+
+
+def llm_response(result=RESULT) -> AIMessage:
+    return AIMessage(
+        content=result.model_dump_json(),
+        usage_metadata={"input_tokens": 9000, "output_tokens": 400, "total_tokens": 9400}
+    )
+
+
+@pytest.mark.database
+# Les modèles utilisent datetime.utcnow (déprécié depuis Python 3.12)
+@pytest.mark.filterwarnings("ignore:datetime.datetime.utcnow:DeprecationWarning")
+class TestSemanticResultCache:
+    """Tests du cache de résultats LLM"""
+
+    def test_replay_without_llm_call(self, session_factory):
+        """Un second appel identique rejoue le résultat sans appeler le LLM"""
+        cache = SemanticResultCache(session_factory=session_factory)
+        responses = [llm_response()]
+
+        first = make_analyzer(cache, responses).analyze("CBAM text", "Doc", "CBAM", PROFILE)
+        # Nouvel analyseur (ex: run relancé) : plus aucune réponse LLM disponible
+        second = make_analyzer(cache, []).analyze("CBAM text", "Doc", "CBAM", PROFILE)
+
+        assert second.model_dump() == first.model_dump() == RESULT.model_dump()
+        assert cache.stats() == {
+            "hits": 1, "misses": 1, "writes": 1, "evictions": 0, "errors": 0, "hit_rate": 0.5
+        }
+
+        entry = session_factory().query(SemanticCacheEntry).one()
+        assert entry.usage == {
+            "input_tokens": 9000, "output_tokens": 400,
+            "cache_read_input_tokens": 0, "cache_creation_input_tokens": 0
+        }
+        assert entry.hits == 1
+
+    def test_key_depends_on_all_inputs(self):
+        """Document, profil, modèle et température changent la clé"""
+        analyzer = SemanticAnalyzer()
+        key = analyzer.cache_key("text", "Doc", "CBAM", PROFILE)
+
+        assert key == SemanticAnalyzer().cache_key("text", "Doc", "CBAM", dict(PROFILE))
+        assert key != analyzer.cache_key("text 2", "Doc", "CBAM", PROFILE)
+        assert key != analyzer.cache_key("text", "Doc", "CBAM", {**PROFILE, "industry": "Acier"})
+        assert key != SemanticAnalyzer(temperature=0.0).cache_key("text", "Doc", "CBAM", PROFILE)
+        assert key != SemanticAnalyzer(model_name="claude-haiku-4-5").cache_key("text", "Doc", "CBAM", PROFILE)
+
+    def test_key_depends_on_excerpt_settings(self, monkeypatch):
+        """Budget, sélection, map-reduce et termes du profil (extrait envoyé au LLM) changent la clé"""
+        analyzer = SemanticAnalyzer()
+        key = analyzer.cache_key("text", "Doc", "CBAM", PROFILE)
+
+        assert key != analyzer.cache_key("text", "Doc", "CBAM", {**PROFILE, "keywords": ["rubber"]})
+        for name, value in (
+            ("semantic_content_budget_tokens", 4000),
+            ("semantic_content_selection", "head_tail"),
+            ("semantic_map_reduce_chunk_tokens", 3000),
+            ("semantic_map_reduce_max_tokens", 60000),
+        ):
+            with monkeypatch.context() as patch:
+                patch.setattr(settings, name, value)
+                assert analyzer.cache_key("text", "Doc", "CBAM", PROFILE) != key, name
+        assert analyzer.cache_key("text", "Doc", "CBAM", PROFILE) == key
+
+    def test_fallback_result_not_cached(self, session_factory):
+        """Une erreur LLM n'est jamais mise en cache"""
+        cache = SemanticResultCache(session_factory=session_factory)
+
+        result = make_analyzer(cache, []).analyze("CBAM text", "Doc", "CBAM", PROFILE)
+
+        assert result.confidence_level == 0.0
+        assert cache.stats()["writes"] == 0
+
+    def test_ttl_and_lru_eviction(self, session_factory):
+        """Entrées expirées supprimées, puis les moins récemment utilisées au-delà de la taille max"""
+        session = session_factory()
+        repo = SemanticCacheRepository(session)
+        for key in ("old", "a", "b", "c"):
+            repo.put(key, "model", "1", "x" * 100)
+        session.get(SemanticCacheEntry, "old").created_at = datetime.utcnow() - timedelta(days=10)
+        for offset, key in enumerate(("b", "a", "c")):
+            session.get(SemanticCacheEntry, key).last_used_at = datetime.utcnow() + timedelta(seconds=offset)
+        session.flush()
+
+        removed = repo.evict(ttl_days=7, max_bytes=200)
+
+        assert removed == 2
+        assert sorted(key for (key,) in session.query(SemanticCacheEntry.cache_key)) == ["a", "c"]
+
+    def test_expired_entry_is_a_miss(self, session_factory):
+        """Une entrée plus ancienne que le TTL n'est pas relue et est supprimée"""
+        cache = SemanticResultCache(session_factory=session_factory, ttl_days=7)
+        make_analyzer(cache, [llm_response()]).analyze("CBAM text", "Doc", "CBAM", PROFILE)
+
+        session = session_factory()
+        session.query(SemanticCacheEntry).one().created_at = datetime.utcnow() - timedelta(days=8)
+        session.commit()
+
+        cache_key = SemanticAnalyzer().cache_key("CBAM text", "Doc", "CBAM", PROFILE)
+        assert cache.get(cache_key) is None
+        assert cache.stats()["misses"] == 2 and cache.stats()["hits"] == 0
+        assert session_factory().query(SemanticCacheEntry).count() == 0
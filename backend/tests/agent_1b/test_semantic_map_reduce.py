@@ -0,0 +1,145 @@
+"""Tests de l'analyse sémantique map-reduce des documents très longs."""
+
+import time
+
+import pytest
+
+from anthropic_stand_in import AnthropicStandIn
+from src.agent_1b.models import ChunkExtraction, SemanticAnalysisResult
+from src.agent_1b.tools.semantic_analyzer import PROMPT_VERSION, SemanticAnalyzer
+from src.agent_1b.tools.semantic_map_reduce import render_extractions
+from src.config import settings
+
+PROFILE = {
+    "company_name": "ACME",
+    "products": ["joints"],
+    "keywords": ["rubber"],
+    "nc_codes": ["4016.93"],
+    "regulations": ["CBAM"],
+}
+
+RESULT = SemanticAnalysisResult(
+    score=0.8,
+    is_applicable=True,
+    explanation="Le règlement impose une déclaration CBAM pour les joints en caoutchouc.",
+    regulation_summary="Déclaration trimestrielle des émissions intégrées.",
+    confidence_level=0.9
+)
+
+FILLER = "The Commission should be empowered to adopt delegated acts in accordance with the Treaty. "
+
+
+def long_regulation(articles: int = 12) -> str:
+    """Règlement d'environ 4 500 caractères par article (l'article court rejoint son voisin)"""
+    parts = [f"Article {i}\n{FILLER * 50}\n" for i in range(1, articles + 1)]
+    parts[articles // 2] = f"Article {articles // 2 + 1}\nImporters of rubber gaskets, CN code 4016 93 00, shall declare.\n"
+    return "REGULATION (EU) 2026/1\n" + "".join(parts)
+
+
+def respond(request) -> str:
+    """Extraction pour la phase map, résultat final pour la réduction"""
+    prompt = request["messages"][-1]["content"]
+    if prompt.startswith("# PASSAGE"):
+        return ChunkExtraction(
+            is_relevant="4016 93" in prompt,
+            summary="Déclaration des joints en caoutchouc." if "4016 93" in prompt else "Dispositions générales.",
+            nc_codes=["4016 93 00"] if "4016 93" in prompt else [],
+            obligations=["Déclaration trimestrielle"] if "4016 93" in prompt else [],
+        ).model_dump_json()
+    return RESULT.model_dump_json()
+
+
+@pytest.fixture
+def map_reduce_settings(monkeypatch):
+    monkeypatch.setattr(settings, "anthropic_api_key", "sk-ant-test")
+    monkeypatch.setattr(settings, "semantic_map_reduce_enabled", True)
+    monkeypatch.setattr(settings, "semantic_map_reduce_min_tokens", 5000)
+    monkeypatch.setattr(settings, "semantic_map_reduce_chunk_tokens", 1200)
+    monkeypatch.setattr(settings, "semantic_map_reduce_concurrency", 8)
+
+
+# Le SDK anthropic signale les modèles en fin de vie (DeprecationWarning)
+@pytest.mark.filterwarnings("ignore:The model:DeprecationWarning")
+class TestSemanticMapReduce:
+    """Découpage, extraction parallèle et réduction"""
+
+    def test_map_then_reduce(self, map_reduce_settings, monkeypatch):
+        """Un appel par passage puis un appel de réduction sur la synthèse"""
+        with AnthropicStandIn(respond=respond) as stand_in:
+            monkeypatch.setattr(settings, "anthropic_base_url", stand_in.base_url)
+            result = SemanticAnalyzer().analyze(long_regulation(), "Doc", "CBAM", PROFILE)
+
+        assert result.score == 0.8
+
+        *map_requests, reduce_request = stand_in.requests
+        assert len(map_requests) == 11
+        assert all(request["max_tokens"] < 2000 for request in map_requests)
+        # Le profil est en préfixe cacheable, identique pour tous les passages
+        assert all(request["system"] == map_requests[0]["system"] for request in map_requests)
+        # La réduction reçoit la synthèse, pas le texte du document
+        reduce_prompt = reduce_request["messages"][-1]["content"]
+        assert "4016 93 00" in reduce_prompt and "Déclaration trimestrielle" in reduce_prompt
+        assert FILLER not in reduce_prompt
+
+    def test_map_calls_run_concurrently(self, map_reduce_settings, monkeypatch):
+        """Durée proche de deux appels, pas de douze"""
+        with AnthropicStandIn(respond=respond, latency_ms=200) as stand_in:
+            monkeypatch.setattr(settings, "anthropic_base_url", stand_in.base_url)
+            analyzer = SemanticAnalyzer()
+            analyzer.warm_up()
+
+            start = time.perf_counter()
+            analyzer.analyze(long_regulation(), "Doc", "CBAM", PROFILE)
+            elapsed = time.perf_counter() - start
+
+        assert len(stand_in.requests) == 12
+        assert elapsed < 1.5
+
+    def test_budget_keeps_best_chunks(self, map_reduce_settings, monkeypatch):
+        """Au-delà du budget par document, les passages du profil sont gardés"""
+        monkeypatch.setattr(settings, "semantic_map_reduce_max_tokens", 3000)
+        analyzer = SemanticAnalyzer()
+
+        chunks, total = analyzer.map_reduce.split(long_regulation(), analyzer.content_query(PROFILE, "CBAM"))
+
+        assert total == 11
+        assert 1 <= len(chunks) < total
+        assert any("4016 93 00" in chunk for chunk in chunks)
+
+    def test_short_document_single_call(self, map_reduce_settings, monkeypatch):
+        """Sous le seuil : un seul appel, version de prompt inchangée"""
+        with AnthropicStandIn(respond=respond) as stand_in:
+            monkeypatch.setattr(settings, "anthropic_base_url", stand_in.base_url)
+            analyzer = SemanticAnalyzer()
+            analyzer.analyze("Short CBAM text.", "Doc", "CBAM", PROFILE)
+
+        assert len(stand_in.requests) == 1
+        assert analyzer.prompt_version("Short CBAM text.") == PROMPT_VERSION
+        assert analyzer.prompt_version(long_regulation()) == f"{PROMPT_VERSION}-map-reduce"
+
+    def test_failed_chunks_skipped(self, map_reduce_settings, monkeypatch):
+        """Un passage sans réponse exploitable n'empêche pas la réduction"""
+        def flaky(request):
+            if "Article 2\n" in request["messages"][-1]["content"]:
+                return "pas du JSON"
+            return respond(request)
+
+        with AnthropicStandIn(respond=flaky) as stand_in:
+            monkeypatch.setattr(settings, "anthropic_base_url", stand_in.base_url)
+            result = SemanticAnalyzer().analyze(long_regulation(), "Doc", "CBAM", PROFILE)
+
+        assert result.score == 0.8
+        assert "Synthèse de 10 passages analysés sur 11" in stand_in.requests[-1]["messages"][-1]["content"]
+
+
+def test_render_deduplicates():
+    extractions = [
+        (0, ChunkExtraction(is_relevant=True, summary="A", nc_codes=["4016 93 00"])),
+        (3, ChunkExtraction(summary="B", nc_codes=["4016 93 00 "], geographical_scope=["UE"])),
+    ]
+
+    text = render_extractions(extractions, 5)
+
+    assert text.count("4016 93 00") == 1
+    assert "[Passage 1/5] A" in text
+    assert "[Passage 4/5]" not in text
@@ -0,0 +1,152 @@
+"""Tests des destinations d'analyses (JSONL, unité de travail en base)."""
+
+import json
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import src.storage.analysis_repository as analysis_repository
+from src.agent_1b.agent import Agent1B
+from src.agent_1b.models import SemanticAnalysisResult
+from src.agent_1b.sinks import DatabaseSink, JsonlSink
+from src.agent_1b.tools.semantic_analyzer import SemanticAnalyzer
+from src.config import settings
+from src.storage.models import Base, CompanyProfile, Document, DocumentProfileAnalysis
+
+PROFILE = {"company_id": "acme", "company_name": "ACME", "keywords": ["cbam", "rubber"], "nc_codes": ["4016.93"]}
+
+
+@pytest.fixture
+def analyses(monkeypatch):
+    """Analyses produites par l'agent avec un LLM simulé"""
+    monkeypatch.setattr(settings, "semantic_cascade_mode", "off")
+    monkeypatch.setattr(settings, "semantic_cache_enabled", False)
+    response = AIMessage(
+        content=SemanticAnalysisResult(
+            score=0.9,
+            is_applicable=True,
+            explanation="Le règlement impose une déclaration pour les importations concernées.",
+            regulation_summary="Déclaration trimestrielle des émissions intégrées aux marchandises importées.",
+            impact_explanation="Les produits importés relèvent des codes NC déclarés par l'entreprise.",
+            confidence_level=0.9
+        ).model_dump_json()
+    )
+    analyzer = SemanticAnalyzer()
+    analyzer.chain = RunnableLambda(lambda inputs: response)
+    agent = Agent1B(PROFILE, semantic_analyzer=analyzer)
+    return [
+        agent.analyze_document(f"doc-{index}", "CBAM declarations for rubber goods under CN 4016.93.", "Acte")
+        for index in range(3)
+    ]
+
+
+def test_jsonl_sink(tmp_path, analyses):
+    path = tmp_path / "runs" / "run.jsonl"
+    sink = JsonlSink.open(path)
+
+    sink.write({"document_id": "doc-0"}, "acme", analyses[0])
+    sink.error({"document_id": "doc-1"}, "acme", RuntimeError("timeout"))
+    sink.close()
+
+    records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [record["status"] for record in records] == ["analyzed", "error"] and sink.lines == 2
+    assert records[0]["analysis"]["document_id"] == "doc-0"
+    assert records[0]["analysis"]["relevance_score"]["criticality"] == analyses[0].relevance_score.criticality.value
+    assert records[1] == {"status": "error", "document_id": "doc-1", "company_profile_id": "acme", "error": "timeout"}
+
+
+class FakeAnalysisRepository:
+    """Enregistrement des analyses simulé (échec au-delà de `fail_after` écritures)"""
+
+    fail_after = None
+
+    def __init__(self, session):
+        self.saved = []
+
+    def save_from_document_analysis(self, analysis, document_id, commit=True, update_document=True):
+        if self.fail_after is not None and len(self.saved) >= self.fail_after:
+            raise RuntimeError("database is locked")
+        self.saved.append(document_id)
+
+
+def make_sink(monkeypatch, commit_every: int, fail_after=None, listeners=None):
+    monkeypatch.setattr(FakeAnalysisRepository, "fail_after", fail_after)
+    monkeypatch.setattr(analysis_repository, "AnalysisRepository", FakeAnalysisRepository)
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(CompanyProfile(id="acme", company_name="ACME", headquarters_country="FR"))
+    documents = {}
+    for index in range(3):
+        document = Document(id=f"doc-{index}", title="Acte", source_url="http://x", event_type="reglementaire",
+                            hash_sha256=str(index) * 64, content="texte")
+        session.add(document)
+        documents[document.id] = document
+    session.commit()
+    pending = {document_id: ["acme"] for document_id in documents}
+    return session, DatabaseSink(session, documents, pending, commit_every=commit_every, listeners=listeners)
+
+
+@pytest.mark.database
+@pytest.mark.filterwarnings("ignore:datetime.datetime.utcnow:DeprecationWarning")
+def test_database_sink_batched_commits(monkeypatch, analyses):
+    session, sink = make_sink(monkeypatch, commit_every=2)
+
+    for analysis in analyses:
+        sink.write({"document_id": analysis.document_id}, "acme", analysis)
+    assert (sink.commits, sink.saved) == (1, 2)
+
+    sink.close()
+
+    assert (sink.commits, sink.saved, sink.lost) == (2, 3, 0)
+    assert session.query(DocumentProfileAnalysis).filter_by(status="analyzed").count() == 3
+    assert sink.documents["doc-2"].analyzed_at == analyses[2].analysis_timestamp
+
+
+@pytest.mark.database
+@pytest.mark.filterwarnings("ignore:datetime.datetime.utcnow:DeprecationWarning")
+def test_database_sink_rollback(monkeypatch, analyses):
+    """Écriture échouée : la transaction en cours est annulée, ses couples restent en attente"""
+    session, sink = make_sink(monkeypatch, commit_every=10, fail_after=1)
+
+    sink.write({"document_id": "doc-0"}, "acme", analyses[0])
+    with pytest.raises(RuntimeError):
+        sink.write({"document_id": "doc-1"}, "acme", analyses[1])
+
+    assert (sink.lost, sink.saved, sink.remaining["doc-0"]) == (1, 0, 1)
+    assert session.query(DocumentProfileAnalysis).count() == 0
+
+    sink.error({"document_id": "doc-1"}, "acme", RuntimeError("database is locked"))
+    sink.close()
+
+    assert sink.commits == 1
+    assert session.query(DocumentProfileAnalysis).one().status == "error"
+
+
+@pytest.mark.database
+@pytest.mark.filterwarnings("ignore:datetime.datetime.utcnow:DeprecationWarning")
+def test_jsonl_lines_follow_commits(tmp_path, monkeypatch, analyses):
+    """Lignes JSONL écrites au commit ; celles d'une transaction annulée ne sont jamais écrites"""
+    path = tmp_path / "run.jsonl"
+    jsonl = JsonlSink.open(path)
+    session, sink = make_sink(monkeypatch, commit_every=2, fail_after=2, listeners=[jsonl])
+
+    for analysis in analyses[:2]:
+        jsonl.write({"document_id": analysis.document_id}, "acme", analysis)
+        assert jsonl.lines == 0
+        sink.write({"document_id": analysis.document_id}, "acme", analysis)
+    assert (sink.commits, jsonl.lines) == (1, 2)
+
+    jsonl.write({"document_id": "doc-2"}, "acme", analyses[2])
+    with pytest.raises(RuntimeError):
+        sink.write({"document_id": "doc-2"}, "acme", analyses[2])
+    sink.close()
+    jsonl.close()
+
+    records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [record["document_id"] for record in records] == ["doc-0", "doc-1"]
+    assert (jsonl.lines, jsonl.discarded, sink.saved) == (2, 1, 2)
@@ -0,0 +1,18 @@
+"""Configuration partagée des tests."""
+
+import pytest
+
+from src.agent_1b.profile_index import reset_profile_indexes
+from src.config import settings
+
+
+@pytest.fixture(autouse=True)
+def generated_data_dirs(tmp_path, monkeypatch):
+    """Index de profils, pré-classifieurs et JSONL headless écrits sous tmp_path, pas dans data/"""
+    monkeypatch.setattr(settings, "profile_index_dir", tmp_path / "profile_index")
+    monkeypatch.setattr(settings, "pre_classifier_dir", tmp_path / "pre_classifier")
+    monkeypatch.setattr(settings, "headless_output_dir", tmp_path / "headless")
+    # Cache d'index du processus : recréé sur le répertoire du test
+    reset_profile_indexes()
+    yield
+    reset_profile_indexes()
@@ -0,0 +1,145 @@
+"""Tests de l'analyse Agent 1B du backlog sur un schéma SQLite réel."""
+
+import json
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import src.orchestration.pipeline as pipeline
+from src.agent_1b.agent import Agent1B
+from src.agent_1b.models import SemanticAnalysisResult
+from src.agent_1b.profile_index import reset_profile_indexes
+from src.agent_1b.sinks import AnalysisSink, JsonlSink
+from src.agent_1b.tools.semantic_analyzer import SemanticAnalyzer
+from src.config import settings
+from src.storage.models import Analysis, Base, CompanyProfile, Document, DocumentProfileAnalysis
+from src.utils.llm_usage import llm_context, new_run_id, persist_run
+
+RESPONSE = AIMessage(
+    content=SemanticAnalysisResult(
+        score=0.8,
+        is_applicable=True,
+        explanation="Le règlement impose une déclaration pour les importations concernées.",
+        regulation_summary="Déclaration trimestrielle des émissions intégrées aux marchandises importées.",
+        impact_explanation="Les produits importés relèvent des codes NC déclarés par l'entreprise.",
+        confidence_level=0.9
+    ).model_dump_json(),
+    usage_metadata={"input_tokens": 3000, "output_tokens": 200, "total_tokens": 3200}
+)
+
+
+@pytest.fixture
+def database(monkeypatch):
+    """Base SQLite en mémoire (schéma complet) et agents dont la chaîne LLM est locale"""
+    monkeypatch.setattr(settings, "semantic_cascade_mode", "off")
+    monkeypatch.setattr(settings, "semantic_cache_enabled", False)
+    monkeypatch.setattr(settings, "profile_index_disk_cache", False)
+    reset_profile_indexes()
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(pipeline, "get_session", session_factory)
+
+    llm_calls = []
+
+    async def fake_llm(inputs):
+        llm_calls.append(inputs["company_name"])
+        return RESPONSE
+
+    analyzer = SemanticAnalyzer()
+    analyzer.chain = RunnableLambda(lambda inputs: RESPONSE, afunc=fake_llm)
+    analyzer.warm_up = lambda: None
+    monkeypatch.setattr(pipeline, "Agent1B", lambda profile_index: Agent1B(profile_index, semantic_analyzer=analyzer))
+
+    session = session_factory()
+    session.add_all([
+        CompanyProfile(id="hut", company_name="HUTCHINSON", headquarters_country="FR",
+                       keywords=["cbam", "rubber"], nc_codes=["4016.93"]),
+        CompanyProfile(id="steel", company_name="Steel", headquarters_country="DE",
+                       keywords=["cbam", "steel"], nc_codes=["7208"], regulations=["CBAM"]),
+        CompanyProfile(id="old", company_name="Old", headquarters_country="FR", keywords=["cbam"], active=False),
+        # Analysé avant le suivi par profil
+        Document(id="doc-legacy", title="Acte", source_url="http://x", event_type="reglementaire",
+                 hash_sha256="0" * 64, content="CBAM applies to steel under CN 7208.10.", workflow_status="analyzed"),
+    ])
+    for index in (1, 2):
+        session.add(Document(id=f"doc-{index}", title="Acte", source_url="http://x", event_type="reglementaire",
+                             regulation_type="CBAM", hash_sha256=str(index) * 64,
+                             content="CBAM declarations for rubber goods under CN 4016.93 and steel under 7208.10."))
+    session.commit()
+
+    yield session, llm_calls
+    session.close()
+    reset_profile_indexes()
+
+
+@pytest.mark.database
+@pytest.mark.filterwarnings("ignore:datetime.datetime.utcnow:DeprecationWarning")
+def test_analyze_backlog(tmp_path, database):
+    session, llm_calls = database
+    profiles = pipeline.load_active_profiles()
+    assert sorted(profile_index.profile_id for profile_index in profiles) == ["hut", "steel"]
+
+    sink = JsonlSink.open(tmp_path / "run.jsonl")
+    stats = pipeline._analyze_backlog(session, profiles, sinks=[sink], commit_every=2)
+
+    # doc-legacy : reporté pour HUTCHINSON, analysé pour le nouveau profil seulement
+    assert (stats["documents"], stats["pairs"], stats["documents_analyzed"], stats["errors"]) == (3, 5, 5, 0)
+    assert stats["documents_saved"] == 5 and sorted(llm_calls) == ["HUTCHINSON"] * 2 + ["Steel"] * 3
+    assert session.query(Analysis).count() == 5
+    assert session.query(DocumentProfileAnalysis).filter_by(status="analyzed").count() == 6
+    assert {doc.workflow_status for doc in session.query(Document)} == {"analyzed"}
+    assert session.get(Document, "doc-1").analyzed_at is not None
+    records = [json.loads(line) for line in (tmp_path / "run.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert len(records) == 5 and {record["status"] for record in records} == {"analyzed"}
+
+    # Second run : plus rien en attente, aucune analyse dupliquée
+    stats = pipeline._analyze_backlog(session, profiles, sinks=[], commit_every=2)
+    assert stats["pairs"] == 0 and session.query(Analysis).count() == 5
+
+
+@pytest.mark.database
+@pytest.mark.filterwarnings("ignore:datetime.datetime.utcnow:DeprecationWarning")
+def test_llm_usage_on_profile_analyses(database):
+    """Tokens et durée de l'appel LLM reportés sur la ligne (document, profil) du run"""
+    session, llm_calls = database
+    run_id = new_run_id("test")
+
+    with llm_context(run_id=run_id):
+        pipeline._analyze_backlog(session, pipeline.load_active_profiles(), sinks=[], commit_every=2)
+    persist_run(run_id, session_factory=pipeline.get_session)
+
+    session.expire_all()
+    states = session.query(DocumentProfileAnalysis).filter(DocumentProfileAnalysis.llm_tokens.isnot(None)).all()
+    assert len(states) == len(llm_calls) == 5
+    assert {state.llm_tokens for state in states} == {3200}
+    # doc-legacy (reporté pour HUTCHINSON) : pas d'appel LLM, colonne vide
+    legacy = session.query(DocumentProfileAnalysis).filter_by(document_id="doc-legacy", company_profile_id="hut").one()
+    assert legacy.llm_tokens is None
+
+
+class FailingSink(AnalysisSink):
+    """Destination secondaire en échec (disque plein, terminal fermé...)"""
+
+    def write(self, document, profile_id, analysis):
+        raise OSError("No space left on device")
+
+
+@pytest.mark.database
+@pytest.mark.filterwarnings("ignore:datetime.datetime.utcnow:DeprecationWarning")
+def test_failing_sink_keeps_analyses(tmp_path, database):
+    """L'échec d'une autre destination n'annule ni ne marque en erreur les analyses enregistrées"""
+    session, llm_calls = database
+    sink = JsonlSink.open(tmp_path / "run.jsonl")
+
+    stats = pipeline._analyze_backlog(session, pipeline.load_active_profiles(), sinks=[FailingSink(), sink],
+                                      commit_every=2)
+
+    assert (stats["documents_analyzed"], stats["documents_saved"], stats["errors"]) == (5, 5, 0)
+    assert session.query(DocumentProfileAnalysis).filter_by(status="error").count() == 0
+    assert len((tmp_path / "run.jsonl").read_text(encoding="utf-8").splitlines()) == 5
@@ -1,230 +1,195 @@
 """Tests pour l'orchestration du pipeline Agent 1A → Agent 1B."""
 
 import pytest
-from unittest.mock import Mock, patch, MagicMock
-from datetime import datetime
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
-from src.orchestration.pipeline import run_pipeline, load_company_profile
-from src.storage.models import Document
+import src.orchestration.pipeline as pipeline
+import src.storage.database as storage_database
+from src.agent_1b.agent import Agent1B
+from src.agent_1b.models import SemanticAnalysisResult
+from src.agent_1b.tools.semantic_analyzer import SemanticAnalyzer
+from src.config import settings
+from src.orchestration.pipeline import load_company_profile, run_pipeline
+from src.storage.models import Base, CompanyProfile, Document, DocumentProfileAnalysis
 
+RESPONSE = AIMessage(
+    content=SemanticAnalysisResult(
+        score=0.8,
+        is_applicable=True,
+        explanation="Le règlement impose une déclaration pour les importations concernées.",
+        regulation_summary="Déclaration trimestrielle des émissions intégrées aux marchandises importées.",
+        impact_explanation="Les produits importés relèvent des codes NC déclarés par l'entreprise.",
+        confidence_level=0.9
+    ).model_dump_json()
+)
 
+AGENT_1A_SUCCESS = {
+    "status": "success",
+    "documents_processed": 2,
+    "documents_unchanged": 0,
+    "sources": {"eurlex": {"found": 2, "processed": 2}}
+}
+
+
+class FailingAgent1B(Agent1B):
+    """Agent 1B en échec sur doc-1 (les autres documents sont analysés)"""
+
+    async def aanalyze_document(self, document_id, *args, **kwargs):
+        if document_id == "doc-1":
+            raise RuntimeError("Analysis failed")
+        return await super().aanalyze_document(document_id, *args, **kwargs)
+
+
+@pytest.fixture
+def database(monkeypatch):
+    """Base SQLite en mémoire, Agent 1A et chaîne LLM locaux"""
+    monkeypatch.setattr(settings, "semantic_cascade_mode", "off")
+    monkeypatch.setattr(settings, "semantic_cache_enabled", False)
+    monkeypatch.setattr(settings, "profile_index_disk_cache", False)
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(pipeline, "get_session", session_factory)
+    # Consommation LLM du run (persist_run)
+    monkeypatch.setattr(storage_database, "get_session", session_factory)
+
+    agent_1a_result = dict(AGENT_1A_SUCCESS)
+
+    async def fake_agent_1a(**kwargs):
+        return agent_1a_result
+
+    monkeypatch.setattr(pipeline, "run_agent_1a_combined", fake_agent_1a)
+
+    llm_calls = []
+
+    async def fake_llm(inputs):
+        llm_calls.append(inputs["company_name"])
+        return RESPONSE
+
+    analyzer = SemanticAnalyzer()
+    analyzer.chain = RunnableLambda(lambda inputs: RESPONSE, afunc=fake_llm)
+    analyzer.warm_up = lambda: None
+    agent_class = {"class": Agent1B}
+    monkeypatch.setattr(
+        pipeline, "Agent1B",
+        lambda profile_index: agent_class["class"](profile_index, semantic_analyzer=analyzer)
+    )
+
+    session = session_factory()
+    session.add_all([
+        CompanyProfile(id="hut", company_name="HUTCHINSON", headquarters_country="FR",
+                       keywords=["cbam", "rubber"], nc_codes=["4016.93"]),
+        CompanyProfile(id="steel", company_name="Steel", headquarters_country="DE",
+                       keywords=["cbam", "steel"], nc_codes=["7208"], regulations=["CBAM"]),
+        CompanyProfile(id="old", company_name="Old", headquarters_country="FR", keywords=["cbam"], active=False),
+    ])
+    for index in (1, 2):
+        session.add(Document(id=f"doc-{index}", title="Acte", source_url="http://x", event_type="reglementaire",
+                             regulation_type="CBAM", hash_sha256=str(index) * 64,
+                             content="CBAM declarations for rubber goods under CN 4016.93 and steel under 7208.10."))
+    session.commit()
+
+    yield session, agent_1a_result, agent_class, llm_calls
+    session.close()
+
+
+@pytest.mark.database
+@pytest.mark.filterwarnings("ignore:datetime.datetime.utcnow:DeprecationWarning")
 class TestPipeline:
-    """Tests du pipeline complet"""
-    
-    @patch('src.orchestration.pipeline.asyncio.run')
-    @patch('src.orchestration.pipeline.get_session')
-    @patch('src.orchestration.pipeline.Agent1B')
-    def test_pipeline_success(self, mock_agent1b, mock_get_session, mock_asyncio_run):
-        """Test du pipeline avec succès complet"""
-        
-        # Mock Agent 1A result
-        mock_asyncio_run.return_value = {
-            "status": "success",
-            "documents_processed": 5,
-            "documents_unchanged": 2,
-            "sources": {
-                "eurlex": {"found": 3, "processed": 3},
-                "cbam_guidance": {"found": 4, "processed": 2}
-            }
-        }
-        
-        # Mock session et documents
-        mock_session = MagicMock()
-        mock_get_session.return_value = mock_session
-        
-        # Créer des documents mock
-        mock_doc = Mock(spec=Document)
-        mock_doc.id = "doc-123"
-        mock_doc.title = "Test Document"
-        mock_doc.content = "Test content"
-        mock_doc.regulation_type = "CBAM"
-        mock_doc.workflow_status = "raw"
-        
-        mock_session.query.return_value.filter.return_value.all.return_value = [mock_doc]
-        
-        # Mock Agent 1B
-        mock_analysis = Mock()
-        mock_analysis.is_relevant = True
-        mock_analysis.relevance_score.criticality.value = "HIGH"
-        mock_analysis.created_at = datetime.utcnow()
-        
-        mock_agent1b.return_value.analyze_document.return_value = mock_analysis
-        
-        # Mock process_and_display_analysis
-        with patch('src.orchestration.pipeline.process_and_display_analysis', return_value="analysis-123"):
-            result = run_pipeline()
-        
-        # Vérifications
-        assert result["status"] == "success"
-        assert result["agent_1a"]["documents_processed"] == 5
-        assert result["agent_1b"]["documents_analyzed"] == 1
-        assert result["agent_1b"]["relevant_count"] == 1
-        
-        # Vérifier que le workflow_status a été mis à jour
-        assert mock_doc.workflow_status == "analyzed"
-        mock_session.commit.assert_called()
-    
-    @patch('src.orchestration.pipeline.asyncio.run')
-    def test_pipeline_agent1a_fails(self, mock_asyncio_run):
-        """Test quand Agent 1A échoue"""
-        
-        # Mock Agent 1A failure
-        mock_asyncio_run.return_value = {
-            "status": "error",
-            "error": "Connection failed"
-        }
-        
+    """Tests du pipeline complet (collecte, profils actifs, backlog par profil)"""
+
+    def test_pipeline_success(self, database):
+        """Chaque document est analysé pour chaque profil actif"""
+        session, _, _, llm_calls = database
+
+        result = run_pipeline()
+
+        assert result["status"] == "success" and result["run_id"].startswith("pipeline-")
+        assert result["agent_1a"]["documents_processed"] == 2
+        assert result["agent_1b"]["profiles"] == 2
+        assert (result["agent_1b"]["pairs"], result["agent_1b"]["documents_analyzed"]) == (4, 4)
+        assert result["agent_1b"]["relevant_count"] == 4 and result["agent_1b"]["errors"] == 0
+        assert sorted(llm_calls) == ["HUTCHINSON"] * 2 + ["Steel"] * 2
+
+        session.expire_all()
+        assert {doc.workflow_status for doc in session.query(Document)} == {"analyzed"}
+        assert session.query(DocumentProfileAnalysis).filter_by(status="analyzed").count() == 4
+
+    def test_pipeline_agent1a_fails(self, database):
+        """Échec de l'Agent 1A : pas d'analyse"""
+        _, agent_1a_result, _, llm_calls = database
+        agent_1a_result.update(status="error", error="Connection failed")
+
         result = run_pipeline()
-        
-        # Le pipeline doit retourner une erreur
+
         assert result["status"] == "error"
         assert "Agent 1A failed" in result["error"]
-    
-    @patch('src.orchestration.pipeline.asyncio.run')
-    @patch('src.orchestration.pipeline.get_session')
-    def test_pipeline_no_documents_to_analyze(self, mock_get_session, mock_asyncio_run):
-        """Test quand il n'y a pas de documents à analyser"""
-        
-        # Mock Agent 1A success
-        mock_asyncio_run.return_value = {
-            "status": "success",
-            "documents_processed": 0,
-            "sources": {
-                "eurlex": {"found": 0, "processed": 0},
-                "cbam_guidance": {"found": 0, "processed": 0}
-            }
-        }
-        
-        # Mock session sans documents
-        mock_session = MagicMock()
-        mock_get_session.return_value = mock_session
-        mock_session.query.return_value.filter.return_value.all.return_value = []
-        
+        assert llm_calls == []
+
+    def test_pipeline_no_documents_to_analyze(self, database):
+        """Second run : tous les couples (document, profil) sont déjà analysés"""
+        run_pipeline()
+
         result = run_pipeline()
-        
+
         assert result["status"] == "success"
+        assert result["agent_1b"]["pairs"] == 0
         assert result["agent_1b"]["documents_analyzed"] == 0
-    
-    @patch('src.orchestration.pipeline.asyncio.run')
-    @patch('src.orchestration.pipeline.get_session')
-    @patch('src.orchestration.pipeline.Agent1B')
-    def test_pipeline_agent1b_partial_failure(self, mock_agent1b, mock_get_session, mock_asyncio_run):
-        """Test quand Agent 1B échoue sur certains documents mais continue"""
-        
-        # Mock Agent 1A success
-        mock_asyncio_run.return_value = {
-            "status": "success",
-            "documents_processed": 2,
-            "sources": {
-                "eurlex": {"found": 2, "processed": 2},
-                "cbam_guidance": {"found": 0, "processed": 0}
-            }
-        }
-        
-        # Mock session avec 2 documents
-        mock_session = MagicMock()
-        mock_get_session.return_value = mock_session
-        
-        doc1 = Mock(spec=Document)
-        doc1.id = "doc-1"
-        doc1.title = "Doc 1"
-        doc1.content = "Content 1"
-        doc1.regulation_type = "CBAM"
-        
-        doc2 = Mock(spec=Document)
-        doc2.id = "doc-2"
-        doc2.title = "Doc 2"
-        doc2.content = "Content 2"
-        doc2.regulation_type = "CBAM"
-        
-        mock_session.query.return_value.filter.return_value.all.return_value = [doc1, doc2]
-        
-        # Agent 1B échoue sur le premier, réussit sur le second
-        mock_analysis = Mock()
-        mock_analysis.is_relevant = False
-        mock_analysis.relevance_score.criticality.value = "LOW"
-        mock_analysis.created_at = datetime.utcnow()
-        
-        mock_agent1b.return_value.analyze_document.side_effect = [
-            Exception("Analysis failed"),
-            mock_analysis
-        ]
-        
-        with patch('src.orchestration.pipeline.process_and_display_analysis', return_value="analysis-123"):
-            result = run_pipeline()
-        
-        # Le pipeline doit continuer malgré l'erreur
+
+    def test_pipeline_agent1b_partial_failure(self, database):
+        """Un document en échec n'interrompt pas les autres et reste à analyser"""
+        session, _, agent_class, _ = database
+        agent_class["class"] = FailingAgent1B
+
+        result = run_pipeline()
+
         assert result["status"] == "success"
-        assert result["agent_1b"]["errors"] == 1
-        assert result["agent_1b"]["documents_analyzed"] == 1
+        assert result["agent_1b"]["errors"] == 2
+        assert result["agent_1b"]["documents_analyzed"] == 2
 
+        session.expire_all()
+        assert session.get(Document, "doc-1").workflow_status != "analyzed"
+        assert session.get(Document, "doc-2").workflow_status == "analyzed"
+        assert session.query(DocumentProfileAnalysis).filter_by(document_id="doc-1", status="error").count() == 2
 
+    def test_pipeline_without_active_profile(self, database):
+        """Aucun profil actif : erreur explicite"""
+        session, _, _, llm_calls = database
+        session.query(CompanyProfile).update({CompanyProfile.active: False})
+        session.commit()
+
+        result = run_pipeline()
+
+        assert result["status"] == "error"
+        assert "Aucun profil entreprise actif" in result["error"]
+        assert llm_calls == []
+
+
+@pytest.mark.database
+@pytest.mark.filterwarnings("ignore:datetime.datetime.utcnow:DeprecationWarning")
 class TestLoadCompanyProfile:
     """Tests du chargement du profil entreprise"""
-    
-    @patch('src.orchestration.pipeline.get_session')
-    def test_load_company_profile_success(self, mock_get_session):
-        """Test du chargement réussi du profil depuis la BDD"""
-        
-        from src.orchestration.pipeline import load_company_profile
-        
-        # Mock session et profil
-        mock_session = MagicMock()
-        mock_get_session.return_value = mock_session
-        
-        mock_profile = Mock()
-        mock_profile.id = "profile-123"
-        mock_profile.company_name = "Hutchinson SA"
-        mock_profile.active = True
-        mock_profile.nc_codes = ["7318159090", "4016999097"]
-        mock_profile.keywords = ["caoutchouc", "joint"]
-        mock_profile.regulations = ["CBAM", "EUDR"]
-        mock_profile.contact_emails = ["contact@hutchinson.com"]
-        mock_profile.config = {}
-        
-        mock_repo = Mock()
-        mock_repo.find_by_name.return_value = mock_profile
-        
-        with patch('src.orchestration.pipeline.CompanyProfileRepository', return_value=mock_repo):
-            profile = load_company_profile("Hutchinson SA")
-        
-        assert profile["company_name"] == "Hutchinson SA"
-        assert profile["company_id"] == "profile-123"
-        assert len(profile["nc_codes"]) == 2
+
+    def test_load_company_profile_success(self, database):
+        """Profil compilé depuis la BDD"""
+        profile = load_company_profile("Steel")
+
+        assert profile["company_name"] == "Steel"
+        assert profile["company_id"] == "steel"
+        assert profile["nc_codes"] == ["7208"]
         assert "CBAM" in profile["regulations"]
-    
-    @patch('src.orchestration.pipeline.get_session')
-    def test_load_company_profile_not_found(self, mock_get_session):
-        """Test quand le profil n'existe pas en BDD"""
-        
-        from src.orchestration.pipeline import load_company_profile
-        
-        mock_session = MagicMock()
-        mock_get_session.return_value = mock_session
-        
-        mock_repo = Mock()
-        mock_repo.find_by_name.return_value = None
-        
-        with patch('src.orchestration.pipeline.CompanyProfileRepository', return_value=mock_repo):
-            with pytest.raises(ValueError, match="non trouvé en BDD"):
-                load_company_profile("Unknown Company")
-    
-    @patch('src.orchestration.pipeline.get_session')
-    def test_load_company_profile_inactive(self, mock_get_session):
-        """Test quand le profil est désactivé"""
-        
-        from src.orchestration.pipeline import load_company_profile
-        
-        mock_session = MagicMock()
-        mock_get_session.return_value = mock_session
-        
-        mock_profile = Mock()
-        mock_profile.company_name = "Inactive Corp"
-        mock_profile.active = False
-        
-        mock_repo = Mock()
-        mock_repo.find_by_name.return_value = mock_profile
-        
-        with patch('src.orchestration.pipeline.CompanyProfileRepository', return_value=mock_repo):
-            with pytest.raises(ValueError, match="désactivé"):
-                load_company_profile("Inactive Corp")
+
+    def test_load_company_profile_not_found(self, database):
+        """Le profil n'existe pas en BDD"""
+        with pytest.raises(ValueError, match="non trouvé en BDD"):
+            load_company_profile("Unknown Company")
+
+    def test_load_company_profile_inactive(self, database):
+        """Le profil est désactivé"""
+        with pytest.raises(ValueError, match="désactivé"):
+            load_company_profile("Old")